@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+串口数据分析工具 - 命令行入口
+
+用法:
+    python cli.py compare -p protocol.json expected.txt observed.txt
+    python cli.py filter -p protocol.json capture.txt "命令 == 0x03 and not checksum_valid"
+    python cli.py filter -p meter.json -p modbus.json capture.bin "protocol == '示例协议'"
+    python cli.py export -p protocol.json capture.bin -o result.csv
+    python cli.py export -p protocol.json capture.bin -o result.csv --resync
+    python cli.py export -p protocol.json capture.bin -o result.parquet
+    python cli.py export -p protocol.json capture.bin -o result.db --index 命令码
+    python cli.py export -p protocol.json serial.log -o result.csv --start "2026-10-01 12:00:00"
+    python cli.py detect capture.bin --library protocols/
+    python cli.py follow -p protocol.json capture.bin --filter "not checksum_valid"
+    python cli.py show -p protocol.json capture.bin 3000000 -n 20
+    python cli.py show -p protocol.json capture.bin 3000000 --next-error
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+
+# 添加项目路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from models import ProtocolConfig
+from core import DataParser, ProtocolManager
+from core.frame_compare import FrameComparator
+from core.frame_filter import FrameFilter
+from core.demux import MultiProtocolParser
+from core.protocol_library import ProtocolLibrary
+from core.log_ingest import LogReader, LogTimeIndex, LogFrameParser, parse_time_text
+from core.file_follow import FileFollower
+from core.frame_index import FrameIndexWriter, open_frame_index, is_binary_capture
+from core.stream_parser import StreamParser
+from utils import (
+    read_capture_file, iter_capture_file, stream_export, get_txt_header,
+    export_columnar, get_columnar_format, export_sqlite, is_sqlite_path
+)
+
+
+def load_protocol(file_path: str) -> ProtocolConfig:
+    """加载协议配置，未指定文件时使用默认协议"""
+    if not file_path:
+        return ProtocolManager.get_default_protocol()
+    
+    protocol = ProtocolManager.load_protocol(file_path)
+    if protocol is None:
+        raise ValueError(f"协议加载失败: {file_path}")
+    return protocol
+
+
+def cmd_compare(args) -> int:
+    """对比两段捕获数据"""
+    parser = DataParser(load_protocol(args.protocol))
+    result_a = parser.parse_bytes(read_capture_file(args.expected))
+    result_b = parser.parse_bytes(read_capture_file(args.observed))
+    
+    comparator = FrameComparator(compare_fields=not args.no_fields)
+    result = comparator.compare(result_a.frames, result_b.frames)
+    print(result.to_text(args.max_diffs))
+    return 0 if result.is_identical() else 1
+
+
+def open_log_records(args, protocol: ProtocolConfig):
+    """
+    流式读取带时间戳的串口日志，指定起始时间时用稀疏时间索引直接定位
+    
+    Returns:
+        (日志行迭代器, 日志帧解析器)
+    """
+    reader = LogReader(args.capture)
+    start_time = parse_time_text(args.start) if args.start else None
+    end_time = parse_time_text(args.end) if args.end else None
+    offset, previous = 0, None
+    if start_time is not None:
+        index = LogTimeIndex(reader)
+        index.update()
+        offset, previous = index.find(start_time)
+    log_parser = LogFrameParser(protocol, resync=args.resync)
+    return reader.iter_records(offset, previous, start_time, end_time), log_parser
+
+
+def format_frame_line(frame) -> str:
+    """帧的一行文本（来自日志的帧带到达时间和方向）"""
+    line = (f"#{frame.frame_number}\t{frame.start_position}-{frame.end_position}\t"
+            f"{frame.get_raw_data_hex()}\t{frame.get_field_summary()}")
+    if frame.timestamp is not None:
+        line = f"{frame.get_timestamp_text()}\t{frame.channel}\t{line}"
+    return line
+
+
+def cmd_filter(args) -> int:
+    """按表达式过滤捕获数据中的帧"""
+    frame_filter = FrameFilter(args.expression)
+    if LogReader.is_log_file(args.capture):
+        if len(args.protocol) > 1:
+            raise ValueError("串口日志只支持单个协议")
+        records, log_parser = open_log_records(args, load_protocol(args.protocol[0] if args.protocol else ''))
+        result = log_parser.parse_records(records)
+    else:
+        if len(args.protocol) > 1:
+            # 多种协议交替出现时一次扫描分流解析
+            parser = MultiProtocolParser([load_protocol(path) for path in args.protocol])
+        else:
+            parser = DataParser(load_protocol(args.protocol[0] if args.protocol else ''), resync=args.resync)
+        result = parser.parse_bytes(read_capture_file(args.capture))
+    matched = frame_filter.filter(result.frames)
+    
+    if not args.count:
+        shown = matched if args.max_frames <= 0 else matched[:args.max_frames]
+        for frame in shown:
+            print(format_frame_line(frame))
+        if len(shown) < len(matched):
+            print(f"... 还有 {len(matched) - len(shown)} 帧未列出")
+    print(f"匹配: {len(matched)} / {result.get_total_frames()} 帧")
+    if result.framing_stats is not None:
+        print(f"分帧统计: {result.framing_stats.get_summary()}")
+    if result.gaps is not None:
+        print(result.gaps.get_summary())
+    return 0 if matched else 1
+
+
+def iter_file_frames(stream_parser: StreamParser, file_path: str):
+    """分块读取捕获文件并流式分帧，内存占用与文件大小无关"""
+    for block in iter_capture_file(file_path):
+        yield from stream_parser.feed(block)
+
+
+def cmd_export(args) -> int:
+    """流式导出捕获文件的解析结果"""
+    protocol = load_protocol(args.protocol)
+    stream_parser = None
+    index_writer = None
+    if LogReader.is_log_file(args.capture):
+        records, log_parser = open_log_records(args, protocol)
+        frames = log_parser.iter_frames(records)
+    else:
+        stream_parser = StreamParser(protocol, resync=args.resync)
+        frames = iter_file_frames(stream_parser, args.capture)
+    if args.frame_index:
+        # 分帧的同时记录帧索引，之后可用 show 命令直接跳转到任意帧
+        if stream_parser is None or not is_binary_capture(args.capture):
+            raise ValueError("帧索引只支持二进制捕获文件")
+        index_writer = FrameIndexWriter(protocol, resync=args.resync)
+        frames = index_writer.record(frames)
+    if args.filter:
+        frames = filter(FrameFilter(args.filter).matches, frames)
+    
+    def progress(written, total):
+        print(f"\r已导出 {written} 帧", end='', file=sys.stderr, flush=True)
+    
+    columnar_format = get_columnar_format(args.output)
+    if is_sqlite_path(args.output):
+        written = export_sqlite(frames, args.output, protocol, args.index, progress=progress)
+    elif columnar_format:
+        written = export_columnar(frames, args.output, protocol, columnar_format, progress=progress)
+    else:
+        file_format = 'csv' if args.output.lower().endswith('.csv') else 'txt'
+        written = stream_export(frames, args.output, file_format, get_txt_header(),
+                                progress=progress, workers=args.jobs)
+    print(file=sys.stderr)
+    print(f"导出完成: {written} 帧 -> {args.output}")
+    if index_writer is not None:
+        print(f"帧索引: {index_writer.write(args.capture)}")
+    if stream_parser is not None and stream_parser.framing_stats is not None:
+        print(f"分帧统计: {stream_parser.framing_stats.get_summary()}")
+    return 0
+
+
+def cmd_detect(args) -> int:
+    """用捕获数据样本为协议库中的协议打分，输出排名"""
+    library = ProtocolLibrary(args.library)
+    count = library.scan()
+    scores = library.detect(read_capture_file(args.capture), workers=args.jobs,
+                            sample_size=args.sample_size)
+    
+    shown = scores if args.max_results <= 0 else scores[:args.max_results]
+    for rank, score in enumerate(shown, 1):
+        print(f"{rank}. {score.describe()}\t{score.path}")
+    print(f"候选: {len(scores)} / {count} 个协议")
+    if scores and scores[0].score > 0:
+        print(f"最匹配: {scores[0].path}")
+        return 0
+    print("没有匹配的协议")
+    return 1
+
+
+def cmd_follow(args) -> int:
+    """跟踪不断增长的捕获文件，持续输出新识别的帧，按 Ctrl+C 结束"""
+    frame_filter = FrameFilter(args.filter) if args.filter else None
+    follower = FileFollower(args.capture, load_protocol(args.protocol),
+                            from_start=args.from_start, resync=args.resync)
+    follower.start()
+    try:
+        while follower.is_running():
+            frames = follower.get_frames(timeout=0.5)
+            if frame_filter is not None:
+                frames = frame_filter.filter(frames)
+            for frame in frames:
+                print(format_frame_line(frame), flush=True)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        follower.stop()
+    print(follower.get_stats().get_summary())
+    if follower.error_message:
+        print(follower.error_message, file=sys.stderr)
+        return 2
+    return 0
+
+
+def cmd_show(args) -> int:
+    """按帧序号显示大捕获文件中的帧（用 .sdcidx 帧索引直接定位，首次使用时建立索引）"""
+    def progress(done, total):
+        print(f"\r正在建立帧索引 {done * 100 // max(total, 1)}%", end='' if done < total else '\n',
+              file=sys.stderr, flush=True)
+    
+    index = open_frame_index(args.capture, load_protocol(args.protocol), resync=args.resync,
+                             rebuild=args.rebuild, progress=progress)
+    try:
+        frame_number = args.frame
+        if args.next_error:
+            frame_number = index.next_error(frame_number - 1)
+            if frame_number is None:
+                print(f"从第 {args.frame} 帧起没有错误帧")
+                return 1
+        for frame in index.read_frames(frame_number, args.count):
+            print(format_frame_line(frame))
+        print(index.get_summary())
+    finally:
+        index.close()
+    return 0
+
+
+def add_time_range_arguments(parser: argparse.ArgumentParser):
+    """添加串口日志的时间范围参数"""
+    parser.add_argument('--start', default='',
+                        help="串口日志：只处理该时间之后的数据，如 \"2026-10-01 12:00:00\"（用时间索引直接定位）")
+    parser.add_argument('--end', default='', help="串口日志：只处理该时间之前的数据")
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    """构建命令行参数解析器"""
+    arg_parser = argparse.ArgumentParser(description="串口数据分析工具（命令行）")
+    subparsers = arg_parser.add_subparsers(dest='command', required=True)
+    
+    compare = subparsers.add_parser('compare', help="对比两段捕获数据（十六进制文本或二进制文件）")
+    compare.add_argument('expected', help="基准数据文件")
+    compare.add_argument('observed', help="对比数据文件")
+    compare.add_argument('-p', '--protocol', default='', help="协议配置文件（JSON），默认使用内置默认协议")
+    compare.add_argument('--max-diffs', type=int, default=100, help="最多列出的差异数，0表示全部（默认100）")
+    compare.add_argument('--no-fields', action='store_true', help="不进行字段级对比")
+    compare.set_defaults(func=cmd_compare)
+    
+    filter_parser = subparsers.add_parser('filter', help="按表达式过滤帧，例如 \"命令 == 0x03 and 电压 > 3600\"")
+    filter_parser.add_argument('capture', help="捕获数据文件")
+    filter_parser.add_argument('expression', help="过滤表达式")
+    filter_parser.add_argument('-p', '--protocol', action='append', default=[],
+                               help="协议配置文件（JSON），可重复指定以分流解析多种协议，默认使用内置默认协议")
+    filter_parser.add_argument('--max-frames', type=int, default=100, help="最多列出的帧数，0表示全部（默认100）")
+    filter_parser.add_argument('--count', action='store_true', help="只输出匹配帧数")
+    filter_parser.add_argument('--resync', action='store_true',
+                               help="重同步分帧：只接受帧长和校验都正确的帧（仅单协议）")
+    add_time_range_arguments(filter_parser)
+    filter_parser.set_defaults(func=cmd_filter)
+    
+    export = subparsers.add_parser('export', help="流式解析捕获文件并导出为TXT/CSV/Parquet/Arrow/NPZ/SQLite（按输出文件扩展名）")
+    export.add_argument('capture', help="捕获数据文件")
+    export.add_argument('-o', '--output', required=True, help="输出文件（.txt、.csv、.parquet、.arrow、.npz、.db）")
+    export.add_argument('-p', '--protocol', default='', help="协议配置文件（JSON），默认使用内置默认协议")
+    export.add_argument('--filter', default='', help="只导出匹配过滤表达式的帧")
+    export.add_argument('--index', action='append', default=[],
+                        help="SQLite导出时建索引的字段（可重复指定）")
+    export.add_argument('-j', '--jobs', type=int, default=0, help="并行格式化的进程数（仅TXT/CSV，默认不并行）")
+    export.add_argument('--resync', action='store_true', help="重同步分帧：只接受帧长和校验都正确的帧")
+    export.add_argument('--frame-index', action='store_true',
+                        help="同时写入 .sdcidx 帧索引（仅二进制捕获文件），之后可用 show 命令直接跳转")
+    add_time_range_arguments(export)
+    export.set_defaults(func=cmd_export)
+    
+    detect = subparsers.add_parser('detect', help="在协议库中自动识别捕获数据使用的协议（按校验通过率打分）")
+    detect.add_argument('capture', help="捕获数据文件")
+    detect.add_argument('-l', '--library', default='.', help="协议文件目录（包括子目录，默认当前目录）")
+    detect.add_argument('--sample-size', type=int, default=64 * 1024,
+                        help="用于打分的数据长度（字节），0表示全部（默认65536）")
+    detect.add_argument('--max-results', type=int, default=10, help="最多列出的协议数，0表示全部（默认10）")
+    detect.add_argument('-j', '--jobs', type=int, default=0, help="并行打分的进程数（默认不并行）")
+    detect.set_defaults(func=cmd_detect)
+    
+    follow = subparsers.add_parser('follow', help="跟踪不断增长的捕获文件（类似 tail -f），持续输出新识别的帧")
+    follow.add_argument('capture', help="捕获文件（二进制、十六进制文本或串口日志）")
+    follow.add_argument('-p', '--protocol', default='', help="协议配置文件（JSON），默认使用内置默认协议")
+    follow.add_argument('--filter', default='', help="只输出匹配过滤表达式的帧")
+    follow.add_argument('--from-start', action='store_true', help="先解析文件中已有的内容（默认只解析新追加的数据）")
+    follow.add_argument('--resync', action='store_true', help="重同步分帧：只接受帧长和校验都正确的帧")
+    follow.set_defaults(func=cmd_follow)
+    
+    show = subparsers.add_parser('show', help="按帧序号显示大捕获文件中的帧（使用 .sdcidx 帧索引，无需重新解析整个文件）")
+    show.add_argument('capture', help="二进制捕获文件")
+    show.add_argument('frame', type=int, help="帧序号（从1开始）")
+    show.add_argument('-p', '--protocol', default='', help="协议配置文件（JSON），默认使用内置默认协议")
+    show.add_argument('-n', '--count', type=int, default=1, help="显示的帧数（默认1）")
+    show.add_argument('--next-error', action='store_true', help="从该帧开始查找下一个错误帧（校验失败等）")
+    show.add_argument('--resync', action='store_true', help="重同步分帧：只接受帧长和校验都正确的帧")
+    show.add_argument('--rebuild', action='store_true', help="忽略已有索引，重新建立")
+    show.set_defaults(func=cmd_show)
+    
+    return arg_parser
+
+
+def main(argv=None) -> int:
+    """命令行入口，返回值：0 成功/无差异，1 有差异/无匹配帧，2 出错"""
+    args = build_arg_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except (OSError, ValueError, sqlite3.Error) as e:
+        print(f"错误: {e}", file=sys.stderr)
+        return 2
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,66 +1,267 @@
 """
 分析历史记录管理
+历史记录保存在 SQLite 数据库中，每次分析只追加一行，不重写整个文件；
+按时间和协议名建索引，界面按页查询，启动时不读取全部记录。
+分析的捕获数据和协议配置保存在内容寻址数据块存储中，记录按哈希引用，可以原样重放。
+捕获数据按3字节组建倒排索引，按十六进制片段搜索时先用索引筛出候选捕获，再读取数据确认。
+粘贴的串口日志按日志文本保存（可原样重放），索引和搜索使用其中各数据行的字节。
+不同字节组过多的大捕获不写倒排索引，改为保存压缩的字节组位图（2^24位）。
 """
 import json
 import os
+import sqlite3
+import zlib
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Set, Tuple
 from datetime import datetime
 
+from models import ProtocolConfig
+from core.blob_store import BlobStore, DEFAULT_MAX_BYTES
+from core.parser import DataParser
+from core.log_ingest import log_payload
+
+try:
+    import numpy as np
+except ImportError:  # numpy 为可选依赖，没有时逐字节计算，大捕获不建索引
+    np = None
+
+
+# 每个捕获写入倒排索引的最多不同3字节组数（超出时改用字节组位图）
+MAX_CAPTURE_GRAMS = 65536
+# 3字节组的取值个数（位图位数）
+GRAM_SPACE = 1 << 24
+# 向量化计算字节组时每块的字节数
+GRAM_BLOCK_SIZE = 1 << 22
+
+# captures.indexed 的取值
+INDEX_NONE = 0  # 未建索引，搜索时直接读取数据确认
+INDEX_GRAMS = 1  # 字节组写入 capture_grams 倒排索引
+INDEX_BITMAP = 2  # 字节组位图保存在 captures.gram_bitmap
+
+
+def _gram_blocks(data: bytes):
+    """按块生成数据中的3字节组数组（大端整数，相邻块重叠2字节）"""
+    for start in range(0, max(len(data) - 2, 0), GRAM_BLOCK_SIZE):
+        block = np.frombuffer(data, dtype=np.uint8, count=min(GRAM_BLOCK_SIZE + 2, len(data) - start),
+                              offset=start).astype(np.uint32)
+        yield (block[:-2] << 16) | (block[1:-1] << 8) | block[2:]
+
+
+def capture_grams(data: bytes, limit: int = MAX_CAPTURE_GRAMS) -> Optional[Set[int]]:
+    """
+    计算数据中出现的所有3字节组（按大端整数表示）
+
+    Args:
+        data: 数据
+        limit: 最多的不同字节组数
+
+    Returns:
+        字节组集合，超出上限时返回None
+    """
+    if np is None:
+        grams = set()
+        add = grams.add
+        for i in range(len(data) - 2):
+            add(data[i:i + 3])
+            if len(grams) > limit:
+                return None
+        return {int.from_bytes(gram, 'big') for gram in grams}
+
+    if len(data) - 2 <= limit:
+        grams = next(_gram_blocks(data), np.empty(0, dtype=np.uint32))
+        return set(np.unique(grams).tolist())
+    bitmap = _gram_bitmap(data)
+    if np.count_nonzero(bitmap) > limit:
+        return None
+    return set(np.flatnonzero(bitmap).tolist())
+
+
+def _gram_bitmap(data: bytes) -> "np.ndarray":
+    """数据中出现的3字节组（长度为 GRAM_SPACE 的 bool 数组）"""
+    bitmap = np.zeros(GRAM_SPACE, dtype=np.bool_)
+    for grams in _gram_blocks(data):
+        bitmap[grams] = True
+    return bitmap
+
+
+def bitmap_contains(bitmap: bytes, grams: Set[int]) -> bool:
+    """压缩的字节组位图中是否包含全部字节组"""
+    bits = zlib.decompress(bitmap)
+    return all(bits[gram >> 3] & (0x80 >> (gram & 7)) for gram in grams)
+
+
+def search_data(data: bytes) -> bytes:
+    """捕获数据中按十六进制片段搜索的字节（日志文本取其中的数据字节）"""
+    payload = log_payload(data)
+    return data if payload is None else payload
+
+
+def index_capture_data(data: bytes) -> Tuple[Optional[Set[int]], Optional[bytes]]:
+    """
+    计算捕获数据的字节组索引
+
+    Args:
+        data: 捕获数据（已经过 search_data 处理）
+
+    Returns:
+        (字节组集合, 压缩位图)：不同字节组不超过上限时只有前者，超出时只有后者
+        （位图中字节组 g 对应第 g 位，高位在前，zlib 压缩）；没有 numpy 且超出上限时都为None，不建索引
+    """
+    if np is None or len(data) - 2 <= MAX_CAPTURE_GRAMS:
+        return capture_grams(data), None
+
+    bitmap = _gram_bitmap(data)
+    if np.count_nonzero(bitmap) <= MAX_CAPTURE_GRAMS:
+        return set(np.flatnonzero(bitmap).tolist()), None
+    return None, zlib.compress(np.packbits(bitmap).tobytes(), 1)
+
 
 class AnalysisHistory:
     """分析历史记录管理器"""
-    
-    def __init__(self, max_history: int = 20):
+
+    # 记录中保存的帧摘要数
+    SUMMARY_FRAMES = 10
+    # 输入数据预览长度
+    PREVIEW_LENGTH = 200
+
+    def __init__(self, max_history: int = 10000, max_snapshots: int = 20,
+                 history_dir: Optional[str] = None, max_blob_bytes: int = DEFAULT_MAX_BYTES):
         """
         初始化
-        
+
         Args:
-            max_history: 最大历史记录数
+            max_history: 最大历史记录数（超出时删除最早的记录）
+            max_snapshots: 保留快照的最近记录数（更早记录的快照文件被删除）
+            history_dir: 历史记录目录，默认 ~/.serialdatacompare
+            max_blob_bytes: 捕获数据存储的压缩后总大小上限
         """
         self.max_history = max_history
-        self.history_file = Path.home() / '.serialdatacompare' / 'analysis_history.json'
-        self.history_file.parent.mkdir(parents=True, exist_ok=True)
-        self.history: List[Dict[str, Any]] = self._load_history()
-    
-    def _load_history(self) -> List[Dict[str, Any]]:
-        """加载历史记录"""
+        self.max_snapshots = max_snapshots
+        base_dir = Path(history_dir) if history_dir else Path.home() / '.serialdatacompare'
+        base_dir.mkdir(parents=True, exist_ok=True)
+        self.db_file = base_dir / 'analysis_history.db'
+        # 旧版本的 JSON 历史记录文件，首次启动时迁移到数据库
+        self.history_file = base_dir / 'analysis_history.json'
+        # 分析结果快照目录（记录被淘汰或清空时一并删除）
+        self.snapshot_dir = base_dir / 'snapshots'
+        # 捕获数据和协议配置存储（相同内容只保存一份）
+        self.blob_store = BlobStore(str(base_dir / 'blobs'), max_blob_bytes)
+
+        self.conn = sqlite3.connect(str(self.db_file))
+        self.conn.row_factory = sqlite3.Row
+        # 后台线程计算的待索引字节组（捕获哈希 -> index_capture_data 的结果）
+        self._pending_grams: Dict[str, Tuple[Optional[Set[int]], Optional[bytes]]] = {}
+        # 十六进制搜索结果缓存（片段 -> 匹配的捕获哈希），记录变化时清空
+        self._search_cache: Dict[bytes, List[str]] = {}
+        self._init_db()
+        self._migrate_json()
+
+    def _init_db(self):
+        """创建表和索引"""
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        with self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS analyses (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    timestamp TEXT NOT NULL,
+                    protocol_name TEXT NOT NULL,
+                    input_data TEXT NOT NULL,
+                    total_frames INTEGER NOT NULL,
+                    valid_frames INTEGER NOT NULL,
+                    error_frames INTEGER NOT NULL,
+                    frame_summary TEXT NOT NULL,
+                    snapshot_path TEXT NOT NULL DEFAULT '',
+                    capture_hash TEXT NOT NULL DEFAULT '',
+                    protocol_hash TEXT NOT NULL DEFAULT ''
+                )
+            """)
+            # 旧版本数据库补充数据块引用列
+            columns = {row['name'] for row in self.conn.execute("PRAGMA table_info(analyses)")}
+            for column in ('capture_hash', 'protocol_hash'):
+                if column not in columns:
+                    self.conn.execute(f"ALTER TABLE analyses ADD COLUMN {column} TEXT NOT NULL DEFAULT ''")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_analyses_timestamp ON analyses (timestamp)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_analyses_protocol ON analyses (protocol_name)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_analyses_capture ON analyses (capture_hash)")
+            # 捕获数据索引：indexed 取值见 INDEX_NONE/INDEX_GRAMS/INDEX_BITMAP
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS captures (
+                    id INTEGER PRIMARY KEY,
+                    capture_hash TEXT NOT NULL UNIQUE,
+                    indexed INTEGER NOT NULL,
+                    gram_bitmap BLOB
+                )
+            """)
+            columns = {row['name'] for row in self.conn.execute("PRAGMA table_info(captures)")}
+            if 'gram_bitmap' not in columns:
+                self.conn.execute("ALTER TABLE captures ADD COLUMN gram_bitmap BLOB")
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS capture_grams (
+                    gram INTEGER NOT NULL,
+                    capture_id INTEGER NOT NULL,
+                    PRIMARY KEY (gram, capture_id)
+                ) WITHOUT ROWID
+            """)
+
+    def _migrate_json(self):
+        """把旧版本的 JSON 历史记录导入数据库（导入后文件改名为 .migrated）"""
         if not self.history_file.exists():
-            return []
-        
+            return
+
         try:
             with open(self.history_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except Exception as e:
-            print(f"加载分析历史记录失败: {e}")
-            return []
-    
-    def _save_history(self):
-        """保存历史记录"""
-        try:
-            with open(self.history_file, 'w', encoding='utf-8') as f:
-                json.dump(self.history, f, ensure_ascii=False, indent=2)
+                records = json.load(f)
+            # JSON 中最新的记录在前，按时间顺序插入
+            with self.conn:
+                for record in reversed(records):
+                    self._insert(record)
+            self.history_file.rename(self.history_file.with_suffix('.json.migrated'))
         except Exception as e:
-            print(f"保存分析历史记录失败: {e}")
-    
-    def add_analysis(self, protocol_name: str, input_data: str, 
+            print(f"迁移分析历史记录失败: {e}")
+
+    def _insert(self, record: Dict[str, Any]):
+        self.conn.execute(
+            "INSERT INTO analyses (timestamp, protocol_name, input_data, total_frames, valid_frames, "
+            "error_frames, frame_summary, snapshot_path, capture_hash, protocol_hash) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (record.get('timestamp', ''), record.get('protocol_name', ''), record.get('input_data', ''),
+             record.get('total_frames', 0), record.get('valid_frames', 0), record.get('error_frames', 0),
+             json.dumps(record.get('frame_summary', []), ensure_ascii=False),
+             record.get('snapshot_path', ''), record.get('capture_hash', ''),
+             record.get('protocol_hash', ''))
+        )
+
+    @staticmethod
+    def _to_record(row: sqlite3.Row) -> Dict[str, Any]:
+        record = dict(row)
+        record['frame_summary'] = json.loads(record['frame_summary'])
+        return record
+
+    def add_analysis(self, protocol_name: str, input_data: str,
                     total_frames: int, valid_frames: int, error_frames: int,
-                    frame_details: List[Dict[str, Any]]):
+                    frame_details: List[Dict[str, Any]], snapshot_path: str = '',
+                    capture_hash: str = '', protocol_hash: str = ''):
         """
         添加分析记录
-        
+
         Args:
             protocol_name: 协议名称
             input_data: 输入数据
             total_frames: 总帧数
             valid_frames: 有效帧数
             error_frames: 错误帧数
-            frame_details: 帧详情列表
+            frame_details: 帧详情列表（只保存前几帧的摘要）
+            snapshot_path: 分析结果快照文件路径（可为空）
+            capture_hash: 捕获数据的数据块哈希（见 store_capture）
+            protocol_hash: 协议配置的数据块哈希
         """
+        if len(input_data) > self.PREVIEW_LENGTH:
+            input_data = input_data[:self.PREVIEW_LENGTH] + '...'  # 截断长数据
         record = {
             'timestamp': datetime.now().isoformat(),
             'protocol_name': protocol_name,
-            'input_data': input_data[:200] + '...' if len(input_data) > 200 else input_data,  # 截断长数据
+            'input_data': input_data,
             'total_frames': total_frames,
             'valid_frames': valid_frames,
             'error_frames': error_frames,
@@ -71,34 +272,255 @@ class AnalysisHistory:
                     'checksum_valid': f['checksum_valid'],
                     'raw_data_hex': f['raw_data_hex']
                 }
-                for f in frame_details[:10]  # 最多保存前10帧的摘要
-            ]
+                for f in frame_details[:self.SUMMARY_FRAMES]
+            ],
+            'snapshot_path': snapshot_path,
+            'capture_hash': capture_hash,
+            'protocol_hash': protocol_hash
         }
-        
-        # 添加到列表开头
-        self.history.insert(0, record)
-        
-        # 限制历史记录数量
-        if len(self.history) > self.max_history:
-            self.history = self.history[:self.max_history]
-        
-        self._save_history()
-    
-    def get_history(self) -> List[Dict[str, Any]]:
-        """获取历史记录列表"""
-        return self.history
-    
+
+        try:
+            with self.conn:
+                self._insert(record)
+                if capture_hash:
+                    self._index_capture(capture_hash)
+                self._evict()
+            self._search_cache.clear()
+        except sqlite3.Error as e:
+            print(f"保存分析历史记录失败: {e}")
+
+    def _evict(self):
+        """删除超出数量的旧记录，并删除较早记录的快照"""
+        rows = self.conn.execute(
+            "SELECT id, snapshot_path FROM analyses WHERE snapshot_path != '' "
+            "ORDER BY id DESC LIMIT -1 OFFSET ?", (self.max_snapshots,)
+        ).fetchall()
+        for row in rows:
+            self._remove_snapshot(dict(row))
+        if rows:
+            self.conn.executemany("UPDATE analyses SET snapshot_path = '' WHERE id = ?",
+                                  [(row['id'],) for row in rows])
+
+        rows = self.conn.execute(
+            "SELECT id, capture_hash, protocol_hash FROM analyses ORDER BY id DESC LIMIT -1 OFFSET ?",
+            (self.max_history,)
+        ).fetchall()
+        if not rows:
+            return
+        self.conn.execute("DELETE FROM analyses WHERE id <= ?", (rows[0]['id'],))
+        # 删除不再被任何记录引用的数据块
+        for digest in {row[column] for row in rows for column in ('capture_hash', 'protocol_hash')}:
+            if digest and not self.conn.execute(
+                "SELECT 1 FROM analyses WHERE capture_hash = ? OR protocol_hash = ? LIMIT 1", (digest, digest)
+            ).fetchone():
+                self.blob_store.remove(digest)
+                self._unindex_capture(digest)
+
+    def _index_capture(self, capture_hash: str):
+        """为捕获数据建立字节组索引（已建过时跳过）"""
+        if self.conn.execute("SELECT 1 FROM captures WHERE capture_hash = ?", (capture_hash,)).fetchone():
+            self._pending_grams.pop(capture_hash, None)
+            return
+        if capture_hash in self._pending_grams:
+            grams, bitmap = self._pending_grams.pop(capture_hash)
+        else:
+            data = self.blob_store.get(capture_hash)
+            if data is None:
+                return
+            grams, bitmap = index_capture_data(search_data(data))
+        indexed = INDEX_GRAMS if grams is not None else INDEX_BITMAP if bitmap is not None else INDEX_NONE
+        cursor = self.conn.execute("INSERT INTO captures (capture_hash, indexed, gram_bitmap) VALUES (?, ?, ?)",
+                                   (capture_hash, indexed, bitmap))
+        if grams:
+            capture_id = cursor.lastrowid
+            self.conn.executemany("INSERT INTO capture_grams VALUES (?, ?)",
+                                  ((gram, capture_id) for gram in sorted(grams)))
+
+    def _unindex_capture(self, capture_hash: str):
+        """删除捕获数据的索引"""
+        row = self.conn.execute("SELECT id FROM captures WHERE capture_hash = ?", (capture_hash,)).fetchone()
+        if row:
+            self.conn.execute("DELETE FROM capture_grams WHERE capture_id = ?", (row['id'],))
+            self.conn.execute("DELETE FROM captures WHERE id = ?", (row['id'],))
+
+    def find_captures(self, pattern: bytes) -> List[str]:
+        """
+        查找包含指定字节序列的捕获数据
+
+        Args:
+            pattern: 字节序列
+
+        Returns:
+            匹配的捕获哈希列表
+        """
+        if pattern in self._search_cache:
+            return self._search_cache[pattern]
+
+        grams = {int.from_bytes(pattern[i:i + 3], 'big') for i in range(len(pattern) - 2)}
+        if grams:
+            # 倒排索引中包含全部字节组的捕获，加上未建索引的捕获
+            placeholders = ', '.join('?' * len(grams))
+            candidates = [row[0] for row in self.conn.execute(
+                f"SELECT c.capture_hash FROM capture_grams g JOIN captures c ON c.id = g.capture_id "
+                f"WHERE g.gram IN ({placeholders}) GROUP BY g.capture_id HAVING COUNT(*) = ? "
+                f"UNION SELECT capture_hash FROM captures WHERE indexed = ?",
+                list(grams) + [len(grams), INDEX_NONE]
+            )]
+            # 位图中包含全部字节组的大捕获
+            candidates += [row[0] for row in self.conn.execute(
+                "SELECT capture_hash, gram_bitmap FROM captures WHERE indexed = ?", (INDEX_BITMAP,)
+            ) if bitmap_contains(row[1], grams)]
+        else:
+            # 少于3字节的片段无法使用索引
+            candidates = [row[0] for row in self.conn.execute("SELECT capture_hash FROM captures")]
+
+        matches = []
+        for capture_hash in candidates:
+            data = self.blob_store.get(capture_hash)
+            if data is not None and pattern in search_data(data):
+                matches.append(capture_hash)
+        self._search_cache[pattern] = matches
+        return matches
+
+    def _where(self, protocol_name: Optional[str] = None, start: Optional[str] = None,
+               end: Optional[str] = None, hex_pattern: str = '') -> Tuple[str, list]:
+        """生成查询条件（时间为 ISO 格式字符串，可比较大小）"""
+        conditions, params = [], []
+        if hex_pattern:
+            pattern = DataParser.parse_hex_string(hex_pattern)
+            # 没有保存捕获数据的旧记录在输入数据预览中查找
+            conditions.append("(capture_hash IN (SELECT value FROM json_each(?)) OR "
+                              "(capture_hash = '' AND REPLACE(UPPER(input_data), ' ', '') LIKE ?))")
+            params += [json.dumps(self.find_captures(pattern)), f"%{pattern.hex().upper()}%"]
+        if protocol_name:
+            conditions.append("protocol_name = ?")
+            params.append(protocol_name)
+        if start:
+            conditions.append("timestamp >= ?")
+            params.append(start)
+        if end:
+            conditions.append("timestamp < ?")
+            params.append(end)
+        return (" WHERE " + " AND ".join(conditions)) if conditions else "", params
+
+    def query(self, offset: int = 0, limit: int = 100, protocol_name: Optional[str] = None,
+              start: Optional[str] = None, end: Optional[str] = None,
+              hex_pattern: str = '') -> List[Dict[str, Any]]:
+        """
+        分页查询历史记录（最新的在前）
+
+        Args:
+            offset: 跳过的记录数
+            limit: 最多返回的记录数
+            protocol_name: 只返回该协议的记录
+            start: 起始时间（含），ISO 格式
+            end: 结束时间（不含），ISO 格式
+            hex_pattern: 捕获数据中包含的十六进制片段，例如 "68 01 03"
+
+        Returns:
+            记录列表
+
+        Raises:
+            ValueError: 十六进制片段无效
+        """
+        where, params = self._where(protocol_name, start, end, hex_pattern)
+        rows = self.conn.execute(
+            f"SELECT * FROM analyses{where} ORDER BY id DESC LIMIT ? OFFSET ?",
+            params + [limit, offset]
+        ).fetchall()
+        return [self._to_record(row) for row in rows]
+
+    def count(self, protocol_name: Optional[str] = None, start: Optional[str] = None,
+              end: Optional[str] = None, hex_pattern: str = '') -> int:
+        """获取符合条件的记录数（参数同 query）"""
+        where, params = self._where(protocol_name, start, end, hex_pattern)
+        return self.conn.execute(f"SELECT COUNT(*) FROM analyses{where}", params).fetchone()[0]
+
+    def get_protocol_names(self) -> List[str]:
+        """获取历史记录中出现过的协议名"""
+        rows = self.conn.execute("SELECT DISTINCT protocol_name FROM analyses ORDER BY protocol_name")
+        return [row[0] for row in rows]
+
+    def get_history(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """获取最近的历史记录列表"""
+        return self.query(0, limit)
+
+    def store_capture(self, data: bytes, protocol: ProtocolConfig) -> Tuple[str, str]:
+        """
+        保存捕获数据和协议配置（可在后台线程调用）
+
+        Args:
+            data: 捕获数据（二进制数据或串口日志文本）
+            protocol: 解析使用的协议配置
+
+        Returns:
+            (捕获数据哈希, 协议配置哈希)
+
+        Raises:
+            OSError: 文件写入失败
+        """
+        protocol_json = json.dumps(protocol.to_dict(), ensure_ascii=False, sort_keys=True)
+        capture_hash = self.blob_store.put(data)
+        # 字节组在调用线程计算（有 numpy 时向量化），add_analysis 时写入索引
+        self._pending_grams[capture_hash] = index_capture_data(search_data(data))
+        # 保存协议配置时不能淘汰刚保存的捕获数据
+        return capture_hash, self.blob_store.put(protocol_json.encode('utf-8'), keep=(capture_hash,))
+
+    def load_capture(self, record: Dict[str, Any]) -> Tuple[Optional[ProtocolConfig], Optional[bytes]]:
+        """
+        读取记录对应的协议配置和捕获数据
+
+        Args:
+            record: 历史记录
+
+        Returns:
+            (协议配置, 捕获数据)，数据块已被淘汰时对应项为None
+        """
+        protocol = None
+        protocol_data = self.blob_store.get(record.get('protocol_hash', ''))
+        if protocol_data is not None:
+            protocol = ProtocolConfig.from_dict(json.loads(protocol_data))
+        return protocol, self.blob_store.get(record.get('capture_hash', ''))
+
+    def new_snapshot_path(self) -> str:
+        """生成新快照文件的路径"""
+        self.snapshot_dir.mkdir(parents=True, exist_ok=True)
+        name = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+        return str(self.snapshot_dir / f"{name}.sdcsnap")
+
+    def _remove_snapshot(self, record: Dict[str, Any]):
+        """删除记录对应的快照文件（只删除快照目录中的文件）"""
+        path = record.get('snapshot_path')
+        if not path or Path(path).parent != self.snapshot_dir:
+            return
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
     def clear_history(self):
         """清空历史记录"""
-        self.history = []
-        self._save_history()
-    
+        for row in self.conn.execute("SELECT snapshot_path FROM analyses WHERE snapshot_path != ''"):
+            self._remove_snapshot(dict(row))
+        with self.conn:
+            self.conn.execute("DELETE FROM analyses")
+            self.conn.execute("DELETE FROM capture_grams")
+            self.conn.execute("DELETE FROM captures")
+        self.blob_store.clear()
+        self._search_cache.clear()
+
     def get_record(self, index: int) -> Dict[str, Any]:
-        """获取指定索引的记录"""
-        if 0 <= index < len(self.history):
-            return self.history[index]
-        return {}
-    
+        """获取指定索引的记录（按最新在前的顺序）"""
+        if index < 0:
+            return {}
+        records = self.query(index, 1)
+        return records[0] if records else {}
+
+    def get_record_by_id(self, record_id: int) -> Dict[str, Any]:
+        """按记录ID获取记录"""
+        row = self.conn.execute("SELECT * FROM analyses WHERE id = ?", (record_id,)).fetchone()
+        return self._to_record(row) if row else {}
+
     def format_timestamp(self, timestamp: str) -> str:
         """格式化时间戳"""
         try:
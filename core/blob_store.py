@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+"""
+内容寻址数据存储
+按内容的 SHA-256 保存 zlib 压缩的数据块，相同内容只保存一份；
+总大小超过上限时按最近使用时间（文件修改时间）淘汰最久未用的数据块。
+"""
+
+import hashlib
+import os
+import tempfile
+import zlib
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+
+# 数据块文件扩展名
+BLOB_EXTENSION = '.zz'
+
+# 默认总大小上限
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+def blob_hash(data: bytes) -> str:
+    """计算数据块哈希（SHA-256 十六进制）"""
+    return hashlib.sha256(data).hexdigest()
+
+
+class BlobStore:
+    """内容寻址的压缩数据块存储"""
+
+    def __init__(self, root: str, max_bytes: int = DEFAULT_MAX_BYTES, level: int = 6):
+        """
+        初始化
+
+        Args:
+            root: 存储目录（按哈希前两位分子目录）
+            max_bytes: 压缩后总大小上限，0表示不限制
+            level: zlib 压缩级别
+        """
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.level = level
+        # 已知的压缩后总大小（None表示需要重新统计），避免每次保存都扫描目录
+        self._total: Optional[int] = None
+
+    def _path(self, digest: str) -> Path:
+        return self.root / digest[:2] / (digest[2:] + BLOB_EXTENSION)
+
+    @staticmethod
+    def _touch(path: Path):
+        """更新最近使用时间"""
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def put(self, data: bytes, keep: Iterable[str] = ()) -> str:
+        """
+        保存数据块（已存在时只更新使用时间，不重复写入）
+
+        Args:
+            data: 数据
+            keep: 超出上限淘汰时同样保留的数据块哈希（如同一条记录刚保存的其他数据块）
+
+        Returns:
+            数据块哈希
+
+        Raises:
+            OSError: 文件写入失败
+        """
+        digest = blob_hash(data)
+        path = self._path(digest)
+        if path.exists():
+            self._touch(path)
+            return digest
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # 先写临时文件再改名，其他进程不会读到不完整的数据块
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        try:
+            compressed = zlib.compress(data, self.level)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(compressed)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+        if self._total is not None:
+            self._total += len(compressed)
+        if self.max_bytes and self.total_size() > self.max_bytes:
+            self.evict(self.max_bytes, keep=(digest, *keep))
+        return digest
+
+    def get(self, digest: str) -> Optional[bytes]:
+        """
+        读取数据块
+
+        Args:
+            digest: 数据块哈希
+
+        Returns:
+            数据，不存在或已损坏时返回None
+        """
+        if not digest:
+            return None
+        path = self._path(digest)
+        try:
+            with open(path, 'rb') as f:
+                data = zlib.decompress(f.read())
+        except (OSError, zlib.error):
+            return None
+        if blob_hash(data) != digest:
+            return None
+        self._touch(path)
+        return data
+
+    def has(self, digest: str) -> bool:
+        """数据块是否存在"""
+        return bool(digest) and self._path(digest).exists()
+
+    def remove(self, digest: str):
+        """删除数据块"""
+        try:
+            os.remove(self._path(digest))
+        except OSError:
+            pass
+        self._total = None
+
+    def _entries(self) -> List[Tuple[float, int, Path]]:
+        """[(使用时间, 大小, 路径), ...]"""
+        entries = []
+        if not self.root.exists():
+            return entries
+        for path in self.root.glob('??/*' + BLOB_EXTENSION):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def total_size(self) -> int:
+        """压缩后总大小"""
+        if self._total is None:
+            self._total = sum(size for _, size, _ in self._entries())
+        return self._total
+
+    def evict(self, max_bytes: int, keep: Iterable[str] = ()) -> int:
+        """
+        淘汰最久未用的数据块，直到总大小不超过上限
+
+        Args:
+            max_bytes: 总大小上限
+            keep: 不淘汰的数据块哈希
+
+        Returns:
+            删除的数据块数
+        """
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        self._total = total
+        if total <= max_bytes:
+            return 0
+
+        keep_paths = {self._path(digest) for digest in keep}
+        removed = 0
+        for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+            if total <= max_bytes:
+                break
+            if path in keep_paths:
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        self._total = total
+        return removed
+
+    def clear(self):
+        """删除所有数据块"""
+        for _, _, path in self._entries():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        self._total = None
@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+"""
+列式帧数据模块
+把帧列表按字段转换为 numpy 列数组，供过滤、统计等批量计算向量化使用
+"""
+
+from typing import Dict, List, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # numpy 为可选依赖，没有时使用逐帧计算
+    np = None
+
+from models import DataFrame
+
+
+# 帧元数据列名（与字段列同名时，过滤表达式中用 field('名称') 访问字段）
+METADATA_COLUMNS = (
+    'frame_number', 'position', 'end_position', 'length',
+    'checksum_valid', 'has_error', 'channel', 'protocol', 'timestamp',
+)
+
+
+def is_numpy_available() -> bool:
+    """numpy是否可用"""
+    return np is not None
+
+
+class FrameColumns:
+    """帧数据的列式视图"""
+
+    def __init__(self, frames: Sequence[DataFrame], metadata: Dict[str, "np.ndarray"],
+                 fields: Dict[str, "np.ndarray"], present: Dict[str, "np.ndarray"]):
+        """
+        初始化（一般通过 from_frames 构建）
+
+        Args:
+            frames: 原始帧序列（按行号对应）
+            metadata: 元数据列名 -> 值数组
+            fields: 字段名 -> 值数组
+            present: 字段名 -> 该字段在每帧中是否存在的布尔数组
+        """
+        self.frames = frames
+        self.metadata = metadata
+        self.fields = fields
+        self.present = present
+
+    @classmethod
+    def from_frames(cls, frames: Sequence[DataFrame]) -> "FrameColumns":
+        """
+        从帧列表构建列数组
+
+        数值字段转换为 int64/float64 数组（缺失处填0，由 present 标记），
+        其他字段（bytes、字符串）保存为 object 数组。
+
+        Args:
+            frames: 帧列表
+
+        Returns:
+            列式视图
+
+        Raises:
+            RuntimeError: 未安装numpy
+        """
+        if np is None:
+            raise RuntimeError("列式计算需要安装 numpy：pip install numpy")
+
+        count = len(frames)
+        metadata = {}
+        metadata['frame_number'] = np.fromiter((f.frame_number for f in frames), np.int64, count)
+        metadata['position'] = np.fromiter((f.start_position for f in frames), np.int64, count)
+        metadata['end_position'] = np.fromiter((f.end_position for f in frames), np.int64, count)
+        metadata['length'] = np.fromiter((len(f.raw_data) for f in frames), np.int64, count)
+        metadata['checksum_valid'] = np.fromiter((f.checksum_valid for f in frames), np.bool_, count)
+        metadata['has_error'] = np.fromiter((f.has_error for f in frames), np.bool_, count)
+        metadata['channel'] = np.array([f.channel for f in frames], dtype=object)
+        metadata['protocol'] = np.array([f.protocol_name for f in frames], dtype=object)
+        metadata['timestamp'] = np.fromiter(
+            (np.nan if f.timestamp is None else f.timestamp for f in frames), np.float64, count
+        )
+
+        # 按字段收集值（同一协议的帧字段一致，逐帧字典遍历一次）
+        values: Dict[str, List] = {}
+        rows: Dict[str, List[int]] = {}
+        for row, frame in enumerate(frames):
+            for name, value in frame.fields.items():
+                if name not in values:
+                    values[name] = []
+                    rows[name] = []
+                values[name].append(value)
+                rows[name].append(row)
+
+        fields = {}
+        present = {}
+        for name, field_values in values.items():
+            mask = np.zeros(count, dtype=np.bool_)
+            mask[rows[name]] = True
+            present[name] = mask
+
+            if all(type(v) is int for v in field_values):
+                in_range = -2**63 <= min(field_values) and max(field_values) < 2**63
+                column = np.zeros(count, dtype=np.int64 if in_range else np.float64)
+            elif all(type(v) in (int, float) for v in field_values):
+                column = np.zeros(count, dtype=np.float64)
+            else:
+                column = np.empty(count, dtype=object)
+            column[rows[name]] = field_values
+            fields[name] = column
+
+        return cls(frames, metadata, fields, present)
+
+    def __len__(self) -> int:
+        return len(self.frames)
+
+    def get_metadata(self, name: str) -> "np.ndarray":
+        """获取元数据列（frame_number、position、length等）"""
+        return self.metadata[name]
+
+    def get_field(self, name: str) -> "np.ndarray":
+        """获取字段列（缺失行的值无意义，需结合 get_present）"""
+        return self.fields[name]
+
+    def get_present(self, name: str) -> "np.ndarray":
+        """获取字段在每帧中是否存在的布尔数组"""
+        return self.present[name]
+
+    def has_field(self, name: str) -> bool:
+        """是否存在该字段列"""
+        return name in self.fields
+
+    def get_field_names(self) -> List[str]:
+        """获取字段名列表"""
+        return list(self.fields.keys())
+
+    def is_numeric(self, name: str) -> bool:
+        """字段列是否为数值类型"""
+        return self.fields[name].dtype.kind in 'iuf'
+
+    def get_values(self, name: str) -> "np.ndarray":
+        """获取字段实际存在的值（去掉缺失行）"""
+        return self.fields[name][self.present[name]]
+
+    def take(self, mask: "np.ndarray") -> List[DataFrame]:
+        """
+        按布尔掩码取出帧
+
+        Args:
+            mask: 与帧数等长的布尔数组
+
+        Returns:
+            帧列表
+        """
+        return [self.frames[i] for i in np.flatnonzero(mask)]
@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+"""
+协议解码计划模块
+把协议配置预先编译为解码计划：帧头/帧尾匹配模式、数据区范围、各字段的长度来源和
+预先创建的 struct 解码器，解析每帧时不再重复查找字段定义和转换帧头帧尾。
+解码计划可以序列化为字典，由协议注册表缓存到磁盘。
+"""
+
+import struct
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from models import ProtocolConfig, FieldType, ChecksumType
+from core.frame_pattern import FramePattern
+
+
+# 数值类型 -> (struct格式, 数据不足时的默认值)，均为小端序
+_NUMERIC_FORMATS = {
+    FieldType.UINT8.value: ('<B', 0),
+    FieldType.UINT16.value: ('<H', 0),
+    FieldType.UINT32.value: ('<I', 0),
+    FieldType.INT8.value: ('<b', 0),
+    FieldType.INT16.value: ('<h', 0),
+    FieldType.INT32.value: ('<i', 0),
+    FieldType.FLOAT.value: ('<f', 0.0),
+    FieldType.DOUBLE.value: ('<d', 0.0),
+}
+
+
+def _decode_string(data: bytes) -> str:
+    try:
+        return data.decode('utf-8').rstrip('\x00')
+    except UnicodeDecodeError:
+        return data.decode('latin-1').rstrip('\x00')
+
+
+def _make_decoder(field_type: str) -> Callable[[bytes], Any]:
+    """创建字段解码函数（与 DataParser.parse_field 的结果一致）"""
+    if field_type in _NUMERIC_FORMATS:
+        fmt, default = _NUMERIC_FORMATS[field_type]
+        unpack_from = struct.Struct(fmt).unpack_from
+        size = struct.calcsize(fmt)
+
+        def decode(data: bytes):
+            return unpack_from(data)[0] if len(data) >= size else default
+        return decode
+    if field_type == FieldType.STRING.value:
+        return _decode_string
+    # bytes 及未知类型返回原始字节
+    return bytes
+
+
+class FieldPlan:
+    """单个字段的解码步骤"""
+
+    __slots__ = ('name', 'field_type', 'byte_count', 'length_field', 'decode')
+
+    def __init__(self, name: str, field_type: str, byte_count: int, length_field: Optional[str]):
+        self.name = name
+        self.field_type = field_type
+        self.byte_count = byte_count
+        self.length_field = length_field
+        self.decode = _make_decoder(field_type)
+
+
+class DecodePlan:
+    """协议解码计划"""
+
+    def __init__(self, header: FramePattern, tail: FramePattern, trailer_length: int,
+                 fields: List[Tuple[str, str, int, Optional[str]]]):
+        """
+        初始化
+
+        Args:
+            header: 帧头匹配模式
+            tail: 帧尾匹配模式
+            trailer_length: 数据区之后的字节数（帧尾加校验码）
+            fields: [(字段名, 类型值, 字节数, 长度字段), ...]，字节数为0表示变长
+        """
+        self.header = header
+        self.tail = tail
+        self.trailer_length = trailer_length
+        self.fields = [FieldPlan(*field) for field in fields]
+        self.field_types: Dict[str, str] = {f.name: f.field_type for f in self.fields}
+        # 变长字段引用的长度字段（计算帧长时需要解码）
+        self._length_fields = {f.length_field for f in self.fields if f.byte_count == 0 and f.length_field}
+        # 所有字段都为定长时的帧长
+        self.min_length = header.length + sum(f.byte_count for f in self.fields) + trailer_length
+
+    @classmethod
+    def compile(cls, protocol: ProtocolConfig) -> "DecodePlan":
+        """
+        编译协议配置
+
+        Args:
+            protocol: 协议配置
+
+        Returns:
+            解码计划
+
+        Raises:
+            ValueError: 帧头或帧尾不是有效的十六进制模式
+        """
+        checksum_config = protocol.checksum_config
+        tail = FramePattern(protocol.frame_tail)
+        trailer_length = len(tail)
+        if checksum_config.checksum_type != ChecksumType.NONE:
+            trailer_length += checksum_config.checksum_length
+        return cls(
+            FramePattern(protocol.frame_header), tail, trailer_length,
+            [(fd.name, fd.field_type.value, fd.byte_count, fd.length_field) for fd in protocol.fields]
+        )
+
+    def decode_fields(self, frame_data: bytes) -> dict:
+        """
+        解析帧中的所有字段
+
+        Args:
+            frame_data: 完整的帧数据（包括帧头和帧尾）
+
+        Returns:
+            字段字典 {字段名: 值}
+        """
+        fields = {}
+        data_part = frame_data[len(self.header):len(frame_data) - self.trailer_length]
+        data_length = len(data_part)
+
+        offset = 0
+        for field in self.fields:
+            if offset >= data_length:
+                break
+
+            if field.byte_count == 0:
+                # 变长字段，从长度字段获取，没有时取剩余所有数据
+                if field.length_field and field.length_field in fields:
+                    field_len = fields[field.length_field]
+                else:
+                    field_len = data_length - offset
+            else:
+                field_len = field.byte_count
+
+            fields[field.name] = field.decode(data_part[offset:offset + field_len])
+            offset += field_len
+
+        return fields
+
+    def frame_length(self, data: bytes, start: int) -> Optional[int]:
+        """
+        按字段定义计算从 start 开始的帧的总长度
+
+        变长字段需要由前面的长度字段给出长度；长度字段还没有收到时返回帧的最小长度。
+
+        Args:
+            data: 字节数据
+            start: 帧头位置
+
+        Returns:
+            帧长（包括帧头、校验码和帧尾），有不带长度字段的变长字段时返回None
+        """
+        offset = start + self.header.length
+        lengths = {}
+        for field in self.fields:
+            if field.byte_count == 0:
+                field_len = lengths.get(field.length_field)
+                if not isinstance(field_len, int) or isinstance(field_len, bool):
+                    # 没有长度字段（取剩余数据）或长度字段不是整数
+                    return None
+            else:
+                field_len = field.byte_count
+                if field.name in self._length_fields:
+                    if offset + field_len > len(data):
+                        return self.min_length
+                    lengths[field.name] = field.decode(data[offset:offset + field_len])
+            offset += field_len
+        return offset - start + self.trailer_length
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典（用于缓存到磁盘）"""
+        return {
+            'header': self.header.to_text(),
+            'tail': self.tail.to_text(),
+            'trailer_length': self.trailer_length,
+            'fields': [[f.name, f.field_type, f.byte_count, f.length_field] for f in self.fields],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "DecodePlan":
+        """从字典恢复解码计划"""
+        # 旧版本缓存的帧头帧尾是十六进制字符串，同样可以按模式解析
+        return cls(
+            FramePattern(data['header']), FramePattern(data['tail']), data['trailer_length'],
+            [tuple(field) for field in data['fields']]
+        )
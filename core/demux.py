@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+"""
+多协议分流解析模块
+同一总线上交替出现多种协议的帧时，一次扫描找出所有协议的帧：
+各协议的帧头（包括通配/掩码模式）编译为一个多模式匹配器（正则表达式的分支），
+每个匹配位置按帧头分派给对应协议的解码计划，得到按位置排序、标记了协议的合并结果。
+
+同一位置匹配多个协议的帧头时（帧头相同、互为前缀或通配模式重叠）依次尝试，
+取第一个校验通过且帧长正确的协议；都不通过时按第一个找到帧尾的协议解析为错误帧。
+未通过的候选帧中出现其他协议的帧头时不接受该错误帧（它会吞掉其中的正确帧），
+从下一个字节重新查找帧头。帧长不超过 max_frame_length（与重同步分帧相同），
+各协议下一个帧尾的位置被缓存，重试帧头时不重复查找，总工作量与数据长度成线性关系。
+"""
+
+import re
+from typing import Dict, List, Optional, Tuple
+
+from models import ProtocolConfig, DataFrame, ParseResult, GapIndex
+from core.decode_plan import DecodePlan
+from core.frame_pattern import FramePattern
+from core.parser import DataParser
+from core.protocol_library import ProtocolSignature
+
+
+class MultiProtocolParser:
+    """多协议分流解析器"""
+
+    def __init__(self, protocols: List[ProtocolConfig],
+                 plans: Optional[List[Optional[DecodePlan]]] = None):
+        """
+        初始化
+
+        Args:
+            protocols: 协议配置列表（帧头冲突时靠前的协议优先）
+            plans: 各协议预先编译的解码计划，为None时编译
+
+        Raises:
+            ValueError: 协议列表为空，或帧头帧尾不是有效的十六进制
+        """
+        if not protocols:
+            raise ValueError("至少需要一个协议")
+        plans = plans or [None] * len(protocols)
+        self.parsers = [DataParser(protocol, plan) for protocol, plan in zip(protocols, plans)]
+        # 各协议的固定帧长（用于帧头冲突时判断帧是否属于该协议）
+        self.fixed_lengths = [
+            ProtocolSignature.from_protocol(parser.protocol, parser.plan).fixed_length
+            for parser in self.parsers
+        ]
+
+        headers: Dict[FramePattern, List[int]] = {}
+        for index, parser in enumerate(self.parsers):
+            headers.setdefault(parser.plan.header, []).append(index)
+        # 各帧头及使用它的协议，长帧头优先尝试
+        self._headers: List[Tuple[FramePattern, List[int]]] = sorted(
+            headers.items(), key=lambda item: len(item[0]), reverse=True
+        )
+        self._pattern = re.compile(b'|'.join(header.regex() for header, _ in self._headers), re.DOTALL)
+        # 各协议以外的帧头（判断错误帧中是否夹着其他协议的帧），没有时为None
+        self._other_headers = []
+        for index in range(len(self.parsers)):
+            others = [header.regex() for header, indexes in self._headers if indexes != [index]]
+            self._other_headers.append(re.compile(b'|'.join(others), re.DOTALL) if others else None)
+
+    @property
+    def protocols(self) -> List[ProtocolConfig]:
+        """协议配置列表"""
+        return [parser.protocol for parser in self.parsers]
+
+    def _accepts(self, index: int, frame: DataFrame) -> bool:
+        """帧是否校验通过且帧长符合该协议"""
+        fixed_length = self.fixed_lengths[index]
+        return not frame.has_error and (fixed_length is None or len(frame.raw_data) == fixed_length)
+
+    def _parse_at(self, data: bytes, start: int, candidates: List[int],
+                  exhausted: set, next_tails: Dict[int, int]) -> Optional[Tuple[DataFrame, int]]:
+        """
+        在帧头位置按候选协议解析一帧
+
+        Args:
+            next_tails: 各协议上次找到的帧尾位置（帧头位置递增，仍在帧头之后时直接使用）
+
+        Returns:
+            (数据帧, 协议序号)，没有可接受的帧时返回None
+        """
+        fallback = None
+        for index in candidates:
+            if index in exhausted:
+                continue
+            parser = self.parsers[index]
+            plan = parser.plan
+            search_start = start + len(plan.header)
+            tail_pos = next_tails.get(index, -1)
+            if tail_pos < search_start:
+                tail_pos = plan.tail.find(data, search_start)
+                next_tails[index] = tail_pos
+            if tail_pos == -1:
+                # 之后不会再有该协议的完整帧
+                exhausted.add(index)
+                continue
+            end = tail_pos + len(plan.tail)
+            if end - start > parser.max_frame_length:
+                # 帧过长，不是该协议的帧
+                continue
+            frame = parser.parse_single_frame(data[start:end], 0, start)
+            if self._accepts(index, frame):
+                return frame, index
+            other_headers = self._other_headers[index]
+            if fallback is None and (other_headers is None
+                                     or other_headers.search(data, start + 1, end) is None):
+                fallback = (frame, index)
+        return fallback
+
+    def parse_bytes(self, data: bytes) -> ParseResult:
+        """
+        一次扫描解析所有协议的帧
+
+        Args:
+            data: 原始字节数据
+
+        Returns:
+            合并的解析结果，每帧的 protocol_name 记录所属协议
+        """
+        result = ParseResult()
+        result.total_bytes = len(data)
+        exhausted: set = set()
+        next_tails: Dict[int, int] = {}
+        search = self._pattern.search
+        pos = 0
+        try:
+            while len(exhausted) < len(self.parsers):
+                match = search(data, pos)
+                if match is None:
+                    break
+                start = match.start()
+                candidates = [index for header, indexes in self._headers
+                              if header.match_at(data, start) for index in indexes]
+                parsed = self._parse_at(data, start, candidates, exhausted, next_tails)
+                if parsed is None:
+                    pos = start + 1
+                    continue
+                frame, index = parsed
+                frame.frame_number = len(result.frames) + 1
+                frame.protocol_name = self.parsers[index].protocol.protocol_name
+                result.add_frame(frame)
+                pos = frame.end_position
+        except Exception as e:
+            return DataParser._error_result(f"解析失败: {str(e)}")
+        result.gaps = GapIndex.from_positions(
+            ((frame.start_position, frame.end_position) for frame in result.frames), len(data), data
+        )
+        return result
+
+    def parse(self, hex_string: str) -> ParseResult:
+        """
+        解析十六进制字符串
+
+        Args:
+            hex_string: 输入的十六进制字符串
+
+        Returns:
+            合并的解析结果
+        """
+        try:
+            data = DataParser.parse_hex_string(hex_string)
+        except ValueError as e:
+            return DataParser._error_result(f"数据格式错误: {str(e)}")
+        return self.parse_bytes(data)
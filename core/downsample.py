@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+"""
+大序列降采样模块
+为字段趋势图构建 min/max 金字塔：每个字段只构建一次，
+缩放/平移时从合适的层级取出可见窗口，再把窗口降采样到像素数量级；
+也提供 LTTB（Largest-Triangle-Three-Buckets）算法用于保留形状的降采样
+"""
+
+from typing import List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # numpy 为可选依赖，趋势图需要
+    np = None
+
+from core.columns import FrameColumns
+
+
+def lttb(x: "np.ndarray", y: "np.ndarray", threshold: int) -> Tuple["np.ndarray", "np.ndarray"]:
+    """
+    LTTB 降采样
+
+    Args:
+        x: 横坐标（单调递增）
+        y: 纵坐标
+        threshold: 输出点数（至少3）
+
+    Returns:
+        (x, y) 降采样后的点
+    """
+    count = len(x)
+    if threshold >= count or threshold < 3:
+        return x, y
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = count - 1
+    # 中间的点平均分为 threshold-2 个桶，每个桶选一个点
+    edges = np.linspace(1, count - 1, threshold - 1).astype(np.int64)
+
+    previous = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], max(edges[i + 1], edges[i] + 1)
+        # 下一个桶的平均点（最后一个桶用终点）
+        if i + 2 < threshold - 1:
+            next_start, next_end = edges[i + 1], max(edges[i + 2], edges[i + 1] + 1)
+            avg_x = x[next_start:next_end].mean()
+            avg_y = y[next_start:next_end].mean()
+        else:
+            avg_x, avg_y = x[-1], y[-1]
+
+        # 选与前一个选中点、下一个桶平均点构成三角形面积最大的点
+        px, py = x[previous], y[previous]
+        areas = np.abs((px - avg_x) * (y[start:end] - py) - (px - x[start:end]) * (avg_y - py))
+        previous = start + int(areas.argmax())
+        selected[i + 1] = previous
+
+    return x[selected], y[selected]
+
+
+def _bucket_minmax(x: "np.ndarray", mins: "np.ndarray", maxs: "np.ndarray",
+                   buckets: int) -> Tuple["np.ndarray", "np.ndarray"]:
+    """把点分为 buckets 组，每组输出最小值和最大值两个点"""
+    starts = np.linspace(0, len(x), max(buckets, 1), endpoint=False).astype(np.int64)
+    starts = np.unique(starts)
+    bucket_min = np.minimum.reduceat(mins, starts)
+    bucket_max = np.maximum.reduceat(maxs, starts)
+    bucket_x = x[starts]
+
+    out_x = np.repeat(bucket_x, 2)
+    out_y = np.empty(len(starts) * 2, dtype=np.float64)
+    out_y[0::2] = bucket_min
+    out_y[1::2] = bucket_max
+    return out_x, out_y
+
+
+class MinMaxPyramid:
+    """min/max 降采样金字塔"""
+
+    def __init__(self, x: "np.ndarray", y: "np.ndarray", factor: int = 4, min_level_size: int = 1024):
+        """
+        构建金字塔
+
+        Args:
+            x: 横坐标（帧序号或时间戳），非单调时按横坐标排序
+            y: 纵坐标（字段值）
+            factor: 每层相对下一层的合并倍数
+            min_level_size: 最顶层的点数下限，层级缩减到该点数以下后停止
+        """
+        if np is None:
+            raise RuntimeError("趋势图需要安装 numpy：pip install numpy")
+
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        if len(x) > 1 and np.any(x[1:] < x[:-1]):
+            order = np.argsort(x, kind='stable')
+            x, y = x[order], y[order]
+
+        self.x = x
+        self.y = y
+        # 每层：(块起点横坐标, 块最小值, 块最大值)；第0层是原始数据
+        self.levels: List[Tuple["np.ndarray", "np.ndarray", "np.ndarray"]] = [(x, y, y)]
+        while len(self.levels[-1][0]) > min_level_size:
+            level_x, level_min, level_max = self.levels[-1]
+            starts = np.arange(0, len(level_x), factor)
+            self.levels.append((
+                level_x[starts],
+                np.minimum.reduceat(level_min, starts),
+                np.maximum.reduceat(level_max, starts),
+            ))
+
+    def __len__(self) -> int:
+        return len(self.x)
+
+    def get_x_range(self) -> Tuple[float, float]:
+        """获取横坐标范围"""
+        if len(self.x) == 0:
+            return 0.0, 1.0
+        return float(self.x[0]), float(self.x[-1])
+
+    def get_y_range(self, x_start: Optional[float] = None, x_end: Optional[float] = None) -> Tuple[float, float]:
+        """获取窗口内的纵坐标范围（使用不超过几千点的层级估算）"""
+        _, y = self.get_view(x_start, x_end, 4096)
+        if len(y) == 0:
+            return 0.0, 1.0
+        return float(y.min()), float(y.max())
+
+    def get_view(self, x_start: Optional[float] = None, x_end: Optional[float] = None,
+                 max_points: int = 2000, method: str = 'minmax') -> Tuple["np.ndarray", "np.ndarray"]:
+        """
+        获取可见窗口的降采样点
+
+        从最细的、窗口内点数不超过 max_points*4 的层级取出窗口，
+        再降采样到 max_points 以内，因此耗时与总点数无关。
+
+        Args:
+            x_start: 窗口起点，None表示从头
+            x_end: 窗口终点，None表示到尾
+            max_points: 最多输出的点数（一般取绘图区像素宽度的2倍）
+            method: 'minmax' 保留每组极值，'lttb' 保留形状
+
+        Returns:
+            (x, y) 按横坐标排序的点
+        """
+        x_start = self.get_x_range()[0] if x_start is None else x_start
+        x_end = self.get_x_range()[1] if x_end is None else x_end
+
+        for level_x, level_min, level_max in self.levels:
+            # 多取窗口两侧各一点，使折线延伸到窗口边缘
+            first = max(int(np.searchsorted(level_x, x_start, 'right')) - 1, 0)
+            last = min(int(np.searchsorted(level_x, x_end, 'right')) + 1, len(level_x))
+            if last - first <= max_points * 4 or level_x is self.levels[-1][0]:
+                break
+
+        view_x = level_x[first:last]
+        view_min = level_min[first:last]
+        view_max = level_max[first:last]
+
+        if level_min is level_max:
+            # 原始数据层
+            if len(view_x) <= max_points:
+                return view_x, view_min
+            if method == 'lttb':
+                return lttb(view_x, view_min, max_points)
+            return _bucket_minmax(view_x, view_min, view_max, max_points // 2)
+
+        if method == 'lttb':
+            # 聚合层每块取最小值和最大值两点后再做 LTTB
+            points_x = np.repeat(view_x, 2)
+            points_y = np.empty(len(view_x) * 2, dtype=np.float64)
+            points_y[0::2] = view_min
+            points_y[1::2] = view_max
+            return lttb(points_x, points_y, max_points)
+        return _bucket_minmax(view_x, view_min, view_max, max_points // 2)
+
+
+def build_field_pyramid(columns: FrameColumns, field_name: str, use_time: bool = False) -> MinMaxPyramid:
+    """
+    为一个数值字段构建金字塔
+
+    Args:
+        columns: 列式帧数据
+        field_name: 字段名（必须是数值列）
+        use_time: True 以到达时间为横坐标，False 以帧序号为横坐标
+
+    Returns:
+        金字塔
+
+    Raises:
+        ValueError: 字段不存在或不是数值字段
+    """
+    if not columns.has_field(field_name) or not columns.is_numeric(field_name):
+        raise ValueError(f"字段 {field_name} 不是数值字段")
+
+    present = columns.get_present(field_name)
+    if use_time:
+        timestamps = columns.get_metadata('timestamp')
+        present = present & ~np.isnan(timestamps)
+        x = timestamps[present]
+    else:
+        x = columns.get_metadata('frame_number')[present]
+    return MinMaxPyramid(x, columns.get_field(field_name)[present])
@@ -0,0 +1,397 @@
+# -*- coding: utf-8 -*-
+"""
+字段统计模块
+单遍流式统计每个数值字段的计数、最小/最大值、均值、标准差（Welford算法）和直方图，
+帧可以逐批加入，内存占用与帧数无关；有列式数据时用 numpy 批量计算
+"""
+
+import csv
+import math
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # numpy 为可选依赖，没有时逐值计算
+    np = None
+
+from models import DataFrame
+from core.columns import FrameColumns
+
+
+class Histogram:
+    """
+    固定桶数的直方图
+
+    桶宽和起点在收到前若干个值后确定；之后出现范围外的值时，
+    把相邻两个桶合并使桶宽加倍，直到覆盖新值（桶数保持不变），
+    因此不需要预先知道取值范围，也不需要保存原始值。
+    NaN 和 ±inf 无法分桶，加入时忽略。
+    """
+
+    # 确定初始范围前缓存的值个数
+    INIT_SAMPLES = 256
+
+    def __init__(self, bins: int = 50, integer: bool = True):
+        """
+        初始化
+
+        Args:
+            bins: 桶数
+            integer: 是否整数字段（整数字段的桶宽至少为1）
+        """
+        self.bins = bins
+        self.integer = integer
+        self.origin = 0.0
+        self.width = 0.0
+        self.counts: List[int] = []
+        self._samples: List[float] = []
+
+    def is_initialized(self) -> bool:
+        """是否已确定桶范围"""
+        return self.width > 0
+
+    def add(self, value: float):
+        """加入一个值"""
+        if not math.isfinite(value):
+            return
+        if not self.is_initialized():
+            self._samples.append(value)
+            if len(self._samples) >= self.INIT_SAMPLES:
+                self._initialize()
+            return
+        self._add_count(value, 1)
+
+    def add_array(self, values: "np.ndarray"):
+        """批量加入值（numpy数组）"""
+        values = values[np.isfinite(values)]
+        if not self.is_initialized():
+            take = self.INIT_SAMPLES - len(self._samples)
+            self._samples.extend(values[:take].tolist())
+            values = values[take:]
+            if len(self._samples) < self.INIT_SAMPLES:
+                return
+            self._initialize()
+        if len(values) == 0:
+            return
+
+        self._ensure_range(float(values.min()), float(values.max()))
+        indexes = ((values - self.origin) // self.width).astype(np.int64)
+        np.clip(indexes, 0, self.bins - 1, out=indexes)
+        counts = np.bincount(indexes, minlength=self.bins)
+        self.counts = [a + int(b) for a, b in zip(self.counts, counts)]
+
+    def merge(self, other: "Histogram"):
+        """合并另一个直方图"""
+        if not other.is_initialized():
+            for value in other._samples:
+                self.add(value)
+            return
+
+        if not self.is_initialized():
+            samples = self._samples
+            self._samples = []
+            self.origin, self.width, self.counts = other.origin, other.width, list(other.counts)
+            for value in samples:
+                self._add_count(value, 1)
+            return
+
+        # 以桶宽较大的一方为基准，窄桶的中点精确落入宽桶
+        if other.width > self.width:
+            origin, width, counts = self.origin, self.width, self.counts
+            self.origin, self.width, self.counts = other.origin, other.width, list(other.counts)
+        else:
+            origin, width, counts = other.origin, other.width, other.counts
+        for index, count in enumerate(counts):
+            if count:
+                self._add_count(origin + (index + 0.5) * width, count)
+
+    def _add_count(self, value: float, count: int):
+        self._ensure_range(value, value)
+        self.counts[min(int((value - self.origin) // self.width), self.bins - 1)] += count
+
+    def _initialize(self):
+        """根据缓存的值确定桶宽和起点"""
+        samples = self._samples
+        self._samples = []
+        low, high = min(samples), max(samples)
+
+        # 桶宽取2的整数次幂，起点对齐到桶宽，加倍后旧桶恰好落在一个新桶内
+        span = (high - low) / self.bins
+        if span <= 0:
+            span = abs(low) / self.bins if low else 1.0
+        width = 2.0 ** math.ceil(math.log2(span))
+        if self.integer:
+            width = max(width, 1.0)
+        self.width = width
+        self.origin = math.floor(low / width) * width
+        self.counts = [0] * self.bins
+
+        for value in samples:
+            self._add_count(value, 1)
+
+    def _ensure_range(self, low: float, high: float):
+        """必要时加倍桶宽，使 [low, high] 落入范围"""
+        end = self.origin + self.width * self.bins
+        if low >= self.origin and high < end:
+            return
+
+        low = min(low, self.origin)
+        width = self.width
+        while True:
+            width *= 2
+            origin = math.floor(low / width) * width
+            new_end = origin + width * self.bins
+            if high < new_end and end <= new_end:
+                break
+
+        counts = [0] * self.bins
+        for index, count in enumerate(self.counts):
+            if count:
+                center = self.origin + (index + 0.5) * self.width
+                counts[int((center - origin) // width)] += count
+        self.origin = origin
+        self.width = width
+        self.counts = counts
+
+    def get_buckets(self) -> List[Tuple[float, float, int]]:
+        """
+        获取非空区间
+
+        Returns:
+            [(下界, 上界, 计数), ...]，未确定范围时按缓存值逐个统计
+        """
+        if not self.is_initialized():
+            buckets: Dict[float, int] = {}
+            for value in self._samples:
+                buckets[value] = buckets.get(value, 0) + 1
+            return [(value, value, count) for value, count in sorted(buckets.items())]
+
+        buckets = [
+            (self.origin + i * self.width, self.origin + (i + 1) * self.width, count)
+            for i, count in enumerate(self.counts)
+        ]
+        # 去掉两端的空桶
+        while buckets and buckets[0][2] == 0:
+            buckets.pop(0)
+        while buckets and buckets[-1][2] == 0:
+            buckets.pop()
+        return buckets
+
+
+class FieldStats:
+    """单个字段的流式统计"""
+
+    def __init__(self, name: str, field_type: str = "", bins: int = 50):
+        """
+        初始化
+
+        Args:
+            name: 字段名
+            field_type: 字段类型（float/double为浮点，其余数值类型按整数分桶）
+            bins: 直方图桶数
+        """
+        self.name = name
+        self.field_type = field_type
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0  # 与均值之差的平方和
+        self.minimum: Optional[float] = None
+        self.maximum: Optional[float] = None
+        self.skipped = 0  # 非数值（bytes、字符串）的个数
+        self.nonfinite = 0  # NaN 和 ±inf 的个数（不计入统计量和直方图）
+        self.histogram = Histogram(bins, integer=field_type not in ('float', 'double'))
+
+    def update(self, value):
+        """加入一个值（Welford算法）"""
+        if type(value) not in (int, float):
+            self.skipped += 1
+            return
+        if not math.isfinite(value):
+            self.nonfinite += 1
+            return
+
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        if self.minimum is None or value < self.minimum:
+            self.minimum = value
+        if self.maximum is None or value > self.maximum:
+            self.maximum = value
+        self.histogram.add(value)
+
+    def update_array(self, values: "np.ndarray"):
+        """批量加入数值数组（按 Chan 并行公式合并整批的统计量）"""
+        if values.dtype.kind == 'f':
+            valid = values[np.isfinite(values)]
+            self.nonfinite += len(values) - len(valid)
+            values = valid
+        if len(values) == 0:
+            return
+
+        floats = values.astype(np.float64)
+        with np.errstate(over='ignore', invalid='ignore'):
+            batch_mean = float(floats.mean())
+            # 偏差按最大绝对偏差缩放后再平方，很大的有限值（如1e200）平方时不溢出
+            deviations = floats - batch_mean
+            scale = float(np.abs(deviations).max())
+            batch_m2 = float(((deviations / scale) ** 2).sum()) * scale * scale if scale else 0.0
+        if not (math.isfinite(batch_mean) and math.isfinite(batch_m2)):
+            # 整批的和或平方和超出浮点范围，逐值更新
+            for value in values.tolist():
+                self.update(value)
+            return
+        self._combine(len(values), batch_mean, batch_m2, values.min().item(), values.max().item())
+        self.histogram.add_array(floats)
+
+    def merge(self, other: "FieldStats"):
+        """合并另一个统计（如另一批数据或另一个通道）"""
+        self.skipped += other.skipped
+        self.nonfinite += other.nonfinite
+        if other.count:
+            self._combine(other.count, other.mean, other.m2, other.minimum, other.maximum)
+            self.histogram.merge(other.histogram)
+
+    def _combine(self, count: int, mean: float, m2: float, minimum, maximum):
+        if not self.count:
+            # 第一批直接采用（均值很大时 delta * delta 溢出，乘以0得到 NaN）
+            self.count, self.mean, self.m2 = count, mean, m2
+            self.minimum, self.maximum = minimum, maximum
+            return
+        total = self.count + count
+        delta = mean - self.mean
+        self.m2 += m2 + delta * delta * self.count * count / total
+        self.mean += delta * count / total
+        self.count = total
+        self.minimum = minimum if self.minimum is None else min(self.minimum, minimum)
+        self.maximum = maximum if self.maximum is None else max(self.maximum, maximum)
+
+    def get_variance(self) -> float:
+        """获取总体方差"""
+        return self.m2 / self.count if self.count else 0.0
+
+    def get_stddev(self) -> float:
+        """获取总体标准差"""
+        return math.sqrt(self.get_variance())
+
+    def get_summary(self) -> str:
+        """获取统计摘要"""
+        if not self.count:
+            return f"{self.name}: 无数值"
+        return (f"{self.name}: 计数 {self.count}, 最小 {self.minimum}, 最大 {self.maximum}, "
+                f"均值 {self.mean:.4f}, 标准差 {self.get_stddev():.4f}")
+
+
+class FieldStatistics:
+    """所有字段的流式统计"""
+
+    def __init__(self, bins: int = 50):
+        """
+        初始化
+
+        Args:
+            bins: 每个字段的直方图桶数
+        """
+        self.bins = bins
+        self.fields: Dict[str, FieldStats] = {}
+        self.frame_count = 0
+
+    def _get(self, name: str, field_type: str) -> FieldStats:
+        stats = self.fields.get(name)
+        if stats is None:
+            stats = FieldStats(name, field_type, self.bins)
+            self.fields[name] = stats
+        return stats
+
+    def add_frame(self, frame: DataFrame):
+        """加入一帧"""
+        self.frame_count += 1
+        for name, value in frame.fields.items():
+            self._get(name, frame.field_types.get(name, "")).update(value)
+
+    def add_frames(self, frames: Iterable[DataFrame]):
+        """加入多帧"""
+        for frame in frames:
+            self.add_frame(frame)
+
+    def add_columns(self, columns: FrameColumns):
+        """
+        加入列式数据（数值列用 numpy 批量统计）
+
+        Args:
+            columns: 列式帧数据
+        """
+        self.frame_count += len(columns)
+        first_types = {}
+        for frame in columns.frames:
+            first_types = frame.field_types
+            if first_types:
+                break
+
+        for name in columns.get_field_names():
+            stats = self._get(name, first_types.get(name, ""))
+            if columns.is_numeric(name):
+                stats.update_array(columns.get_values(name))
+            else:
+                for value in columns.get_values(name):
+                    stats.update(value)
+
+    def merge(self, other: "FieldStatistics"):
+        """合并另一个统计"""
+        self.frame_count += other.frame_count
+        for name, stats in other.fields.items():
+            self._get(name, stats.field_type).merge(stats)
+
+    def clear(self):
+        """清空统计"""
+        self.fields.clear()
+        self.frame_count = 0
+
+    def get_numeric_fields(self) -> List[FieldStats]:
+        """获取有数值的字段统计"""
+        return [stats for stats in self.fields.values() if stats.count]
+
+    def to_text(self) -> str:
+        """生成文本报告"""
+        lines = [f"字段统计（共 {self.frame_count} 帧）", "=" * 80]
+        for stats in self.get_numeric_fields():
+            lines.append(stats.get_summary())
+            for low, high, count in stats.histogram.get_buckets():
+                bucket = f"{low:g}" if low == high else f"[{low:g}, {high:g})"
+                lines.append(f"    {bucket}: {count}")
+        return '\n'.join(lines)
+
+    def export_csv(self, file_path: str) -> bool:
+        """
+        导出统计结果到CSV文件（汇总表和各字段直方图）
+
+        Args:
+            file_path: 文件路径
+
+        Returns:
+            是否成功
+        """
+        try:
+            with open(file_path, 'w', encoding='utf-8-sig', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(['字段', '类型', '计数', '最小值', '最大值', '均值', '标准差', '非数值', '非有限值'])
+                for stats in self.fields.values():
+                    writer.writerow([
+                        stats.name, stats.field_type, stats.count,
+                        stats.minimum if stats.count else '',
+                        stats.maximum if stats.count else '',
+                        f"{stats.mean:.6g}" if stats.count else '',
+                        f"{stats.get_stddev():.6g}" if stats.count else '',
+                        stats.skipped,
+                        stats.nonfinite
+                    ])
+
+                writer.writerow([])
+                writer.writerow(['字段', '区间下界', '区间上界', '计数'])
+                for stats in self.get_numeric_fields():
+                    for low, high, count in stats.histogram.get_buckets():
+                        writer.writerow([stats.name, f"{low:g}", f"{high:g}", count])
+            return True
+        except Exception as e:
+            print(f"导出统计失败: {e}")
+            return False
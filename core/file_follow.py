@@ -0,0 +1,523 @@
+# -*- coding: utf-8 -*-
+"""
+文件跟踪模块
+类似 `tail -f`：监视不断追加的捕获文件，只读取新追加的字节并交给流式解析器，
+分帧状态跨多次追加保持。文件被截断或轮转（替换为新文件）时从新文件开头重新分帧。
+
+Linux 上通过 ctypes 调用 inotify 等待文件变化，没有数据时线程阻塞在 select 上，
+CPU 基本空闲；其他平台按固定间隔检查文件大小（轮询）。
+"""
+
+import ctypes
+import ctypes.util
+import os
+import queue
+import re
+import select
+import threading
+import time
+from datetime import date
+from typing import List, Optional
+
+from models import ProtocolConfig, DataFrame
+from core.decode_plan import DecodePlan
+from core.log_ingest import LogFormat, LogLineParser, LogFrameParser, detect_log_format, DETECT_SIZE
+from core.serial_capture import CaptureStats
+from core.stream_parser import StreamParser
+
+
+# inotify 事件（<sys/inotify.h>）
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVE_SELF = 0x00000800
+IN_DELETE_SELF = 0x00000400
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+_FOLLOW_EVENTS = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVE_SELF | IN_DELETE_SELF
+
+# 文件内容格式
+FORMAT_BINARY = 'binary'
+FORMAT_HEX = 'hex'
+FORMAT_LOG = 'log'
+
+# 自动判断格式前至少积累的字节数（数据中出现换行时立即判断）
+_DETECT_MIN_BYTES = 4096
+
+_HEX_TEXT = re.compile(rb'[0-9A-Fa-f\s,;:\-]*')
+_CONTROL_BYTES = re.compile(rb'[\x00-\x08\x0e-\x1f]')
+_HEX_SEPARATORS = re.compile(rb'[\s,;:\-]+')
+
+
+def _load_libc():
+    """加载提供 inotify 的 C 库，不可用时返回None"""
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        libc.inotify_init1
+        libc.inotify_add_watch
+    except (OSError, AttributeError):
+        return None
+    libc.inotify_init1.argtypes = [ctypes.c_int]
+    libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+    return libc
+
+
+_libc = _load_libc()
+
+
+def is_inotify_available() -> bool:
+    """inotify是否可用（Linux）"""
+    return _libc is not None
+
+
+class PollingWatcher:
+    """轮询文件变化（按间隔比较文件大小和修改时间）"""
+
+    def __init__(self, file_path: str, interval: float = 0.5):
+        """
+        初始化
+
+        Args:
+            file_path: 文件路径
+            interval: 检查间隔（秒）
+        """
+        self.file_path = file_path
+        self.interval = interval
+        self._state = self._stat()
+
+    def _stat(self):
+        try:
+            stat = os.stat(self.file_path)
+        except OSError:
+            return None
+        return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+    def wait(self, timeout: float) -> bool:
+        """
+        等待文件变化
+
+        Args:
+            timeout: 最长等待时间（秒）
+
+        Returns:
+            文件是否有变化
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            state = self._stat()
+            if state != self._state:
+                self._state = state
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            time.sleep(min(self.interval, remaining))
+
+    def close(self):
+        """释放资源"""
+
+
+class InotifyWatcher:
+    """通过 inotify 等待文件变化（仅Linux）"""
+
+    def __init__(self, file_path: str):
+        """
+        初始化
+
+        Args:
+            file_path: 文件路径
+
+        Raises:
+            OSError: inotify 初始化或添加监视失败
+        """
+        self.file_path = file_path
+        self._fd = _libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, f"inotify初始化失败: {os.strerror(errno)}")
+        if _libc.inotify_add_watch(self._fd, os.fsencode(file_path), _FOLLOW_EVENTS) < 0:
+            errno = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(errno, f"监视文件失败: {os.strerror(errno)}")
+
+    def wait(self, timeout: float) -> bool:
+        """
+        等待文件变化（阻塞在 select 上，不占用CPU）
+
+        Args:
+            timeout: 最长等待时间（秒）
+
+        Returns:
+            文件是否有变化
+        """
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return False
+        # 取走所有待处理的事件，事件内容不需要解析
+        try:
+            while os.read(self._fd, 4096):
+                pass
+        except BlockingIOError:
+            pass
+        return True
+
+    def close(self):
+        """关闭 inotify 文件描述符"""
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+def create_watcher(file_path: str, poll_interval: float = 0.5):
+    """
+    创建文件变化监视器（优先使用 inotify，不可用时轮询）
+
+    Args:
+        file_path: 文件路径
+        poll_interval: 轮询间隔（秒）
+
+    Returns:
+        提供 wait(timeout)/close() 的监视器
+    """
+    if _libc is not None:
+        try:
+            return InotifyWatcher(file_path)
+        except OSError as e:
+            print(f"inotify不可用，改为轮询: {e}")
+    return PollingWatcher(file_path, poll_interval)
+
+
+def is_format_decidable(head: bytes) -> bool:
+    """数据是否足以判断格式（出现换行或控制字符，或已有足够多的字节）"""
+    return (b'\n' in head or len(head) >= _DETECT_MIN_BYTES
+            or _CONTROL_BYTES.search(head) is not None)
+
+
+def detect_content_format(head: bytes) -> str:
+    """
+    按文件开头判断内容格式
+
+    Args:
+        head: 文件开头的数据
+
+    Returns:
+        FORMAT_LOG、FORMAT_HEX 或 FORMAT_BINARY
+    """
+    if detect_log_format(head.splitlines()) is not None:
+        return FORMAT_LOG
+    if _HEX_TEXT.fullmatch(head):
+        return FORMAT_HEX
+    return FORMAT_BINARY
+
+
+class FileFollower:
+    """文件跟踪采集源（提供 start/stop/is_running/get_frames/get_stats，可用于实时采集界面）"""
+
+    def __init__(self, file_path: str, protocol: ProtocolConfig, from_start: bool = False,
+                 content_format: Optional[str] = None, resync: bool = False,
+                 block_size: int = 1 << 20, poll_interval: float = 0.5,
+                 wait_timeout: float = 0.25, max_queued_frames: int = 100000):
+        """
+        初始化
+
+        Args:
+            file_path: 捕获文件路径
+            protocol: 协议配置
+            from_start: 是否先解析文件中已有的内容（否则只解析之后追加的数据）
+            content_format: 文件内容格式（FORMAT_BINARY 或 FORMAT_HEX），为None时按首次读到的
+                数据自动判断（带时间戳的串口日志只能自动识别）
+            resync: 是否使用重同步分帧
+            block_size: 每次读取的字节数
+            poll_interval: 不支持 inotify 时的轮询间隔（秒）
+            wait_timeout: 每次等待文件变化的最长时间（秒），决定停止时的响应延迟
+            max_queued_frames: 等待取走的帧数上限，达到后暂停读取文件，直到帧被取走
+                （停止跟踪时仍放不下的帧计入丢弃数）
+        """
+        self.file_path = file_path
+        self.protocol = protocol
+        self.from_start = from_start
+        self.content_format = content_format
+        self.resync = resync
+        self.block_size = block_size
+        self.poll_interval = poll_interval
+        self.wait_timeout = wait_timeout
+        self.frame_queue: "queue.Queue[DataFrame]" = queue.Queue(max_queued_frames)
+        self.frames_dropped = 0
+        self.channel = os.path.basename(file_path)
+
+        self.stream_parser: Optional[StreamParser] = None
+        self.log_parser: Optional[LogFrameParser] = None
+        self.line_parser: Optional[LogLineParser] = None
+        self._plan: Optional[DecodePlan] = None
+        self._log_format: Optional[LogFormat] = None
+        self._carry = b''  # 十六进制文本的半个字节、日志的半行或尚未判断格式的数据
+        self._frame_base = 0  # 文件重新打开前已识别的帧数（帧序号连续编号）
+        self._file = None
+        self._watcher = None
+        self.position = 0  # 已读取到的文件位置
+        self.bytes_read = 0
+        self.reopen_count = 0  # 文件被截断或轮转的次数
+
+        self._running = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._start_time = 0.0
+        self._stop_time = 0.0
+        self.error_message = ""
+
+    def start(self):
+        """
+        打开文件并启动跟踪线程
+
+        Raises:
+            OSError: 文件打开失败
+        """
+        if self.is_running():
+            return
+        self._open(self.from_start)
+        self._start_time = time.monotonic()
+        self._stop_time = 0.0
+        self._running.set()
+        self._thread = threading.Thread(
+            target=self._follow_loop, name=f"FileFollower-{self.channel}", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """停止跟踪并关闭文件"""
+        if not self._running.is_set():
+            return
+        self._running.clear()
+        if self._thread:
+            self._thread.join()
+        self._thread = None
+        self._close()
+        self._stop_time = time.monotonic()
+
+    def is_running(self) -> bool:
+        """是否正在跟踪"""
+        return self._running.is_set()
+
+    def set_protocol(self, protocol: ProtocolConfig, plan: Optional[DecodePlan] = None):
+        """
+        跟踪过程中切换协议（未完成的帧按新协议继续分帧）
+
+        Args:
+            protocol: 新的协议配置
+            plan: 预先编译的解码计划
+        """
+        with self._lock:
+            self.protocol = protocol
+            self._plan = plan
+            if self.stream_parser:
+                self.stream_parser.set_protocol(protocol, plan)
+            if self.log_parser:
+                self.log_parser.set_protocol(protocol, plan)
+
+    def _open(self, from_start: bool):
+        """打开文件（from_start 为False时定位到文件末尾）"""
+        self._file = open(self.file_path, 'rb')
+        self._watcher = create_watcher(self.file_path, self.poll_interval)
+        self._reset_parsers()
+        if self.content_format is None:
+            # 按文件中已有的内容判断格式，空文件等到追加数据后再判断
+            self._detect_format(self._file.read(DETECT_SIZE))
+        self.position = 0 if from_start else os.fstat(self._file.fileno()).st_size
+        self._file.seek(self.position)
+
+    def _close(self):
+        if self._watcher:
+            self._watcher.close()
+            self._watcher = None
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def _reset_parsers(self):
+        """重置分帧状态（文件重新打开后从头分帧）"""
+        with self._lock:
+            self._frame_base = self._frame_count()
+            self.stream_parser = None
+            self.log_parser = None
+            self.line_parser = None
+            self._carry = b''
+
+    def _file_replaced(self) -> bool:
+        """文件是否被截断或轮转"""
+        try:
+            stat = os.stat(self.file_path)
+        except OSError:
+            # 轮转过程中文件暂时不存在，继续读旧文件
+            return False
+        current = os.fstat(self._file.fileno())
+        return stat.st_ino != current.st_ino or stat.st_dev != current.st_dev or stat.st_size < self.position
+
+    def _follow_loop(self):
+        """跟踪线程：读取新追加的数据，没有数据时等待文件变化"""
+        try:
+            while self._running.is_set():
+                self._read_available()
+                if self._file_replaced():
+                    self._close()
+                    self._open(from_start=True)
+                    self.reopen_count += 1
+                    continue
+                self._watcher.wait(self.wait_timeout)
+            # 停止前把已写入的数据处理完
+            self._read_available()
+        except Exception as e:
+            self.error_message = f"跟踪文件失败: {e}"
+            print(self.error_message)
+            self._running.clear()
+
+    def _read_available(self):
+        """读取并解析当前已追加的全部数据（停止跟踪后帧队列已满时不再读取）"""
+        while True:
+            data = self._file.read(self.block_size)
+            if not data:
+                return
+            self.position += len(data)
+            self.bytes_read += len(data)
+            if not self._feed(data, time.time()):
+                return
+
+    def _feed(self, data: bytes, arrival_time: float) -> bool:
+        """
+        把新读到的数据交给对应格式的解析器，识别出的帧放入帧队列
+
+        Returns:
+            是否所有帧都已放入队列（停止跟踪后队列已满时为False）
+        """
+        with self._lock:
+            if self.content_format is None:
+                data = self._carry + data
+                self._carry = b''
+                if not self._detect_format(data[:DETECT_SIZE]):
+                    # 数据太少，等待更多数据再判断格式
+                    self._carry = data
+                    return True
+            
+            if self.content_format == FORMAT_LOG:
+                frames = self._feed_log(data)
+            else:
+                if self.stream_parser is None:
+                    self.stream_parser = StreamParser(self.protocol, plan=self._plan, resync=self.resync)
+                if self.content_format == FORMAT_HEX:
+                    data = self._decode_hex(data)
+                frames = self.stream_parser.feed(data)
+                for frame in frames:
+                    frame.channel = self.channel
+                    frame.timestamp = arrival_time
+            for frame in frames:
+                frame.frame_number += self._frame_base
+        
+        for i, frame in enumerate(frames):
+            if not self._put_frame(frame):
+                self.frames_dropped += len(frames) - i
+                return False
+        return True
+
+    def _put_frame(self, frame: DataFrame) -> bool:
+        """
+        放入帧队列：队列满时等待取走（跟踪线程暂停读取，文件中的数据不会丢失）
+
+        Returns:
+            是否放入，停止跟踪后队列仍满时返回False
+        """
+        while True:
+            try:
+                self.frame_queue.put(frame, timeout=self.wait_timeout)
+                return True
+            except queue.Full:
+                if not self._running.is_set():
+                    return False
+
+    def _detect_format(self, head: bytes) -> bool:
+        """按数据开头判断内容格式，数据不足以判断时返回False"""
+        if not is_format_decidable(head):
+            return False
+        self.content_format = detect_content_format(head)
+        if self.content_format == FORMAT_LOG:
+            self._log_format = detect_log_format(head.splitlines())
+        return True
+
+    def _decode_hex(self, data: bytes) -> bytes:
+        """解码十六进制文本（奇数个字符时把最后半个字节留到下次）"""
+        digits = self._carry + _HEX_SEPARATORS.sub(b'', data)
+        even = len(digits) & ~1
+        self._carry = digits[even:]
+        return bytes.fromhex(digits[:even].decode('ascii'))
+
+    def _feed_log(self, data: bytes) -> List[DataFrame]:
+        """按行解析日志（最后不完整的一行留到下次）"""
+        if self.log_parser is None:
+            self.log_parser = LogFrameParser(self.protocol, self._plan, resync=self.resync)
+            self.line_parser = LogLineParser(self._log_format, date.today())
+        data = self._carry + data
+        # data 结束于当前读取位置
+        offset = self.position - len(data)
+        end = data.rfind(b'\n') + 1
+        self._carry = data[end:]
+        frames = []
+        for line in data[:end].splitlines(keepends=True):
+            record = self.line_parser.parse_line(line, offset)
+            offset += len(line)
+            if record is not None:
+                frames.extend(self.log_parser.feed(record))
+        return frames
+
+    def _frame_count(self) -> int:
+        """已识别的帧数（调用方持有锁）"""
+        if self.log_parser:
+            return self._frame_base + self.log_parser.frame_count
+        if self.stream_parser:
+            return self._frame_base + self.stream_parser.frame_count
+        return self._frame_base
+
+    def get_frames(self, max_frames: int = 10000, timeout: float = 0.0) -> List[DataFrame]:
+        """
+        取走已识别的帧（供GUI定时调用）
+
+        Args:
+            max_frames: 本次最多取走的帧数
+            timeout: 没有帧时最多等待的时间（秒），0表示不等待
+
+        Returns:
+            帧列表
+        """
+        frames = []
+        if timeout > 0:
+            try:
+                frames.append(self.frame_queue.get(timeout=timeout))
+            except queue.Empty:
+                return frames
+        while len(frames) < max_frames:
+            try:
+                frames.append(self.frame_queue.get_nowait())
+            except queue.Empty:
+                break
+        return frames
+
+    def get_stats(self) -> CaptureStats:
+        """获取跟踪统计"""
+        if self._start_time:
+            elapsed = (self._stop_time or time.monotonic()) - self._start_time
+        else:
+            elapsed = 0.0
+        with self._lock:
+            parsers = [self.stream_parser] if self.stream_parser else []
+            if self.log_parser:
+                parsers = list(self.log_parser.stream_parsers.values())
+            discarded = sum(parser.discarded_bytes for parser in parsers)
+            buffered = sum(parser.pending_bytes for parser in parsers) + len(self._carry)
+            frames = self._frame_count()
+        return CaptureStats(
+            bytes_received=self.bytes_read,
+            bytes_discarded=discarded,
+            frames=frames,
+            frames_dropped=self.frames_dropped,
+            buffered_bytes=buffered,
+            elapsed=elapsed,
+            throughput=self.bytes_read / elapsed if elapsed > 0 else 0.0
+        )
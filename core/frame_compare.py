@@ -0,0 +1,390 @@
+# -*- coding: utf-8 -*-
+"""
+帧序列对比模块
+对两段捕获数据的解析结果逐帧哈希，用线性空间差分算法对齐两个帧序列，
+报告多出、缺失和变化的帧，变化的帧给出字段级差异
+"""
+
+from collections import Counter
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, List, Optional, Sequence, Tuple
+
+from models import DataFrame
+
+
+class DiffKind(Enum):
+    """差异类型枚举"""
+    MISSING = "缺失"    # 基准中有、对比中没有
+    INSERTED = "多出"   # 对比中有、基准中没有
+    CHANGED = "变化"    # 同一位置的帧内容不同
+
+
+@dataclass
+class FieldDiff:
+    """字段差异"""
+    name: str
+    value_a: Any
+    value_b: Any
+
+    def get_text(self) -> str:
+        """获取差异描述"""
+        return f"{self.name}: {_format_value(self.value_a)} → {_format_value(self.value_b)}"
+
+
+@dataclass
+class FrameDiff:
+    """帧差异"""
+    kind: DiffKind
+    index_a: Optional[int]  # 在基准帧列表中的索引
+    index_b: Optional[int]  # 在对比帧列表中的索引
+    frame_a: Optional[DataFrame] = None
+    frame_b: Optional[DataFrame] = None
+    field_diffs: List[FieldDiff] = field(default_factory=list)
+
+    def get_field_diff_text(self) -> str:
+        """获取字段差异摘要"""
+        return ', '.join(diff.get_text() for diff in self.field_diffs)
+
+    def get_detailed_info(self) -> str:
+        """获取详细信息"""
+        lines = [f"[{self.kind.value}]"]
+        if self.frame_a is not None:
+            lines.append(f"  基准帧 #{self.frame_a.frame_number}: {self.frame_a.get_raw_data_hex()}")
+        if self.frame_b is not None:
+            lines.append(f"  对比帧 #{self.frame_b.frame_number}: {self.frame_b.get_raw_data_hex()}")
+        for diff in self.field_diffs:
+            lines.append(f"    {diff.get_text()}")
+        return '\n'.join(lines)
+
+
+@dataclass
+class CompareResult:
+    """对比结果"""
+    total_a: int = 0  # 基准帧数
+    total_b: int = 0  # 对比帧数
+    equal: int = 0    # 相同的帧数
+    diffs: List[FrameDiff] = field(default_factory=list)
+    # 对齐操作码 [(标记, a起, a止, b起, b止), ...]，标记为 equal/delete/insert/replace
+    opcodes: List[Tuple[str, int, int, int, int]] = field(default_factory=list)
+
+    def count(self, kind: DiffKind) -> int:
+        """统计某类差异的帧数"""
+        return sum(1 for diff in self.diffs if diff.kind == kind)
+
+    def is_identical(self) -> bool:
+        """两段数据是否完全相同"""
+        return not self.diffs
+
+    def get_match_rate(self) -> float:
+        """相同帧占较长一方帧数的比例"""
+        total = max(self.total_a, self.total_b)
+        return self.equal / total if total else 1.0
+
+    def get_summary(self) -> str:
+        """获取统计摘要"""
+        return (f"基准帧: {self.total_a}, 对比帧: {self.total_b}, "
+                f"相同: {self.equal}, "
+                f"缺失: {self.count(DiffKind.MISSING)}, "
+                f"多出: {self.count(DiffKind.INSERTED)}, "
+                f"变化: {self.count(DiffKind.CHANGED)}, "
+                f"匹配率: {self.get_match_rate() * 100:.2f}%")
+
+    def to_text(self, max_diffs: int = 0) -> str:
+        """
+        生成文本报告
+
+        Args:
+            max_diffs: 最多列出的差异数，0表示全部
+        """
+        lines = [self.get_summary(), ""]
+        diffs = self.diffs if max_diffs <= 0 else self.diffs[:max_diffs]
+        for diff in diffs:
+            lines.append(diff.get_detailed_info())
+        if len(diffs) < len(self.diffs):
+            lines.append(f"... 另有 {len(self.diffs) - len(diffs)} 处差异未列出")
+        return '\n'.join(lines)
+
+
+def _format_value(value: Any) -> str:
+    if isinstance(value, bytes):
+        return ' '.join(f'{b:02X}' for b in value)
+    if isinstance(value, int) and not isinstance(value, bool):
+        return f"{value} (0x{value:X})"
+    return str(value)
+
+
+# ==================== 序列差分 ====================
+
+def _middle_snake(a: Sequence, a0: int, a1: int, b: Sequence, b0: int, b1: int,
+                  max_cost: int) -> Optional[Tuple[int, int, int, int]]:
+    """
+    Myers线性空间算法：查找最短编辑路径的中间蛇形段
+
+    Returns:
+        蛇形段 (x, y, u, v)（绝对坐标），编辑距离超过 max_cost 时返回None
+    """
+    n = a1 - a0
+    m = b1 - b0
+    delta = n - m
+    odd = delta & 1
+    limit = min((n + m + 1) // 2, max_cost)
+    offset = limit + 1
+    vf = [0] * (2 * limit + 3)
+    vb = [0] * (2 * limit + 3)
+
+    for d in range(limit + 1):
+        # 正向搜索
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and vf[offset + k - 1] < vf[offset + k + 1]):
+                x = vf[offset + k + 1]
+            else:
+                x = vf[offset + k - 1] + 1
+            y = x - k
+            x_start, y_start = x, y
+            while x < n and y < m and a[a0 + x] == b[b0 + y]:
+                x += 1
+                y += 1
+            vf[offset + k] = x
+            if odd and -(d - 1) <= delta - k <= d - 1:
+                if x + vb[offset + delta - k] >= n:
+                    return a0 + x_start, b0 + y_start, a0 + x, b0 + y
+
+        # 反向搜索
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and vb[offset + k - 1] < vb[offset + k + 1]):
+                x = vb[offset + k + 1]
+            else:
+                x = vb[offset + k - 1] + 1
+            y = x - k
+            x_start, y_start = x, y
+            while x < n and y < m and a[a1 - 1 - x] == b[b1 - 1 - y]:
+                x += 1
+                y += 1
+            vb[offset + k] = x
+            if not odd and -d <= delta - k <= d:
+                if x + vf[offset + delta - k] >= n:
+                    return a1 - x, b1 - y, a1 - x_start, b1 - y_start
+
+    return None
+
+
+def _unique_anchors(a: Sequence, a0: int, a1: int,
+                    b: Sequence, b0: int, b1: int) -> List[Tuple[int, int]]:
+    """
+    查找两段中都只出现一次的元素，取位置的最长递增子序列作为锚点（patience diff）
+    """
+    count_a = Counter(a[i] for i in range(a0, a1))
+    count_b = Counter(b[j] for j in range(b0, b1))
+    position_b = {b[j]: j for j in range(b0, b1) if count_b[b[j]] == 1}
+
+    pairs = [(i, position_b[a[i]]) for i in range(a0, a1)
+             if count_a[a[i]] == 1 and a[i] in position_b]
+    if not pairs:
+        return []
+
+    # 耐心排序求最长递增子序列
+    tails: List[int] = []
+    tail_index: List[int] = []
+    previous = [-1] * len(pairs)
+    for index, (_, j) in enumerate(pairs):
+        pos = bisect_left(tails, j)
+        if pos == len(tails):
+            tails.append(j)
+            tail_index.append(index)
+        else:
+            tails[pos] = j
+            tail_index[pos] = index
+        previous[index] = tail_index[pos - 1] if pos > 0 else -1
+
+    anchors = []
+    index = tail_index[-1]
+    while index >= 0:
+        anchors.append(pairs[index])
+        index = previous[index]
+    anchors.reverse()
+    return anchors
+
+
+def diff_sequences(a: Sequence, b: Sequence,
+                   max_cost: int = 0) -> List[Tuple[str, int, int, int, int]]:
+    """
+    计算两个序列的对齐操作码
+
+    先去掉公共前后缀，再以两段中唯一出现的元素为锚点分割问题，
+    锚点之间用Myers线性空间算法求最短编辑脚本。单个区段的编辑距离
+    超过max_cost时整段视为替换，保证最坏情况下的耗时有界。
+
+    Args:
+        a: 基准序列（元素需可哈希、可比较相等）
+        b: 对比序列
+        max_cost: 单个区段允许的最大编辑距离，0表示按区段长度自动确定
+
+    Returns:
+        与 difflib.SequenceMatcher.get_opcodes() 相同格式的操作码列表
+    """
+    blocks = []  # 匹配块 (i, j, 长度)
+    stack = [(0, len(a), 0, len(b))]
+
+    while stack:
+        a0, a1, b0, b1 = stack.pop()
+
+        # 公共前缀
+        start = a0
+        while a0 < a1 and b0 < b1 and a[a0] == b[b0]:
+            a0 += 1
+            b0 += 1
+        if a0 > start:
+            blocks.append((start, b0 - (a0 - start), a0 - start))
+
+        # 公共后缀
+        end = a1
+        while a1 > a0 and b1 > b0 and a[a1 - 1] == b[b1 - 1]:
+            a1 -= 1
+            b1 -= 1
+        if a1 < end:
+            blocks.append((a1, b1, end - a1))
+
+        if a0 == a1 or b0 == b1:
+            continue
+
+        anchors = _unique_anchors(a, a0, a1, b, b0, b1)
+        if anchors:
+            prev_i, prev_j = a0, b0
+            for i, j in anchors:
+                if i < prev_i or j < prev_j:
+                    # 已被上一个锚点的扩展覆盖
+                    continue
+                # 从锚点向后扩展匹配
+                length = 1
+                while i + length < a1 and j + length < b1 and a[i + length] == b[j + length]:
+                    length += 1
+                blocks.append((i, j, length))
+                if i > prev_i or j > prev_j:
+                    stack.append((prev_i, i, prev_j, j))
+                prev_i, prev_j = i + length, j + length
+            if prev_i < a1 or prev_j < b1:
+                stack.append((prev_i, a1, prev_j, b1))
+            continue
+
+        cost = max_cost or max(64, 20000000 // (a1 - a0 + b1 - b0))
+        snake = _middle_snake(a, a0, a1, b, b0, b1, cost)
+        if snake is None:
+            # 差异过大，整段视为替换
+            continue
+        x, y, u, v = snake
+        if u > x:
+            blocks.append((x, y, u - x))
+        stack.append((a0, x, b0, y))
+        stack.append((u, a1, v, b1))
+
+    # 合并相邻匹配块并生成操作码
+    blocks.sort()
+    opcodes = []
+    i = j = 0
+    for block_i, block_j, size in blocks + [(len(a), len(b), 0)]:
+        if block_i < i:
+            continue
+        if i < block_i and j < block_j:
+            tag = 'replace'
+        elif i < block_i:
+            tag = 'delete'
+        elif j < block_j:
+            tag = 'insert'
+        else:
+            tag = ''
+        if tag:
+            opcodes.append((tag, i, block_i, j, block_j))
+        if size:
+            if opcodes and opcodes[-1][0] == 'equal':
+                _, i1, _, j1, _ = opcodes.pop()
+                opcodes.append(('equal', i1, block_i + size, j1, block_j + size))
+            else:
+                opcodes.append(('equal', block_i, block_i + size, block_j, block_j + size))
+        i, j = block_i + size, block_j + size
+
+    return opcodes
+
+
+# ==================== 帧对比 ====================
+
+class FrameComparator:
+    """帧序列对比器"""
+
+    def __init__(self, compare_fields: bool = True):
+        """
+        初始化
+
+        Args:
+            compare_fields: 是否对变化的帧进行字段级对比
+        """
+        self.compare_fields = compare_fields
+
+    @staticmethod
+    def frame_hash(frame: DataFrame) -> int:
+        """计算帧的哈希（基于原始字节）"""
+        return hash(frame.raw_data)
+
+    @staticmethod
+    def diff_fields(frame_a: DataFrame, frame_b: DataFrame) -> List[FieldDiff]:
+        """
+        对比两帧的字段
+
+        Returns:
+            字段差异列表，按基准帧字段顺序
+        """
+        diffs = []
+        names = list(frame_a.fields)
+        names.extend(name for name in frame_b.fields if name not in frame_a.fields)
+        for name in names:
+            value_a = frame_a.fields.get(name)
+            value_b = frame_b.fields.get(name)
+            if value_a != value_b:
+                diffs.append(FieldDiff(name, value_a, value_b))
+        if frame_a.checksum_valid != frame_b.checksum_valid:
+            diffs.append(FieldDiff("校验", frame_a.checksum_valid, frame_b.checksum_valid))
+        return diffs
+
+    def compare(self, frames_a: Sequence[DataFrame],
+                frames_b: Sequence[DataFrame]) -> CompareResult:
+        """
+        对比两个帧序列
+
+        Args:
+            frames_a: 基准帧序列（期望数据、发送方向等）
+            frames_b: 对比帧序列（实测数据、接收方向等）
+
+        Returns:
+            对比结果
+        """
+        hashes_a = [self.frame_hash(frame) for frame in frames_a]
+        hashes_b = [self.frame_hash(frame) for frame in frames_b]
+        return self.compare_hashed(frames_a, hashes_a, frames_b, hashes_b)
+
+    def compare_hashed(self, frames_a: Sequence[DataFrame], hashes_a: Sequence[int],
+                       frames_b: Sequence[DataFrame], hashes_b: Sequence[int]) -> CompareResult:
+        """使用预先计算的帧哈希进行对比"""
+        result = CompareResult(total_a=len(frames_a), total_b=len(frames_b))
+        result.opcodes = diff_sequences(hashes_a, hashes_b)
+
+        for tag, i1, i2, j1, j2 in result.opcodes:
+            if tag == 'equal':
+                result.equal += i2 - i1
+                continue
+
+            # 替换段内按位置配对为“变化”，多余部分为缺失/多出
+            paired = min(i2 - i1, j2 - j1) if tag == 'replace' else 0
+            for offset in range(paired):
+                frame_a = frames_a[i1 + offset]
+                frame_b = frames_b[j1 + offset]
+                result.diffs.append(FrameDiff(
+                    DiffKind.CHANGED, i1 + offset, j1 + offset, frame_a, frame_b,
+                    self.diff_fields(frame_a, frame_b) if self.compare_fields else []
+                ))
+            for index in range(i1 + paired, i2):
+                result.diffs.append(FrameDiff(DiffKind.MISSING, index, None, frames_a[index], None))
+            for index in range(j1 + paired, j2):
+                result.diffs.append(FrameDiff(DiffKind.INSERTED, None, index, None, frames_b[index]))
+
+        return result
@@ -0,0 +1,482 @@
+# -*- coding: utf-8 -*-
+"""
+帧过滤表达式模块
+
+表达式使用 Python 表达式语法的安全子集，例如：
+
+    命令 == 0x03 and 电压 > 3600 and not checksum_valid
+    length >= 10 or field('帧 类型') in (1, 2)
+
+- 名称解析为帧元数据（frame_number、position、end_position、length、
+  checksum_valid、has_error、channel、protocol、timestamp）或字段值；
+  字段名不是合法标识符或与元数据同名时用 field('名称') 访问
+- 支持 and/or/not、比较（含链式比较和 in/not in）、算术和位运算
+- 帧中缺少表达式引用的字段，或字段值类型无法比较、除数为0时，该帧不匹配
+  （与 Python 求值一致：`命令 == 3 or 缺失 == 1` 在命令为3的帧上不会访问缺失的字段）
+
+表达式只编译一次：逐帧判断时编译为 Python 函数，
+有列式数据（FrameColumns）时编译为 numpy 向量化计算。向量化计算的每个子表达式
+同时计算值和"求值不出错"掩码，and/or 按短路规则合并掩码，结果与逐帧判断一致
+"""
+
+import ast
+import operator
+from typing import Callable, List, Sequence, Set
+
+try:
+    import numpy as np
+except ImportError:  # numpy 为可选依赖，没有时只能逐帧过滤
+    np = None
+
+from models import DataFrame
+from core.columns import FrameColumns
+
+
+class FilterError(ValueError):
+    """过滤表达式错误"""
+
+
+# 逐帧求值时视为该帧不匹配的异常（缺少字段、类型不支持、除数为0、负的移位位数等）
+_EVAL_ERRORS = (KeyError, TypeError, ValueError, ZeroDivisionError, OverflowError)
+
+
+# 逐帧计算时元数据名称对应的取值表达式
+_METADATA_SOURCE = {
+    'frame_number': "frame.frame_number",
+    'position': "frame.start_position",
+    'end_position': "frame.end_position",
+    'length': "len(frame.raw_data)",
+    'checksum_valid': "frame.checksum_valid",
+    'has_error': "frame.has_error",
+    'channel': "frame.channel",
+    'protocol': "frame.protocol_name",
+    'timestamp': "frame.timestamp",
+}
+
+_ALLOWED_BINOPS = (
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod,
+    ast.BitAnd, ast.BitOr, ast.BitXor, ast.LShift, ast.RShift,
+)
+_ALLOWED_UNARYOPS = (ast.Not, ast.USub, ast.UAdd, ast.Invert)
+_ALLOWED_CMPOPS = (ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE, ast.In, ast.NotIn)
+
+
+def _field_call_name(node: ast.Call) -> str:
+    """检查 field('名称') 调用并返回字段名"""
+    if (not isinstance(node.func, ast.Name) or node.func.id != 'field'
+            or len(node.args) != 1 or node.keywords
+            or not isinstance(node.args[0], ast.Constant) or not isinstance(node.args[0].value, str)):
+        raise FilterError("只支持 field('字段名') 函数调用")
+    return node.args[0].value
+
+
+class _Validator(ast.NodeVisitor):
+    """检查表达式只包含允许的语法，并收集引用的字段"""
+
+    def __init__(self):
+        self.fields: Set[str] = set()
+        self.metadata: Set[str] = set()
+
+    def generic_visit(self, node):
+        raise FilterError(f"不支持的语法: {type(node).__name__}")
+
+    def visit_Expression(self, node):
+        self.visit(node.body)
+
+    def visit_BoolOp(self, node):
+        for value in node.values:
+            self.visit(value)
+
+    def visit_UnaryOp(self, node):
+        if not isinstance(node.op, _ALLOWED_UNARYOPS):
+            raise FilterError(f"不支持的运算符: {type(node.op).__name__}")
+        self.visit(node.operand)
+
+    def visit_BinOp(self, node):
+        if not isinstance(node.op, _ALLOWED_BINOPS):
+            raise FilterError(f"不支持的运算符: {type(node.op).__name__}")
+        self.visit(node.left)
+        self.visit(node.right)
+
+    def visit_Compare(self, node):
+        for op, comparator in zip(node.ops, node.comparators):
+            if not isinstance(op, _ALLOWED_CMPOPS):
+                raise FilterError(f"不支持的比较运算符: {type(op).__name__}")
+            if isinstance(op, (ast.In, ast.NotIn)) and not isinstance(comparator, (ast.Tuple, ast.List)):
+                raise FilterError("in 右侧必须是常量列表，例如 命令 in (1, 2, 3)")
+        self.visit(node.left)
+        for comparator in node.comparators:
+            self.visit(comparator)
+
+    def visit_Tuple(self, node):
+        for element in node.elts:
+            if not isinstance(element, ast.Constant):
+                raise FilterError("列表中只能包含常量")
+
+    visit_List = visit_Tuple
+
+    def visit_Constant(self, node):
+        if not isinstance(node.value, (int, float, str, bytes)) and node.value is not None:
+            raise FilterError(f"不支持的常量: {node.value!r}")
+
+    def visit_Name(self, node):
+        if node.id in ('True', 'False', 'None'):
+            return
+        if node.id in _METADATA_SOURCE:
+            self.metadata.add(node.id)
+        else:
+            self.fields.add(node.id)
+
+    def visit_Call(self, node):
+        self.fields.add(_field_call_name(node))
+
+
+class _ScalarTransformer(ast.NodeTransformer):
+    """把名称替换为逐帧取值表达式"""
+
+    def visit_Name(self, node):
+        if node.id in _METADATA_SOURCE:
+            return ast.parse(_METADATA_SOURCE[node.id], mode='eval').body
+        if node.id in ('True', 'False', 'None'):
+            return node
+        return self._field(node.id)
+
+    def visit_Call(self, node):
+        return self._field(_field_call_name(node))
+
+    def visit_BinOp(self, node):
+        node = self.generic_visit(node)
+        if isinstance(node.op, ast.LShift):
+            # 限制左移位数，避免 1 << 10**15 这类表达式分配巨大的整数
+            return _call('_lshift', [node.left, node.right])
+        return node
+
+    @staticmethod
+    def _field(name: str) -> ast.expr:
+        # frame.fields[名称]，缺少字段时抛出 KeyError，由调用方视为不匹配
+        return ast.Subscript(
+            value=ast.Attribute(value=ast.Name('frame', ast.Load()), attr='fields', ctx=ast.Load()),
+            slice=ast.Constant(name),
+            ctx=ast.Load()
+        )
+
+
+# 逐帧求值时左移的最大位数，超过时该帧不匹配
+_MAX_SHIFT = 1024
+
+
+def _scalar_lshift(value, count):
+    if count > _MAX_SHIFT:
+        raise OverflowError("移位位数过大")
+    return value << count
+
+
+def _call(func: str, args: List[ast.expr]) -> ast.Call:
+    return ast.Call(func=ast.Name(func, ast.Load()), args=args, keywords=[])
+
+
+class _VectorTransformer(ast.NodeTransformer):
+    """把表达式改写为 numpy 列运算（每个子表达式求值为 (值, 求值不出错的掩码)）"""
+
+    def visit_Name(self, node):
+        if node.id in ('True', 'False', 'None'):
+            return _call('_const', [node])
+        if node.id in _METADATA_SOURCE:
+            return _call('_metadata', [ast.Name('columns', ast.Load()), ast.Constant(node.id)])
+        return self._field(node.id)
+
+    def visit_Constant(self, node):
+        return _call('_const', [node])
+
+    def visit_Call(self, node):
+        return self._field(_field_call_name(node))
+
+    @staticmethod
+    def _field(name: str) -> ast.Call:
+        return _call('_field', [ast.Name('columns', ast.Load()), ast.Constant(name)])
+
+    def visit_BoolOp(self, node):
+        func = '_and' if isinstance(node.op, ast.And) else '_or'
+        return _call(func, [self.visit(value) for value in node.values])
+
+    def visit_UnaryOp(self, node):
+        operand = self.visit(node.operand)
+        if isinstance(node.op, ast.Not):
+            return _call('_not', [operand])
+        return _call('_unary', [ast.Constant(type(node.op).__name__), operand])
+
+    def visit_BinOp(self, node):
+        return _call('_binop', [ast.Constant(type(node.op).__name__),
+                                self.visit(node.left), self.visit(node.right)])
+
+    def visit_Compare(self, node):
+        # 链式比较 a < b < c 等价于 (a < b) and (b < c)，b 只求值一次不影响结果
+        parts = []
+        left = self.visit(node.left)
+        for op, comparator in zip(node.ops, node.comparators):
+            if isinstance(op, (ast.In, ast.NotIn)):
+                parts.append(_call('_isin', [left, comparator, ast.Constant(isinstance(op, ast.NotIn))]))
+                right = _call('_const', [comparator])
+            else:
+                right = self.visit(comparator)
+                parts.append(_call('_compare', [ast.Constant(type(op).__name__), left, right]))
+            left = right
+        return parts[0] if len(parts) == 1 else _call('_and', parts)
+
+
+def _compile_lambda(body: ast.expr, arg: str, env: dict) -> Callable:
+    tree = ast.Expression(ast.Lambda(
+        args=ast.arguments(posonlyargs=[], args=[ast.arg(arg)], kwonlyargs=[],
+                           kw_defaults=[], defaults=[]),
+        body=body
+    ))
+    ast.fix_missing_locations(tree)
+    return eval(compile(tree, '<filter>', 'eval'), env)
+
+
+_OPERATORS = {
+    'Add': operator.add, 'Sub': operator.sub, 'Mult': operator.mul,
+    'Div': operator.truediv, 'FloorDiv': operator.floordiv, 'Mod': operator.mod,
+    'BitAnd': operator.and_, 'BitOr': operator.or_, 'BitXor': operator.xor,
+    'LShift': operator.lshift, 'RShift': operator.rshift,
+    'USub': operator.neg, 'UAdd': operator.pos, 'Invert': operator.invert,
+    'Eq': operator.eq, 'NotEq': operator.ne, 'Lt': operator.lt,
+    'LtE': operator.le, 'Gt': operator.gt, 'GtE': operator.ge,
+}
+
+
+def _truth(value) -> "np.ndarray":
+    """逐元素的真值（与 Python bool() 一致，NaN 为真）"""
+    return np.asarray(value).astype(np.bool_)
+
+
+# 可能使 int64 溢出的运算，以及判断溢出时的安全范围（浮点估算有舍入误差，留出余量）
+_OVERFLOW_OPS = ('Add', 'Sub', 'Mult', 'FloorDiv', 'LShift')
+_INT64_SAFE = 2.0 ** 62
+
+
+def _is_int_array(value) -> bool:
+    return isinstance(value, (np.ndarray, np.integer)) and value.dtype.kind in 'iu'
+
+
+def _as_number(value):
+    """bool 列参与算术运算时按 Python 规则视为 0/1（numpy 中 ~True 为 False，True + True 为 True）"""
+    if isinstance(value, (bool, np.bool_, np.ndarray)) and np.asarray(value).dtype == np.bool_:
+        return np.asarray(value, dtype=np.int64)
+    return value
+
+
+def _vector_field(columns: FrameColumns, name: str):
+    if not columns.has_field(name):
+        # 所有帧都缺少该字段
+        empty = np.zeros(len(columns), dtype=np.bool_)
+        return empty, empty
+    return columns.get_field(name), columns.get_present(name)
+
+
+def _vector_binop(name: str, left, right):
+    (x, x_valid), (y, y_valid) = left, right
+    valid = x_valid & y_valid
+    if name not in ('BitAnd', 'BitOr', 'BitXor'):
+        x, y = _as_number(x), _as_number(y)
+    if name in ('Div', 'FloorDiv', 'Mod'):
+        valid = valid & (np.asarray(y) != 0)
+    elif name in ('LShift', 'RShift'):
+        counts = np.asarray(y)
+        valid = valid & (counts >= 0)
+        if np.any(valid & (counts >= 63)):
+            # Python 整数移位不会溢出，int64 会，交给逐帧判断
+            raise OverflowError("移位位数过大")
+    try:
+        value = _OPERATORS[name](x, y)
+    except ZeroDivisionError:
+        # 两侧都是常量且除数为0，结果无效
+        value = 0
+    if name in _OVERFLOW_OPS and _is_int_array(value):
+        # Python 整数运算不会溢出，int64 会回绕：按浮点估算结果的大小，可能溢出时交给逐帧判断
+        x_float, y_float = np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64)
+        if name == 'LShift':
+            approx = x_float * np.exp2(y_float)
+        else:
+            approx = _OPERATORS[name](x_float, y_float)
+        if np.any(valid & ~(np.abs(approx) < _INT64_SAFE)):
+            raise OverflowError("整数运算溢出")
+    return value, valid
+
+
+def _vector_unary(name: str, operand):
+    value, valid = operand
+    value = _as_number(value)
+    if name == 'USub' and _is_int_array(value) and np.any(valid & (value == np.iinfo(np.int64).min)):
+        raise OverflowError("整数运算溢出")
+    return _OPERATORS[name](value), valid
+
+
+def _select(condition, if_true, if_false):
+    """逐元素选择（np.where 会把超出 int64 的 Python 整数静默回绕）"""
+    for value in (if_true, if_false):
+        if type(value) is int and not -2 ** 63 <= value < 2 ** 63:
+            raise OverflowError("整数超出 int64 范围")
+    return np.where(condition, if_true, if_false)
+
+
+def _vector_and(*parts):
+    value, valid = parts[0]
+    for next_value, next_valid in parts[1:]:
+        truth = _truth(value)
+        # 左侧为假时短路，不求右侧
+        valid = valid & (~truth | next_valid)
+        value = _select(truth, next_value, value)
+    return value, valid
+
+
+def _vector_or(*parts):
+    value, valid = parts[0]
+    for next_value, next_valid in parts[1:]:
+        truth = _truth(value)
+        valid = valid & (truth | next_valid)
+        value = _select(truth, value, next_value)
+    return value, valid
+
+
+# 向量化计算使用的辅助函数，均返回 (值, 求值不出错的掩码)
+_VECTOR_ENV = {
+    '__builtins__': {},
+    '_const': lambda value: (value, True),
+    '_metadata': lambda columns, name: (columns.get_metadata(name), True),
+    '_field': _vector_field,
+    '_binop': _vector_binop,
+    '_unary': _vector_unary,
+    '_compare': lambda name, left, right: (_OPERATORS[name](left[0], right[0]), left[1] & right[1]),
+    '_isin': lambda left, options, negate: (np.isin(left[0], list(options)) != negate, left[1]),
+    '_not': lambda operand: (np.logical_not(_truth(operand[0])), operand[1]),
+    '_and': _vector_and,
+    '_or': _vector_or,
+}
+
+
+class FrameFilter:
+    """编译后的帧过滤器"""
+
+    def __init__(self, expression: str):
+        """
+        编译过滤表达式
+
+        Args:
+            expression: 过滤表达式
+
+        Raises:
+            FilterError: 表达式为空、语法错误或使用了不支持的语法
+        """
+        self.expression = expression.strip()
+        if not self.expression:
+            raise FilterError("过滤表达式为空")
+
+        try:
+            tree = ast.parse(self.expression, mode='eval')
+        except SyntaxError as e:
+            raise FilterError(f"表达式语法错误: {e.msg}") from e
+
+        validator = _Validator()
+        validator.visit(tree)
+        # 表达式引用的字段和元数据
+        self.fields = validator.fields
+        self.metadata = validator.metadata
+
+        scalar_body = _ScalarTransformer().visit(ast.parse(self.expression, mode='eval')).body
+        self._predicate = _compile_lambda(scalar_body, 'frame',
+                                          {'__builtins__': {'len': len}, '_lshift': _scalar_lshift})
+        vector_body = _VectorTransformer().visit(ast.parse(self.expression, mode='eval')).body
+        self._vector = _compile_lambda(vector_body, 'columns', _VECTOR_ENV)
+
+    def matches(self, frame: DataFrame) -> bool:
+        """
+        判断单帧是否匹配
+
+        Args:
+            frame: 数据帧
+
+        Returns:
+            是否匹配
+        """
+        try:
+            return bool(self._predicate(frame))
+        except _EVAL_ERRORS:
+            return False
+
+    def filter(self, frames: Sequence[DataFrame]) -> List[DataFrame]:
+        """
+        逐帧过滤
+
+        Args:
+            frames: 帧列表
+
+        Returns:
+            匹配的帧列表
+        """
+        predicate = self._predicate
+        matched = []
+        append = matched.append
+        for frame in frames:
+            try:
+                if predicate(frame):
+                    append(frame)
+            except _EVAL_ERRORS:
+                pass
+        return matched
+
+    def mask(self, columns: FrameColumns) -> "np.ndarray":
+        """
+        在列式数据上计算匹配掩码
+
+        引用的字段都是数值列时使用 numpy 向量化计算，结果与逐帧判断一致；
+        否则（bytes/字符串字段、没有时间戳的帧）退回逐帧判断。
+
+        Args:
+            columns: 列式帧数据
+
+        Returns:
+            与帧数等长的布尔数组
+        """
+        count = len(columns)
+        scalar = any(columns.has_field(name) and not columns.is_numeric(name) for name in self.fields)
+        # 没有时间戳的帧逐帧求值时是 None（不能比较大小、不能参与运算），列中是 NaN
+        scalar = scalar or ('timestamp' in self.metadata and np.isnan(columns.get_metadata('timestamp')).any())
+        if not scalar:
+            try:
+                with np.errstate(all='ignore'):
+                    value, valid = self._vector(columns)
+                    result = _truth(value) & valid
+                return np.broadcast_to(result, (count,)).copy()
+            except (TypeError, ValueError, OverflowError):
+                # 列类型不支持该运算（如字符串元数据与数字比较），退回逐帧判断
+                pass
+        return np.fromiter((self.matches(frame) for frame in columns.frames), np.bool_, count)
+
+    def filter_columns(self, columns: FrameColumns) -> List[DataFrame]:
+        """
+        在列式数据上过滤
+
+        Args:
+            columns: 列式帧数据
+
+        Returns:
+            匹配的帧列表
+        """
+        return columns.take(self.mask(columns))
+
+
+def compile_filter(expression: str) -> FrameFilter:
+    """
+    编译过滤表达式
+
+    Args:
+        expression: 过滤表达式
+
+    Returns:
+        过滤器
+
+    Raises:
+        FilterError: 表达式无效
+    """
+    return FrameFilter(expression)
@@ -0,0 +1,514 @@
+# -*- coding: utf-8 -*-
+"""
+帧索引模块
+分帧时为大捕获文件写入 `.sdcidx` 旁路索引文件（如 capture.bin.sdcidx）：每隔固定帧数记录一个
+检查点（该帧的起始字节位置），并用位图记录每一帧是否是错误帧（校验失败等）。
+重新打开时只映射索引文件（mmap），不需要重新分帧整个文件：
+
+    跳转到第 n 帧         从第 n 帧之前最近的检查点开始分帧，最多多解析一个检查点间隔的帧
+    下一个/上一个错误帧    在各检查点之前的累计错误帧数上二分查找，再在一个间隔的位图内查找
+
+索引记录捕获文件的大小、修改时间和协议指纹，任一项变化后索引失效，需要重新建立。
+只支持二进制捕获文件（十六进制文本解码后的字节位置与文件位置不对应）。
+
+文件格式（小端序）：
+    8字节魔数 | uint32 版本 | uint32 元数据长度 | 元数据JSON | 按8字节对齐的各数组段
+"""
+
+import array
+import bisect
+import json
+import mmap
+import os
+import re
+import struct
+import sys
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from models import DataFrame, ProtocolConfig
+from core.snapshot import protocol_fingerprint
+from core.stream_parser import StreamParser
+
+
+FRAME_INDEX_MAGIC = b'SDCIDX01'
+# 版本2：分帧结果与读取块大小无关（版本1的索引在有过长帧时帧序号可能错位，打开时重建）
+# 版本3：去掉检查点到达时间段（二进制捕获文件分帧没有到达时间）
+FRAME_INDEX_VERSION = 3
+FRAME_INDEX_EXTENSION = '.sdcidx'
+
+# 默认每1024帧一个检查点（随机访问最多多解析1023帧）
+DEFAULT_STRIDE = 1024
+# 建立索引和随机访问时每次读取的字节数（StreamParser 分帧与分块方式无关，两者可以不同）
+BUILD_BLOCK_SIZE = 1 << 20
+READ_BLOCK_SIZE = 64 * 1024
+
+_HEADER = struct.Struct('<8sII')
+_HEX_TEXT = re.compile(rb'[0-9A-Fa-f\s,;:\-]*')
+
+# 数组段：(段名, array类型码)
+_ARRAY_SECTIONS = (
+    ('offsets', 'q'),       # 各检查点帧的起始字节位置
+    ('error_counts', 'q'),  # 各检查点之前的累计错误帧数（最后一项为错误帧总数）
+    ('error_bitmap', 'B'),  # 每帧一位，错误帧为1
+)
+
+
+def get_index_path(capture_path: str) -> str:
+    """捕获文件对应的帧索引文件路径"""
+    return capture_path + FRAME_INDEX_EXTENSION
+
+
+def is_binary_capture(capture_path: str) -> bool:
+    """
+    捕获文件是否按二进制读取（与 iter_capture_file 的判断一致）
+
+    Args:
+        capture_path: 捕获文件路径
+
+    Returns:
+        是否是二进制捕获文件（空文件也算二进制）
+    """
+    with open(capture_path, 'rb') as f:
+        head = f.read(BUILD_BLOCK_SIZE)
+    return not head or _HEX_TEXT.fullmatch(head) is None
+
+
+class FrameIndexWriter:
+    """帧索引写入器（分帧时逐帧记录，分帧完成后写入索引文件）"""
+
+    def __init__(self, protocol: ProtocolConfig, resync: bool = False, stride: int = DEFAULT_STRIDE):
+        """
+        初始化
+
+        Args:
+            protocol: 分帧使用的协议配置
+            resync: 是否使用重同步分帧（随机访问时按相同方式分帧）
+            stride: 检查点间隔（帧数，必须是8的倍数）
+
+        Raises:
+            ValueError: 检查点间隔无效
+        """
+        if stride <= 0 or stride % 8:
+            raise ValueError(f"检查点间隔必须是8的正整数倍: {stride}")
+        self.protocol = protocol
+        self.resync = resync
+        self.stride = stride
+        self.offsets = array.array('q')
+        self.error_bitmap = bytearray()
+        self.frame_count = 0
+        self.error_count = 0
+
+    def add(self, frame: DataFrame):
+        """
+        记录一帧（按帧序号顺序调用）
+
+        Args:
+            frame: 数据帧
+        """
+        index = self.frame_count
+        if index % self.stride == 0:
+            self.offsets.append(frame.start_position)
+        if index & 7 == 0:
+            self.error_bitmap.append(0)
+        if frame.has_error:
+            self.error_bitmap[-1] |= 1 << (index & 7)
+            self.error_count += 1
+        self.frame_count += 1
+
+    def record(self, frames: Iterable[DataFrame]) -> Iterator[DataFrame]:
+        """
+        记录经过的每一帧并原样产出（可串在导出等流式处理之前）
+
+        Args:
+            frames: 帧迭代器
+
+        Yields:
+            数据帧
+        """
+        add = self.add
+        for frame in frames:
+            add(frame)
+            yield frame
+
+    def write(self, capture_path: str, index_path: Optional[str] = None) -> str:
+        """
+        写入索引文件（捕获文件分帧完成后调用）
+
+        Args:
+            capture_path: 捕获文件路径
+            index_path: 索引文件路径，为None时写在捕获文件旁边
+
+        Returns:
+            索引文件路径
+
+        Raises:
+            OSError: 文件读写失败
+        """
+        index_path = index_path or get_index_path(capture_path)
+        stat = os.stat(capture_path)
+
+        # 各检查点之前的累计错误帧数（每个检查点间隔占位图的 stride/8 字节）
+        bitmap = bytes(self.error_bitmap)
+        block_bytes = self.stride // 8
+        error_counts = array.array('q', [0])
+        for start in range(0, len(bitmap), block_bytes):
+            block = int.from_bytes(bitmap[start:start + block_bytes], 'little')
+            error_counts.append(error_counts[-1] + bin(block).count('1'))
+
+        arrays = {
+            'offsets': array.array('q', self.offsets),
+            'error_counts': error_counts,
+            'error_bitmap': array.array('B', bitmap),
+        }
+        if sys.byteorder != 'little':
+            for values in arrays.values():
+                values.byteswap()
+
+        sections: Dict[str, List[int]] = {}
+        metadata = {
+            'capture_name': os.path.basename(capture_path),
+            'capture_size': stat.st_size,
+            'capture_mtime_ns': stat.st_mtime_ns,
+            'fingerprint': protocol_fingerprint(self.protocol),
+            'resync': self.resync,
+            'stride': self.stride,
+            'frame_count': self.frame_count,
+            'error_count': self.error_count,
+            'sections': sections,
+        }
+        parts = [(name, arrays[name].tobytes()) for name, _ in _ARRAY_SECTIONS]
+
+        def layout(start: int) -> int:
+            offset = start
+            for name, payload in parts:
+                offset = (offset + 7) & ~7
+                sections[name] = [offset, len(payload)]
+                offset += len(payload)
+            return offset
+
+        # 段偏移写入元数据会改变元数据长度，迭代到稳定为止
+        metadata_length = 0
+        while True:
+            layout(_HEADER.size + metadata_length)
+            metadata_bytes = json.dumps(metadata, ensure_ascii=False).encode('utf-8')
+            if len(metadata_bytes) == metadata_length:
+                break
+            metadata_length = len(metadata_bytes)
+
+        with open(index_path, 'wb') as f:
+            f.write(_HEADER.pack(FRAME_INDEX_MAGIC, FRAME_INDEX_VERSION, len(metadata_bytes)))
+            f.write(metadata_bytes)
+            for name, payload in parts:
+                f.write(b'\0' * (sections[name][0] - f.tell()))
+                f.write(payload)
+        return index_path
+
+
+class FrameIndex:
+    """映射到内存的帧索引（配合同样映射的捕获文件随机访问帧）"""
+
+    def __init__(self, capture_path: str, protocol: ProtocolConfig, resync: bool = False,
+                 index_path: Optional[str] = None):
+        """
+        打开帧索引（只映射文件，不分帧）
+
+        Args:
+            capture_path: 捕获文件路径
+            protocol: 协议配置（必须与建立索引时一致）
+            resync: 是否使用重同步分帧（必须与建立索引时一致）
+            index_path: 索引文件路径，为None时使用捕获文件旁边的索引
+
+        Raises:
+            OSError: 文件读取失败
+            ValueError: 不是帧索引文件，或索引与捕获文件、协议不一致（需要重新建立）
+        """
+        self.capture_path = capture_path
+        self.index_path = index_path or get_index_path(capture_path)
+        self.protocol = protocol
+        self.resync = resync
+
+        with open(self.index_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size < _HEADER.size:
+                raise ValueError("不是有效的帧索引文件")
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            metadata = self._read_metadata()
+            self._check_metadata(metadata)
+        except ValueError:
+            self._mmap.close()
+            raise
+
+        self.stride: int = metadata['stride']
+        self.frame_count: int = metadata['frame_count']
+        self.error_count: int = metadata['error_count']
+        self.capture_size: int = metadata['capture_size']
+
+        view = memoryview(self._mmap)
+        self.arrays = {}
+        for name, typecode in _ARRAY_SECTIONS:
+            offset, length = metadata['sections'][name]
+            section = view[offset:offset + length]
+            if sys.byteorder != 'little' and typecode != 'B':
+                # 大端序主机上复制并转换字节序
+                values = array.array(typecode, section.tobytes())
+                values.byteswap()
+                self.arrays[name] = memoryview(values)
+            else:
+                self.arrays[name] = section.cast(typecode)
+
+        # 捕获文件同样只映射，随机访问时只读取检查点之后的一小段
+        self._capture_mmap = None
+        self.capture_data = b''
+        if self.capture_size:
+            with open(capture_path, 'rb') as f:
+                self._capture_mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self.capture_data = self._capture_mmap
+
+    def _read_metadata(self) -> dict:
+        magic, version, metadata_length = _HEADER.unpack_from(self._mmap, 0)
+        if magic != FRAME_INDEX_MAGIC:
+            raise ValueError("不是有效的帧索引文件")
+        if version != FRAME_INDEX_VERSION:
+            raise ValueError(f"不支持的帧索引版本: {version}")
+        return json.loads(bytes(self._mmap[_HEADER.size:_HEADER.size + metadata_length]))
+
+    def _check_metadata(self, metadata: dict):
+        """检查索引是否仍与捕获文件和协议一致"""
+        stat = os.stat(self.capture_path)
+        if stat.st_size != metadata['capture_size'] or stat.st_mtime_ns != metadata['capture_mtime_ns']:
+            raise ValueError("捕获文件在建立帧索引后已被修改")
+        if metadata['fingerprint'] != protocol_fingerprint(self.protocol):
+            raise ValueError("帧索引不是用当前协议建立的")
+        if metadata['resync'] != self.resync:
+            raise ValueError("帧索引的分帧模式与当前设置不一致")
+
+    def __len__(self) -> int:
+        return self.frame_count
+
+    def _check_number(self, frame_number: int):
+        if not 1 <= frame_number <= self.frame_count:
+            raise ValueError(f"帧序号超出范围（1~{self.frame_count}）: {frame_number}")
+
+    def checkpoint(self, frame_number: int) -> Tuple[int, int]:
+        """
+        第 frame_number 帧之前（含）最近的检查点
+
+        Args:
+            frame_number: 帧序号（从1开始）
+
+        Returns:
+            (检查点的帧序号, 该帧的起始字节位置)
+
+        Raises:
+            ValueError: 帧序号超出范围
+        """
+        self._check_number(frame_number)
+        block = (frame_number - 1) // self.stride
+        return block * self.stride + 1, self.arrays['offsets'][block]
+
+    def is_error(self, frame_number: int) -> bool:
+        """
+        该帧是否是错误帧
+
+        Raises:
+            ValueError: 帧序号超出范围
+        """
+        self._check_number(frame_number)
+        index = frame_number - 1
+        return bool(self.arrays['error_bitmap'][index >> 3] >> (index & 7) & 1)
+
+    def _find_in_block(self, first: int, last: int, forward: bool) -> Optional[int]:
+        """在帧下标 first~last（含，同一个检查点间隔内）中查找错误帧，返回帧下标"""
+        bitmap = self.arrays['error_bitmap']
+        first_byte, last_byte = first >> 3, last >> 3
+        byte_range = range(first_byte, last_byte + 1) if forward else range(last_byte, first_byte - 1, -1)
+        for position in byte_range:
+            value = bitmap[position]
+            # 去掉范围以外的位
+            if position == first_byte:
+                value &= 0xFF << (first & 7) & 0xFF
+            if position == last_byte:
+                value &= 0xFF >> (7 - (last & 7))
+            if value:
+                bit = (value & -value).bit_length() - 1 if forward else value.bit_length() - 1
+                return (position << 3) + bit
+        return None
+
+    def next_error(self, frame_number: int = 0) -> Optional[int]:
+        """
+        下一个错误帧
+
+        Args:
+            frame_number: 从该帧之后开始查找（0表示从第一帧开始）
+
+        Returns:
+            错误帧的帧序号，之后没有错误帧时返回None
+        """
+        index = max(frame_number, 0)
+        if index >= self.frame_count:
+            return None
+        stride = self.stride
+        counts = self.arrays['error_counts']
+        block = index // stride
+        block_last = min((block + 1) * stride, self.frame_count) - 1
+        found = self._find_in_block(index, block_last, forward=True)
+        if found is None:
+            # 累计错误帧数首次超过本间隔末尾数值的位置，前一个间隔就是下一个有错误帧的间隔
+            later = bisect.bisect_right(counts, counts[block + 1])
+            if later >= len(counts):
+                return None
+            block = later - 1
+            block_last = min((block + 1) * stride, self.frame_count) - 1
+            found = self._find_in_block(block * stride, block_last, forward=True)
+        return found + 1
+
+    def previous_error(self, frame_number: int) -> Optional[int]:
+        """
+        上一个错误帧
+
+        Args:
+            frame_number: 从该帧之前开始查找
+
+        Returns:
+            错误帧的帧序号，之前没有错误帧时返回None
+        """
+        index = min(frame_number - 2, self.frame_count - 1)
+        if index < 0:
+            return None
+        stride = self.stride
+        counts = self.arrays['error_counts']
+        block = index // stride
+        found = self._find_in_block(block * stride, index, forward=False)
+        if found is None:
+            if counts[block] == 0:
+                return None
+            block = bisect.bisect_left(counts, counts[block]) - 1
+            block_last = min((block + 1) * stride, self.frame_count) - 1
+            found = self._find_in_block(block * stride, block_last, forward=False)
+        return found + 1
+
+    def read_frames(self, frame_number: int, count: int = 1) -> List[DataFrame]:
+        """
+        读取从 frame_number 开始的若干帧（从最近的检查点开始分帧）
+
+        Args:
+            frame_number: 第一帧的帧序号
+            count: 帧数（超出总帧数的部分忽略）
+
+        Returns:
+            帧列表
+
+        Raises:
+            ValueError: 帧序号超出范围
+        """
+        first, offset = self.checkpoint(frame_number)
+        last = min(frame_number + count - 1, self.frame_count)
+        stream_parser = StreamParser(self.protocol, resync=self.resync)
+        stream_parser.reset(offset)
+        stream_parser.frame_count = first - 1
+
+        data = self.capture_data
+        frames = []
+        position = offset
+        while position < len(data) and stream_parser.frame_count < last:
+            block = data[position:position + READ_BLOCK_SIZE]
+            position += len(block)
+            for frame in stream_parser.feed(block):
+                if frame_number <= frame.frame_number <= last:
+                    frames.append(frame)
+        return frames
+
+    def get_frame(self, frame_number: int) -> DataFrame:
+        """
+        读取一帧
+
+        Raises:
+            ValueError: 帧序号超出范围，或捕获文件内容与索引不一致
+        """
+        frames = self.read_frames(frame_number)
+        if not frames:
+            raise ValueError(f"无法读取第 {frame_number} 帧，请重新建立帧索引")
+        return frames[0]
+
+    def get_summary(self) -> str:
+        """获取索引摘要"""
+        return (f"帧索引: {self.frame_count} 帧, 错误帧: {self.error_count}, "
+                f"检查点: {len(self.arrays['offsets'])} 个（每 {self.stride} 帧）")
+
+    def close(self):
+        """释放内存映射（之后不能再读取帧）"""
+        for values in self.arrays.values():
+            values.release()
+        self._mmap.close()
+        self.capture_data = b''
+        if self._capture_mmap is not None:
+            self._capture_mmap.close()
+            self._capture_mmap = None
+
+
+def build_frame_index(capture_path: str, protocol: ProtocolConfig, resync: bool = False,
+                      stride: int = DEFAULT_STRIDE,
+                      progress: Optional[Callable[[int, int], None]] = None) -> str:
+    """
+    分帧整个捕获文件并写入帧索引
+
+    Args:
+        capture_path: 捕获文件路径
+        protocol: 协议配置
+        resync: 是否使用重同步分帧
+        stride: 检查点间隔（帧数）
+        progress: 进度回调 progress(已读字节数, 文件大小)
+
+    Returns:
+        索引文件路径
+
+    Raises:
+        OSError: 文件读写失败
+        ValueError: 不是二进制捕获文件
+    """
+    if not is_binary_capture(capture_path):
+        raise ValueError("帧索引只支持二进制捕获文件")
+    writer = FrameIndexWriter(protocol, resync, stride)
+    stream_parser = StreamParser(protocol, resync=resync)
+    size = os.path.getsize(capture_path)
+    done = 0
+    with open(capture_path, 'rb') as f:
+        while True:
+            block = f.read(BUILD_BLOCK_SIZE)
+            if not block:
+                break
+            for frame in stream_parser.feed(block):
+                writer.add(frame)
+            done += len(block)
+            if progress:
+                progress(done, size)
+    return writer.write(capture_path)
+
+
+def open_frame_index(capture_path: str, protocol: ProtocolConfig, resync: bool = False,
+                     rebuild: bool = False,
+                     progress: Optional[Callable[[int, int], None]] = None) -> FrameIndex:
+    """
+    打开捕获文件的帧索引，索引不存在或已失效时先分帧整个文件建立索引
+
+    Args:
+        capture_path: 捕获文件路径
+        protocol: 协议配置
+        resync: 是否使用重同步分帧
+        rebuild: 是否忽略已有索引重新建立
+        progress: 建立索引时的进度回调 progress(已读字节数, 文件大小)
+
+    Returns:
+        帧索引
+
+    Raises:
+        OSError: 文件读写失败
+        ValueError: 不是二进制捕获文件
+    """
+    if not rebuild:
+        try:
+            return FrameIndex(capture_path, protocol, resync)
+        except (OSError, ValueError):
+            pass
+    build_frame_index(capture_path, protocol, resync, progress=progress)
+    return FrameIndex(capture_path, protocol, resync)
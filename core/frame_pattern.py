@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+"""
+帧头/帧尾匹配模式模块
+帧头帧尾除固定字节外可以包含通配和掩码字节，例如 DL/T 645 的
+`68 ?? ?? ?? ?? ?? ?? 68`（两个 68 之间是 6 字节地址）：
+
+    68      固定字节
+    ??      任意字节
+    6?      半字节通配（高4位为6）
+    68/F0   掩码字节（按位与 F0 后等于 60 & F0）
+
+模式编译为字节级匹配器：用 bytes.find 查找最长的一段固定字节，再校验其余字节的掩码，
+查找时间与数据长度成线性关系。全部是固定字节时直接使用 bytes.find。
+"""
+
+import re
+from typing import List, Optional, Tuple
+
+from models.protocol import FRAME_PATTERN_TOKEN
+
+
+_TOKEN_RE = re.compile(FRAME_PATTERN_TOKEN)
+
+
+class FramePattern:
+    """帧头/帧尾匹配模式"""
+
+    __slots__ = ('text', 'values', 'masks', 'length', 'literal',
+                 '_anchor', '_anchor_offset', '_checks', 'find')
+
+    def __init__(self, text: str):
+        """
+        编译匹配模式
+
+        Args:
+            text: 模式文本，如 "68"、"68 ?? ?? ?? ?? ?? ?? 68"、"AA 5?"
+
+        Raises:
+            ValueError: 模式无效或不包含固定字节
+        """
+        values, masks = self.parse(text)
+        self.text = text
+        self.values = bytes(values)
+        self.masks = bytes(masks)
+        self.length = len(values)
+        # 全部是固定字节时的帧头字节，否则为None
+        self.literal: Optional[bytes] = self.values if all(m == 0xFF for m in masks) else None
+
+        # 最长的一段固定字节作为查找锚点
+        best_start, best_length = 0, 0
+        run_start = None
+        for i, mask in enumerate(list(masks) + [0]):
+            if mask == 0xFF:
+                if run_start is None:
+                    run_start = i
+            elif run_start is not None:
+                if i - run_start > best_length:
+                    best_start, best_length = run_start, i - run_start
+                run_start = None
+        if best_length == 0:
+            raise ValueError(f"帧头/帧尾至少需要一个固定字节: {text}")
+        self._anchor = self.values[best_start:best_start + best_length]
+        self._anchor_offset = best_start
+        # 锚点以外需要校验的字节：(偏移, 值, 掩码)，完全通配的字节不校验
+        self._checks: List[Tuple[int, int, int]] = [
+            (i, values[i], masks[i]) for i in range(self.length)
+            if masks[i] and not best_start <= i < best_start + best_length
+        ]
+        self.find = self._find_literal if self.literal is not None else self._find_masked
+
+    @staticmethod
+    def parse(text: str) -> Tuple[List[int], List[int]]:
+        """
+        解析模式文本
+
+        Args:
+            text: 模式文本
+
+        Returns:
+            (各字节的值, 各字节的掩码)，值已与掩码按位与
+
+        Raises:
+            ValueError: 模式无效
+        """
+        cleaned = re.sub(r'\s+', '', text).upper()
+        if not cleaned:
+            raise ValueError("帧头/帧尾不能为空")
+        values, masks = [], []
+        pos = 0
+        while pos < len(cleaned):
+            match = _TOKEN_RE.match(cleaned, pos)
+            if match is None:
+                raise ValueError(f"帧头/帧尾不是有效的十六进制模式: {text}")
+            digits, explicit_mask = match.group(1), match.group(2)
+            if explicit_mask is not None:
+                if '?' in digits:
+                    raise ValueError(f"掩码字节不能包含通配符: {match.group(0)}")
+                mask = int(explicit_mask, 16)
+            else:
+                mask = (0x00 if digits[0] == '?' else 0xF0) | (0x00 if digits[1] == '?' else 0x0F)
+            value = int(digits.replace('?', '0'), 16) & mask
+            values.append(value)
+            masks.append(mask)
+            pos = match.end()
+        return values, masks
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __eq__(self, other) -> bool:
+        return (isinstance(other, FramePattern)
+                and self.values == other.values and self.masks == other.masks)
+
+    def __hash__(self) -> int:
+        return hash((self.values, self.masks))
+
+    def __repr__(self) -> str:
+        return f"FramePattern({self.to_text()!r})"
+
+    def to_text(self) -> str:
+        """规范化的模式文本（用于缓存和比较）"""
+        parts = []
+        for value, mask in zip(self.values, self.masks):
+            if mask == 0xFF:
+                parts.append(f"{value:02X}")
+            elif mask == 0x00:
+                parts.append("??")
+            elif mask == 0xF0:
+                parts.append(f"{value >> 4:X}?")
+            elif mask == 0x0F:
+                parts.append(f"?{value & 0x0F:X}")
+            else:
+                parts.append(f"{value:02X}/{mask:02X}")
+        return ' '.join(parts)
+
+    def match_at(self, data: bytes, pos: int) -> bool:
+        """
+        模式是否在指定位置匹配
+
+        Args:
+            data: 字节数据
+            pos: 起始位置
+
+        Returns:
+            是否匹配
+        """
+        if pos < 0 or pos + self.length > len(data):
+            return False
+        if not data.startswith(self._anchor, pos + self._anchor_offset):
+            return False
+        for offset, value, mask in self._checks:
+            if data[pos + offset] & mask != value:
+                return False
+        return True
+
+    def _find_literal(self, data: bytes, start: int = 0, end: Optional[int] = None) -> int:
+        return data.find(self.literal, start, end)
+
+    def _find_masked(self, data: bytes, start: int = 0, end: Optional[int] = None) -> int:
+        """
+        查找第一个匹配位置（与 bytes.find 相同的返回值）
+
+        Args:
+            data: 字节数据
+            start: 起始查找位置
+            end: 匹配必须在该位置之前结束，为None时到数据末尾
+
+        Returns:
+            匹配起始位置，没有时返回-1
+        """
+        anchor, anchor_offset = self._anchor, self._anchor_offset
+        end_limit = (len(data) if end is None else min(end, len(data))) - self.length
+        # 锚点查找也限定在窗口内，窗口查找的代价与窗口大小成正比，与数据长度无关
+        search_end = end_limit + anchor_offset + len(anchor)
+        pos = data.find(anchor, max(start, 0) + anchor_offset, search_end)
+        while pos != -1:
+            candidate = pos - anchor_offset
+            for offset, value, mask in self._checks:
+                if data[candidate + offset] & mask != value:
+                    break
+            else:
+                return candidate
+            pos = data.find(anchor, pos + 1, search_end)
+        return -1
+
+    def regex(self) -> bytes:
+        """
+        转换为正则表达式（需使用 re.DOTALL 编译）
+
+        Returns:
+            正则表达式字节串
+        """
+        parts = []
+        for value, mask in zip(self.values, self.masks):
+            if mask == 0xFF:
+                parts.append(re.escape(bytes([value])))
+            elif mask == 0x00:
+                parts.append(b'.')
+            else:
+                matching = bytes(b for b in range(256) if b & mask == value)
+                parts.append(b'[' + b''.join(re.escape(bytes([b])) for b in matching) + b']')
+        return b''.join(parts)
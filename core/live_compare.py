@@ -0,0 +1,275 @@
+# -*- coding: utf-8 -*-
+"""
+实时双通道对比模块
+在滑动时间/数量窗口内用哈希查找匹配两个实时数据流中的相同帧，
+统计滚动匹配率和匹配帧之间的延迟，内存占用只取决于窗口大小
+"""
+
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Deque, Dict, List, Optional, Tuple
+
+from models import DataFrame
+from core.frame_compare import FrameComparator
+
+
+# 通道标识
+SIDE_A = 'A'
+SIDE_B = 'B'
+
+
+@dataclass
+class LiveMatch:
+    """一次对比结果（匹配成功或超出窗口未匹配）"""
+    frame_a: Optional[DataFrame]
+    frame_b: Optional[DataFrame]
+    latency: Optional[float] = None  # B相对A的到达延迟（秒），未匹配时为None
+
+    def is_matched(self) -> bool:
+        """是否匹配成功"""
+        return self.frame_a is not None and self.frame_b is not None
+
+    def get_text(self) -> str:
+        """获取描述"""
+        if self.is_matched():
+            return f"匹配 #{self.frame_a.frame_number} ↔ #{self.frame_b.frame_number} 延迟 {self.latency * 1000:.1f} ms"
+        if self.frame_a is not None:
+            return f"A独有 #{self.frame_a.frame_number}: {self.frame_a.get_raw_data_hex()}"
+        return f"B独有 #{self.frame_b.frame_number}: {self.frame_b.get_raw_data_hex()}"
+
+
+@dataclass
+class LiveCompareStats:
+    """实时对比统计"""
+    matched: int = 0
+    unmatched_a: int = 0
+    unmatched_b: int = 0
+    pending_a: int = 0
+    pending_b: int = 0
+    rolling_match_rate: float = 1.0  # 最近若干次结果中的匹配比例
+    latency_avg: float = 0.0  # 最近若干次匹配的平均延迟（秒）
+    latency_max: float = 0.0  # 最近若干次匹配的最大延迟（秒）
+
+    def get_summary(self) -> str:
+        """获取统计摘要"""
+        return (f"匹配: {self.matched}, A独有: {self.unmatched_a}, B独有: {self.unmatched_b}, "
+                f"滚动匹配率: {self.rolling_match_rate * 100:.1f}%, "
+                f"延迟: 平均 {self.latency_avg * 1000:.1f} ms / 最大 {self.latency_max * 1000:.1f} ms")
+
+
+class _Window:
+    """
+    一侧的待匹配帧窗口
+
+    按到达顺序保存待匹配帧（OrderedDict，键为递增序号），
+    另用 哈希 -> 序号队列 的索引支持O(1)查找最早的同内容帧
+    """
+
+    def __init__(self):
+        self.entries: "OrderedDict[int, Tuple[int, float, DataFrame]]" = OrderedDict()
+        self.index: Dict[int, Deque[int]] = {}
+        self._next_seq = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def add(self, frame_hash: int, timestamp: float, frame: DataFrame):
+        seq = self._next_seq
+        self._next_seq += 1
+        self.entries[seq] = (frame_hash, timestamp, frame)
+        self.index.setdefault(frame_hash, deque()).append(seq)
+
+    def take(self, frame_hash: int) -> Optional[Tuple[float, DataFrame]]:
+        """取出最早的同内容帧"""
+        seqs = self.index.get(frame_hash)
+        if not seqs:
+            return None
+        seq = seqs.popleft()
+        if not seqs:
+            del self.index[frame_hash]
+        _, timestamp, frame = self.entries.pop(seq)
+        return timestamp, frame
+
+    def oldest(self) -> Optional[Tuple[int, float, DataFrame]]:
+        if not self.entries:
+            return None
+        return next(iter(self.entries.values()))
+
+    def pop_oldest(self) -> Tuple[int, float, DataFrame]:
+        seq, (frame_hash, timestamp, frame) = self.entries.popitem(last=False)
+        seqs = self.index[frame_hash]
+        seqs.popleft()
+        if not seqs:
+            del self.index[frame_hash]
+        return frame_hash, timestamp, frame
+
+
+class LiveComparator:
+    """实时双通道对比器"""
+
+    def __init__(self, window_seconds: float = 2.0, window_frames: int = 10000,
+                 rolling_size: int = 1000, max_events: int = 1000):
+        """
+        初始化
+
+        Args:
+            window_seconds: 时间窗口（秒），超过该时间仍未匹配的帧判定为独有帧
+            window_frames: 每侧最多等待匹配的帧数，超过后最早的帧判定为独有帧
+            rolling_size: 滚动匹配率和延迟统计使用的最近结果数
+            max_events: 保留的最近不匹配事件数
+        """
+        self.window_seconds = window_seconds
+        self.window_frames = window_frames
+        self.windows = {SIDE_A: _Window(), SIDE_B: _Window()}
+        self.matched = 0
+        self.unmatched = {SIDE_A: 0, SIDE_B: 0}
+        self._outcomes: Deque[bool] = deque(maxlen=rolling_size)
+        self._latencies: Deque[float] = deque(maxlen=rolling_size)
+        # 最近的不匹配事件（分歧），供界面显示
+        self.events: Deque[LiveMatch] = deque(maxlen=max_events)
+
+    def add_frame(self, side: str, frame: DataFrame) -> List[LiveMatch]:
+        """
+        加入一侧新到达的帧
+
+        Args:
+            side: SIDE_A 或 SIDE_B
+            frame: 帧（timestamp为空时使用当前时间）
+
+        Returns:
+            本次产生的对比结果（匹配或因超出窗口而判定的独有帧）
+        """
+        timestamp = frame.timestamp if frame.timestamp is not None else time.time()
+        other = SIDE_B if side == SIDE_A else SIDE_A
+        results = self.expire(timestamp)
+
+        frame_hash = FrameComparator.frame_hash(frame)
+        found = self.windows[other].take(frame_hash)
+        if found:
+            other_time, other_frame = found
+            if side == SIDE_A:
+                match = LiveMatch(frame, other_frame, other_time - timestamp)
+            else:
+                match = LiveMatch(other_frame, frame, timestamp - other_time)
+            self._record(match)
+            results.append(match)
+            return results
+
+        window = self.windows[side]
+        window.add(frame_hash, timestamp, frame)
+        while len(window) > self.window_frames:
+            results.append(self._expire_oldest(side))
+        return results
+
+    def expire(self, now: Optional[float] = None) -> List[LiveMatch]:
+        """
+        把超出时间窗口的待匹配帧判定为独有帧
+
+        Args:
+            now: 当前时间戳，None表示使用系统时间
+
+        Returns:
+            判定出的独有帧结果
+        """
+        now = time.time() if now is None else now
+        deadline = now - self.window_seconds
+        results = []
+        for side, window in self.windows.items():
+            while True:
+                oldest = window.oldest()
+                if oldest is None or oldest[1] >= deadline:
+                    break
+                results.append(self._expire_oldest(side))
+        return results
+
+    def _expire_oldest(self, side: str) -> LiveMatch:
+        _, _, frame = self.windows[side].pop_oldest()
+        self.unmatched[side] += 1
+        match = LiveMatch(frame, None) if side == SIDE_A else LiveMatch(None, frame)
+        self._record(match)
+        return match
+
+    def _record(self, match: LiveMatch):
+        if match.is_matched():
+            self.matched += 1
+            self._outcomes.append(True)
+            self._latencies.append(match.latency)
+        else:
+            self._outcomes.append(False)
+            self.events.append(match)
+
+    def get_stats(self) -> LiveCompareStats:
+        """获取统计"""
+        latencies = [abs(latency) for latency in self._latencies]
+        return LiveCompareStats(
+            matched=self.matched,
+            unmatched_a=self.unmatched[SIDE_A],
+            unmatched_b=self.unmatched[SIDE_B],
+            pending_a=len(self.windows[SIDE_A]),
+            pending_b=len(self.windows[SIDE_B]),
+            rolling_match_rate=(sum(self._outcomes) / len(self._outcomes)) if self._outcomes else 1.0,
+            latency_avg=sum(latencies) / len(latencies) if latencies else 0.0,
+            latency_max=max(latencies, default=0.0)
+        )
+
+
+class LiveCompareSession:
+    """实时对比会话：从两个采集源取帧送入对比器"""
+
+    def __init__(self, source_a, source_b, comparator: Optional[LiveComparator] = None):
+        """
+        初始化
+
+        Args:
+            source_a: A通道采集源（如请求线/被测设备）
+            source_b: B通道采集源（如参考模拟器）
+            comparator: 对比器，None时使用默认窗口参数
+        """
+        self.sources = {SIDE_A: source_a, SIDE_B: source_b}
+        self.comparator = comparator or LiveComparator()
+        self.error_message = ""
+
+    def start(self):
+        """启动两个采集源"""
+        self.sources[SIDE_A].start()
+        try:
+            self.sources[SIDE_B].start()
+        except Exception:
+            self.sources[SIDE_A].stop()
+            raise
+
+    def stop(self):
+        """停止两个采集源"""
+        for source in self.sources.values():
+            source.stop()
+
+    def is_running(self) -> bool:
+        """两个采集源是否都在运行"""
+        running = all(source.is_running() for source in self.sources.values())
+        if not running:
+            self.error_message = '\n'.join(
+                f"{side}: {source.error_message}" for side, source in self.sources.items()
+                if getattr(source, 'error_message', '')
+            )
+        return running
+
+    def poll(self) -> Tuple[Dict[str, List[DataFrame]], List[LiveMatch]]:
+        """
+        取走两侧新到达的帧并对比（供GUI定时调用）
+
+        Returns:
+            ({通道: 新帧列表}, 对比结果列表)
+        """
+        frames = {side: source.get_frames() for side, source in self.sources.items()}
+
+        # 按到达时间交替送入，使匹配延迟反映真实到达先后
+        tagged = [(frame.timestamp or 0.0, side, frame)
+                  for side, side_frames in frames.items() for frame in side_frames]
+        tagged.sort(key=lambda item: item[0])
+
+        results = []
+        for _, side, frame in tagged:
+            results.extend(self.comparator.add_frame(side, frame))
+        results.extend(self.comparator.expire())
+        return frames, results
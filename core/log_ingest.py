@@ -0,0 +1,529 @@
+# -*- coding: utf-8 -*-
+"""
+串口监视日志导入模块
+解析串口调试助手/记录器输出的带时间戳日志，例如：
+
+    [2026-10-01 12:00:01.123] RX: 68 01 03 02 AA BB 6B 16
+    [12:00:01.123]收←◆68 01 03 02 AA BB 6B 16
+    2026-10-01 12:00:01.123 TX 68 02 01 00 03 16
+
+逐行流式读取，每行的时间戳和方向（TX/RX）随数据块一起交给按方向分开的流式解析器，
+解析出的帧记录到达时间（完成该帧的数据行的时间）和方向（写入帧的 channel 字段）。
+只有十六进制数据、没有时间戳的行视为上一行数据的续行。
+
+稀疏时间索引按固定字节间隔定位（seek）到日志中的行并读取其时间戳，
+建立索引和按时间跳转都不需要从头扫描文件。
+"""
+
+import os
+import re
+import time
+from array import array
+from bisect import bisect_left
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from models import ProtocolConfig, DataFrame, ParseResult
+from core.decode_plan import DecodePlan
+from core.stream_parser import StreamParser
+
+
+# 格式识别读取的文件开头字节数
+DETECT_SIZE = 64 * 1024
+# 稀疏时间索引的默认间隔（字节）
+DEFAULT_INDEX_STRIDE = 1 << 20
+_DAY_SECONDS = 24 * 3600
+
+# 方向标记 -> 方向
+DIRECTIONS = {
+    'RX': 'RX', 'TX': 'TX',
+    '收←◆': 'RX', '发→◇': 'TX',
+    '收': 'RX', '发': 'TX',
+    '<<': 'RX', '>>': 'TX',
+    '<-': 'RX', '->': 'TX',
+}
+
+_DATE = rb'(?P<y>\d{4})[-/](?P<mo>\d{1,2})[-/](?P<d>\d{1,2})'
+_TIME = rb'(?P<h>\d{1,2}):(?P<mi>\d{2}):(?P<s>\d{2})(?:[.,](?P<f>\d{1,6}))?'
+_DIRECTION = (rb'(?P<dir>'
+              + b'|'.join(re.escape(token.encode('utf-8'))
+                          for token in sorted(DIRECTIONS, key=len, reverse=True))
+              + rb')')
+_DATA = rb'(?P<data>(?:[0-9A-Fa-f]{2}[\s,]*)*)'
+_HEX_LINE = re.compile(rb'\s*(?:[0-9A-Fa-f]{2}[\s,]*)+')
+
+
+@dataclass(frozen=True)
+class LogFormat:
+    """日志格式"""
+    name: str
+    pattern: 're.Pattern[bytes]'  # 命名分组：y/mo/d（可选）、h/mi/s/f、dir（可选）、data
+    has_date: bool  # 时间戳是否包含日期
+
+    def match(self, line: bytes) -> Optional['re.Match[bytes]']:
+        """匹配一行日志"""
+        return self.pattern.fullmatch(line)
+
+
+# 支持的日志格式（按识别优先级排列）
+LOG_FORMATS = [
+    LogFormat("方括号时间戳",
+              re.compile(rb'\s*\[' + _DATE + rb'[ T]' + _TIME + rb'\]\s*\[?' + _DIRECTION
+                         + rb'?\]?[\s:]*' + _DATA + rb'\s*', re.IGNORECASE),
+              True),
+    LogFormat("行首时间戳",
+              re.compile(rb'\s*' + _DATE + rb'[ T]' + _TIME + rb'\s+\[?' + _DIRECTION
+                         + rb'?\]?[\s:]*' + _DATA + rb'\s*', re.IGNORECASE),
+              True),
+    LogFormat("串口调试助手",
+              re.compile(rb'\s*\[' + _TIME + rb'\]\s*\[?' + _DIRECTION
+                         + rb'?\]?[\s:]*' + _DATA + rb'\s*', re.IGNORECASE),
+              False),
+]
+
+
+@dataclass
+class LogRecord:
+    """日志中的一行数据"""
+    offset: int  # 该行在日志文件中的位置
+    timestamp: float  # Unix时间戳
+    direction: str  # TX/RX，日志没有方向时为空
+    data: bytes
+
+
+def detect_log_format(lines: Iterable[bytes]) -> Optional[LogFormat]:
+    """
+    识别日志格式
+
+    Args:
+        lines: 日志开头的若干行
+
+    Returns:
+        匹配行数最多的格式，没有带时间戳的数据行时返回None
+    """
+    counts = [0] * len(LOG_FORMATS)
+    for line in lines:
+        for i, log_format in enumerate(LOG_FORMATS):
+            match = log_format.match(line)
+            if match and match.group('data'):
+                counts[i] += 1
+                break
+    best = max(range(len(LOG_FORMATS)), key=lambda i: counts[i])
+    return LOG_FORMATS[best] if counts[best] else None
+
+
+def parse_time_text(text: str) -> float:
+    """
+    解析时间范围参数
+
+    Args:
+        text: 如 "2026-10-01 12:00:00" 或 "2026-10-01T12:00:00.500"
+
+    Returns:
+        Unix时间戳
+
+    Raises:
+        ValueError: 时间格式无效
+    """
+    try:
+        return datetime.fromisoformat(text.strip()).timestamp()
+    except ValueError:
+        raise ValueError(f"无效的时间: {text}（格式如 2026-10-01 12:00:00）")
+
+
+class _Clock:
+    """把日志行的时间字段转换为Unix时间戳（按日期缓存零点时间）"""
+
+    def __init__(self, base_date: date):
+        self.base_date = base_date
+        self._midnights: Dict[Tuple[int, int, int], float] = {}
+
+    def midnight(self, year: int, month: int, day: int) -> float:
+        key = (year, month, day)
+        value = self._midnights.get(key)
+        if value is None:
+            value = time.mktime((year, month, day, 0, 0, 0, 0, 0, -1))
+            self._midnights[key] = value
+        return value
+
+    def timestamp(self, match: 're.Match[bytes]', has_date: bool) -> float:
+        if has_date:
+            midnight = self.midnight(int(match.group('y')), int(match.group('mo')), int(match.group('d')))
+        else:
+            base = self.base_date
+            midnight = self.midnight(base.year, base.month, base.day)
+        seconds = int(match.group('h')) * 3600 + int(match.group('mi')) * 60 + int(match.group('s'))
+        fraction = match.group('f')
+        if fraction:
+            seconds += int(fraction) / 10 ** len(fraction)
+        return midnight + seconds
+
+
+class LogLineParser:
+    """日志行解析器（把日志行转换为带时间戳和方向的数据）"""
+
+    def __init__(self, log_format: LogFormat, base_date: date):
+        """
+        初始化
+
+        Args:
+            log_format: 日志格式
+            base_date: 时间戳只有时分秒时使用的日期
+        """
+        self.log_format = log_format
+        self._clock = _Clock(base_date)
+        # 上一个带时间戳的行的时间和方向（续行沿用）
+        self.previous: Optional[float] = None
+        self.direction = ''
+        # 无法识别而跳过的行数
+        self.skipped_lines = 0
+
+    def line_time(self, match: 're.Match[bytes]', previous: Optional[float]) -> float:
+        """
+        一行的时间戳
+
+        Args:
+            match: 日志格式的匹配结果
+            previous: 上一行的时间戳，时间戳只有时分秒时用于处理跨午夜
+
+        Returns:
+            Unix时间戳
+        """
+        has_date = self.log_format.has_date
+        timestamp = self._clock.timestamp(match, has_date)
+        if previous is not None and not has_date:
+            # 调整到与上一行相差不超过半天的那一天
+            timestamp += round((previous - timestamp) / _DAY_SECONDS) * _DAY_SECONDS
+        return timestamp
+
+    def parse_line(self, line: bytes, offset: int = 0) -> Optional[LogRecord]:
+        """
+        解析一行日志（可逐行输入，跨调用保持上一行的时间和方向）
+
+        Args:
+            line: 日志行
+            offset: 该行在文件中的位置
+
+        Returns:
+            有数据时返回日志行数据，否则返回None
+        """
+        match = self.log_format.match(line)
+        if match is not None:
+            self.previous = self.line_time(match, self.previous)
+            token = match.group('dir')
+            self.direction = DIRECTIONS.get(token.decode('utf-8').upper(), '') if token else ''
+            hex_text = match.group('data')
+        elif self.previous is not None and _HEX_LINE.fullmatch(line):
+            # 续行：沿用上一行的时间和方向
+            hex_text = line
+        else:
+            if line.strip():
+                self.skipped_lines += 1
+            return None
+        data = bytes.fromhex(re.sub(rb'[\s,]+', b'', hex_text).decode('ascii'))
+        if not data:
+            return None
+        return LogRecord(offset, self.previous, self.direction, data)
+
+    def iter_lines(self, lines: Iterable[bytes], offset: int = 0,
+                   previous: Optional[float] = None) -> Iterator[LogRecord]:
+        """
+        解析日志行
+
+        Args:
+            lines: 日志行（含换行符时用于累计文件位置）
+            offset: 第一行在文件中的位置
+            previous: 上一行的时间戳（从文件中间开始时用于确定只有时分秒的日期）
+
+        Yields:
+            有数据的日志行
+        """
+        self.previous = previous
+        self.direction = ''
+        parse_line = self.parse_line
+        for line in lines:
+            record = parse_line(line, offset)
+            offset += len(line)
+            if record is not None:
+                yield record
+
+
+class LogReader:
+    """带时间戳的串口监视日志读取器"""
+
+    def __init__(self, file_path: str, log_format: Optional[LogFormat] = None,
+                 base_date: Optional[date] = None):
+        """
+        打开日志
+
+        Args:
+            file_path: 日志文件路径
+            log_format: 日志格式，为None时按文件开头自动识别
+            base_date: 时间戳只有时分秒时使用的日期，为None时使用文件修改日期
+
+        Raises:
+            OSError: 文件读取失败
+            ValueError: 不是支持的日志格式
+        """
+        self.file_path = file_path
+        if log_format is None:
+            with open(file_path, 'rb') as f:
+                head = f.read(DETECT_SIZE)
+            log_format = detect_log_format(head.splitlines())
+            if log_format is None:
+                raise ValueError(f"不是支持的日志格式: {file_path}")
+        if base_date is None:
+            base_date = date.fromtimestamp(os.path.getmtime(file_path))
+        self.line_parser = LogLineParser(log_format, base_date)
+
+    @staticmethod
+    def is_log_file(file_path: str) -> bool:
+        """文件开头是否是支持的日志格式"""
+        with open(file_path, 'rb') as f:
+            head = f.read(DETECT_SIZE)
+        return detect_log_format(head.splitlines()) is not None
+
+    @property
+    def log_format(self) -> LogFormat:
+        """日志格式"""
+        return self.line_parser.log_format
+
+    @property
+    def size(self) -> int:
+        """日志文件当前大小"""
+        return os.path.getsize(self.file_path)
+
+    def iter_records(self, start_offset: int = 0, previous: Optional[float] = None,
+                     start_time: Optional[float] = None,
+                     end_time: Optional[float] = None) -> Iterator[LogRecord]:
+        """
+        从指定位置流式读取日志
+
+        Args:
+            start_offset: 开始读取的位置（应为行首，可由时间索引得到）
+            previous: start_offset 之前一行的时间戳
+            start_time: 跳过早于该时间的行
+            end_time: 读到晚于该时间的行时停止
+
+        Yields:
+            有数据的日志行
+        """
+        with open(self.file_path, 'rb') as f:
+            f.seek(start_offset)
+            for record in self.line_parser.iter_lines(f, start_offset, previous):
+                if start_time is not None and record.timestamp < start_time:
+                    continue
+                if end_time is not None and record.timestamp > end_time:
+                    break
+                yield record
+
+    def probe(self, offset: int, previous: Optional[float] = None) -> Optional[Tuple[int, float]]:
+        """
+        定位到指定位置之后的第一个带时间戳的行
+
+        Args:
+            offset: 文件中的位置（可以在行中间）
+            previous: 之前的时间戳（用于确定只有时分秒的日期）
+
+        Returns:
+            (行首位置, 时间戳)，之后没有带时间戳的行时返回None
+        """
+        with open(self.file_path, 'rb') as f:
+            f.seek(offset)
+            if offset > 0:
+                # 跳过半行
+                offset += len(f.readline())
+            for line in f:
+                match = self.log_format.match(line)
+                if match is not None:
+                    return offset, self.line_parser.line_time(match, previous)
+                offset += len(line)
+        return None
+
+
+class LogTimeIndex:
+    """
+    日志的稀疏时间索引
+
+    每隔 stride 字节记录一个（行首位置, 时间戳），按时间二分查找到起始位置后
+    最多多读 stride 字节就能到达目标时间。建立索引只需 文件大小/stride 次定位读取。
+    """
+
+    def __init__(self, reader: LogReader, stride: int = DEFAULT_INDEX_STRIDE):
+        """
+        初始化
+
+        Args:
+            reader: 日志读取器
+            stride: 索引间隔（字节）
+        """
+        self.reader = reader
+        self.stride = stride
+        self.offsets = array('q')
+        self.times = array('d')
+        # 已建立索引的文件长度
+        self.indexed_size = 0
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def update(self) -> int:
+        """
+        为上次之后新增的文件内容补充索引（首次调用时建立索引）
+
+        Returns:
+            新增的索引项数
+        """
+        size = self.reader.size
+        added = 0
+        position = self.indexed_size
+        while position < size:
+            previous = self.times[-1] if self.times else None
+            found = self.reader.probe(position, previous)
+            if found is None:
+                break
+            offset, timestamp = found
+            if not self.offsets or offset > self.offsets[-1]:
+                self.offsets.append(offset)
+                # 时间索引必须单调，乱序的时间戳按前一项处理
+                self.times.append(max(timestamp, previous) if previous is not None else timestamp)
+                added += 1
+            position = max(position + self.stride, offset + 1)
+        self.indexed_size = size
+        return added
+
+    def find(self, timestamp: float) -> Tuple[int, Optional[float]]:
+        """
+        查找读取指定时间之后的数据应从哪里开始
+
+        Args:
+            timestamp: 目标时间
+
+        Returns:
+            (开始读取的位置, 该位置之前的时间戳)，传给 LogReader.iter_records
+        """
+        index = bisect_left(self.times, timestamp) - 1
+        if index < 0:
+            return 0, None
+        return self.offsets[index], self.times[index]
+
+
+class LogFrameParser:
+    """日志帧解析器：按方向分开流式分帧，帧记录到达时间和方向"""
+
+    def __init__(self, protocol: ProtocolConfig, plan: Optional[DecodePlan] = None,
+                 resync: bool = False):
+        """
+        初始化
+
+        Args:
+            protocol: 协议配置
+            plan: 预先编译的解码计划
+            resync: 是否使用重同步分帧
+        """
+        self.protocol = protocol
+        self.plan = plan or DecodePlan.compile(protocol)
+        self.resync = resync
+        # 方向 -> 流式解析器
+        self.stream_parsers: Dict[str, StreamParser] = {}
+        self.frame_count = 0
+        self.total_bytes = 0
+
+    def set_protocol(self, protocol: ProtocolConfig, plan: Optional[DecodePlan] = None):
+        """
+        切换协议（保留各方向的缓冲区和帧计数）
+
+        Args:
+            protocol: 新的协议配置
+            plan: 预先编译的解码计划
+        """
+        self.protocol = protocol
+        self.plan = plan or DecodePlan.compile(protocol)
+        for stream_parser in self.stream_parsers.values():
+            stream_parser.set_protocol(protocol, self.plan)
+
+    def feed(self, record: LogRecord) -> List[DataFrame]:
+        """
+        输入一行日志数据
+
+        Args:
+            record: 日志行
+
+        Returns:
+            本行数据完成的帧
+        """
+        stream_parser = self.stream_parsers.get(record.direction)
+        if stream_parser is None:
+            stream_parser = StreamParser(self.protocol, plan=self.plan, resync=self.resync)
+            self.stream_parsers[record.direction] = stream_parser
+        self.total_bytes += len(record.data)
+
+        frames = stream_parser.feed(record.data)
+        for frame in frames:
+            self.frame_count += 1
+            frame.frame_number = self.frame_count
+            frame.timestamp = record.timestamp
+            frame.channel = record.direction
+        return frames
+
+    def iter_frames(self, records: Iterable[LogRecord]) -> Iterator[DataFrame]:
+        """流式解析日志行"""
+        for record in records:
+            yield from self.feed(record)
+
+    def parse_records(self, records: Iterable[LogRecord]) -> ParseResult:
+        """
+        解析日志行为解析结果
+
+        Args:
+            records: 日志行
+
+        Returns:
+            解析结果（帧的位置是所在方向数据流中的位置）
+        """
+        result = ParseResult()
+        for frame in self.iter_frames(records):
+            result.add_frame(frame)
+        result.total_bytes = self.total_bytes
+        return result
+
+
+def log_payload(data: bytes) -> Optional[bytes]:
+    """
+    提取日志文本中的数据字节（各数据行按顺序拼接，用于按十六进制片段搜索保存的日志）
+
+    Args:
+        data: 日志文本（UTF-8）
+
+    Returns:
+        数据字节，不是支持的日志格式时返回None
+    """
+    log_format = detect_log_format(data[:DETECT_SIZE].splitlines())
+    if log_format is None:
+        return None
+    line_parser = LogLineParser(log_format, date.today())
+    return b''.join(record.data for record in line_parser.iter_lines(data.splitlines()))
+
+
+def parse_log_text(text: str, protocol: ProtocolConfig, resync: bool = False,
+                   base_date: Optional[date] = None) -> Optional[ParseResult]:
+    """
+    解析粘贴的日志文本
+
+    Args:
+        text: 日志文本
+        protocol: 协议配置
+        resync: 是否使用重同步分帧
+        base_date: 时间戳只有时分秒时使用的日期，为None时使用今天
+
+    Returns:
+        解析结果，不是支持的日志格式时返回None
+    """
+    # 先只用开头识别格式，普通十六进制文本不做整体编码
+    log_format = detect_log_format(text[:DETECT_SIZE].encode('utf-8').splitlines())
+    if log_format is None:
+        return None
+    lines = text.encode('utf-8').splitlines()
+    line_parser = LogLineParser(log_format, base_date or date.today())
+    return LogFrameParser(protocol, resync=resync).parse_records(line_parser.iter_lines(lines))
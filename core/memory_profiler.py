@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+"""
+内存分析模块
+基于tracemalloc，在解析流水线的每个阶段边界拍摄快照，
+统计各阶段的峰值/驻留内存、按对象类型的占用以及每帧字节数
+"""
+
+import sys
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Tuple
+
+
+@dataclass
+class StageMemory:
+    """单个阶段的内存统计"""
+    name: str
+    retained_bytes: int = 0  # 阶段结束后仍驻留的新增内存
+    peak_bytes: int = 0  # 阶段内相对阶段开始时的峰值增量
+    # 新增内存最多的分配位置 [(位置, 字节数, 块数), ...]
+    top_allocations: List[Tuple[str, int, int]] = field(default_factory=list)
+
+
+@dataclass
+class MemoryReport:
+    """内存分析报告"""
+    stages: List[StageMemory] = field(default_factory=list)
+    # 按对象类型统计的占用（类型名 -> 字节数）
+    object_sizes: Dict[str, int] = field(default_factory=dict)
+    frame_count: int = 0
+    total_bytes: int = 0  # 原始数据字节数
+
+    def get_retained_total(self) -> int:
+        """获取所有阶段驻留内存之和"""
+        return sum(stage.retained_bytes for stage in self.stages)
+
+    def get_peak_max(self) -> int:
+        """获取各阶段峰值中的最大值"""
+        return max((stage.peak_bytes for stage in self.stages), default=0)
+
+    def get_bytes_per_frame(self) -> float:
+        """获取每帧平均驻留字节数"""
+        if self.frame_count == 0:
+            return 0.0
+        return self.get_retained_total() / self.frame_count
+
+    def get_bytes_per_input_byte(self) -> float:
+        """获取每个原始字节对应的驻留字节数（内存放大倍数）"""
+        if self.total_bytes == 0:
+            return 0.0
+        return self.get_retained_total() / self.total_bytes
+
+    def to_text(self) -> str:
+        """生成文本报告"""
+        lines = []
+        lines.append("=" * 80)
+        lines.append("  内存分析报告")
+        lines.append("=" * 80)
+        lines.append(f"  帧数: {self.frame_count}    原始数据: {format_size(self.total_bytes)}")
+        lines.append("")
+
+        lines.append("-" * 80)
+        lines.append("  各阶段内存")
+        lines.append("-" * 80)
+        lines.append(f"  {'阶段':<20s}{'峰值':>16s}{'驻留':>16s}")
+        for stage in self.stages:
+            lines.append(f"  {stage.name:<20s}{format_size(stage.peak_bytes):>16s}"
+                         f"{format_size(stage.retained_bytes):>16s}")
+        lines.append("")
+
+        if self.object_sizes:
+            lines.append("-" * 80)
+            lines.append("  按对象类型")
+            lines.append("-" * 80)
+            for name, size in sorted(self.object_sizes.items(), key=lambda x: -x[1]):
+                lines.append(f"  {name:<30s}{format_size(size):>16s}")
+            lines.append("")
+
+        lines.append("-" * 80)
+        lines.append("  容量估算")
+        lines.append("-" * 80)
+        lines.append(f"  驻留总计: {format_size(self.get_retained_total())}")
+        lines.append(f"  最大峰值: {format_size(self.get_peak_max())}")
+        lines.append(f"  每帧字节数: {self.get_bytes_per_frame():.1f} B/帧")
+        lines.append(f"  内存放大倍数: {self.get_bytes_per_input_byte():.1f} x")
+        lines.append("")
+
+        for stage in self.stages:
+            if not stage.top_allocations:
+                continue
+            lines.append("-" * 80)
+            lines.append(f"  [{stage.name}] 主要分配位置")
+            lines.append("-" * 80)
+            for location, size, count in stage.top_allocations:
+                lines.append(f"  {format_size(size):>12s} {count:>8d} 块  {location}")
+            lines.append("")
+
+        lines.append("=" * 80)
+        return '\n'.join(lines)
+
+
+class MemoryProfiler:
+    """内存分析器"""
+
+    def __init__(self, top_n: int = 5, traceback_frames: int = 1):
+        """
+        初始化
+
+        Args:
+            top_n: 每个阶段记录的主要分配位置数量
+            traceback_frames: tracemalloc保存的调用栈深度
+        """
+        self.top_n = top_n
+        self.traceback_frames = traceback_frames
+        self.report = MemoryReport()
+        self._started_here = False
+
+    def start(self):
+        """开始跟踪内存分配"""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.traceback_frames)
+            self._started_here = True
+        self.report = MemoryReport()
+
+    def stop(self):
+        """停止跟踪（仅停止由本分析器启动的跟踪）"""
+        if self._started_here and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self._started_here = False
+
+    def is_running(self) -> bool:
+        """是否正在跟踪"""
+        return tracemalloc.is_tracing()
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        统计一个流水线阶段的内存
+
+        用法:
+            with profiler.stage("帧定位"):
+                frames = parser.find_frames(data)
+        """
+        if not tracemalloc.is_tracing():
+            yield
+            return
+
+        before = tracemalloc.take_snapshot()
+        base_current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        try:
+            yield
+        finally:
+            current, peak = tracemalloc.get_traced_memory()
+            after = tracemalloc.take_snapshot()
+            self.report.stages.append(StageMemory(
+                name=name,
+                retained_bytes=max(0, current - base_current),
+                peak_bytes=max(0, peak - base_current),
+                top_allocations=self._top_allocations(before, after)
+            ))
+
+    def _top_allocations(self, before, after) -> List[Tuple[str, int, int]]:
+        """对比两次快照，获取新增内存最多的分配位置"""
+        filters = [
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ]
+        before = before.filter_traces(filters)
+        after = after.filter_traces(filters)
+
+        top = []
+        for diff in after.compare_to(before, 'lineno'):
+            if diff.size_diff <= 0:
+                continue
+            frame = diff.traceback[0]
+            top.append((f"{frame.filename}:{frame.lineno}", diff.size_diff, diff.count_diff))
+            if len(top) >= self.top_n:
+                break
+        return top
+
+    def measure_objects(self, **objects: Any):
+        """
+        按对象类型统计占用
+
+        Args:
+            objects: 名称 -> 对象，如 输入文本=hex_string
+        """
+        for name, obj in objects.items():
+            self.report.object_sizes[name] = (
+                self.report.object_sizes.get(name, 0) + sys.getsizeof(obj)
+            )
+
+    def measure_result(self, result):
+        """
+        统计解析结果中各类对象的占用
+
+        Args:
+            result: ParseResult 解析结果
+        """
+        sizes = self.report.object_sizes
+        frame_objects = 0
+        raw_bytes = 0
+        field_dicts = 0
+        field_values = 0
+
+        for frame in result.frames:
+            frame_objects += sys.getsizeof(frame) + sys.getsizeof(frame.__dict__)
+            raw_bytes += sys.getsizeof(frame.raw_data)
+            field_dicts += sys.getsizeof(frame.fields) + sys.getsizeof(frame.field_types)
+            for value in frame.fields.values():
+                field_values += sys.getsizeof(value)
+
+        sizes['帧对象(DataFrame)'] = sizes.get('帧对象(DataFrame)', 0) + frame_objects
+        sizes['帧原始数据(bytes)'] = sizes.get('帧原始数据(bytes)', 0) + raw_bytes
+        sizes['字段字典(dict)'] = sizes.get('字段字典(dict)', 0) + field_dicts
+        sizes['字段值'] = sizes.get('字段值', 0) + field_values
+        sizes['帧列表(list)'] = sizes.get('帧列表(list)', 0) + sys.getsizeof(result.frames)
+        if result.gaps is not None:
+            sizes['间隙索引(array)'] = sizes.get('间隙索引(array)', 0) + result.gaps.nbytes
+
+        self.report.frame_count = result.get_total_frames()
+        self.report.total_bytes = result.total_bytes
+
+    def get_report(self) -> MemoryReport:
+        """获取分析报告"""
+        return self.report
+
+
+def format_size(size: float) -> str:
+    """格式化字节数"""
+    for unit in ('B', 'KB', 'MB'):
+        if abs(size) < 1024:
+            return f"{size:.1f} {unit}" if unit != 'B' else f"{int(size)} B"
+        size /= 1024
+    return f"{size:.1f} GB"
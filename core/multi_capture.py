@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+"""
+多路采集模块
+同时采集多个通道，每个通道独立的协议配置和流式解析器，
+按到达时间戳用k路堆归并合并为统一的时间线
+"""
+
+import heapq
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, List, Optional
+
+from models import ProtocolConfig, DataFrame
+from core.serial_capture import SerialCapture, CaptureStats
+
+
+@dataclass
+class CaptureChannel:
+    """采集通道"""
+    name: str
+    source: object  # 采集源（SerialCapture、NetworkSource等）
+    # 已取出但尚未到达合并水位线的帧（按时间戳有序）
+    pending: Deque[DataFrame] = field(default_factory=deque)
+    # 最近的帧（有上限，用于查看合并时间线）
+    recent: Deque[DataFrame] = field(default_factory=deque)
+    # 待取帧超过上限时丢弃的帧数
+    frames_dropped: int = 0
+
+
+def _timestamp_key(frame: DataFrame) -> float:
+    return frame.timestamp or 0.0
+
+
+class MultiCaptureSession:
+    """多路采集会话"""
+
+    def __init__(self, max_frames_per_channel: int = 100000, reorder_delay: float = 0.2):
+        """
+        初始化
+
+        Args:
+            max_frames_per_channel: 每个通道保留的最近帧数和待取帧数上限
+            reorder_delay: 合并等待时间（秒），到达时间早于 当前时间-reorder_delay
+                的帧才输出，用于吸收各通道解析线程之间的调度延迟
+        """
+        self.max_frames_per_channel = max_frames_per_channel
+        self.reorder_delay = reorder_delay
+        self.channels: List[CaptureChannel] = []
+        self.error_message = ""
+
+    def add_channel(self, name: str, source) -> CaptureChannel:
+        """
+        添加通道
+
+        Args:
+            name: 通道名称（写入帧的channel字段）
+            source: 采集源，需提供 start/stop/is_running/get_frames/get_stats
+
+        Returns:
+            通道对象
+        """
+        if any(channel.name == name for channel in self.channels):
+            raise ValueError(f"通道名称重复: {name}")
+
+        channel = CaptureChannel(
+            name=name,
+            source=source,
+            recent=deque(maxlen=self.max_frames_per_channel)
+        )
+        self.channels.append(channel)
+        return channel
+
+    def add_serial_channel(self, name: str, port: str, baudrate: int,
+                           protocol: ProtocolConfig, **options) -> CaptureChannel:
+        """
+        添加串口通道
+
+        Args:
+            name: 通道名称
+            port: 串口设备名
+            baudrate: 波特率
+            protocol: 该通道的协议配置
+            options: 传递给 SerialCapture 的其他参数
+
+        Returns:
+            通道对象
+        """
+        options.setdefault('max_queued_frames', self.max_frames_per_channel)
+        return self.add_channel(name, SerialCapture(port, baudrate, protocol, **options))
+
+    def start(self):
+        """启动所有通道，任一通道启动失败时停止已启动的通道"""
+        self.error_message = ""
+        started = []
+        try:
+            for channel in self.channels:
+                channel.source.start()
+                started.append(channel)
+        except Exception as e:
+            for channel in started:
+                channel.source.stop()
+            raise RuntimeError(f"通道 {channel.name} 启动失败: {e}") from e
+
+    def stop(self):
+        """停止所有通道"""
+        for channel in self.channels:
+            channel.source.stop()
+
+    def is_running(self) -> bool:
+        """是否仍有通道在采集"""
+        running = any(channel.source.is_running() for channel in self.channels)
+        if not running:
+            errors = [f"{c.name}: {c.source.error_message}" for c in self.channels
+                      if getattr(c.source, 'error_message', '')]
+            self.error_message = '\n'.join(errors)
+        return running
+
+    def get_frames(self, max_frames: int = 10000) -> List[DataFrame]:
+        """
+        取走各通道新到达的帧，按时间戳合并输出
+
+        每个通道各自非阻塞地取帧，慢通道不会阻塞其他通道；
+        采集停止后不再等待水位线，直接输出全部剩余帧。
+
+        Args:
+            max_frames: 每个通道本次最多取走的帧数
+
+        Returns:
+            按到达时间排序的帧列表
+        """
+        running = any(channel.source.is_running() for channel in self.channels)
+        watermark = time.time() - self.reorder_delay if running else float('inf')
+
+        ready_lists = []
+        for channel in self.channels:
+            for frame in channel.source.get_frames(max_frames):
+                frame.channel = channel.name
+                if frame.timestamp is None:
+                    frame.timestamp = time.time()
+                channel.pending.append(frame)
+
+            # 待取帧超过上限时丢弃最旧的帧，保证每个通道内存有界
+            while len(channel.pending) > self.max_frames_per_channel:
+                channel.pending.popleft()
+                channel.frames_dropped += 1
+
+            ready = []
+            while channel.pending and _timestamp_key(channel.pending[0]) <= watermark:
+                ready.append(channel.pending.popleft())
+            if ready:
+                channel.recent.extend(ready)
+                ready_lists.append(ready)
+
+        return list(heapq.merge(*ready_lists, key=_timestamp_key))
+
+    def get_timeline(self, start_time: Optional[float] = None,
+                     end_time: Optional[float] = None) -> List[DataFrame]:
+        """
+        获取各通道最近帧的合并时间线
+
+        Args:
+            start_time: 起始时间戳（含），None表示不限
+            end_time: 结束时间戳（不含），None表示不限
+
+        Returns:
+            按时间排序的帧列表
+        """
+        merged = heapq.merge(*(channel.recent for channel in self.channels), key=_timestamp_key)
+        return [
+            frame for frame in merged
+            if (start_time is None or frame.timestamp >= start_time)
+            and (end_time is None or frame.timestamp < end_time)
+        ]
+
+    def get_channel_stats(self) -> Dict[str, CaptureStats]:
+        """获取各通道的采集统计（丢弃帧数包括合并时因待取帧超限丢弃的帧）"""
+        channel_stats = {}
+        for channel in self.channels:
+            stats = channel.source.get_stats()
+            stats.frames_dropped += channel.frames_dropped
+            channel_stats[channel.name] = stats
+        return channel_stats
+
+    def get_stats(self) -> CaptureStats:
+        """获取所有通道的汇总统计"""
+        total = CaptureStats()
+        for stats in self.get_channel_stats().values():
+            total.bytes_received += stats.bytes_received
+            total.bytes_dropped += stats.bytes_dropped
+            total.bytes_discarded += stats.bytes_discarded
+            total.frames += stats.frames
+            total.frames_dropped += stats.frames_dropped
+            total.buffered_bytes += stats.buffered_bytes
+            total.elapsed = max(total.elapsed, stats.elapsed)
+            total.throughput += stats.throughput
+        return total
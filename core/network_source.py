@@ -0,0 +1,396 @@
+# -*- coding: utf-8 -*-
+"""
+网络采集模块
+基于asyncio从串口服务器（串口转以太网网关）接收数据，支持TCP客户端、
+TCP服务端和UDP，一个事件循环处理所有连接，每个连接独立保持分帧状态
+"""
+
+import asyncio
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from models import ProtocolConfig, DataFrame
+from core.stream_parser import StreamParser
+from core.decode_plan import DecodePlan
+from core.serial_capture import CaptureStats
+
+
+# URL协议 -> 连接模式
+ENDPOINT_SCHEMES = {
+    'tcp': 'tcp-client',
+    'tcp-listen': 'tcp-server',
+    'udp': 'udp',
+}
+
+
+@dataclass
+class Endpoint:
+    """网络端点"""
+    mode: str  # tcp-client / tcp-server / udp
+    host: str
+    port: int
+
+    def __str__(self) -> str:
+        scheme = {mode: scheme for scheme, mode in ENDPOINT_SCHEMES.items()}[self.mode]
+        return f"{scheme}://{self.host}:{self.port}"
+
+
+def parse_endpoint(url: str) -> Endpoint:
+    """
+    解析端点URL
+
+    Args:
+        url: tcp://host:port（连接网关）、tcp-listen://host:port（等待网关连接）
+             或 udp://host:port（监听UDP）
+
+    Returns:
+        端点对象
+
+    Raises:
+        ValueError: URL格式无效
+    """
+    parts = urlsplit(url.strip())
+    if parts.scheme not in ENDPOINT_SCHEMES:
+        raise ValueError(f"不支持的网络协议: {parts.scheme or url}（可用: tcp, tcp-listen, udp）")
+    if parts.port is None:
+        raise ValueError(f"缺少端口号: {url}")
+    return Endpoint(ENDPOINT_SCHEMES[parts.scheme], parts.hostname or '0.0.0.0', parts.port)
+
+
+@dataclass
+class ConnectionState:
+    """单个连接的分帧状态"""
+    name: str
+    parser: StreamParser
+    bytes_received: int = 0
+    last_activity: float = 0.0
+
+
+class _UdpProtocol(asyncio.DatagramProtocol):
+    """UDP数据报接收，每个远端地址独立分帧"""
+
+    def __init__(self, source: 'NetworkSource', endpoint: Endpoint):
+        self.source = source
+        self.endpoint = endpoint
+
+    def datagram_received(self, data: bytes, addr: Tuple):
+        name = f"udp:{addr[0]}:{addr[1]}"
+        state = self.source._get_udp_state(name)
+        if state:
+            # UDP没有流控，帧队列满时只能丢弃
+            self.source._feed_nowait(state, data)
+
+    def error_received(self, exc: Exception):
+        print(f"UDP接收错误({self.endpoint}): {exc}")
+
+
+class NetworkSource:
+    """网络采集源"""
+
+    def __init__(self, endpoints: List[Endpoint], protocol: ProtocolConfig,
+                 max_queued_frames: int = 100000,
+                 read_size: int = 64 * 1024,
+                 reconnect_interval: float = 2.0,
+                 max_connections: int = 1024):
+        """
+        初始化
+
+        Args:
+            endpoints: 端点列表
+            protocol: 协议配置，每个连接各自创建流式解析器
+            max_queued_frames: 等待取走的帧数上限，TCP连接在队列满时暂停读取（背压）
+            read_size: 单次读取的最大字节数
+            reconnect_interval: TCP客户端断线重连间隔（秒），0表示不重连
+            max_connections: 同时保持的最大连接数
+        """
+        self.endpoints = list(endpoints)
+        self.protocol = protocol
+        self.plan: Optional[DecodePlan] = None
+        self.read_size = read_size
+        self.reconnect_interval = reconnect_interval
+        self.max_connections = max_connections
+        self.frame_queue: "queue.Queue[DataFrame]" = queue.Queue(max_queued_frames)
+
+        self.connections: Dict[str, ConnectionState] = {}
+        # 监听端点实际绑定的地址（端口为0时由系统分配）
+        self.bound_addresses: List[Tuple[str, int]] = []
+        self.error_message = ""
+
+        self.bytes_received = 0
+        self.bytes_discarded = 0
+        self.frames = 0
+        self.frames_dropped = 0
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stop: Optional[asyncio.Event] = None
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+        self._running = threading.Event()
+        self._tasks = set()
+        self._start_time = 0.0
+        self._stop_time = 0.0
+
+    # ---------- 生命周期 ----------
+
+    def start(self):
+        """
+        在后台线程中启动事件循环
+
+        Raises:
+            OSError: 监听端点绑定失败
+        """
+        if self.is_running():
+            return
+
+        self._ready.clear()
+        self.error_message = ""
+        self._start_time = time.monotonic()
+        self._stop_time = 0.0
+        self._running.set()
+        self._thread = threading.Thread(target=self._thread_main, name="NetworkSource", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+
+        if self.error_message:
+            self._thread.join()
+            self._thread = None
+            raise OSError(self.error_message)
+
+    def stop(self):
+        """停止事件循环并关闭所有连接"""
+        if not self._thread:
+            return
+
+        if self._loop and self._stop:
+            self._loop.call_soon_threadsafe(self._stop.set)
+        self._thread.join()
+        self._thread = None
+        self._stop_time = time.monotonic()
+
+    def set_protocol(self, protocol: ProtocolConfig, plan: Optional[DecodePlan] = None):
+        """
+        采集过程中切换协议（已有连接的解析器和之后的新连接都使用新协议）
+
+        Args:
+            protocol: 新的协议配置
+            plan: 预先编译的解码计划
+        """
+        self.protocol = protocol
+        self.plan = plan
+        for state in list(self.connections.values()):
+            state.parser.set_protocol(protocol, plan)
+
+    def is_running(self) -> bool:
+        """是否正在采集"""
+        return self._running.is_set()
+
+    def _thread_main(self):
+        try:
+            asyncio.run(self.run())
+        finally:
+            self._running.clear()
+            self._ready.set()
+
+    async def run(self):
+        """
+        运行所有端点，直到调用stop()
+
+        也可以直接在调用方自己的事件循环中 await 本方法
+        """
+        self._loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        self.bound_addresses = []
+        servers = []
+        transports = []
+
+        try:
+            for endpoint in self.endpoints:
+                if endpoint.mode == 'tcp-server':
+                    server = await asyncio.start_server(
+                        self._handle_tcp, endpoint.host, endpoint.port, limit=self.read_size
+                    )
+                    servers.append(server)
+                    self.bound_addresses.append(server.sockets[0].getsockname()[:2])
+                elif endpoint.mode == 'udp':
+                    transport, _ = await self._loop.create_datagram_endpoint(
+                        lambda ep=endpoint: _UdpProtocol(self, ep),
+                        local_addr=(endpoint.host, endpoint.port)
+                    )
+                    transports.append(transport)
+                    self.bound_addresses.append(transport.get_extra_info('sockname')[:2])
+                else:
+                    self._spawn(self._run_tcp_client(endpoint))
+        except OSError as e:
+            self.error_message = f"网络端点启动失败: {e}"
+            self._stop.set()
+        finally:
+            self._ready.set()
+
+        try:
+            await self._stop.wait()
+        finally:
+            for server in servers:
+                server.close()
+            for transport in transports:
+                transport.close()
+            for task in list(self._tasks):
+                task.cancel()
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+            for server in servers:
+                await server.wait_closed()
+
+    def _spawn(self, coro):
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    # ---------- 连接处理 ----------
+
+    async def _run_tcp_client(self, endpoint: Endpoint):
+        """TCP客户端：连接网关，断线后按间隔重连"""
+        while not self._stop.is_set():
+            try:
+                reader, writer = await asyncio.open_connection(
+                    endpoint.host, endpoint.port, limit=self.read_size
+                )
+            except OSError as e:
+                print(f"连接 {endpoint} 失败: {e}")
+            else:
+                await self._serve_stream(reader, writer, f"tcp:{endpoint.host}:{endpoint.port}")
+
+            if self.reconnect_interval <= 0:
+                break
+            try:
+                await asyncio.wait_for(self._stop.wait(), self.reconnect_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _handle_tcp(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """TCP服务端：处理网关发起的连接"""
+        task = asyncio.current_task()
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        peer = writer.get_extra_info('peername') or ('?', 0)
+        await self._serve_stream(reader, writer, f"tcp:{peer[0]}:{peer[1]}")
+
+    async def _serve_stream(self, reader: asyncio.StreamReader,
+                            writer: asyncio.StreamWriter, name: str):
+        """读取一个TCP连接直到断开"""
+        state = self._open_connection(name)
+        if state is None:
+            writer.close()
+            return
+
+        try:
+            while True:
+                data = await reader.read(self.read_size)
+                if not data:
+                    break
+                # 帧队列满时在这里等待，不再读取套接字，由TCP流控把压力传回网关
+                await self._feed(state, data)
+        except (ConnectionError, OSError) as e:
+            print(f"连接 {name} 异常断开: {e}")
+        finally:
+            self._close_connection(name)
+            writer.close()
+
+    def _open_connection(self, name: str) -> Optional[ConnectionState]:
+        if len(self.connections) >= self.max_connections:
+            print(f"连接数已达上限，拒绝 {name}")
+            return None
+        state = ConnectionState(name, StreamParser(self.protocol, plan=self.plan),
+                                last_activity=time.monotonic())
+        self.connections[name] = state
+        return state
+
+    def _close_connection(self, name: str):
+        self.connections.pop(name, None)
+
+    def _get_udp_state(self, name: str) -> Optional[ConnectionState]:
+        state = self.connections.get(name)
+        if state is None:
+            if len(self.connections) >= self.max_connections:
+                # UDP没有断开事件，连接数满时淘汰最久未活动的UDP来源
+                idle = [s for s in self.connections.values() if s.name.startswith('udp:')]
+                if idle:
+                    self._close_connection(min(idle, key=lambda s: s.last_activity).name)
+            state = self._open_connection(name)
+        return state
+
+    # ---------- 分帧与背压 ----------
+
+    def _parse(self, state: ConnectionState, data: bytes) -> List[DataFrame]:
+        state.bytes_received += len(data)
+        state.last_activity = time.monotonic()
+        self.bytes_received += len(data)
+
+        discarded = state.parser.discarded_bytes
+        frames = state.parser.feed(data)
+        self.bytes_discarded += state.parser.discarded_bytes - discarded
+        self.frames += len(frames)
+        arrival_time = time.time()
+        for frame in frames:
+            frame.channel = state.name
+            frame.timestamp = arrival_time
+        return frames
+
+    async def _feed(self, state: ConnectionState, data: bytes):
+        for frame in self._parse(state, data):
+            while True:
+                try:
+                    self.frame_queue.put_nowait(frame)
+                    break
+                except queue.Full:
+                    if self._stop.is_set():
+                        self.frames_dropped += 1
+                        break
+                    await asyncio.sleep(0.01)
+
+    def _feed_nowait(self, state: ConnectionState, data: bytes):
+        for frame in self._parse(state, data):
+            try:
+                self.frame_queue.put_nowait(frame)
+            except queue.Full:
+                self.frames_dropped += 1
+
+    # ---------- 取帧与统计 ----------
+
+    def get_frames(self, max_frames: int = 10000) -> List[DataFrame]:
+        """
+        取走已识别的帧（供GUI定时调用）
+
+        Args:
+            max_frames: 本次最多取走的帧数
+
+        Returns:
+            帧列表
+        """
+        frames = []
+        while len(frames) < max_frames:
+            try:
+                frames.append(self.frame_queue.get_nowait())
+            except queue.Empty:
+                break
+        return frames
+
+    def get_stats(self) -> CaptureStats:
+        """获取采集统计"""
+        if self._start_time:
+            elapsed = (self._stop_time or time.monotonic()) - self._start_time
+        else:
+            elapsed = 0.0
+
+        return CaptureStats(
+            bytes_received=self.bytes_received,
+            bytes_discarded=self.bytes_discarded,
+            frames=self.frames,
+            frames_dropped=self.frames_dropped,
+            buffered_bytes=sum(s.parser.pending_bytes for s in list(self.connections.values())),
+            elapsed=elapsed,
+            throughput=self.bytes_received / elapsed if elapsed > 0 else 0.0
+        )
@@ -6,25 +6,46 @@
 
 import re
 import struct
-from typing import List, Optional
+from contextlib import nullcontext
+from typing import List, Optional, Tuple
 from models import (
-    ProtocolConfig, DataFrame, ParseResult,
+    ProtocolConfig, DataFrame, ParseResult, FramingStats, GapIndex,
     FieldType, ChecksumType
 )
 from core.checksum import ChecksumValidator
+from core.decode_plan import DecodePlan
+
+
+# 重同步分帧时帧的最大长度（帧长无法由字段定义确定时，只在该范围内查找帧尾）
+RESYNC_MAX_FRAME_LENGTH = 4096
 
 
 class DataParser:
     """数据解析器"""
     
-    def __init__(self, protocol: ProtocolConfig):
+    def __init__(self, protocol: ProtocolConfig, plan: Optional[DecodePlan] = None,
+                 resync: bool = False, max_frame_length: int = RESYNC_MAX_FRAME_LENGTH):
         """
         初始化解析器
         
         Args:
             protocol: 协议配置
+            plan: 预先编译的解码计划（如协议注册表中缓存的），为None时首次解析时编译
+            resync: 是否使用重同步分帧（只接受帧长和校验都正确的帧，
+                否则从下一个帧头重新同步，并记录分帧统计）
+            max_frame_length: 重同步分帧时帧的最大长度
         """
         self.protocol = protocol
+        self._plan = plan
+        self.resync = resync
+        self.max_frame_length = max_frame_length
+    
+    @property
+    def plan(self) -> DecodePlan:
+        """协议解码计划"""
+        if self._plan is None:
+            self._plan = DecodePlan.compile(self.protocol)
+        return self._plan
     
     @staticmethod
     def parse_hex_string(hex_string: str) -> bytes:
@@ -65,26 +86,38 @@ class DataParser:
             帧位置列表 [(start, end), ...]
         """
         frames = []
-        header = self.protocol.get_header_bytes()
-        tail = self.protocol.get_tail_bytes()
+        header = self.plan.header
+        tail = self.plan.tail
+        
+        # 固定字节直接用 bytes.find，包含通配/掩码字节时先查找固定字节再校验掩码
+        header_literal = header.literal
+        tail_literal = tail.literal
+        header_length = header.length
+        tail_length = tail.length
         
         pos = 0
         while pos < len(data):
             # 查找帧头
-            header_pos = data.find(header, pos)
+            if header_literal is not None:
+                header_pos = data.find(header_literal, pos)
+            else:
+                header_pos = header.find(data, pos)
             if header_pos == -1:
                 break
             
             # 从帧头后查找帧尾
-            search_start = header_pos + len(header)
-            tail_pos = data.find(tail, search_start)
+            search_start = header_pos + header_length
+            if tail_literal is not None:
+                tail_pos = data.find(tail_literal, search_start)
+            else:
+                tail_pos = tail.find(data, search_start)
             
             if tail_pos == -1:
                 # 没有找到帧尾，可能是不完整的帧
                 break
             
             # 记录帧的位置（包括帧头和帧尾）
-            frame_end = tail_pos + len(tail)
+            frame_end = tail_pos + tail_length
             frames.append((header_pos, frame_end))
             
             # 继续从当前帧尾后搜索
@@ -92,6 +125,89 @@ class DataParser:
         
         return frames
     
+    def find_frames_resync(self, data: bytes, final: bool = True,
+                           in_sync: bool = True) -> Tuple[List[tuple[int, int]], FramingStats]:
+        """
+        重同步分帧：帧头位置的候选帧只有帧长和校验都正确时才接受，
+        否则放弃该帧头，从它后面的下一个帧头重新尝试。
+        
+        帧长能由字段定义（定长字段和长度字段）确定时直接检查该位置的帧尾，
+        否则在 max_frame_length 范围内查找第一个帧尾。每个帧头最多检查一个
+        不超过 max_frame_length 的候选帧，总工作量与数据长度成线性关系。
+        
+        Args:
+            data: 原始字节数据
+            final: 数据是否已经完整；为False（流式输入）时遇到末尾未收完的帧即停止，
+                统计中的 scanned_bytes 为下次需要从哪里继续
+            in_sync: 开始时是否处于同步状态（流式输入时为上一段数据统计中的 in_sync，
+                失步状态跨数据块延续时不重复计入重同步次数）
+            
+        Returns:
+            (帧位置列表 [(start, end), ...], 分帧统计)
+        """
+        plan = self.plan
+        header = plan.header
+        tail = plan.tail
+        checksum_config = self.protocol.checksum_config
+        has_checksum = checksum_config.checksum_type != ChecksumType.NONE
+        min_length = header.length + plan.trailer_length
+        data_length = len(data)
+        
+        frames = []
+        stats = FramingStats()
+        pos = 0
+        scan_end = data_length
+        while True:
+            start = header.find(data, pos)
+            if start == -1:
+                if not final:
+                    # 末尾可能是半个帧头
+                    scan_end = max(pos, data_length - header.length + 1)
+                break
+            
+            end = 0
+            frame_length = plan.frame_length(data, start)
+            if frame_length is None:
+                # 帧长不确定，在最大帧长范围内查找帧尾
+                window_end = start + self.max_frame_length
+                tail_pos = tail.find(data, start + header.length, window_end)
+                if tail_pos != -1:
+                    end = tail_pos + tail.length
+                elif not final and window_end > data_length:
+                    scan_end = start
+                    break
+            elif min_length <= frame_length <= self.max_frame_length:
+                if start + frame_length > data_length:
+                    if not final:
+                        scan_end = start
+                        break
+                elif tail.match_at(data, start + frame_length - tail.length):
+                    end = start + frame_length
+            
+            if end and has_checksum:
+                if not ChecksumValidator.validate_frame(
+                    data[start:end], checksum_config.checksum_type, checksum_config.start_offset,
+                    checksum_config.end_offset, checksum_config.checksum_length
+                )[0]:
+                    end = 0
+            
+            if end:
+                frames.append((start, end))
+                stats.framed_bytes += end - start
+                in_sync = True
+                pos = end
+            else:
+                # 放弃这个帧头，从下一个字节开始重新查找
+                stats.rejected_candidates += 1
+                if in_sync:
+                    stats.resync_events += 1
+                    in_sync = False
+                pos = start + 1
+        
+        stats.scanned_bytes = scan_end
+        stats.in_sync = in_sync
+        return frames, stats
+    
     def parse_field(self, data: bytes, field_def, parsed_fields: dict) -> any:
         """
         解析单个字段
@@ -171,50 +287,8 @@ class DataParser:
         Returns:
             字段字典 {字段名: 值}
         """
-        fields = {}
-        
-        # 跳过帧头
-        header_len = len(self.protocol.get_header_bytes())
-        tail_len = len(self.protocol.get_tail_bytes())
-        checksum_len = self.protocol.checksum_config.checksum_length
-        
-        # 数据部分（帧头后，到校验码或帧尾前）
-        if self.protocol.checksum_config.checksum_type != ChecksumType.NONE:
-            # 有校验码，数据在帧头后到校验码前
-            data_end = len(frame_data) - tail_len - checksum_len
-        else:
-            # 无校验码，数据在帧头后到帧尾前
-            data_end = len(frame_data) - tail_len
-        
-        data_part = frame_data[header_len:data_end]
-        
-        # 解析每个字段
-        offset = 0
-        for field_def in self.protocol.fields:
-            if offset >= len(data_part):
-                break
-            
-            # 确定字段长度
-            if field_def.byte_count == 0:
-                # 变长字段，从长度字段获取
-                if field_def.length_field and field_def.length_field in fields:
-                    field_len = fields[field_def.length_field]
-                else:
-                    # 取剩余所有数据
-                    field_len = len(data_part) - offset
-            else:
-                field_len = field_def.byte_count
-            
-            # 提取字段数据
-            field_data = data_part[offset:offset + field_len]
-            
-            # 解析字段
-            field_value = self.parse_field(field_data, field_def, fields)
-            fields[field_def.name] = field_value
-            
-            offset += field_len
-        
-        return fields
+        # 数据部分在帧头后到校验码（无校验时为帧尾）前，按解码计划逐字段解析
+        return self.plan.decode_fields(frame_data)
     
     def parse_single_frame(self, frame_data: bytes, 
                           frame_number: int,
@@ -239,15 +313,10 @@ class DataParser:
         
         try:
             # 解析字段
-            fields = self.parse_frame_fields(frame_data)
-            for name, value in fields.items():
-                # 找到对应的字段定义，获取类型
-                field_type = ""
-                for field_def in self.protocol.fields:
-                    if field_def.name == name:
-                        field_type = field_def.field_type.value
-                        break
-                frame.add_field(name, value, field_type)
+            plan = self.plan
+            field_types = plan.field_types
+            for name, value in plan.decode_fields(frame_data).items():
+                frame.add_field(name, value, field_types.get(name, ""))
             
             # 校验
             if self.protocol.checksum_config.checksum_type != ChecksumType.NONE:
@@ -265,52 +334,100 @@ class DataParser:
         
         return frame
     
-    def parse(self, hex_string: str) -> ParseResult:
+    def parse(self, hex_string: str, profiler=None) -> ParseResult:
         """
         解析十六进制字符串
         
         Args:
             hex_string: 输入的十六进制字符串
+            profiler: 内存分析器（MemoryProfiler），为None时不统计
             
         Returns:
             解析结果
         """
-        result = ParseResult()
+        return self.parse_with_data(hex_string, profiler)[0]
+    
+    def parse_with_data(self, hex_string: str, profiler=None) -> Tuple[ParseResult, Optional[bytes]]:
+        """
+        解析十六进制字符串，同时返回解码后的字节数据（供保存快照和捕获数据，避免再解码一次）
         
+        Args:
+            hex_string: 输入的十六进制字符串
+            profiler: 内存分析器（MemoryProfiler），为None时不统计
+            
+        Returns:
+            (解析结果, 字节数据)，数据格式错误时字节数据为None
+        """
         try:
             # 转换为字节数据
-            data = self.parse_hex_string(hex_string)
+            with self._stage(profiler, "十六进制解码"):
+                data = self.parse_hex_string(hex_string)
+        except ValueError as e:
+            # 数据格式错误
+            return self._error_result(f"数据格式错误: {str(e)}"), None
+        
+        result = self.parse_bytes(data, profiler)
+        if profiler:
+            profiler.measure_objects(**{'输入文本(str)': hex_string})
+        return result, data
+    
+    def parse_bytes(self, data: bytes, profiler=None) -> ParseResult:
+        """
+        解析字节数据（如二进制捕获文件）
+        
+        Args:
+            data: 原始字节数据
+            profiler: 内存分析器（MemoryProfiler），为None时不统计
+            
+        Returns:
+            解析结果
+        """
+        result = ParseResult()
+        
+        try:
             result.total_bytes = len(data)
             
             # 查找所有帧
-            frame_positions = self.find_frames(data)
+            with self._stage(profiler, "帧定位"):
+                if self.resync:
+                    frame_positions, result.framing_stats = self.find_frames_resync(data)
+                else:
+                    frame_positions = self.find_frames(data)
+                # 帧之间未组成帧的字节区间（只记录位置，不复制数据）
+                result.gaps = GapIndex.from_positions(frame_positions, len(data), data)
             
             # 解析每一帧
-            for i, (start, end) in enumerate(frame_positions, 1):
-                frame_data = data[start:end]
-                frame = self.parse_single_frame(frame_data, i, start)
-                result.add_frame(frame)
-        
-        except ValueError as e:
-            # 数据格式错误
-            error_frame = DataFrame(
-                frame_number=0,
-                start_position=0,
-                end_position=0,
-                raw_data=b''
-            )
-            error_frame.set_error(f"数据格式错误: {str(e)}")
-            result.add_frame(error_frame)
+            with self._stage(profiler, "字段解析"):
+                for i, (start, end) in enumerate(frame_positions, 1):
+                    frame_data = data[start:end]
+                    frame = self.parse_single_frame(frame_data, i, start)
+                    result.add_frame(frame)
+            
+            if profiler:
+                profiler.measure_objects(**{'原始数据(bytes)': data})
+                profiler.measure_result(result)
         
         except Exception as e:
             # 其他错误
-            error_frame = DataFrame(
-                frame_number=0,
-                start_position=0,
-                end_position=0,
-                raw_data=b''
-            )
-            error_frame.set_error(f"解析失败: {str(e)}")
-            result.add_frame(error_frame)
+            return self._error_result(f"解析失败: {str(e)}")
         
         return result
+    
+    @staticmethod
+    def _stage(profiler, name: str):
+        """内存分析阶段（未启用内存分析时为空操作）"""
+        return profiler.stage(name) if profiler else nullcontext()
+    
+    @staticmethod
+    def _error_result(message: str) -> ParseResult:
+        """生成只包含一个错误帧的解析结果"""
+        result = ParseResult()
+        error_frame = DataFrame(
+            frame_number=0,
+            start_position=0,
+            end_position=0,
+            raw_data=b''
+        )
+        error_frame.set_error(message)
+        result.add_frame(error_frame)
+        return result
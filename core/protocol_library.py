@@ -0,0 +1,276 @@
+# -*- coding: utf-8 -*-
+"""
+协议库模块
+扫描目录中的协议文件，按特征（帧头、帧尾、固定帧长、校验类型）建立索引，
+用捕获数据样本为候选协议打分并自动选出最匹配的协议。
+
+打分依据是样本中通过校验的帧所占比例（按帧数取置信下限，1/1 帧不会高于 950/1000 帧）
+乘以通过的帧覆盖的样本比例：帧头帧尾不在样本中出现的协议直接排除，
+剩余候选按特征分组，每个协议在样本上完整解析一遍（可用进程池并行）。
+"""
+
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from models import ProtocolConfig, ChecksumType
+from core.decode_plan import DecodePlan
+from core.frame_pattern import FramePattern
+from core.parser import DataParser
+from core.protocol_registry import ProtocolRegistry, get_protocol_registry
+
+
+# 打分时使用的样本长度（字节）
+DEFAULT_SAMPLE_SIZE = 64 * 1024
+
+# 既无校验又无固定帧长的协议无法验证帧是否正确，得分乘以该系数
+UNVERIFIED_WEIGHT = 0.5
+
+# 通过率置信下限使用的 z 值（95%）
+CONFIDENCE_Z = 1.96
+
+
+@dataclass(frozen=True)
+class ProtocolSignature:
+    """协议特征（协议库索引的键）"""
+    header: FramePattern
+    tail: FramePattern
+    fixed_length: Optional[int]  # 所有字段都是定长时的整帧长度，否则为None
+    checksum_type: str
+
+    @classmethod
+    def from_protocol(cls, protocol: ProtocolConfig, plan: DecodePlan) -> "ProtocolSignature":
+        """从协议配置和解码计划计算特征"""
+        fixed_length = None
+        if plan.fields and all(f.byte_count > 0 for f in plan.fields):
+            fixed_length = (len(plan.header) + sum(f.byte_count for f in plan.fields)
+                            + plan.trailer_length)
+        return cls(plan.header, plan.tail, fixed_length,
+                   protocol.checksum_config.checksum_type.value)
+
+    @property
+    def verifiable(self) -> bool:
+        """能否判断帧是否正确（有校验或固定帧长）"""
+        return self.checksum_type != ChecksumType.NONE.value or self.fixed_length is not None
+
+    def matches_sample(self, sample: bytes) -> bool:
+        """
+        样本中是否可能有该协议的帧
+
+        帧头和帧尾都要出现；有固定帧长时至少一个帧头后在对应位置出现帧尾。
+        """
+        header_pos = self.header.find(sample)
+        if header_pos == -1 or self.tail.find(sample, header_pos + len(self.header)) == -1:
+            return False
+        if self.fixed_length is None:
+            return True
+        tail_offset = self.fixed_length - len(self.tail)
+        while header_pos != -1:
+            if self.tail.match_at(sample, header_pos + tail_offset):
+                return True
+            header_pos = self.header.find(sample, header_pos + 1)
+        return False
+
+
+@dataclass
+class LibraryEntry:
+    """协议库中的一个协议文件"""
+    path: str
+    protocol_name: str
+    signature: ProtocolSignature
+
+
+@dataclass
+class ProtocolScore:
+    """协议在样本上的得分"""
+    path: str
+    protocol_name: str
+    total_frames: int = 0
+    passed_frames: int = 0  # 通过校验且帧长正确的帧数
+    covered_bytes: int = 0  # 通过的帧覆盖的字节数
+    sample_bytes: int = 0
+    verified: bool = True
+    score: float = 0.0
+    error: str = ""
+
+    @property
+    def pass_rate(self) -> float:
+        """通过校验的帧所占比例"""
+        return self.passed_frames / self.total_frames if self.total_frames else 0.0
+
+    @property
+    def pass_rate_lower_bound(self) -> float:
+        """通过率的 Wilson 置信下限（帧数越少越低）"""
+        if not self.total_frames:
+            return 0.0
+        n, p, z2 = self.total_frames, self.pass_rate, CONFIDENCE_Z * CONFIDENCE_Z
+        center = p + z2 / (2 * n)
+        margin = CONFIDENCE_Z * math.sqrt(p * (1 - p) / n + z2 / (4 * n * n))
+        return (center - margin) / (1 + z2 / n)
+
+    @property
+    def coverage(self) -> float:
+        """通过的帧覆盖的样本比例"""
+        return self.covered_bytes / self.sample_bytes if self.sample_bytes else 0.0
+
+    def describe(self) -> str:
+        """得分说明"""
+        if self.error:
+            return f"{self.protocol_name}: 解析失败 ({self.error})"
+        text = (f"{self.protocol_name}: 得分 {self.score:.2f}，通过 {self.passed_frames}/{self.total_frames} 帧，"
+                f"覆盖 {self.coverage:.0%}")
+        if not self.verified:
+            text += "（无校验）"
+        return text
+
+
+def _score_protocol(path: str, protocol_dict: dict, plan_dict: dict, fixed_length: Optional[int],
+                    verified: bool, sample: bytes) -> ProtocolScore:
+    """
+    在样本上解析并打分（进程池中执行，参数使用可序列化的字典）
+
+    Returns:
+        协议得分
+    """
+    protocol = ProtocolConfig.from_dict(protocol_dict)
+    score = ProtocolScore(path, protocol.protocol_name, sample_bytes=len(sample), verified=verified)
+    try:
+        result = DataParser(protocol, DecodePlan.from_dict(plan_dict)).parse_bytes(sample)
+    except Exception as e:
+        score.error = str(e)
+        return score
+
+    for frame in result.frames:
+        if frame.frame_number == 0:
+            # 解析失败时的错误帧
+            score.error = frame.error_message
+            return score
+        score.total_frames += 1
+        if frame.has_error or (fixed_length is not None and len(frame.raw_data) != fixed_length):
+            continue
+        score.passed_frames += 1
+        score.covered_bytes += len(frame.raw_data)
+
+    score.score = (score.pass_rate_lower_bound * score.coverage
+                   * (1.0 if verified else UNVERIFIED_WEIGHT))
+    return score
+
+
+class ProtocolLibrary:
+    """协议库"""
+
+    def __init__(self, directory: str, registry: Optional[ProtocolRegistry] = None):
+        """
+        初始化
+
+        Args:
+            directory: 协议文件目录（包括子目录）
+            registry: 加载协议使用的注册表，默认使用全局注册表
+        """
+        self.directory = directory
+        self.registry = registry or get_protocol_registry()
+        self.entries: List[LibraryEntry] = []
+        self.index: Dict[ProtocolSignature, List[LibraryEntry]] = {}
+
+    def scan(self) -> int:
+        """
+        扫描目录并重建索引（未变化的文件使用注册表缓存，不重新解析）
+
+        Returns:
+            协议文件数
+
+        Raises:
+            OSError: 目录不存在
+        """
+        if not os.path.isdir(self.directory):
+            raise FileNotFoundError(f"目录不存在: {self.directory}")
+
+        entries = []
+        for path in sorted(Path(self.directory).rglob('*.json')):
+            try:
+                protocol, plan = self.registry.load(str(path))
+            except Exception as e:
+                # 目录中可能有其他JSON文件
+                print(f"跳过协议文件 {path}: {e}")
+                continue
+            entries.append(LibraryEntry(str(path.resolve()), protocol.protocol_name,
+                                        ProtocolSignature.from_protocol(protocol, plan)))
+
+        self.entries = entries
+        self.index = {}
+        for entry in entries:
+            self.index.setdefault(entry.signature, []).append(entry)
+        return len(entries)
+
+    def candidates(self, sample: bytes) -> List[LibraryEntry]:
+        """
+        按索引筛选样本中可能出现的协议
+
+        Args:
+            sample: 捕获数据样本
+
+        Returns:
+            候选协议列表
+        """
+        result = []
+        for signature, entries in self.index.items():
+            if signature.matches_sample(sample):
+                result.extend(entries)
+        return result
+
+    def detect(self, data: bytes, workers: int = 0,
+               sample_size: int = DEFAULT_SAMPLE_SIZE) -> List[ProtocolScore]:
+        """
+        为候选协议打分
+
+        Args:
+            data: 捕获数据
+            workers: 并行打分的进程数，0或1表示在当前线程打分
+            sample_size: 使用数据开头多少字节打分，0表示全部
+
+        Returns:
+            按得分从高到低排列的候选协议得分
+        """
+        if not self.entries:
+            self.scan()
+        sample = bytes(data[:sample_size]) if sample_size > 0 else bytes(data)
+
+        jobs = []
+        for entry in self.candidates(sample):
+            try:
+                protocol, plan = self.registry.load(entry.path)
+            except Exception as e:
+                print(f"加载协议失败: {e}")
+                continue
+            jobs.append((entry.path, protocol.to_dict(), plan.to_dict(),
+                         entry.signature.fixed_length, entry.signature.verifiable, sample))
+
+        if workers > 1 and len(jobs) > 1:
+            with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as executor:
+                scores = list(executor.map(_score_protocol, *zip(*jobs)))
+        else:
+            scores = [_score_protocol(*job) for job in jobs]
+
+        scores.sort(key=lambda s: (s.score, s.coverage, s.passed_frames), reverse=True)
+        return scores
+
+    def best_match(self, data: bytes, workers: int = 0,
+                   sample_size: int = DEFAULT_SAMPLE_SIZE) -> Optional[ProtocolScore]:
+        """
+        自动选出最匹配的协议
+
+        Args:
+            data: 捕获数据
+            workers: 并行打分的进程数
+            sample_size: 使用数据开头多少字节打分
+
+        Returns:
+            得分最高的协议，没有任何帧通过时返回None
+        """
+        scores = self.detect(data, workers, sample_size)
+        if scores and scores[0].score > 0:
+            return scores[0]
+        return None
@@ -8,7 +8,8 @@ import json
 import os
 from typing import Optional
 from models import ProtocolConfig
-from core.protocol_converter import ProtocolConverter
+from core.frame_pattern import FramePattern
+from core.protocol_registry import get_protocol_registry
 
 
 class ProtocolManager:
@@ -40,6 +41,8 @@ class ProtocolManager:
         """
         从文件加载协议配置（自动检测并转换格式）
         
+        通过协议注册表加载：文件未变化时使用缓存的转换结果和解码计划。
+        
         Args:
             file_path: 文件路径
             
@@ -51,11 +54,7 @@ class ProtocolManager:
                 print(f"文件不存在: {file_path}")
                 return None
             
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            # 使用转换器自动检测并转换格式
-            protocol = ProtocolConverter.validate_and_convert(data)
+            protocol, _ = get_protocol_registry().load(file_path)
             return protocol
         except Exception as e:
             print(f"加载协议失败: {e}")
@@ -80,18 +79,18 @@ class ProtocolManager:
                 return False, "帧头不能为空"
             
             try:
-                int(protocol.frame_header, 16)
+                FramePattern(protocol.frame_header)
             except ValueError:
-                return False, "帧头不是有效的十六进制"
+                return False, "帧头不是有效的十六进制（可用 ?? 通配字节，且至少包含一个固定字节）"
             
             # 检查帧尾
             if not protocol.frame_tail:
                 return False, "帧尾不能为空"
             
             try:
-                int(protocol.frame_tail, 16)
+                FramePattern(protocol.frame_tail)
             except ValueError:
-                return False, "帧尾不是有效的十六进制"
+                return False, "帧尾不是有效的十六进制（可用 ?? 通配字节，且至少包含一个固定字节）"
             
             # 检查字段
             if not protocol.fields:
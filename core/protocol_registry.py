@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+"""
+协议注册表模块
+按文件路径缓存已加载的协议配置和编译好的解码计划：文件的修改时间和大小不变时
+直接使用内存中的结果；内容哈希相同的文件使用磁盘缓存，跳过格式转换和编译。
+注册表可以监视协议文件，文件变化时重新加载并通知回调，用于采集过程中热切换协议。
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from models import ProtocolConfig
+from core.decode_plan import DecodePlan
+from core.protocol_converter import ProtocolConverter
+
+
+# 磁盘缓存格式版本（解码计划格式变化时增加，旧缓存自动失效）
+CACHE_VERSION = 1
+
+# 磁盘缓存最多保存的协议数
+MAX_CACHED_PROTOCOLS = 64
+
+# 协议文件变化回调：callback(文件路径, 协议配置, 解码计划)
+ProtocolCallback = Callable[[str, ProtocolConfig, DecodePlan], None]
+
+
+@dataclass
+class _Entry:
+    """已加载的协议文件"""
+    stat_key: Tuple[int, int]  # (修改时间ns, 大小)
+    digest: str
+    protocol_dict: dict
+    plan: DecodePlan
+
+
+class ProtocolRegistry:
+    """协议注册表"""
+
+    def __init__(self, cache_file: Optional[str] = None):
+        """
+        初始化
+
+        Args:
+            cache_file: 磁盘缓存文件，默认 ~/.serialdatacompare/protocol_cache.json，
+                为空字符串时不使用磁盘缓存
+        """
+        if cache_file is None:
+            cache_file = str(Path.home() / '.serialdatacompare' / 'protocol_cache.json')
+        self.cache_file = cache_file
+        self._entries: Dict[str, _Entry] = {}
+        self._watchers: Dict[str, List[ProtocolCallback]] = {}
+        # 监视文件最近一次检查到的状态（加载失败时也记录，避免反复报错）
+        self._watched_stats: Dict[str, Optional[Tuple[int, int]]] = {}
+        self._disk_cache: Optional[Dict[str, dict]] = None
+
+    @staticmethod
+    def _stat_key(file_path: str) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _load_disk_cache(self) -> Dict[str, dict]:
+        if self._disk_cache is None:
+            self._disk_cache = {}
+            if self.cache_file and os.path.exists(self.cache_file):
+                try:
+                    with open(self.cache_file, 'r', encoding='utf-8') as f:
+                        data = json.load(f)
+                    if data.get('version') == CACHE_VERSION:
+                        self._disk_cache = data.get('protocols', {})
+                except Exception as e:
+                    print(f"读取协议缓存失败: {e}")
+        return self._disk_cache
+
+    def _save_disk_cache(self):
+        if not self.cache_file:
+            return
+        cache = self._load_disk_cache()
+        # 超出上限时删除最早加入的协议
+        while len(cache) > MAX_CACHED_PROTOCOLS:
+            del cache[next(iter(cache))]
+        try:
+            cache_dir = os.path.dirname(self.cache_file) or '.'
+            os.makedirs(cache_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'version': CACHE_VERSION, 'protocols': cache}, f, ensure_ascii=False)
+            os.replace(tmp_path, self.cache_file)
+        except Exception as e:
+            print(f"保存协议缓存失败: {e}")
+
+    def _get_entry(self, file_path: str) -> _Entry:
+        """获取协议文件的缓存项，文件变化时重新加载"""
+        path = os.path.abspath(file_path)
+        stat_key = self._stat_key(path)
+        if stat_key is None:
+            raise FileNotFoundError(f"文件不存在: {file_path}")
+
+        entry = self._entries.get(path)
+        if entry is not None and entry.stat_key == stat_key:
+            return entry
+
+        with open(path, 'rb') as f:
+            content = f.read()
+        digest = hashlib.sha256(content).hexdigest()
+        if entry is not None and entry.digest == digest:
+            # 只是修改时间变化
+            entry.stat_key = stat_key
+            return entry
+
+        cache = self._load_disk_cache()
+        cached = cache.get(digest)
+        if cached is not None:
+            protocol_dict = cached['protocol']
+            plan = DecodePlan.from_dict(cached['plan'])
+        else:
+            # 自动检测并转换格式
+            protocol = ProtocolConverter.validate_and_convert(json.loads(content.decode('utf-8')))
+            protocol_dict = protocol.to_dict()
+            plan = DecodePlan.compile(protocol)
+            cache[digest] = {'protocol': protocol_dict, 'plan': plan.to_dict()}
+            self._save_disk_cache()
+
+        entry = _Entry(stat_key, digest, protocol_dict, plan)
+        self._entries[path] = entry
+        return entry
+
+    def load(self, file_path: str) -> Tuple[ProtocolConfig, DecodePlan]:
+        """
+        加载协议文件
+
+        每次返回新的协议配置对象（调用方可以修改），解码计划在文件不变时共享。
+
+        Args:
+            file_path: 协议文件路径
+
+        Returns:
+            (协议配置, 解码计划)
+
+        Raises:
+            OSError: 文件不存在或读取失败
+            ValueError: 文件内容不是有效的协议配置
+        """
+        entry = self._get_entry(file_path)
+        return ProtocolConfig.from_dict(entry.protocol_dict), entry.plan
+
+    def watch(self, file_path: str, callback: ProtocolCallback):
+        """
+        监视协议文件（调用 poll 时检查变化）
+
+        Args:
+            file_path: 协议文件路径
+            callback: 文件变化并重新加载成功后调用
+        """
+        path = os.path.abspath(file_path)
+        if path not in self._watchers:
+            self._watched_stats[path] = self._stat_key(path)
+        callbacks = self._watchers.setdefault(path, [])
+        if callback not in callbacks:
+            callbacks.append(callback)
+
+    def unwatch(self, file_path: str, callback: Optional[ProtocolCallback] = None):
+        """
+        停止监视协议文件
+
+        Args:
+            file_path: 协议文件路径
+            callback: 要移除的回调，为None时移除全部
+        """
+        path = os.path.abspath(file_path)
+        callbacks = self._watchers.get(path, [])
+        if callback is not None and callback in callbacks:
+            callbacks.remove(callback)
+        if callback is None or not callbacks:
+            self._watchers.pop(path, None)
+            self._watched_stats.pop(path, None)
+
+    def poll(self) -> List[str]:
+        """
+        检查监视的协议文件，变化的文件重新加载后通知回调
+
+        Returns:
+            重新加载成功的文件路径列表
+        """
+        changed = []
+        for path, callbacks in list(self._watchers.items()):
+            stat_key = self._stat_key(path)
+            if stat_key is None or stat_key == self._watched_stats.get(path):
+                continue
+            self._watched_stats[path] = stat_key
+            try:
+                protocol, plan = self.load(path)
+            except Exception as e:
+                # 文件可能正在写入，下次变化时再试
+                print(f"重新加载协议失败: {e}")
+                continue
+            changed.append(path)
+            for callback in list(callbacks):
+                callback(path, protocol, plan)
+        return changed
+
+
+_registry: Optional[ProtocolRegistry] = None
+
+
+def get_protocol_registry() -> ProtocolRegistry:
+    """获取全局协议注册表"""
+    global _registry
+    if _registry is None:
+        _registry = ProtocolRegistry()
+    return _registry
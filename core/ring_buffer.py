@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""
+环形缓冲区模块
+单生产者/单消费者的固定容量字节环形缓冲区
+"""
+
+import threading
+
+
+class RingBuffer:
+    """
+    单生产者单消费者环形缓冲区（无锁）
+
+    生产者只修改写位置，消费者只修改读位置，两个位置都是单调递增的
+    计数器，取模后才映射到底层缓冲区。数据先拷贝、再发布写位置，
+    因此消费者读到的数据总是完整的，读写双方不需要加锁。
+    缓冲区满时新数据被丢弃并计入 dropped_bytes。
+    """
+
+    def __init__(self, capacity: int = 1 << 20):
+        """
+        初始化
+
+        Args:
+            capacity: 缓冲区容量（字节）
+        """
+        if capacity <= 0:
+            raise ValueError("缓冲区容量必须大于0")
+
+        self.capacity = capacity
+        self._buffer = bytearray(capacity)
+        self._view = memoryview(self._buffer)
+        self._write_pos = 0  # 仅由生产者修改
+        self._read_pos = 0   # 仅由消费者修改
+        self.dropped_bytes = 0  # 仅由生产者修改
+        # 数据到达通知（只用于唤醒消费者，不保护缓冲区）
+        self._data_event = threading.Event()
+
+    def __len__(self) -> int:
+        """当前可读字节数"""
+        return self._write_pos - self._read_pos
+
+    @property
+    def total_written(self) -> int:
+        """累计写入的字节数（不含丢弃的字节）"""
+        return self._write_pos
+
+    @property
+    def total_read(self) -> int:
+        """累计读出的字节数"""
+        return self._read_pos
+
+    def free_space(self) -> int:
+        """剩余可写空间"""
+        return self.capacity - (self._write_pos - self._read_pos)
+
+    def write(self, data) -> int:
+        """
+        写入数据（生产者调用）
+
+        Args:
+            data: 字节数据
+
+        Returns:
+            实际写入的字节数，剩余部分被丢弃
+        """
+        size = len(data)
+        if size == 0:
+            return 0
+
+        count = min(size, self.free_space())
+        if count < size:
+            self.dropped_bytes += size - count
+        if count == 0:
+            return 0
+
+        start = self._write_pos % self.capacity
+        first = min(count, self.capacity - start)
+        src = memoryview(data)
+        self._view[start:start + first] = src[:first]
+        if count > first:
+            self._view[0:count - first] = src[first:count]
+
+        # 数据拷贝完成后再发布写位置
+        self._write_pos += count
+        self._data_event.set()
+        return count
+
+    def read(self, max_bytes: int = -1) -> bytes:
+        """
+        读取数据（消费者调用）
+
+        Args:
+            max_bytes: 最多读取的字节数，-1表示读取全部可读数据
+
+        Returns:
+            读取到的字节数据，无数据时返回空字节串
+        """
+        available = self._write_pos - self._read_pos
+        if max_bytes >= 0:
+            available = min(available, max_bytes)
+        if available <= 0:
+            return b''
+
+        start = self._read_pos % self.capacity
+        first = min(available, self.capacity - start)
+        if available > first:
+            data = bytes(self._view[start:start + first]) + bytes(self._view[0:available - first])
+        else:
+            data = bytes(self._view[start:start + first])
+
+        self._read_pos += available
+        return data
+
+    def wait_for_data(self, timeout: float = None) -> bool:
+        """
+        等待数据到达（消费者调用）
+
+        Args:
+            timeout: 超时时间（秒）
+
+        Returns:
+            是否有可读数据
+        """
+        if len(self) > 0:
+            return True
+        self._data_event.clear()
+        # 清除事件后再检查一次，避免错过清除前刚写入的数据
+        if len(self) > 0:
+            return True
+        self._data_event.wait(timeout)
+        return len(self) > 0
+
+    def clear(self):
+        """丢弃所有可读数据（消费者调用）"""
+        self._read_pos = self._write_pos
@@ -0,0 +1,241 @@
+# -*- coding: utf-8 -*-
+"""
+串口采集模块
+专用读线程把串口数据写入环形缓冲区，解析线程从环形缓冲区流式分帧
+"""
+
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import List, Optional
+
+try:
+    import serial
+    from serial.tools import list_ports
+except ImportError:  # pyserial 为可选依赖，仅串口采集需要
+    serial = None
+    list_ports = None
+
+from models import ProtocolConfig, DataFrame
+from core.ring_buffer import RingBuffer
+from core.stream_parser import StreamParser
+from core.decode_plan import DecodePlan
+
+
+@dataclass
+class CaptureStats:
+    """采集统计信息"""
+    bytes_received: int = 0  # 从设备读到的字节数
+    bytes_dropped: int = 0  # 环形缓冲区满时丢弃的字节数
+    bytes_discarded: int = 0  # 分帧时丢弃的无效字节数
+    frames: int = 0  # 识别出的帧数
+    frames_dropped: int = 0  # 帧队列满时丢弃的帧数
+    buffered_bytes: int = 0  # 环形缓冲区中待处理的字节数
+    elapsed: float = 0.0  # 采集时长（秒）
+    throughput: float = 0.0  # 持续吞吐量（字节/秒）
+
+    def get_summary(self) -> str:
+        """获取统计摘要"""
+        return (f"接收: {self.bytes_received} 字节, "
+                f"吞吐: {self.throughput / 1024:.1f} KB/s, "
+                f"帧: {self.frames}, "
+                f"丢弃: {self.bytes_dropped} 字节/{self.frames_dropped} 帧")
+
+
+def is_serial_available() -> bool:
+    """pyserial是否可用"""
+    return serial is not None
+
+
+def list_serial_ports() -> List[str]:
+    """列出可用串口"""
+    if list_ports is None:
+        return []
+    return [port.device for port in list_ports.comports()]
+
+
+class SerialCapture:
+    """串口采集器"""
+
+    def __init__(self, port: str, baudrate: int = 115200,
+                 protocol: Optional[ProtocolConfig] = None,
+                 buffer_size: int = 1 << 20,
+                 max_queued_frames: int = 100000,
+                 read_timeout: float = 0.05,
+                 **serial_options):
+        """
+        初始化
+
+        Args:
+            port: 串口设备名（如 /dev/ttyUSB0、COM3）
+            baudrate: 波特率
+            protocol: 协议配置，为None时只采集不分帧
+            buffer_size: 环形缓冲区容量（字节）
+            max_queued_frames: 等待取走的帧数上限，超过后丢弃新帧
+            read_timeout: 串口读超时（秒）
+            serial_options: 传递给 serial.Serial 的其他参数（bytesize、parity等）
+        """
+        self.port = port
+        self.baudrate = baudrate
+        self.read_timeout = read_timeout
+        self.serial_options = serial_options
+        self.ring = RingBuffer(buffer_size)
+        self.stream_parser = StreamParser(protocol) if protocol else None
+        self.frame_queue: "queue.Queue[DataFrame]" = queue.Queue(max_queued_frames)
+        self.frames_dropped = 0
+
+        self._serial = None
+        self._running = threading.Event()
+        self._reader_thread: Optional[threading.Thread] = None
+        self._parser_thread: Optional[threading.Thread] = None
+        self._start_time = 0.0
+        self._stop_time = 0.0
+        self.error_message = ""
+
+    def start(self):
+        """
+        打开串口并启动读线程和解析线程
+
+        Raises:
+            RuntimeError: 未安装pyserial
+            serial.SerialException: 串口打开失败
+        """
+        if serial is None:
+            raise RuntimeError("串口采集需要安装 pyserial：pip install pyserial")
+        if self.is_running():
+            return
+
+        self._serial = serial.Serial(
+            self.port, self.baudrate, timeout=self.read_timeout, **self.serial_options
+        )
+        self._start_time = time.monotonic()
+        self._stop_time = 0.0
+        self._running.set()
+
+        self._reader_thread = threading.Thread(
+            target=self._read_loop, name=f"SerialReader-{self.port}", daemon=True
+        )
+        self._reader_thread.start()
+
+        if self.stream_parser:
+            self._parser_thread = threading.Thread(
+                target=self._parse_loop, name=f"SerialParser-{self.port}", daemon=True
+            )
+            self._parser_thread.start()
+
+    def stop(self):
+        """停止采集并关闭串口"""
+        if not self._running.is_set():
+            return
+
+        self._running.clear()
+        if self._reader_thread:
+            self._reader_thread.join()
+        if self._parser_thread:
+            self._parser_thread.join()
+        self._reader_thread = None
+        self._parser_thread = None
+
+        try:
+            self._serial.close()
+        except Exception as e:
+            print(f"关闭串口失败: {e}")
+        self._serial = None
+        self._stop_time = time.monotonic()
+
+    def set_protocol(self, protocol: ProtocolConfig, plan: Optional[DecodePlan] = None):
+        """
+        采集过程中切换协议（不停止采集，未完成的帧按新协议继续分帧）
+
+        Args:
+            protocol: 新的协议配置
+            plan: 预先编译的解码计划
+        """
+        if self.stream_parser:
+            self.stream_parser.set_protocol(protocol, plan)
+
+    def is_running(self) -> bool:
+        """是否正在采集"""
+        return self._running.is_set()
+
+    def _read_loop(self):
+        """读线程：尽快把操作系统缓冲区中的数据搬到环形缓冲区"""
+        ser = self._serial
+        while self._running.is_set():
+            try:
+                # 有数据时一次读完，无数据时阻塞等待至多read_timeout
+                data = ser.read(ser.in_waiting or 1)
+            except Exception as e:
+                self.error_message = f"读取串口失败: {e}"
+                print(self.error_message)
+                self._running.clear()
+                break
+            if data:
+                self.ring.write(data)
+
+    def _parse_loop(self):
+        """解析线程：从环形缓冲区取数据流式分帧"""
+        # 采集停止后把环形缓冲区中剩余的数据也处理完
+        while self._running.is_set() or len(self.ring) > 0:
+            if not self.ring.wait_for_data(self.read_timeout):
+                continue
+            data = self.ring.read()
+            arrival_time = time.time()
+            for frame in self.stream_parser.feed(data):
+                frame.channel = self.port
+                frame.timestamp = arrival_time
+                try:
+                    self.frame_queue.put_nowait(frame)
+                except queue.Full:
+                    self.frames_dropped += 1
+
+    def read_raw(self, max_bytes: int = -1) -> bytes:
+        """
+        读取原始数据（仅在未配置协议时使用）
+
+        Args:
+            max_bytes: 最多读取的字节数，-1表示全部
+
+        Returns:
+            字节数据
+        """
+        return self.ring.read(max_bytes)
+
+    def get_frames(self, max_frames: int = 10000) -> List[DataFrame]:
+        """
+        取走已识别的帧（供GUI定时调用）
+
+        Args:
+            max_frames: 本次最多取走的帧数
+
+        Returns:
+            帧列表
+        """
+        frames = []
+        while len(frames) < max_frames:
+            try:
+                frames.append(self.frame_queue.get_nowait())
+            except queue.Empty:
+                break
+        return frames
+
+    def get_stats(self) -> CaptureStats:
+        """获取采集统计"""
+        if self._start_time:
+            end = self._stop_time or time.monotonic()
+            elapsed = end - self._start_time
+        else:
+            elapsed = 0.0
+
+        received = self.ring.total_written + self.ring.dropped_bytes
+        return CaptureStats(
+            bytes_received=received,
+            bytes_dropped=self.ring.dropped_bytes,
+            bytes_discarded=self.stream_parser.discarded_bytes if self.stream_parser else 0,
+            frames=self.stream_parser.frame_count if self.stream_parser else 0,
+            frames_dropped=self.frames_dropped,
+            buffered_bytes=len(self.ring),
+            elapsed=elapsed,
+            throughput=received / elapsed if elapsed > 0 else 0.0
+        )
@@ -0,0 +1,441 @@
+# -*- coding: utf-8 -*-
+"""
+解析结果快照模块
+把解析结果保存为紧凑的二进制文件：原始捕获数据、帧位置表、校验结果数组和协议指纹。
+打开快照时只映射文件（mmap）并建立惰性视图，帧在被访问时才用快照中的协议解码字段，
+因此重新打开上百万帧的分析结果只需几毫秒；界面按页读取（read_frames）显示。
+打开时检查各段位置、数组长度和协议指纹，损坏或协议配置被改动的文件被拒绝。
+
+文件格式（小端序）：
+    8字节魔数 | uint32 版本 | uint32 元数据长度 | 元数据JSON | 按8字节对齐的各数组段
+元数据JSON 记录协议配置、协议指纹、字符串表和各数组段的位置。
+"""
+
+import array
+import hashlib
+import json
+import math
+import mmap
+import os
+import struct
+import sys
+from collections import OrderedDict
+from collections.abc import Sequence
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+from models import DataFrame, ParseResult, ProtocolConfig, GapIndex
+from core.parser import DataParser
+
+
+SNAPSHOT_MAGIC = b'SDCSNAP1'
+SNAPSHOT_VERSION = 1
+SNAPSHOT_EXTENSION = '.sdcsnap'
+
+_HEADER = struct.Struct('<8sII')
+
+# 帧标志位
+FLAG_CHECKSUM_VALID = 0x01
+FLAG_HAS_ERROR = 0x02
+FLAG_HAS_CHECKSUM = 0x04
+
+# 数组段：(段名, array类型码)
+_ARRAY_SECTIONS = (
+    ('frame_number', 'q'),
+    ('start_position', 'q'),
+    ('end_position', 'q'),
+    ('data_offset', 'q'),
+    ('expected_checksum', 'q'),
+    ('actual_checksum', 'q'),
+    ('timestamp', 'd'),
+    ('channel', 'I'),
+    ('error_message', 'I'),
+    ('flags', 'B'),
+)
+
+
+def protocol_fingerprint(protocol: ProtocolConfig) -> str:
+    """
+    计算协议指纹（协议配置规范化JSON的SHA-256）
+
+    Args:
+        protocol: 协议配置
+
+    Returns:
+        十六进制指纹字符串
+    """
+    text = json.dumps(protocol.to_dict(), ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def estimate_snapshot_size(result: ParseResult, data: Optional[bytes] = None) -> int:
+    """
+    估计快照文件大小（不含元数据）
+
+    Args:
+        result: 解析结果
+        data: 原始捕获数据
+
+    Returns:
+        字节数
+    """
+    frame_size = sum(array.array(typecode).itemsize for _, typecode in _ARRAY_SECTIONS)
+    data_size = len(data) if data is not None else sum(len(frame.raw_data) for frame in result.frames)
+    return data_size + frame_size * len(result.frames)
+
+
+def _frames_in_data(frames: Sequence[DataFrame], data: bytes) -> bool:
+    """帧的原始数据是否都与捕获数据中对应位置一致"""
+    size = len(data)
+    for frame in frames:
+        start, end = frame.start_position, frame.end_position
+        if end > size or end - start != len(frame.raw_data) or data[start:end] != frame.raw_data:
+            return False
+    return True
+
+
+def save_snapshot(file_path: str, result: ParseResult, protocol: ProtocolConfig,
+                  data: Optional[bytes] = None):
+    """
+    保存解析结果快照
+
+    提供原始捕获数据且各帧与之一致时保存完整捕获数据（包括帧之间的字节），
+    否则只保存各帧原始数据的拼接。
+
+    Args:
+        file_path: 快照文件路径
+        result: 解析结果
+        protocol: 解析使用的协议配置
+        data: 原始捕获数据
+
+    Raises:
+        OSError: 文件写入失败
+    """
+    frames = result.frames
+    count = len(frames)
+    if data is not None and _frames_in_data(frames, data):
+        offsets = array.array('q', (frame.start_position for frame in frames))
+    else:
+        data = b''.join(frame.raw_data for frame in frames)
+        offsets = array.array('q', [0] * count)
+        position = 0
+        for i, frame in enumerate(frames):
+            offsets[i] = position
+            position += len(frame.raw_data)
+
+    # 来源和错误信息大多重复，保存为字符串表下标
+    strings: Dict[str, int] = {'': 0}
+    channels = array.array('I', (strings.setdefault(f.channel, len(strings)) for f in frames))
+    errors = array.array('I', (strings.setdefault(f.error_message, len(strings)) for f in frames))
+
+    arrays = {
+        'frame_number': array.array('q', (f.frame_number for f in frames)),
+        'start_position': array.array('q', (f.start_position for f in frames)),
+        'end_position': array.array('q', (f.end_position for f in frames)),
+        'data_offset': offsets,
+        'expected_checksum': array.array('q', (f.expected_checksum or 0 for f in frames)),
+        'actual_checksum': array.array('q', (f.actual_checksum or 0 for f in frames)),
+        'timestamp': array.array('d', (math.nan if f.timestamp is None else f.timestamp for f in frames)),
+        'channel': channels,
+        'error_message': errors,
+        'flags': array.array('B', (
+            (FLAG_CHECKSUM_VALID if f.checksum_valid else 0)
+            | (FLAG_HAS_ERROR if f.has_error else 0)
+            | (FLAG_HAS_CHECKSUM if f.expected_checksum is not None else 0)
+            for f in frames
+        )),
+    }
+    if sys.byteorder != 'little':
+        for values in arrays.values():
+            values.byteswap()
+
+    # 先确定元数据长度，再计算各段偏移
+    sections: Dict[str, List[int]] = {}
+    metadata = {
+        'protocol': protocol.to_dict(),
+        'fingerprint': protocol_fingerprint(protocol),
+        'frame_count': count,
+        'total_bytes': result.total_bytes,
+        'strings': list(strings),
+        'sections': sections,
+    }
+    parts: List[Tuple[str, bytes]] = [('data', data)]
+    parts += [(name, arrays[name].tobytes()) for name, _ in _ARRAY_SECTIONS]
+
+    def layout(start: int) -> int:
+        offset = start
+        for name, payload in parts:
+            offset = (offset + 7) & ~7
+            sections[name] = [offset, len(payload)]
+            offset += len(payload)
+        return offset
+
+    # 段偏移写入元数据会改变元数据长度，迭代到稳定为止
+    metadata_length = 0
+    while True:
+        layout(_HEADER.size + metadata_length)
+        metadata_bytes = json.dumps(metadata, ensure_ascii=False).encode('utf-8')
+        if len(metadata_bytes) == metadata_length:
+            break
+        metadata_length = len(metadata_bytes)
+
+    with open(file_path, 'wb') as f:
+        f.write(_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(metadata_bytes)))
+        f.write(metadata_bytes)
+        for name, payload in parts:
+            f.write(b'\0' * (sections[name][0] - f.tell()))
+            f.write(payload)
+
+
+class SnapshotFrames(Sequence):
+    """快照中帧的惰性序列（按下标访问时才解码字段）"""
+
+    # 最近解码的帧缓存数量
+    CACHE_SIZE = 4096
+
+    def __init__(self, snapshot: "Snapshot"):
+        self.snapshot = snapshot
+        self._cache: "OrderedDict[int, DataFrame]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return self.snapshot.frame_count
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            return [self._get(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("帧下标超出范围")
+        return self._get(index)
+
+    def __iter__(self) -> Iterator[DataFrame]:
+        for i in range(len(self)):
+            yield self._get(i)
+
+    def _get(self, index: int) -> DataFrame:
+        frame = self._cache.get(index)
+        if frame is not None:
+            self._cache.move_to_end(index)
+            return frame
+        frame = self.snapshot.decode_frame(index)
+        self._cache[index] = frame
+        if len(self._cache) > self.CACHE_SIZE:
+            self._cache.popitem(last=False)
+        return frame
+
+
+class SnapshotResult(ParseResult):
+    """快照的解析结果视图（帧数统计直接使用标志数组，不解码帧）"""
+
+    def __init__(self, snapshot: "Snapshot"):
+        super().__init__(frames=SnapshotFrames(snapshot), total_bytes=snapshot.total_bytes)
+        self.snapshot = snapshot
+        if len(snapshot.data) == snapshot.total_bytes:
+            # 保存了完整捕获数据时由帧位置恢复未成帧间隙（间隙内容直接读取映射的数据）
+            arrays = snapshot.arrays
+            self.gaps = GapIndex.from_positions(
+                zip(arrays['start_position'], arrays['end_position']), snapshot.total_bytes, snapshot.data
+            )
+
+    def add_frame(self, frame: DataFrame):
+        raise TypeError("快照结果是只读的")
+
+    def get_error_frames(self) -> int:
+        return self.snapshot.error_count
+
+    def get_valid_frames(self) -> int:
+        return self.get_total_frames() - self.get_error_frames()
+
+
+class Snapshot:
+    """映射到内存的快照文件"""
+
+    def __init__(self, file_path: str):
+        """
+        打开快照（只映射文件，不读取帧）
+
+        Args:
+            file_path: 快照文件路径
+
+        Raises:
+            OSError: 文件读取失败
+            ValueError: 不是快照文件、版本不支持、文件损坏或协议指纹不一致
+        """
+        self.file_path = file_path
+        # 界面按页显示时作为来源文件名
+        self.capture_path = file_path
+        with open(file_path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < _HEADER.size:
+                raise ValueError("不是有效的快照文件")
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, metadata_length = _HEADER.unpack_from(self._mmap, 0)
+        if magic != SNAPSHOT_MAGIC:
+            self._mmap.close()
+            raise ValueError("不是有效的快照文件")
+        if version != SNAPSHOT_VERSION:
+            self._mmap.close()
+            raise ValueError(f"不支持的快照版本: {version}")
+
+        try:
+            metadata = json.loads(bytes(self._mmap[_HEADER.size:_HEADER.size + metadata_length]))
+            self.protocol = ProtocolConfig.from_dict(metadata['protocol'])
+            self.fingerprint: str = metadata['fingerprint']
+            self.frame_count: int = metadata['frame_count']
+            self.total_bytes: int = metadata['total_bytes']
+            self.strings: List[str] = metadata['strings']
+            sections = metadata['sections']
+            self._check_sections(sections, size)
+        except (KeyError, TypeError, ValueError) as e:
+            self._mmap.close()
+            raise ValueError(f"快照文件已损坏: {e}")
+        if protocol_fingerprint(self.protocol) != self.fingerprint:
+            self._mmap.close()
+            raise ValueError("快照的协议指纹与协议配置不一致（文件已损坏或被修改）")
+
+        view = memoryview(self._mmap)
+        offset, length = sections['data']
+        self.data = view[offset:offset + length]
+        self.arrays = {}
+        for name, typecode in _ARRAY_SECTIONS:
+            offset, length = sections[name]
+            section = view[offset:offset + length]
+            if sys.byteorder != 'little' and typecode != 'B':
+                # 大端序主机上复制并转换字节序
+                values = array.array(typecode, section.tobytes())
+                values.byteswap()
+                self.arrays[name] = memoryview(values)
+            else:
+                self.arrays[name] = section.cast(typecode)
+
+        self.parser = DataParser(self.protocol)
+        self._field_types = {fd.name: fd.field_type.value for fd in self.protocol.fields}
+        # 每帧一个字节，错误帧为1（首次查找错误帧时生成）
+        self._error_flags: Optional[bytes] = None
+
+    def _check_sections(self, sections: Dict[str, List[int]], size: int):
+        """检查各段都在文件范围内、数组段长度与帧数一致"""
+        for name in ['data'] + [name for name, _ in _ARRAY_SECTIONS]:
+            offset, length = sections[name]
+            if offset < 0 or length < 0 or offset + length > size:
+                raise ValueError(f"{name} 段超出文件范围")
+        for name, typecode in _ARRAY_SECTIONS:
+            if sections[name][1] != self.frame_count * array.array(typecode).itemsize:
+                raise ValueError(f"{name} 段长度与帧数不一致")
+
+    def __len__(self) -> int:
+        return self.frame_count
+
+    @property
+    def error_flags(self) -> bytes:
+        """每帧一个字节的错误标志（错误帧为1）"""
+        if self._error_flags is None:
+            table = bytes(1 if value & FLAG_HAS_ERROR else 0 for value in range(256))
+            self._error_flags = self.arrays['flags'].tobytes().translate(table)
+        return self._error_flags
+
+    @property
+    def error_count(self) -> int:
+        """错误帧数"""
+        return self.error_flags.count(1)
+
+    def next_error(self, frame_number: int = 0) -> Optional[int]:
+        """
+        下一个错误帧
+
+        Args:
+            frame_number: 从第 frame_number 帧之后开始查找（0表示从第一帧开始）
+
+        Returns:
+            错误帧在快照中的位置（从1开始），之后没有错误帧时返回None
+        """
+        index = self.error_flags.find(1, max(frame_number, 0))
+        return index + 1 if index >= 0 else None
+
+    def read_frames(self, frame_number: int, count: int = 1) -> List[DataFrame]:
+        """
+        解码从第 frame_number 帧开始的若干帧
+
+        Args:
+            frame_number: 第一帧在快照中的位置（从1开始）
+            count: 帧数（超出总帧数的部分忽略）
+
+        Returns:
+            帧列表
+        """
+        first = max(frame_number, 1) - 1
+        return [self.decode_frame(index) for index in range(first, min(first + count, self.frame_count))]
+
+    def decode_frame(self, index: int) -> DataFrame:
+        """
+        解码一帧（字段按快照中的协议解析，校验结果取自快照）
+
+        Args:
+            index: 帧下标
+
+        Returns:
+            数据帧
+        """
+        arrays = self.arrays
+        start = arrays['start_position'][index]
+        end = arrays['end_position'][index]
+        offset = arrays['data_offset'][index]
+        raw_data = bytes(self.data[offset:offset + end - start])
+        flags = arrays['flags'][index]
+        timestamp = arrays['timestamp'][index]
+
+        frame = DataFrame(
+            frame_number=arrays['frame_number'][index],
+            start_position=start,
+            end_position=end,
+            raw_data=raw_data,
+            channel=self.strings[arrays['channel'][index]],
+            timestamp=None if math.isnan(timestamp) else timestamp,
+            checksum_valid=bool(flags & FLAG_CHECKSUM_VALID),
+            has_error=bool(flags & FLAG_HAS_ERROR),
+            error_message=self.strings[arrays['error_message'][index]],
+        )
+        if flags & FLAG_HAS_CHECKSUM:
+            frame.expected_checksum = arrays['expected_checksum'][index]
+            frame.actual_checksum = arrays['actual_checksum'][index]
+        if raw_data:
+            try:
+                for name, value in self.parser.parse_frame_fields(raw_data).items():
+                    frame.add_field(name, value, self._field_types.get(name, ""))
+            except Exception as e:
+                print(f"解码快照帧 {index} 失败: {e}")
+        return frame
+
+    def get_capture_data(self) -> bytes:
+        """获取快照中保存的捕获数据"""
+        return bytes(self.data)
+
+    def get_result(self) -> SnapshotResult:
+        """获取惰性解析结果"""
+        return SnapshotResult(self)
+
+    def close(self):
+        """释放内存映射（之后不能再访问帧）"""
+        self.data.release()
+        for values in self.arrays.values():
+            values.release()
+        self._mmap.close()
+
+
+def load_snapshot(file_path: str) -> Tuple[ProtocolConfig, SnapshotResult]:
+    """
+    打开快照
+
+    Args:
+        file_path: 快照文件路径
+
+    Returns:
+        (协议配置, 惰性解析结果)
+
+    Raises:
+        OSError: 文件读取失败
+        ValueError: 不是快照文件、文件损坏或协议指纹不一致
+    """
+    snapshot = Snapshot(file_path)
+    return snapshot.protocol, snapshot.get_result()
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""
+流式解析模块
+增量接收字节数据，跨数据块保持分帧状态。
+分帧结果与数据如何分块无关（同一数据流整块输入和逐字节输入得到相同的帧），
+因此可以从捕获文件中间的检查点以任意块大小重新分帧。
+"""
+
+from typing import List, Optional, Tuple
+from models import ProtocolConfig, DataFrame, FramingStats
+from core.parser import DataParser
+from core.decode_plan import DecodePlan
+
+
+class StreamParser:
+    """流式解析器"""
+
+    def __init__(self, protocol: ProtocolConfig, max_pending: int = 64 * 1024,
+                 plan: Optional[DecodePlan] = None, resync: bool = False):
+        """
+        初始化
+
+        Args:
+            protocol: 协议配置
+            max_pending: 帧的最大长度，帧头后这么多字节内没有帧尾时丢弃该帧头重新同步
+                （也是未完成帧最多缓存的字节数）
+            plan: 预先编译的解码计划
+            resync: 是否使用重同步分帧（见 DataParser.find_frames_resync）
+        """
+        self.resync = resync
+        self.parser = DataParser(protocol, plan, resync=resync)
+        self.max_pending = max_pending
+        self.reset()
+
+    @property
+    def protocol(self) -> ProtocolConfig:
+        """当前协议配置"""
+        return self.parser.protocol
+
+    def set_protocol(self, protocol: ProtocolConfig, plan: Optional[DecodePlan] = None):
+        """
+        切换协议（保留缓冲区和帧计数，可在其他线程调用 feed 期间切换）
+
+        正在处理的数据块仍按旧协议解析，之后的数据块使用新协议。
+
+        Args:
+            protocol: 新的协议配置
+            plan: 预先编译的解码计划
+        """
+        self.parser = DataParser(protocol, plan, resync=self.resync)
+
+    def reset(self, position: int = 0):
+        """
+        重置分帧状态
+
+        Args:
+            position: 之后输入的第一个字节在数据流中的位置（从捕获文件中间开始分帧时使用）
+        """
+        self._buffer = bytearray()
+        self._base = position  # 缓冲区第一个字节在整个数据流中的位置
+        self.frame_count = 0
+        self.total_bytes = 0
+        self.discarded_bytes = 0
+        # 重同步分帧模式的累计分帧统计
+        self.framing_stats = FramingStats() if self.resync else None
+
+    @property
+    def pending_bytes(self) -> int:
+        """尚未组成完整帧的缓存字节数"""
+        return len(self._buffer)
+
+    def feed(self, data: bytes) -> List[DataFrame]:
+        """
+        输入新数据
+
+        Args:
+            data: 新到达的字节数据
+
+        Returns:
+            本次新识别出的完整帧列表
+        """
+        if not data:
+            return []
+
+        self._buffer += data
+        self.total_bytes += len(data)
+
+        # 本次调用固定使用同一个解析器，期间切换协议不影响
+        parser = self.parser
+        frames = []
+        buffer = bytes(self._buffer)
+        framed_bytes = 0
+        if parser.resync:
+            positions, stats = parser.find_frames_resync(buffer, final=False,
+                                                         in_sync=self.framing_stats.in_sync)
+            # 放弃的帧头已经判定过，从末尾未收完的帧继续
+            keep = stats.scanned_bytes
+            self.framing_stats.merge(stats)
+        else:
+            positions, keep = self._find_frames(parser, buffer)
+        for start, end in positions:
+            self.frame_count += 1
+            frames.append(parser.parse_single_frame(
+                buffer[start:end], self.frame_count, self._base + start
+            ))
+            framed_bytes += end - start
+
+        if keep > 0:
+            # 已组成帧的字节不计入丢弃统计
+            self.discarded_bytes += keep - framed_bytes
+            del self._buffer[:keep]
+            self._base += keep
+        return frames
+
+    def _find_frames(self, parser: DataParser, buffer: bytes) -> Tuple[List[Tuple[int, int]], int]:
+        """
+        在缓冲区中查找完整的帧（帧头后第一个帧尾，帧长不超过 max_pending）
+
+        帧头后 max_pending 字节内没有帧尾时放弃该帧头，从下一个字节继续查找；
+        是否放弃只取决于帧头后的数据，与数据分块方式无关。
+
+        Returns:
+            (帧位置列表, 缓冲区中需要保留的起始位置)
+        """
+        header = parser.plan.header
+        tail = parser.plan.tail
+        max_length = self.max_pending
+        positions = []
+        pos = 0
+        while True:
+            header_pos = header.find(buffer, pos)
+            if header_pos == -1:
+                # 没有帧头，只保留末尾可能是半个帧头的字节
+                return positions, max(pos, len(buffer) - len(header) + 1)
+
+            window_end = header_pos + max_length
+            tail_pos = tail.find(buffer, header_pos + len(header), window_end)
+            if tail_pos != -1:
+                end = tail_pos + len(tail)
+                positions.append((header_pos, end))
+                pos = end
+            elif len(buffer) >= window_end:
+                # 帧过长，放弃这个帧头重新同步
+                pos = header_pos + 1
+            else:
+                # 未收完的帧
+                return positions, header_pos
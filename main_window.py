@@ -4,26 +4,50 @@
 """
 import sys
 import os
-from typing import Optional
+import copy
+import sqlite3
+from bisect import bisect_left
+from typing import Dict, List, Optional, Union
 
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QMessageBox,
-    QFileDialog, QTableWidgetItem
+    QFileDialog, QTableWidgetItem, QMenu, QInputDialog,
+    QHBoxLayout, QLabel, QLineEdit, QPushButton, QProgressDialog
 )
-from PySide6.QtCore import Qt, QThread, Signal
+from PySide6.QtCore import Qt, QThread, Signal, QTimer
 from PySide6.QtGui import QColor, QAction
 
 from ui_form import Ui_Main
 from models import (
     ProtocolConfig, FieldDefinition, ChecksumConfig,
-    ChecksumType, ChecksumPosition, FieldType, ParseResult
+    ChecksumType, ChecksumPosition, FieldType, ParseResult, GapIndex
 )
 from core import DataParser, ProtocolManager, ColorConfig
 from core.protocol_history import ProtocolHistory
 from core.analysis_history import AnalysisHistory
-from utils import export_to_txt, export_to_csv
+from core.memory_profiler import MemoryProfiler
+from core.serial_capture import SerialCapture, is_serial_available, list_serial_ports
+from core.network_source import NetworkSource, parse_endpoint
+from core.multi_capture import MultiCaptureSession
+from core.file_follow import FileFollower
+from core.frame_index import FrameIndex, open_frame_index
+from core.columns import FrameColumns, is_numpy_available
+from core.frame_filter import FrameFilter, FilterError
+from core.snapshot import Snapshot, save_snapshot, estimate_snapshot_size, SNAPSHOT_EXTENSION
+from core.protocol_registry import ProtocolRegistry, get_protocol_registry
+from core.protocol_library import ProtocolLibrary
+from core.log_ingest import (
+    LogReader, LogTimeIndex, LogFrameParser, parse_log_text, parse_time_text, detect_log_format, DETECT_SIZE
+)
+from utils import (
+    stream_export, get_txt_header, ExportCancelled, export_columnar, is_pyarrow_available,
+    export_sqlite, list_sqlite_tables, SqliteTable
+)
 from utils.delegates import ComboBoxDelegate
-from ui import HistoryDialog
+from ui import (
+    HistoryDialog, ReportDialog, MultiCaptureDialog, CompareDialog, LiveCompareDialog,
+    FieldStatsPanel, TrendPlotDialog
+)
 
 
 class ParseThread(QThread):
@@ -31,20 +55,193 @@ class ParseThread(QThread):
     finished = Signal(ParseResult)
     error = Signal(str)
     
-    def __init__(self, parser: DataParser, hex_string: str):
+    # 自动保存快照的大小上限（更大的结果不自动保存，可以用 文件 → 保存结果快照 手动保存）
+    SNAPSHOT_MAX_BYTES = 32 * 1024 * 1024
+    
+    def __init__(self, parser: DataParser, hex_string: str,
+                 profiler: Optional[MemoryProfiler] = None, snapshot_path: str = '',
+                 history: Optional[AnalysisHistory] = None):
         super().__init__()
         self.parser = parser
         self.hex_string = hex_string
+        self.profiler = profiler
+        # 解析完成后在本线程保存快照，保存失败时清空
+        self.snapshot_path = snapshot_path
+        # 解析完成后在本线程把捕获数据存入历史记录的数据块存储
+        self.history = history
+        self.capture_hash = ''
+        self.protocol_hash = ''
     
     def run(self):
         try:
-            result = self.parser.parse(self.hex_string)
+            result = parse_log_text(self.hex_string, self.parser.protocol, self.parser.resync)
+            if result is not None:
+                # 粘贴的是带时间戳的串口日志：快照只保存各帧数据，历史记录保存日志文本供重放
+                if self.snapshot_path:
+                    self.write_snapshot(result, None)
+                if self.history:
+                    self.store_capture(self.hex_string.encode('utf-8'))
+                self.finished.emit(result)
+                return
+            # 解码一次，解码后的数据同时用于快照和历史记录（数据格式错误时为None）
+            result, data = self.parser.parse_with_data(self.hex_string, self.profiler)
+            if self.snapshot_path:
+                self.write_snapshot(result, data)
+            if self.history and data is not None:
+                self.store_capture(data)
             self.finished.emit(result)
         except Exception as e:
             self.error.emit(str(e))
+    
+    def write_snapshot(self, result: ParseResult, data: Optional[bytes]):
+        """保存解析结果快照（包括原始捕获数据），超过大小上限时不保存"""
+        if estimate_snapshot_size(result, data) > self.SNAPSHOT_MAX_BYTES:
+            self.snapshot_path = ''
+            return
+        try:
+            save_snapshot(self.snapshot_path, result, self.parser.protocol, data)
+        except Exception as e:
+            print(f"保存快照失败: {e}")
+            self.snapshot_path = ''
+    
+    def store_capture(self, data: bytes):
+        """保存捕获数据和协议配置，供历史记录重放"""
+        try:
+            self.capture_hash, self.protocol_hash = self.history.store_capture(data, self.parser.protocol)
+        except Exception as e:
+            print(f"保存捕获数据失败: {e}")
+
+
+class ExportThread(QThread):
+    """导出线程（流式写文件，支持进度和取消）"""
+    progress = Signal(int, int)
+    finished = Signal(int)
+    error = Signal(str)
+
+    def __init__(self, result: ParseResult, file_path: str, file_format: str,
+                 protocol: Optional[ProtocolConfig] = None, index_fields: Optional[list] = None):
+        super().__init__()
+        # 复制帧列表，导出期间结果被替换也不受影响
+        self.frames = result.frames[:]
+        self.header = get_txt_header(result) if file_format == 'txt' else ''
+        self.file_path = file_path
+        self.file_format = file_format
+        # 列式和数据库导出时决定字段列
+        self.protocol = copy.deepcopy(protocol)
+        # 数据库导出时建索引的字段
+        self.index_fields = index_fields or []
+        self.cancelled = False
+
+    def cancel(self):
+        """请求取消导出"""
+        self.cancelled = True
+
+    def run(self):
+        try:
+            if self.file_format in ('txt', 'csv'):
+                count = stream_export(
+                    self.frames, self.file_path, self.file_format, self.header,
+                    total=len(self.frames),
+                    progress=self.progress.emit,
+                    is_cancelled=lambda: self.cancelled
+                )
+            elif self.file_format == 'sqlite':
+                count = export_sqlite(
+                    self.frames, self.file_path, self.protocol, self.index_fields,
+                    total=len(self.frames),
+                    progress=self.progress.emit,
+                    is_cancelled=lambda: self.cancelled
+                )
+            else:
+                count = export_columnar(
+                    self.frames, self.file_path, self.protocol, self.file_format,
+                    total=len(self.frames),
+                    progress=self.progress.emit,
+                    is_cancelled=lambda: self.cancelled
+                )
+            self.finished.emit(count)
+        except ExportCancelled:
+            self.error.emit("导出已取消")
+        except Exception as e:
+            self.error.emit(str(e))
+
+
+class DetectProtocolThread(QThread):
+    """协议识别线程（扫描协议库并为候选协议打分）"""
+    finished = Signal(list)
+    error = Signal(str)
+
+    def __init__(self, directory: str, data: bytes, workers: int = 0):
+        super().__init__()
+        self.directory = directory
+        self.data = data
+        self.workers = workers
+
+    def run(self):
+        try:
+            # 使用独立的注册表，不与主线程共享内存缓存
+            library = ProtocolLibrary(self.directory, ProtocolRegistry())
+            library.scan()
+            self.finished.emit(library.detect(self.data, self.workers))
+        except Exception as e:
+            self.error.emit(str(e))
+
+
+class LogImportThread(QThread):
+    """串口日志导入线程（指定起始时间时用稀疏时间索引定位）"""
+    finished = Signal(ParseResult)
+    error = Signal(str)
+
+    def __init__(self, file_path: str, protocol: ProtocolConfig, start_time: Optional[float] = None,
+                 end_time: Optional[float] = None, resync: bool = False):
+        super().__init__()
+        self.file_path = file_path
+        self.protocol = protocol
+        self.start_time = start_time
+        self.end_time = end_time
+        self.resync = resync
+
+    def run(self):
+        try:
+            reader = LogReader(self.file_path)
+            offset, previous = 0, None
+            if self.start_time is not None:
+                index = LogTimeIndex(reader)
+                index.update()
+                offset, previous = index.find(self.start_time)
+            records = reader.iter_records(offset, previous, self.start_time, self.end_time)
+            self.finished.emit(LogFrameParser(self.protocol, resync=self.resync).parse_records(records))
+        except Exception as e:
+            self.error.emit(str(e))
+
+
+class FrameIndexThread(QThread):
+    """打开大捕获文件的帧索引线程（索引不存在或已失效时分帧整个文件建立索引）"""
+    finished = Signal(object)
+    error = Signal(str)
+    progress = Signal(int)
+
+    def __init__(self, file_path: str, protocol: ProtocolConfig, resync: bool = False):
+        super().__init__()
+        self.file_path = file_path
+        self.protocol = protocol
+        self.resync = resync
+
+    def run(self):
+        try:
+            index = open_frame_index(
+                self.file_path, self.protocol, self.resync,
+                progress=lambda done, total: self.progress.emit(done * 100 // max(total, 1))
+            )
+            self.finished.emit(index)
+        except Exception as e:
+            self.error.emit(str(e))
 
 
 class Main(QMainWindow):
+    # 大捕获文件每页显示的帧数
+    FRAME_PAGE_SIZE = 1000
+    
     def __init__(self, parent=None):
         super().__init__(parent)
         self.ui = Ui_Main()
@@ -56,10 +253,46 @@ class Main(QMainWindow):
         self.parse_result: Optional[ParseResult] = None
         # 解析线程
         self.parse_thread: Optional[ParseThread] = None
+        # 导出线程
+        self.export_thread: Optional[ExportThread] = None
+        self.export_progress: Optional[QProgressDialog] = None
+        # 协议识别线程和上次选择的协议库目录
+        self.detect_thread: Optional[DetectProtocolThread] = None
+        # 串口日志导入线程
+        self.log_import_thread: Optional[LogImportThread] = None
+        # 按页显示的帧来源（大捕获文件的帧索引、数据库中的导出表或结果快照）、索引线程、
+        # 当前显示的页和该页第一帧在来源中的位置
+        self.frame_index: Optional[Union[FrameIndex, SqliteTable, Snapshot]] = None
+        self.frame_index_thread: Optional[FrameIndexThread] = None
+        self.frame_index_page: Optional[ParseResult] = None
+        self.frame_index_first = 1
+        self.protocol_library_dir = ''
+        # 内存分析器（仅在内存分析模式下创建）
+        self.memory_profiler: Optional[MemoryProfiler] = None
+        # 实时采集源（提供 start/stop/is_running/get_frames/get_stats）
+        self.live_source = None
+        self.live_timer = QTimer(self)
+        self.live_timer.setInterval(100)
+        self.live_timer.timeout.connect(self.on_live_timer)
+        # 帧过滤器（过滤框为空时为None）和当前结果的列式数据缓存
+        self.frame_filter: Optional[FrameFilter] = None
+        self.frame_columns: Optional[FrameColumns] = None
+        # 帧列表表格中各帧所在的行，以及未成帧间隙所在的行（行 -> 间隙序号）
+        self.frame_rows: List[int] = []
+        self.gap_rows: Dict[int, int] = {}
         # 历史记录管理器
         self.protocol_history = ProtocolHistory()
         # 分析历史记录管理器
         self.analysis_history = AnalysisHistory()
+        # 协议注册表：当前协议来自文件时监视该文件，文件变化后自动重新加载
+        self.protocol_registry = get_protocol_registry()
+        self.protocol_path = ''
+        # 采集期间的协议文件监视 [(文件路径, 回调), ...]，采集停止时移除
+        self.live_protocol_watches = []
+        self.protocol_watch_timer = QTimer(self)
+        self.protocol_watch_timer.setInterval(1000)
+        self.protocol_watch_timer.timeout.connect(self.protocol_registry.poll)
+        self.protocol_watch_timer.start()
         # 颜色配置管理器
         self.color_config = ColorConfig()
         # 颜色选择器字典
@@ -70,6 +303,10 @@ class Main(QMainWindow):
         self.setup_connections()
         self.update_ui_from_protocol()
         self.setup_history_menu()
+        self.setup_tools_menu()
+        self.setup_capture_menu()
+        self.setup_filter_bar()
+        self.setup_stats_tab()
         self.setup_color_config_ui()
         
     def init_protocol(self):
@@ -78,16 +315,89 @@ class Main(QMainWindow):
         example_path = os.path.join(os.path.dirname(__file__), 'protocol_example.json')
         if os.path.exists(example_path):
             self.current_protocol = ProtocolManager.load_protocol(example_path)
+            if self.current_protocol is not None:
+                self.set_protocol_path(example_path)
         
         # 如果加载失败，使用默认协议
         if self.current_protocol is None:
             self.current_protocol = ProtocolManager.get_default_protocol()
     
+    def set_protocol_path(self, file_path: str):
+        """
+        设置当前协议对应的文件并监视其变化
+        
+        Args:
+            file_path: 协议文件路径，为空表示当前协议不来自文件
+        """
+        if self.protocol_path:
+            self.protocol_registry.unwatch(self.protocol_path, self.on_protocol_file_changed)
+        self.protocol_path = file_path
+        if file_path:
+            self.protocol_registry.watch(file_path, self.on_protocol_file_changed)
+    
+    def on_protocol_file_changed(self, file_path: str, protocol: ProtocolConfig, plan):
+        """当前协议文件被修改，重新加载到界面"""
+        if protocol.to_dict() == self.current_protocol.to_dict():
+            return
+        # 采集源各自持有协议，界面使用副本
+        self.current_protocol = copy.deepcopy(protocol)
+        self.update_ui_from_protocol()
+        self.statusBar().showMessage(f"协议文件已更新，已重新加载：{os.path.basename(file_path)}")
+    
+    def watch_live_protocol(self, file_path: str, source):
+        """
+        采集期间监视协议文件，文件变化时采集源不停止、直接切换到新的解码计划
+        
+        Args:
+            file_path: 协议文件路径
+            source: 提供 set_protocol 的采集源
+        """
+        def on_changed(path, protocol, plan):
+            source.set_protocol(protocol, plan)
+        
+        self.protocol_registry.watch(file_path, on_changed)
+        self.live_protocol_watches.append((file_path, on_changed))
+    
     def setup_history_menu(self):
         """设置历史记录菜单"""
         # 在"文件"菜单中添加"最近的协议"子菜单
         self.recent_menu = self.ui.menu_file.addMenu("最近的协议")
         self.update_history_menu()
+        
+        # 重新打开导出到数据库的解析结果
+        self.action_open_database = QAction("打开结果数据库...", self)
+        self.action_open_database.triggered.connect(self.on_open_database_clicked)
+        self.ui.menu_file.addAction(self.action_open_database)
+        
+        # 解析结果快照（映射文件后按需解码，无需重新解析）
+        self.action_open_snapshot = QAction("打开结果快照...", self)
+        self.action_open_snapshot.triggered.connect(self.on_open_snapshot_clicked)
+        self.ui.menu_file.addAction(self.action_open_snapshot)
+        
+        self.action_save_snapshot = QAction("保存结果快照...", self)
+        self.action_save_snapshot.triggered.connect(self.on_save_snapshot_clicked)
+        self.ui.menu_file.addAction(self.action_save_snapshot)
+        
+        # 带时间戳的串口监视日志（帧记录到达时间和收发方向）
+        self.action_import_log = QAction("导入串口日志...", self)
+        self.action_import_log.triggered.connect(self.on_import_log_clicked)
+        self.ui.menu_file.addAction(self.action_import_log)
+        
+        # 大捕获文件：用 .sdcidx 帧索引按页显示，直接跳转到任意帧或下一个错误帧
+        self.ui.menu_file.addSeparator()
+        self.action_open_indexed = QAction("打开大捕获文件...", self)
+        self.action_open_indexed.triggered.connect(self.on_open_indexed_clicked)
+        self.ui.menu_file.addAction(self.action_open_indexed)
+        
+        self.action_goto_frame = QAction("跳转到帧...", self)
+        self.action_goto_frame.setEnabled(False)
+        self.action_goto_frame.triggered.connect(self.on_goto_frame_clicked)
+        self.ui.menu_file.addAction(self.action_goto_frame)
+        
+        self.action_next_error = QAction("下一个错误帧", self)
+        self.action_next_error.setEnabled(False)
+        self.action_next_error.triggered.connect(self.on_next_error_clicked)
+        self.ui.menu_file.addAction(self.action_next_error)
     
     def update_history_menu(self):
         """更新历史记录菜单"""
@@ -112,6 +422,100 @@ class Main(QMainWindow):
         clear_action.triggered.connect(self.clear_protocol_history)
         self.recent_menu.addAction(clear_action)
     
+    def setup_tools_menu(self):
+        """设置工具菜单"""
+        self.tools_menu = QMenu("工具", self)
+        self.ui.menubar.insertMenu(self.ui.menu_help.menuAction(), self.tools_menu)
+        
+        # 内存分析模式（在每个解析阶段边界统计内存）
+        self.action_memory_profile = QAction("内存分析模式", self)
+        self.action_memory_profile.setCheckable(True)
+        self.tools_menu.addAction(self.action_memory_profile)
+        
+        # 重同步分帧（只接受帧长和校验都正确的帧，损坏数据后从下一个帧头重新同步）
+        self.action_resync = QAction("重同步分帧", self)
+        self.action_resync.setCheckable(True)
+        self.action_resync.setToolTip("帧长或校验不正确时放弃该帧头并重新同步，统计跳过的字节数")
+        self.tools_menu.addAction(self.action_resync)
+        
+        self.tools_menu.addSeparator()
+        self.action_compare = QAction("数据对比...", self)
+        self.action_compare.triggered.connect(self.on_compare_clicked)
+        self.tools_menu.addAction(self.action_compare)
+        
+        self.action_trend_plot = QAction("字段趋势图...", self)
+        self.action_trend_plot.triggered.connect(self.on_trend_plot_clicked)
+        self.tools_menu.addAction(self.action_trend_plot)
+        
+        self.tools_menu.addSeparator()
+        self.action_detect_protocol = QAction("自动识别协议...", self)
+        self.action_detect_protocol.triggered.connect(self.on_detect_protocol_clicked)
+        self.tools_menu.addAction(self.action_detect_protocol)
+    
+    def setup_capture_menu(self):
+        """设置采集菜单"""
+        self.capture_menu = QMenu("采集", self)
+        self.ui.menubar.insertMenu(self.tools_menu.menuAction(), self.capture_menu)
+        
+        self.action_serial_capture = QAction("串口采集...", self)
+        self.action_serial_capture.triggered.connect(self.on_serial_capture_clicked)
+        self.capture_menu.addAction(self.action_serial_capture)
+        
+        self.action_multi_capture = QAction("多路串口采集...", self)
+        self.action_multi_capture.triggered.connect(self.on_multi_capture_clicked)
+        self.capture_menu.addAction(self.action_multi_capture)
+        
+        self.action_network_capture = QAction("网络采集...", self)
+        self.action_network_capture.triggered.connect(self.on_network_capture_clicked)
+        self.capture_menu.addAction(self.action_network_capture)
+        
+        self.action_follow_file = QAction("跟踪文件...", self)
+        self.action_follow_file.triggered.connect(self.on_follow_file_clicked)
+        self.capture_menu.addAction(self.action_follow_file)
+        
+        self.action_live_compare = QAction("双路实时对比...", self)
+        self.action_live_compare.triggered.connect(self.on_live_compare_clicked)
+        self.capture_menu.addAction(self.action_live_compare)
+        
+        self.capture_menu.addSeparator()
+        self.action_stop_capture = QAction("停止采集", self)
+        self.action_stop_capture.setEnabled(False)
+        self.action_stop_capture.triggered.connect(self.stop_live_source)
+        self.capture_menu.addAction(self.action_stop_capture)
+    
+    def setup_filter_bar(self):
+        """设置帧过滤栏（位于帧列表表格上方）"""
+        filter_layout = QHBoxLayout()
+        filter_layout.addWidget(QLabel("过滤："))
+        
+        self.lineEdit_filter = QLineEdit()
+        self.lineEdit_filter.setPlaceholderText(
+            "例如：命令 == 0x03 and 电压 > 3600 and not checksum_valid（回车应用）"
+        )
+        self.lineEdit_filter.setToolTip(
+            "字段名直接引用字段值，非标识符字段名用 field('名称')\n"
+            "帧信息：frame_number, position, end_position, length, "
+            "checksum_valid, has_error, channel, protocol, timestamp\n"
+            "运算：and or not == != < <= > >= in, 算术和位运算"
+        )
+        self.lineEdit_filter.returnPressed.connect(self.on_filter_changed)
+        filter_layout.addWidget(self.lineEdit_filter)
+        
+        self.btn_clear_filter = QPushButton("清除过滤")
+        self.btn_clear_filter.clicked.connect(self.on_clear_filter_clicked)
+        filter_layout.addWidget(self.btn_clear_filter)
+        
+        self.label_filter_status = QLabel("")
+        filter_layout.addWidget(self.label_filter_status)
+        
+        self.ui.verticalLayout_result.insertLayout(1, filter_layout)
+    
+    def setup_stats_tab(self):
+        """设置字段统计标签页（位于数据分析之后）"""
+        self.stats_panel = FieldStatsPanel()
+        index = self.ui.tabWidget.indexOf(self.ui.tab_data_analyze) + 1
+        self.ui.tabWidget.insertTab(index, self.stats_panel, "字段统计")
+    
     def setup_connections(self):
         """设置信号槽连接"""
         # 数据分析Tab
@@ -173,7 +577,7 @@ class Main(QMainWindow):
         
         # 清空之前的分析结果
         self.ui.textEdit_frame_detail.clear()
-        self.ui.tableWidget_frames.setRowCount(0)
+        self.clear_frames_table()
         self.parse_result = None
         
         # 从UI更新协议配置
@@ -190,10 +594,19 @@ class Main(QMainWindow):
         self.ui.btn_analyze.setText("正在分析...")
         
         # 创建解析器
-        parser = DataParser(self.current_protocol)
+        parser = DataParser(self.current_protocol, resync=self.action_resync.isChecked())
+        
+        # 内存分析模式
+        self.memory_profiler = None
+        if self.action_memory_profile.isChecked():
+            self.memory_profiler = MemoryProfiler()
+            self.memory_profiler.start()
         
         # 创建解析线程
-        self.parse_thread = ParseThread(parser, input_text)
+        self.parse_thread = ParseThread(
+            parser, input_text, self.memory_profiler, self.analysis_history.new_snapshot_path(),
+            self.analysis_history
+        )
         self.parse_thread.finished.connect(self.on_parse_finished)
         self.parse_thread.error.connect(self.on_parse_error)
         self.parse_thread.start()
@@ -203,12 +616,20 @@ class Main(QMainWindow):
         self.parse_result = result
         
         # 更新统计信息
-        self.ui.label_total_frames.setText(f"总帧数：{result.get_total_frames()}")
-        self.ui.label_valid_frames.setText(f"有效帧：{result.get_valid_frames()}")
-        self.ui.label_error_frames.setText(f"错误帧：{result.get_error_frames()}")
+        self.update_result_labels(result)
         
         # 填充表格
-        self.fill_frames_table(result)
+        if self.memory_profiler:
+            with self.memory_profiler.stage("表格填充"):
+                self.fill_frames_table(result)
+        else:
+            self.fill_frames_table(result)
+        
+        # 字段统计（有numpy时在列式数据上批量计算，列式数据同时供过滤使用）
+        if is_numpy_available():
+            self.stats_panel.set_frames(result.frames, self.get_frame_columns())
+        else:
+            self.stats_panel.set_frames(result.frames)
         
         # 保存到历史记录
         self.save_analysis_to_history(result)
@@ -219,57 +640,183 @@ class Main(QMainWindow):
         
         # 显示完成消息
         self.statusBar().showMessage(f"分析完成！{result.get_summary()}", 5000)
+        
+        # 显示内存分析报告
+        if self.memory_profiler:
+            self.memory_profiler.stop()
+            report = self.memory_profiler.get_report()
+            self.memory_profiler = None
+            ReportDialog("内存分析报告", report.to_text(), self).exec()
+    
+    def show_loaded_result(self, result: ParseResult, message: str):
+        """显示从文件重新打开的解析结果（不重新解析，也不记入分析历史）"""
+        self.stop_live_source()
+        self.parse_result = result
+        self.ui.textEdit_frame_detail.clear()
+        self.update_result_labels(result)
+        self.fill_frames_table(result)
+        if is_numpy_available():
+            self.stats_panel.set_frames(result.frames, self.get_frame_columns())
+        else:
+            self.stats_panel.set_frames(result.frames)
+        self.statusBar().showMessage(f"{message}{result.get_summary()}", 5000)
     
     def on_parse_error(self, error_msg: str):
         """解析错误"""
+        if self.memory_profiler:
+            self.memory_profiler.stop()
+            self.memory_profiler = None
+        
         QMessageBox.critical(self, "解析错误", f"解析失败：\n{error_msg}")
         
         # 恢复按钮
         self.ui.btn_analyze.setEnabled(True)
         self.ui.btn_analyze.setText("开始分析")
     
+    def clear_frames_table(self):
+        """清空帧列表表格"""
+        self.ui.tableWidget_frames.setRowCount(0)
+        self.frame_rows = []
+        self.gap_rows = {}
+    
     def fill_frames_table(self, result: ParseResult):
-        """填充帧列表表格"""
+        """填充帧列表表格（未成帧间隙按位置插在帧之间）"""
         table = self.ui.tableWidget_frames
-        table.setRowCount(0)
+        self.clear_frames_table()
+        self.frame_columns = None
         
+        gaps = result.gaps
+        gap_count = len(gaps) if gaps is not None else 0
+        gap_index = 0
         for frame in result.frames:
-            row = table.rowCount()
-            table.insertRow(row)
-            
-            # 帧序号
-            table.setItem(row, 0, QTableWidgetItem(str(frame.frame_number)))
-            
-            # 起始位置
-            table.setItem(row, 1, QTableWidgetItem(str(frame.start_position)))
-            
-            # 结束位置
-            table.setItem(row, 2, QTableWidgetItem(str(frame.end_position)))
-            
-            # 原始数据
-            table.setItem(row, 3, QTableWidgetItem(frame.get_raw_data_hex()))
-            
-            # 解析结果
-            table.setItem(row, 4, QTableWidgetItem(frame.get_field_summary()))
-            
-            # 校验状态
-            if frame.expected_checksum is not None:
-                status = "✓ 通过" if frame.checksum_valid else "✗ 失败"
-            else:
-                status = "无校验"
-            status_item = QTableWidgetItem(status)
-            
-            # 错误行用红色标记
-            if frame.has_error:
-                for col in range(6):
-                    item = table.item(row, col)
-                    if item:
-                        item.setBackground(QColor(255, 200, 200))
-            
-            table.setItem(row, 5, status_item)
+            while gap_index < gap_count and gaps.starts[gap_index] < frame.start_position:
+                self.append_gap_row(gaps, gap_index)
+                gap_index += 1
+            self.append_frame_row(frame, apply_filter=False)
+        while gap_index < gap_count:
+            self.append_gap_row(gaps, gap_index)
+            gap_index += 1
         
         # 调整列宽
         table.resizeColumnsToContents()
+        self.apply_frame_filter()
+    
+    def append_frame_row(self, frame, apply_filter: bool = True):
+        """在帧列表表格末尾追加一帧"""
+        table = self.ui.tableWidget_frames
+        row = table.rowCount()
+        table.insertRow(row)
+        self.frame_rows.append(row)
+        
+        # 帧序号
+        table.setItem(row, 0, QTableWidgetItem(str(frame.frame_number)))
+        
+        # 起始位置
+        table.setItem(row, 1, QTableWidgetItem(str(frame.start_position)))
+        
+        # 结束位置
+        table.setItem(row, 2, QTableWidgetItem(str(frame.end_position)))
+        
+        # 原始数据
+        table.setItem(row, 3, QTableWidgetItem(frame.get_raw_data_hex()))
+        
+        # 解析结果
+        table.setItem(row, 4, QTableWidgetItem(frame.get_field_summary()))
+        
+        # 校验状态
+        if frame.expected_checksum is not None:
+            status = "✓ 通过" if frame.checksum_valid else "✗ 失败"
+        else:
+            status = "无校验"
+        status_item = QTableWidgetItem(status)
+        
+        # 错误行用红色标记
+        if frame.has_error:
+            for col in range(6):
+                item = table.item(row, col)
+                if item:
+                    item.setBackground(QColor(255, 200, 200))
+        
+        table.setItem(row, 5, status_item)
+        
+        if apply_filter and self.frame_filter and not self.frame_filter.matches(frame):
+            table.setRowHidden(row, True)
+    
+    def append_gap_row(self, gaps: GapIndex, index: int):
+        """在帧列表表格末尾追加一个未成帧间隙"""
+        table = self.ui.tableWidget_frames
+        row = table.rowCount()
+        table.insertRow(row)
+        self.gap_rows[row] = index
+        
+        start, length = gaps[index]
+        texts = ("—", str(start), str(start + length), gaps.get_preview_hex(index),
+                 f"未成帧间隙 {length} 字节", "")
+        for col, text in enumerate(texts):
+            item = QTableWidgetItem(text)
+            item.setForeground(QColor(128, 128, 128))
+            item.setBackground(QColor(235, 235, 235))
+            table.setItem(row, col, item)
+    
+    def on_filter_changed(self):
+        """过滤表达式改变"""
+        text = self.lineEdit_filter.text().strip()
+        if not text:
+            self.on_clear_filter_clicked()
+            return
+        
+        try:
+            self.frame_filter = FrameFilter(text)
+        except FilterError as e:
+            self.label_filter_status.setStyleSheet("color: red;")
+            self.label_filter_status.setText(str(e))
+            return
+        
+        self.apply_frame_filter()
+    
+    def on_clear_filter_clicked(self):
+        """清除过滤"""
+        self.lineEdit_filter.clear()
+        self.frame_filter = None
+        self.apply_frame_filter()
+    
+    def apply_frame_filter(self):
+        """按当前过滤器隐藏不匹配的行"""
+        table = self.ui.tableWidget_frames
+        frames = self.parse_result.frames if self.parse_result else []
+        self.label_filter_status.setStyleSheet("")
+        
+        if self.frame_filter is None:
+            for row in range(table.rowCount()):
+                table.setRowHidden(row, False)
+            self.label_filter_status.setText("")
+            return
+        
+        # 已有列式数据（统计面板已构建）时向量化过滤，否则逐帧判断：
+        # 只为过滤构建列式数据比逐帧判断更慢
+        columns = self.frame_columns
+        if columns is not None and len(columns) == len(frames) and not self.live_source:
+            matches = self.frame_filter.mask(columns).tolist()
+        else:
+            matches = [self.frame_filter.matches(frame) for frame in frames]
+        
+        table.setUpdatesEnabled(False)
+        frame_rows = self.frame_rows
+        for i in range(min(len(frame_rows), len(matches))):
+            table.setRowHidden(frame_rows[i], not matches[i])
+        # 过滤时不显示未成帧间隙
+        for row in self.gap_rows:
+            table.setRowHidden(row, True)
+        table.setUpdatesEnabled(True)
+        
+        self.label_filter_status.setText(f"显示 {sum(matches)} / {len(frames)} 帧")
+    
+    def get_frame_columns(self) -> FrameColumns:
+        """获取当前结果的列式数据（帧数变化后重新构建）"""
+        frames = self.parse_result.frames if self.parse_result else []
+        if self.frame_columns is None or len(self.frame_columns) != len(frames):
+            self.frame_columns = FrameColumns.from_frames(frames)
+        return self.frame_columns
     
     def on_frame_selected(self):
         """帧选择改变"""
@@ -278,8 +825,16 @@ class Main(QMainWindow):
             return
         
         row = selected_items[0].row()
-        if self.parse_result and row < len(self.parse_result.frames):
-            frame = self.parse_result.frames[row]
+        if not self.parse_result:
+            return
+        if row in self.gap_rows:
+            self.ui.textEdit_frame_detail.setPlainText(
+                self.parse_result.gaps.get_detailed_info(self.gap_rows[row])
+            )
+            return
+        index = bisect_left(self.frame_rows, row)
+        if index < len(self.frame_rows) and self.frame_rows[index] == row:
+            frame = self.parse_result.frames[index]
             # 使用HTML版本显示，带颜色
             self.ui.textEdit_frame_detail.setHtml(frame.get_detailed_info_html(self.color_config))
     
@@ -288,9 +843,9 @@ class Main(QMainWindow):
         try:
             input_data = self.ui.textEdit_input.toPlainText().strip()
             
-            # 准备帧详情
+            # 准备帧详情（历史记录只保存前几帧的摘要）
             frame_details = []
-            for frame in result.frames:
+            for frame in result.frames[:self.analysis_history.SUMMARY_FRAMES]:
                 frame_details.append({
                     'frame_number': frame.frame_number,
                     'has_error': frame.has_error,
@@ -300,21 +855,560 @@ class Main(QMainWindow):
             
             # 添加到历史记录
             self.analysis_history.add_analysis(
-                protocol_name=self.current_protocol.name,
+                protocol_name=self.current_protocol.protocol_name,
                 input_data=input_data,
                 total_frames=result.get_total_frames(),
                 valid_frames=result.get_valid_frames(),
                 error_frames=result.get_error_frames(),
-                frame_details=frame_details
+                frame_details=frame_details,
+                snapshot_path=self.parse_thread.snapshot_path if self.parse_thread else '',
+                capture_hash=self.parse_thread.capture_hash if self.parse_thread else '',
+                protocol_hash=self.parse_thread.protocol_hash if self.parse_thread else ''
             )
         except Exception as e:
             print(f"保存分析历史失败: {e}")
     
+    def on_compare_clicked(self):
+        """数据对比"""
+        protocol = self.get_validated_protocol()
+        if protocol is None:
+            return
+        
+        dialog = CompareDialog(protocol, self.ui.textEdit_input.toPlainText().strip(), self)
+        dialog.exec()
+    
+    def on_trend_plot_clicked(self):
+        """字段趋势图"""
+        if not is_numpy_available():
+            QMessageBox.warning(self, "警告", "趋势图需要安装 numpy：\npip install numpy")
+            return
+        if not self.parse_result or self.parse_result.get_total_frames() == 0:
+            QMessageBox.warning(self, "警告", "没有可绘制的数据，请先分析或采集数据！")
+            return
+        
+        dialog = TrendPlotDialog(self.get_frame_columns(), self)
+        dialog.exec()
+    
+    def on_detect_protocol_clicked(self):
+        """在协议库目录中自动识别输入数据的协议"""
+        if self.detect_thread and self.detect_thread.isRunning():
+            return
+        input_text = self.ui.textEdit_input.toPlainText().strip()
+        if not input_text:
+            QMessageBox.warning(self, "警告", "请先输入数据！")
+            return
+        try:
+            data = DataParser.parse_hex_string(input_text)
+        except ValueError as e:
+            QMessageBox.warning(self, "警告", f"数据格式错误：\n{e}")
+            return
+        
+        start_dir = self.protocol_library_dir or os.path.dirname(self.protocol_path) or os.getcwd()
+        directory = QFileDialog.getExistingDirectory(self, "选择协议库目录", start_dir)
+        if not directory:
+            return
+        self.protocol_library_dir = directory
+        
+        self.action_detect_protocol.setEnabled(False)
+        self.statusBar().showMessage("正在识别协议...")
+        self.detect_thread = DetectProtocolThread(directory, data, os.cpu_count() or 1)
+        self.detect_thread.finished.connect(self.on_detect_protocol_finished)
+        self.detect_thread.error.connect(self.on_detect_protocol_error)
+        self.detect_thread.start()
+    
+    def on_detect_protocol_finished(self, scores: list):
+        """协议识别完成：加载得分最高的协议并重新分析"""
+        self.action_detect_protocol.setEnabled(True)
+        ranking = '\n'.join(score.describe() for score in scores[:5])
+        if not scores or scores[0].score <= 0:
+            self.statusBar().clearMessage()
+            QMessageBox.warning(self, "警告", "协议库中没有匹配的协议！" + (f"\n\n{ranking}" if ranking else ""))
+            return
+        
+        best = scores[0]
+        if not self.load_protocol_from_path(best.path, show_message=False):
+            return
+        self.statusBar().showMessage(f"已自动选择协议：{best.describe()}", 5000)
+        QMessageBox.information(self, "协议识别", f"已选择协议：{best.protocol_name}\n{best.path}\n\n候选协议：\n{ranking}")
+        self.on_analyze_clicked()
+    
+    def on_detect_protocol_error(self, error_msg: str):
+        """协议识别失败"""
+        self.action_detect_protocol.setEnabled(True)
+        self.statusBar().clearMessage()
+        QMessageBox.critical(self, "失败", f"协议识别失败！\n{error_msg}")
+    
+    def on_import_log_clicked(self):
+        """导入带时间戳的串口监视日志，可只导入一段时间范围"""
+        if self.log_import_thread and self.log_import_thread.isRunning():
+            return
+        protocol = self.get_validated_protocol()
+        if protocol is None:
+            return
+        
+        file_path, _ = QFileDialog.getOpenFileName(
+            self, "导入串口日志", "", "日志文件 (*.log *.txt);;所有文件 (*)"
+        )
+        if not file_path:
+            return
+        
+        text, ok = QInputDialog.getText(
+            self, "时间范围", "起始时间 ~ 结束时间（留空导入全部，如 2026-10-01 12:00:00 ~ 2026-10-01 12:05:00）："
+        )
+        if not ok:
+            return
+        try:
+            start_text, _, end_text = text.partition('~')
+            start_time = parse_time_text(start_text) if start_text.strip() else None
+            end_time = parse_time_text(end_text) if end_text.strip() else None
+        except ValueError as e:
+            QMessageBox.warning(self, "警告", str(e))
+            return
+        
+        self.action_import_log.setEnabled(False)
+        self.statusBar().showMessage("正在导入日志...")
+        self.log_import_thread = LogImportThread(
+            file_path, protocol, start_time, end_time, self.action_resync.isChecked()
+        )
+        self.log_import_thread.finished.connect(
+            lambda result: self.on_import_log_finished(result, os.path.basename(file_path))
+        )
+        self.log_import_thread.error.connect(self.on_import_log_error)
+        self.log_import_thread.start()
+    
+    def on_import_log_finished(self, result: ParseResult, file_name: str):
+        """串口日志导入完成"""
+        self.action_import_log.setEnabled(True)
+        self.show_loaded_result(result, f"已导入日志 {file_name}：")
+    
+    def on_import_log_error(self, error_msg: str):
+        """串口日志导入失败"""
+        self.action_import_log.setEnabled(True)
+        self.statusBar().clearMessage()
+        QMessageBox.critical(self, "失败", f"导入日志失败！\n{error_msg}")
+    
+    def on_open_indexed_clicked(self):
+        """打开大捕获文件（首次打开时分帧整个文件建立帧索引，之后直接映射索引）"""
+        if self.frame_index_thread and self.frame_index_thread.isRunning():
+            return
+        protocol = self.get_validated_protocol()
+        if protocol is None:
+            return
+        
+        file_path, _ = QFileDialog.getOpenFileName(
+            self, "打开大捕获文件", "", "二进制捕获文件 (*.bin *.dat);;所有文件 (*)"
+        )
+        if not file_path:
+            return
+        
+        self.action_open_indexed.setEnabled(False)
+        self.statusBar().showMessage("正在打开帧索引...")
+        self.frame_index_thread = FrameIndexThread(file_path, protocol, self.action_resync.isChecked())
+        self.frame_index_thread.progress.connect(
+            lambda percent: self.statusBar().showMessage(f"正在建立帧索引 {percent}%...")
+        )
+        self.frame_index_thread.finished.connect(self.on_frame_index_opened)
+        self.frame_index_thread.error.connect(self.on_frame_index_error)
+        self.frame_index_thread.start()
+    
+    def on_frame_index_opened(self, frame_index: FrameIndex):
+        """帧索引已打开，显示第一页"""
+        self.action_open_indexed.setEnabled(True)
+        self.open_frame_pages(frame_index)
+    
+    def open_frame_pages(self, frame_index: Union[FrameIndex, SqliteTable, Snapshot]):
+        """按页显示帧来源，显示第一页"""
+        self.close_frame_index()
+        self.frame_index = frame_index
+        self.action_goto_frame.setEnabled(True)
+        self.action_next_error.setEnabled(True)
+        self.show_frame_page(1)
+    
+    def on_frame_index_error(self, error_msg: str):
+        """打开帧索引失败"""
+        self.action_open_indexed.setEnabled(True)
+        self.statusBar().clearMessage()
+        QMessageBox.critical(self, "失败", f"打开大捕获文件失败！\n{error_msg}")
+    
+    def close_frame_index(self):
+        """关闭当前按页显示的帧来源"""
+        if self.frame_index:
+            self.frame_index.close()
+            self.frame_index = None
+            self.frame_index_page = None
+        self.action_goto_frame.setEnabled(False)
+        self.action_next_error.setEnabled(False)
+    
+    def show_frame_page(self, frame_number: int):
+        """显示帧来源中从第 frame_number 帧开始的一页帧"""
+        frame_index = self.frame_index
+        frames = frame_index.read_frames(frame_number, self.FRAME_PAGE_SIZE)
+        total_bytes = frames[-1].end_position - frames[0].start_position if frames else 0
+        self.frame_index_page = ParseResult(frames=frames, total_bytes=total_bytes)
+        self.frame_index_first = frame_number
+        last = frame_number + len(frames) - 1
+        self.show_loaded_result(
+            self.frame_index_page,
+            f"{os.path.basename(frame_index.capture_path)} 第 {frame_number}~{last} 帧"
+            f"（共 {len(frame_index)} 帧，错误帧 {frame_index.error_count}）："
+        )
+        if frames:
+            self.ui.tableWidget_frames.selectRow(self.frame_rows[0])
+    
+    def on_goto_frame_clicked(self):
+        """跳转到按页显示的帧来源中的指定帧"""
+        frame_index = self.frame_index
+        if not frame_index or len(frame_index) == 0:
+            return
+        number, ok = QInputDialog.getInt(
+            self, "跳转到帧", f"帧序号（1~{len(frame_index)}）：", 1, 1, len(frame_index)
+        )
+        if ok:
+            self.show_frame_page(number)
+    
+    def on_next_error_clicked(self):
+        """跳转到当前选中帧之后的下一个错误帧"""
+        if not self.frame_index:
+            return
+        page = self.frame_index_page if self.parse_result is self.frame_index_page else None
+        # 从选中的帧之后查找，没有选中帧时从当前页开头查找（都按帧在来源中的位置）
+        first = self.frame_index_first
+        current = first - 1 if page and page.frames else 0
+        selected_items = self.ui.tableWidget_frames.selectedItems()
+        if page and selected_items:
+            row = selected_items[0].row()
+            index = bisect_left(self.frame_rows, row)
+            if index < len(self.frame_rows) and self.frame_rows[index] == row:
+                current = first + index
+        
+        number = self.frame_index.next_error(current)
+        if number is None:
+            self.statusBar().showMessage("之后没有错误帧", 5000)
+            return
+        if page and page.frames and first <= number < first + len(page.frames):
+            # 错误帧在当前页中，直接选中
+            self.ui.tableWidget_frames.selectRow(self.frame_rows[number - first])
+        else:
+            self.show_frame_page(number)
+    
+    def on_open_database_clicked(self):
+        """打开导出到 SQLite 数据库的解析结果"""
+        file_path, _ = QFileDialog.getOpenFileName(
+            self, "打开结果数据库", "", "SQLite数据库 (*.db *.sqlite *.sqlite3);;所有文件 (*)"
+        )
+        if not file_path:
+            return
+        
+        try:
+            tables = list_sqlite_tables(file_path)
+        except sqlite3.Error as e:
+            QMessageBox.critical(self, "错误", f"无法读取数据库：\n{e}")
+            return
+        if not tables:
+            QMessageBox.warning(self, "警告", "数据库中没有导出的帧数据！")
+            return
+        
+        table_name = tables[0][0]
+        if len(tables) > 1:
+            items = [f"{name}（{protocol_name}，{count} 帧）" for name, protocol_name, count in tables]
+            item, ok = QInputDialog.getItem(self, "选择数据表", "数据表：", items, 0, False)
+            if not ok:
+                return
+            table_name = tables[items.index(item)][0]
+        
+        try:
+            table = SqliteTable(file_path, table_name)
+        except (sqlite3.Error, ValueError) as e:
+            QMessageBox.critical(self, "错误", f"读取数据库失败：\n{e}")
+            return
+        
+        # 恢复导出时使用的协议，使帧详情和过滤与数据一致
+        if table.protocol is not None:
+            self.current_protocol = table.protocol
+            self.set_protocol_path('')
+            self.update_ui_from_protocol()
+        # 导出表可能有上百万行，和大捕获文件一样按页读取显示
+        self.open_frame_pages(table)
+    
+    def on_open_snapshot_clicked(self):
+        """选择并打开结果快照"""
+        file_path, _ = QFileDialog.getOpenFileName(
+            self, "打开结果快照", "", f"结果快照 (*{SNAPSHOT_EXTENSION});;所有文件 (*)"
+        )
+        if file_path:
+            self.open_snapshot(file_path)
+    
+    def open_snapshot(self, file_path: str):
+        """打开结果快照"""
+        try:
+            snapshot = Snapshot(file_path)
+        except (OSError, ValueError) as e:
+            QMessageBox.critical(self, "错误", f"打开快照失败：\n{e}")
+            return
+        
+        # 快照中的帧按保存时的协议解码，界面同步显示该协议
+        self.current_protocol = snapshot.protocol
+        self.set_protocol_path('')
+        self.update_ui_from_protocol()
+        # 只解码当前页的帧，和大捕获文件一样按页显示
+        self.open_frame_pages(snapshot)
+    
+    def on_save_snapshot_clicked(self):
+        """保存当前结果快照"""
+        if not self.parse_result or self.parse_result.get_total_frames() == 0:
+            QMessageBox.warning(self, "警告", "没有可保存的数据！")
+            return
+        
+        file_path, _ = QFileDialog.getSaveFileName(
+            self, "保存结果快照", "", f"结果快照 (*{SNAPSHOT_EXTENSION})"
+        )
+        if not file_path:
+            return
+        if not file_path.endswith(SNAPSHOT_EXTENSION):
+            file_path += SNAPSHOT_EXTENSION
+        
+        try:
+            save_snapshot(file_path, self.parse_result, self.current_protocol)
+        except OSError as e:
+            QMessageBox.critical(self, "失败", f"保存快照失败：\n{e}")
+            return
+        self.statusBar().showMessage(f"快照已保存到 {file_path}", 5000)
+    
+    # ==================== 实时采集功能 ====================
+    
+    def on_serial_capture_clicked(self):
+        """串口采集"""
+        if not is_serial_available():
+            QMessageBox.warning(self, "警告", "串口采集需要安装 pyserial：\npip install pyserial")
+            return
+        
+        ports = list_serial_ports()
+        port, ok = QInputDialog.getItem(self, "串口采集", "串口:", ports, 0, True)
+        if not ok or not port.strip():
+            return
+        
+        baudrate, ok = QInputDialog.getInt(self, "串口采集", "波特率:", 115200, 50, 12000000)
+        if not ok:
+            return
+        
+        protocol = self.get_validated_protocol()
+        if protocol is None:
+            return
+        
+        self.start_live_source(SerialCapture(port.strip(), baudrate, protocol))
+    
+    def on_multi_capture_clicked(self):
+        """多路串口采集"""
+        if not is_serial_available():
+            QMessageBox.warning(self, "警告", "串口采集需要安装 pyserial：\npip install pyserial")
+            return
+        
+        dialog = MultiCaptureDialog(list_serial_ports(), self)
+        if dialog.exec() != MultiCaptureDialog.DialogCode.Accepted:
+            return
+        
+        default_protocol = self.get_validated_protocol()
+        if default_protocol is None:
+            return
+        
+        session = MultiCaptureSession(reorder_delay=dialog.get_reorder_delay())
+        protocol_files = []
+        for channel in dialog.get_channels():
+            protocol = default_protocol
+            if channel['protocol_file']:
+                protocol = ProtocolManager.load_protocol(channel['protocol_file'])
+                if protocol is None:
+                    QMessageBox.critical(self, "失败", f"通道 {channel['name']} 的协议加载失败！")
+                    return
+            capture_channel = session.add_serial_channel(
+                channel['name'], channel['port'], channel['baudrate'], protocol
+            )
+            protocol_files.append((channel['protocol_file'] or self.protocol_path, capture_channel.source))
+        
+        self.start_live_source(session)
+        # 各通道监视自己的协议文件
+        if self.live_source is session:
+            for file_path, source in protocol_files:
+                if file_path:
+                    self.watch_live_protocol(file_path, source)
+    
+    def on_network_capture_clicked(self):
+        """网络采集（串口服务器/透传网关）"""
+        text, ok = QInputDialog.getText(
+            self, "网络采集",
+            "端点（多个用空格分隔）:\n"
+            "  tcp://主机:端口          连接网关\n"
+            "  tcp-listen://地址:端口   等待网关连接\n"
+            "  udp://地址:端口          监听UDP",
+            text="tcp://127.0.0.1:4001"
+        )
+        if not ok or not text.strip():
+            return
+        
+        try:
+            endpoints = [parse_endpoint(url) for url in text.replace(',', ' ').split()]
+        except ValueError as e:
+            QMessageBox.critical(self, "端点错误", str(e))
+            return
+        
+        protocol = self.get_validated_protocol()
+        if protocol is None:
+            return
+        
+        self.start_live_source(NetworkSource(endpoints, protocol))
+    
+    def on_follow_file_clicked(self):
+        """跟踪不断增长的捕获文件（其他程序正在写入的日志或捕获文件）"""
+        file_path, _ = QFileDialog.getOpenFileName(
+            self, "选择要跟踪的文件", "",
+            "捕获文件 (*.bin *.dat *.txt *.log);;所有文件 (*)"
+        )
+        if not file_path:
+            return
+        
+        modes = ["只读取新追加的数据", "从文件开头读取"]
+        mode, ok = QInputDialog.getItem(self, "跟踪文件", "读取方式:", modes, 0, False)
+        if not ok:
+            return
+        
+        protocol = self.get_validated_protocol()
+        if protocol is None:
+            return
+        
+        self.start_live_source(FileFollower(
+            file_path, protocol, from_start=(mode == modes[1]),
+            resync=self.action_resync.isChecked()
+        ))
+    
+    def on_live_compare_clicked(self):
+        """双路实时对比"""
+        protocol = self.get_validated_protocol()
+        if protocol is None:
+            return
+        
+        dialog = LiveCompareDialog(protocol, self)
+        dialog.exec()
+    
+    def get_validated_protocol(self) -> Optional[ProtocolConfig]:
+        """从UI更新并验证协议，返回供后台使用的副本"""
+        self.update_protocol_from_ui()
+        is_valid, error_msg = ProtocolManager.validate_protocol(self.current_protocol)
+        if not is_valid:
+            QMessageBox.critical(self, "协议错误", f"协议配置无效：\n{error_msg}")
+            return None
+        # 后台线程使用副本，避免界面编辑影响正在进行的采集
+        return copy.deepcopy(self.current_protocol)
+    
+    def start_live_source(self, source):
+        """启动实时采集源"""
+        if self.live_source:
+            self.stop_live_source()
+        
+        try:
+            source.start()
+        except Exception as e:
+            QMessageBox.critical(self, "采集失败", f"无法启动采集：\n{e}")
+            return
+        
+        self.live_source = source
+        self.parse_result = ParseResult()
+        self.frame_columns = None
+        self.stats_panel.clear()
+        self.clear_frames_table()
+        self.ui.textEdit_frame_detail.clear()
+        self.update_result_labels(self.parse_result)
+        
+        self.action_stop_capture.setEnabled(True)
+        self.ui.btn_analyze.setEnabled(False)
+        self.live_timer.start()
+        
+        # 协议来自文件时，采集期间修改协议文件会热切换到新协议
+        if self.protocol_path and hasattr(source, 'set_protocol'):
+            self.watch_live_protocol(self.protocol_path, source)
+    
+    def stop_live_source(self):
+        """停止实时采集源"""
+        if not self.live_source:
+            return
+        
+        self.live_timer.stop()
+        self.live_source.stop()
+        for file_path, callback in self.live_protocol_watches:
+            self.protocol_registry.unwatch(file_path, callback)
+        self.live_protocol_watches = []
+        # 取走停止前已识别的帧
+        self.on_live_timer()
+        
+        self.statusBar().showMessage(f"采集已停止。{self.live_source.get_stats().get_summary()}")
+        self.live_source = None
+        self.action_stop_capture.setEnabled(False)
+        self.ui.btn_analyze.setEnabled(True)
+    
+    def on_live_timer(self):
+        """定时取走实时采集源中的新帧"""
+        source = self.live_source
+        if not source:
+            return
+        
+        frames = source.get_frames()
+        if frames:
+            first_batch = self.parse_result.get_total_frames() == 0
+            for frame in frames:
+                self.parse_result.add_frame(frame)
+                self.append_frame_row(frame)
+            self.stats_panel.add_frames(frames)
+            if first_batch:
+                self.ui.tableWidget_frames.resizeColumnsToContents()
+        
+        stats = source.get_stats()
+        self.parse_result.total_bytes = stats.bytes_received
+        self.update_result_labels(self.parse_result)
+        
+        if source.is_running():
+            self.statusBar().showMessage(stats.get_summary())
+        elif self.live_timer.isActive():
+            # 采集源异常停止
+            error_msg = getattr(source, 'error_message', '')
+            self.stop_live_source()
+            if error_msg:
+                QMessageBox.critical(self, "采集错误", error_msg)
+    
+    def update_result_labels(self, result: ParseResult):
+        """更新统计信息标签"""
+        self.ui.label_total_frames.setText(f"总帧数：{result.get_total_frames()}")
+        self.ui.label_valid_frames.setText(f"有效帧：{result.get_valid_frames()}")
+        self.ui.label_error_frames.setText(f"错误帧：{result.get_error_frames()}")
+    
+    def closeEvent(self, event):
+        """关闭窗口"""
+        self.stop_live_source()
+        self.close_frame_index()
+        super().closeEvent(event)
+    
     def on_view_history_clicked(self):
         """查看历史记录按钮点击"""
         dialog = HistoryDialog(self.analysis_history, self)
+        dialog.snapshot_requested.connect(self.open_snapshot)
+        dialog.replay_requested.connect(self.replay_analysis)
         dialog.exec()
     
+    def replay_analysis(self, record: dict):
+        """用保存的协议配置和捕获数据重新分析历史记录"""
+        protocol, data = self.analysis_history.load_capture(record)
+        if protocol is None or data is None:
+            QMessageBox.warning(self, "警告", "该记录的捕获数据已被清理，无法重放！")
+            return
+        
+        self.current_protocol = protocol
+        self.set_protocol_path('')
+        self.update_ui_from_protocol()
+        if detect_log_format(data[:DETECT_SIZE].splitlines()) is not None:
+            # 粘贴日志的记录保存的是日志文本
+            self.ui.textEdit_input.setPlainText(data.decode('utf-8', errors='replace'))
+        else:
+            self.ui.textEdit_input.setPlainText(data.hex(' ').upper())
+        self.on_analyze_clicked()
+    
     def on_clear_input_clicked(self):
         """清空输入"""
         self.ui.textEdit_input.clear()
@@ -325,28 +1419,78 @@ class Main(QMainWindow):
             QMessageBox.warning(self, "警告", "没有可导出的数据！")
             return
         
-        # 选择文件类型
+        # 选择文件类型（列式格式每个字段一列，便于 pandas/duckdb 加载）
+        formats = {"文本文件 (*.txt)": 'txt', "CSV文件 (*.csv)": 'csv'}
+        if is_pyarrow_available():
+            formats["Parquet文件 (*.parquet)"] = 'parquet'
+            formats["Arrow文件 (*.arrow)"] = 'arrow'
+        if is_numpy_available():
+            formats["NumPy文件 (*.npz)"] = 'npz'
+        formats["SQLite数据库 (*.db)"] = 'sqlite'
         file_path, selected_filter = QFileDialog.getSaveFileName(
             self,
             "导出结果",
             "",
-            "文本文件 (*.txt);;CSV文件 (*.csv)"
+            ";;".join(formats)
         )
         
         if not file_path:
             return
         
-        # 根据选择的类型导出
-        if selected_filter == "文本文件 (*.txt)":
-            success = export_to_txt(self.parse_result, file_path)
-        else:
-            success = export_to_csv(self.parse_result, file_path)
-        
-        if success:
-            QMessageBox.information(self, "成功", "导出成功！")
+        if self.export_thread and self.export_thread.isRunning():
+            QMessageBox.warning(self, "警告", "正在导出，请稍候！")
+            return
+
+        # 根据选择的类型在后台线程导出
+        file_format = formats.get(selected_filter, 'csv')
+        index_fields = []
+        if file_format == 'sqlite':
+            text, ok = QInputDialog.getText(
+                self, "数据库索引", "建索引的字段（逗号分隔，可留空）：", text="timestamp"
+            )
+            if not ok:
+                return
+            index_fields = [name.strip() for name in text.replace('，', ',').split(',') if name.strip()]
+        self.export_thread = ExportThread(
+            self.parse_result, file_path, file_format, self.current_protocol, index_fields
+        )
+
+        self.export_progress = QProgressDialog("正在导出...", "取消", 0, len(self.export_thread.frames), self)
+        self.export_progress.setWindowTitle("导出结果")
+        self.export_progress.setWindowModality(Qt.WindowModality.WindowModal)
+        self.export_progress.setMinimumDuration(300)
+        self.export_progress.canceled.connect(self.export_thread.cancel)
+
+        self.export_thread.progress.connect(self.on_export_progress)
+        self.export_thread.finished.connect(self.on_export_finished)
+        self.export_thread.error.connect(self.on_export_error)
+        self.export_thread.start()
+
+    def on_export_progress(self, written: int, total: int):
+        """导出进度"""
+        if self.export_progress:
+            self.export_progress.setValue(written)
+
+    def close_export_progress(self):
+        """关闭导出进度对话框"""
+        if self.export_progress:
+            self.export_progress.canceled.disconnect()
+            self.export_progress.close()
+            self.export_progress = None
+
+    def on_export_finished(self, count: int):
+        """导出完成"""
+        self.close_export_progress()
+        QMessageBox.information(self, "成功", f"导出成功！共 {count} 帧")
+
+    def on_export_error(self, error_msg: str):
+        """导出失败或取消"""
+        self.close_export_progress()
+        if error_msg == "导出已取消":
+            self.statusBar().showMessage(error_msg, 3000)
         else:
-            QMessageBox.critical(self, "失败", "导出失败！")
-    
+            QMessageBox.critical(self, "失败", f"导出失败！\n{error_msg}")
+
     # ==================== 协议配置Tab功能 ====================
     
     def update_ui_from_protocol(self):
@@ -599,6 +1743,7 @@ class Main(QMainWindow):
         self.update_protocol_from_ui()
         
         if ProtocolManager.save_protocol(self.current_protocol, file_path):
+            self.set_protocol_path(file_path)
             QMessageBox.information(self, "成功", "协议保存成功！")
         else:
             QMessageBox.critical(self, "失败", "协议保存失败！")
@@ -617,23 +1762,30 @@ class Main(QMainWindow):
         
         self.load_protocol_from_path(file_path)
     
-    def load_protocol_from_path(self, file_path: str):
+    def load_protocol_from_path(self, file_path: str, show_message: bool = True) -> bool:
         """
         从指定路径加载协议
         
         Args:
             file_path: 协议文件路径
+            show_message: 加载成功时是否提示
+            
+        Returns:
+            是否加载成功
         """
         protocol = ProtocolManager.load_protocol(file_path)
         if protocol:
             self.current_protocol = protocol
+            self.set_protocol_path(file_path)
             self.update_ui_from_protocol()
             # 添加到历史记录
             self.protocol_history.add_protocol(file_path, protocol.protocol_name)
             self.update_history_menu()
-            QMessageBox.information(self, "成功", "协议加载成功！")
-        else:
-            QMessageBox.critical(self, "失败", "协议加载失败！请检查文件格式。")
+            if show_message:
+                QMessageBox.information(self, "成功", "协议加载成功！")
+            return True
+        QMessageBox.critical(self, "失败", "协议加载失败！请检查文件格式。")
+        return False
     
     def clear_protocol_history(self):
         """清空历史记录"""
@@ -660,6 +1812,7 @@ class Main(QMainWindow):
         
         if reply == QMessageBox.StandardButton.Yes:
             self.current_protocol = ProtocolManager.get_default_protocol()
+            self.set_protocol_path('')
             self.update_ui_from_protocol()
     
     # ==================== 设置Tab功能 ====================
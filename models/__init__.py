@@ -11,7 +11,7 @@ from .protocol import (
     ChecksumPosition,
     FieldType
 )
-from .data_frame import DataFrame, ParseResult
+from .data_frame import DataFrame, ParseResult, FramingStats, GapIndex
 
 __all__ = [
     'ProtocolConfig',
@@ -21,5 +21,7 @@ __all__ = [
     'ChecksumPosition',
     'FieldType',
     'DataFrame',
-    'ParseResult'
+    'ParseResult',
+    'FramingStats',
+    'GapIndex'
 ]
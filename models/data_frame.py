@@ -3,8 +3,11 @@
 数据模型模块 - 数据帧定义
 """
 
-from typing import Dict, Any, Optional
+from array import array
+from bisect import bisect_right
+from typing import Dict, Any, Iterable, Iterator, Optional, Tuple
 from dataclasses import dataclass, field
+from datetime import datetime
 
 
 @dataclass
@@ -15,6 +18,13 @@ class DataFrame:
     end_position: int  # 在原始数据中的结束位置
     raw_data: bytes  # 原始字节数据
     
+    # 数据来源（串口名、网络连接等，粘贴分析时为空）
+    channel: str = ""
+    # 解析该帧使用的协议名称（多协议分流解析时记录，单协议解析时为空）
+    protocol_name: str = ""
+    # 到达时间（Unix时间戳，实时采集时记录）
+    timestamp: Optional[float] = None
+    
     # 解析后的字段数据
     fields: Dict[str, Any] = field(default_factory=dict)
     # 字段类型映射（字段名 -> 类型字符串）
@@ -53,6 +63,12 @@ class DataFrame:
         self.has_error = True
         self.error_message = message
     
+    def get_timestamp_text(self) -> str:
+        """获取到达时间文本"""
+        if self.timestamp is None:
+            return ""
+        return datetime.fromtimestamp(self.timestamp).strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]
+    
     def get_raw_data_hex(self) -> str:
         """获取原始数据的十六进制字符串"""
         return ' '.join(f'{b:02X}' for b in self.raw_data)
@@ -79,6 +95,12 @@ class DataFrame:
         lines.append(f"  数据帧 #{self.frame_number}")
         lines.append("=" * 80)
         lines.append(f"  位置范围: {self.start_position} - {self.end_position} ({len(self.raw_data)} 字节)")
+        if self.channel:
+            lines.append(f"  数据来源: {self.channel}")
+        if self.protocol_name:
+            lines.append(f"  协议: {self.protocol_name}")
+        if self.timestamp is not None:
+            lines.append(f"  到达时间: {self.get_timestamp_text()}")
         lines.append("")
         lines.append(f"  原始数据:")
         lines.append(f"  {self.get_raw_data_hex()}")
@@ -148,6 +170,12 @@ class DataFrame:
         
         html_parts.append(f"<div class='header'>数据帧 #{self.frame_number}</div>")
         html_parts.append(f"<div class='section'>位置范围: {self.start_position} - {self.end_position} ({len(self.raw_data)} 字节)</div>")
+        if self.channel:
+            html_parts.append(f"<div>数据来源: {self.channel}</div>")
+        if self.protocol_name:
+            html_parts.append(f"<div>协议: {self.protocol_name}</div>")
+        if self.timestamp is not None:
+            html_parts.append(f"<div>到达时间: {self.get_timestamp_text()}</div>")
         html_parts.append(f"<div class='section'>原始数据:<br/>{self.get_raw_data_hex()}</div>")
         
         if self.fields:
@@ -196,11 +224,177 @@ class DataFrame:
         return ''.join(html_parts)
 
 
+@dataclass
+class FramingStats:
+    """分帧统计（重同步分帧模式下记录）"""
+    scanned_bytes: int = 0  # 已判定的字节数（流式分帧时末尾未完成的帧不计入）
+    framed_bytes: int = 0  # 组成帧的字节数
+    rejected_candidates: int = 0  # 帧长或校验不符而放弃的帧头
+    resync_events: int = 0  # 失步后重新寻找帧头的次数
+    in_sync: bool = True  # 扫描结束时是否处于同步状态（流式分帧时传给下一段数据）
+    
+    @property
+    def skipped_bytes(self) -> int:
+        """未组成帧而跳过的字节数"""
+        return self.scanned_bytes - self.framed_bytes
+    
+    def merge(self, other: 'FramingStats'):
+        """累加另一段数据的统计"""
+        self.scanned_bytes += other.scanned_bytes
+        self.framed_bytes += other.framed_bytes
+        self.rejected_candidates += other.rejected_candidates
+        self.resync_events += other.resync_events
+        self.in_sync = other.in_sync
+    
+    def get_summary(self) -> str:
+        """获取统计摘要"""
+        return (f"跳过字节: {self.skipped_bytes}, "
+                f"重同步: {self.resync_events} 次, "
+                f"放弃帧头: {self.rejected_candidates}")
+
+
+class GapIndex:
+    """
+    未成帧间隙的区间索引
+    
+    记录帧之间（以及第一帧之前、最后一帧之后）未组成帧的字节区间，
+    起始位置和长度保存在两个按位置排序的整数数组中，按位置查询为二分查找。
+    间隙内容不复制，需要时从原始数据中按位置读取。
+    """
+    
+    def __init__(self, data_length: int = 0, data: Optional[bytes] = None):
+        """
+        初始化
+        
+        Args:
+            data_length: 原始数据总字节数
+            data: 原始数据（只保存引用，用于读取间隙内容），为None时不能读取内容
+        """
+        self.data_length = data_length
+        self.data = data
+        self.starts = array('q')
+        self.lengths = array('q')
+        self.gap_bytes = 0
+    
+    @classmethod
+    def from_positions(cls, positions: Iterable[Tuple[int, int]], data_length: int,
+                       data: Optional[bytes] = None) -> 'GapIndex':
+        """
+        由按位置排序的帧位置生成间隙索引
+        
+        Args:
+            positions: 帧位置 [(start, end), ...]
+            data_length: 原始数据总字节数
+            data: 原始数据
+            
+        Returns:
+            间隙索引
+        """
+        index = cls(data_length, data)
+        starts, lengths = index.starts, index.lengths
+        pos = 0
+        for start, end in positions:
+            if start > pos:
+                starts.append(pos)
+                lengths.append(start - pos)
+            pos = end
+        if data_length > pos:
+            starts.append(pos)
+            lengths.append(data_length - pos)
+        index.gap_bytes = sum(lengths)
+        return index
+    
+    def __len__(self) -> int:
+        return len(self.starts)
+    
+    def __getitem__(self, index: int) -> Tuple[int, int]:
+        """第 index 个间隙的 (起始位置, 长度)"""
+        return self.starts[index], self.lengths[index]
+    
+    def __iter__(self) -> Iterator[Tuple[int, int]]:
+        return zip(self.starts, self.lengths)
+    
+    @property
+    def coverage(self) -> float:
+        """组成帧的字节占原始数据的比例（0~1，空数据为1）"""
+        if self.data_length == 0:
+            return 1.0
+        return 1.0 - self.gap_bytes / self.data_length
+    
+    @property
+    def nbytes(self) -> int:
+        """索引数组占用的字节数"""
+        return self.starts.itemsize * len(self.starts) + self.lengths.itemsize * len(self.lengths)
+    
+    def find(self, position: int) -> int:
+        """
+        查找包含指定位置的间隙
+        
+        Args:
+            position: 原始数据中的位置
+            
+        Returns:
+            间隙序号，该位置在帧内时返回-1
+        """
+        index = bisect_right(self.starts, position) - 1
+        if index >= 0 and position < self.starts[index] + self.lengths[index]:
+            return index
+        return -1
+    
+    def get_bytes(self, index: int, max_bytes: Optional[int] = None) -> bytes:
+        """
+        读取间隙内容
+        
+        Args:
+            index: 间隙序号
+            max_bytes: 最多读取的字节数，为None时读取全部
+            
+        Returns:
+            间隙的字节数据（没有原始数据时为空）
+        """
+        if self.data is None:
+            return b''
+        start, length = self[index]
+        if max_bytes is not None:
+            length = min(length, max_bytes)
+        return bytes(self.data[start:start + length])
+    
+    def get_preview_hex(self, index: int, max_bytes: int = 16) -> str:
+        """获取间隙开头字节的十六进制预览"""
+        preview = ' '.join(f'{b:02X}' for b in self.get_bytes(index, max_bytes))
+        if self.lengths[index] > max_bytes and preview:
+            preview += ' ...'
+        return preview
+    
+    def get_detailed_info(self, index: int, max_bytes: int = 256) -> str:
+        """获取间隙的详细信息（用于显示在详情区）"""
+        start, length = self[index]
+        lines = []
+        lines.append("=" * 80)
+        lines.append(f"  未成帧间隙 #{index + 1}")
+        lines.append("=" * 80)
+        lines.append(f"  位置范围: {start} - {start + length} ({length} 字节)")
+        lines.append("")
+        lines.append("  原始数据:")
+        lines.append(f"  {self.get_preview_hex(index, max_bytes)}")
+        lines.append("=" * 80)
+        return '\n'.join(lines)
+    
+    def get_summary(self) -> str:
+        """获取统计摘要"""
+        return (f"未成帧间隙: {len(self)} 处 / {self.gap_bytes} 字节, "
+                f"覆盖率: {self.coverage * 100:.1f}%")
+
+
 @dataclass
 class ParseResult:
     """解析结果"""
     frames: list[DataFrame] = field(default_factory=list)
     total_bytes: int = 0
+    # 重同步分帧模式的分帧统计（普通模式为None）
+    framing_stats: Optional[FramingStats] = None
+    # 未成帧间隙索引（从原始数据解析时生成，重新打开的结果和实时采集为None）
+    gaps: Optional[GapIndex] = None
     
     def add_frame(self, frame: DataFrame):
         """添加数据帧"""
@@ -226,6 +420,11 @@ class ParseResult:
     
     def get_summary(self) -> str:
         """获取统计摘要"""
-        return (f"总帧数: {self.get_total_frames()}, "
-                f"有效帧: {self.get_valid_frames()}, "
-                f"错误帧: {self.get_error_frames()}")
+        summary = (f"总帧数: {self.get_total_frames()}, "
+                   f"有效帧: {self.get_valid_frames()}, "
+                   f"错误帧: {self.get_error_frames()}")
+        if self.framing_stats is not None:
+            summary += f", {self.framing_stats.get_summary()}"
+        if self.gaps is not None:
+            summary += f", 覆盖率: {self.gaps.coverage * 100:.1f}%"
+        return summary
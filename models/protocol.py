@@ -3,11 +3,23 @@
 数据模型模块 - 协议配置和字段定义
 """
 
+import re
 from typing import List, Optional, Dict, Any
 from dataclasses import dataclass, field
 from enum import Enum
 
 
+# 帧头/帧尾模式中的一个字节（去掉空白后）：两位十六进制，可用 ? 通配半字节，
+# 或用 /XX 指定掩码，如 68、??、6?、68/F0（由 core.frame_pattern 编译）
+FRAME_PATTERN_TOKEN = r'([0-9A-F?]{2})(?:/([0-9A-F]{2}))?'
+_FRAME_PATTERN_RE = re.compile(f'(?:{FRAME_PATTERN_TOKEN})+')
+
+
+def is_valid_frame_pattern(text: str) -> bool:
+    """帧头/帧尾是否是有效的十六进制模式（不检查是否包含固定字节）"""
+    return bool(_FRAME_PATTERN_RE.fullmatch(re.sub(r'\s+', '', text).upper()))
+
+
 class ChecksumType(Enum):
     """校验类型枚举"""
     NONE = "无校验"
@@ -98,7 +110,7 @@ class ProtocolConfig:
     description: str = ""
     
     # 帧标识
-    frame_header: str = "68"  # 十六进制字符串
+    frame_header: str = "68"  # 十六进制字符串，可包含通配/掩码字节，如 "68 ?? ?? ?? ?? ?? ?? 68"
     frame_tail: str = "16"    # 十六进制字符串
     
     # 校验配置
@@ -109,11 +121,8 @@ class ProtocolConfig:
     
     def __post_init__(self):
         """数据验证"""
-        # 确保帧头帧尾是有效的十六进制
-        try:
-            int(self.frame_header, 16)
-            int(self.frame_tail, 16)
-        except ValueError:
+        # 确保帧头帧尾是有效的十六进制（模式）
+        if not is_valid_frame_pattern(self.frame_header) or not is_valid_frame_pattern(self.frame_tail):
             raise ValueError("帧头或帧尾不是有效的十六进制字符串")
     
     def add_field(self, field_def: FieldDefinition):
@@ -148,11 +157,11 @@ class ProtocolConfig:
             self.fields[index + 1].order = index + 1
     
     def get_header_bytes(self) -> bytes:
-        """获取帧头字节"""
+        """获取帧头字节（帧头包含通配/掩码字节时抛出 ValueError）"""
         return bytes.fromhex(self.frame_header)
     
     def get_tail_bytes(self) -> bytes:
-        """获取帧尾字节"""
+        """获取帧尾字节（帧尾包含通配/掩码字节时抛出 ValueError）"""
         return bytes.fromhex(self.frame_tail)
     
     def to_dict(self) -> Dict[str, Any]:
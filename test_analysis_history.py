@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试分析历史记录存储
+"""
+
+import json
+import os
+import random
+import sys
+import tempfile
+
+# 添加项目路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core import ProtocolManager
+from core.analysis_history import (
+    AnalysisHistory, INDEX_BITMAP, bitmap_contains, capture_grams
+)
+from core.columns import is_numpy_available
+
+
+def add_records(history, count, protocol_name="协议A"):
+    """添加若干条记录"""
+    for i in range(count):
+        history.add_analysis(protocol_name, f"68 {i:02X} 16", 3, 2, 1, [
+            {'frame_number': 1, 'has_error': False, 'checksum_valid': True, 'raw_data_hex': '68 16'}
+        ])
+
+
+def test_pagination_and_filter():
+    """测试分页查询和按协议筛选"""
+    with tempfile.TemporaryDirectory() as tmp:
+        history = AnalysisHistory(history_dir=tmp)
+        add_records(history, 25, "协议A")
+        add_records(history, 5, "协议B")
+
+        assert history.count() == 30
+        assert history.count(protocol_name="协议A") == 25
+        assert history.get_protocol_names() == ["协议A", "协议B"]
+
+        # 最新的在前
+        first_page = history.query(0, 10)
+        assert len(first_page) == 10
+        assert first_page[0]['protocol_name'] == "协议B"
+        assert history.query(20, 10, protocol_name="协议A")[-1]['input_data'] == "68 00 16"
+        assert history.get_record(0) == first_page[0]
+        assert history.get_record(30) == {}
+        assert first_page[0]['frame_summary'][0]['raw_data_hex'] == '68 16'
+
+        # 时间范围
+        timestamp = first_page[0]['timestamp']
+        assert history.count(start=timestamp) >= 1
+        assert history.count(end=history.query(29, 1)[0]['timestamp']) == 0
+        history.conn.close()
+
+        # 重新打开后记录仍在
+        history = AnalysisHistory(history_dir=tmp)
+        assert history.count() == 30
+        history.clear_history()
+        assert history.count() == 0
+        history.conn.close()
+
+
+def test_eviction():
+    """测试超出上限时删除旧记录和旧快照"""
+    with tempfile.TemporaryDirectory() as tmp:
+        history = AnalysisHistory(max_history=10, max_snapshots=2, history_dir=tmp)
+        paths = []
+        for i in range(5):
+            path = history.new_snapshot_path()
+            with open(path, 'wb') as f:
+                f.write(b'snapshot')
+            paths.append(path)
+            history.add_analysis("协议A", "68 16", 1, 1, 0, [], snapshot_path=path)
+
+        # 只保留最近两条记录的快照
+        assert [os.path.exists(path) for path in paths] == [False, False, False, True, True]
+        assert [r['snapshot_path'] for r in history.query(0, 5)] == [paths[4], paths[3], '', '', '']
+
+        add_records(history, 20)
+        assert history.count() == 10
+        history.conn.close()
+
+
+def test_migrate_json():
+    """测试旧版本JSON历史记录迁移"""
+    with tempfile.TemporaryDirectory() as tmp:
+        records = [
+            {'timestamp': '2024-01-02T00:00:00', 'protocol_name': '新', 'input_data': 'BB',
+             'total_frames': 2, 'valid_frames': 2, 'error_frames': 0, 'frame_summary': []},
+            {'timestamp': '2024-01-01T00:00:00', 'protocol_name': '旧', 'input_data': 'AA',
+             'total_frames': 1, 'valid_frames': 1, 'error_frames': 0, 'frame_summary': []},
+        ]
+        with open(os.path.join(tmp, 'analysis_history.json'), 'w', encoding='utf-8') as f:
+            json.dump(records, f)
+
+        history = AnalysisHistory(history_dir=tmp)
+        assert [r['protocol_name'] for r in history.get_history()] == ['新', '旧']
+        assert not os.path.exists(os.path.join(tmp, 'analysis_history.json'))
+        history.conn.close()
+
+        # 再次打开不会重复导入
+        history = AnalysisHistory(history_dir=tmp)
+        assert history.count() == 2
+        history.conn.close()
+
+
+def test_capture_replay():
+    """测试捕获数据按哈希保存、去重，并在记录淘汰后删除"""
+    with tempfile.TemporaryDirectory() as tmp:
+        history = AnalysisHistory(max_history=2, history_dir=tmp)
+        protocol = ProtocolManager.get_default_protocol()
+        data = bytes.fromhex("68 01 03 02 AA BB 6B 16") * 1000
+
+        hashes = history.store_capture(data, protocol)
+        assert history.store_capture(data, protocol) == hashes
+        for _ in range(2):
+            history.add_analysis("示例", data.hex(), 1000, 1000, 0, [],
+                                 capture_hash=hashes[0], protocol_hash=hashes[1])
+        loaded_protocol, loaded_data = history.load_capture(history.get_record(0))
+        assert loaded_data == data
+        assert loaded_protocol.to_dict() == protocol.to_dict()
+
+        # 同一捕获仍被一条记录引用时不删除
+        add_records(history, 1)
+        assert history.blob_store.has(hashes[0])
+        add_records(history, 1)
+        assert not history.blob_store.has(hashes[0])
+        assert history.load_capture(history.get_record(0)) == (None, None)
+        history.conn.close()
+
+
+def test_hex_search():
+    """测试按捕获数据中的十六进制片段搜索"""
+    with tempfile.TemporaryDirectory() as tmp:
+        history = AnalysisHistory(history_dir=tmp)
+        protocol = ProtocolManager.get_default_protocol()
+        captures = [bytes([i, i + 1, i + 2, 0x16]) * 50 for i in range(20)]
+        captures.append(bytes.fromhex("AA 68 01 03 02 BB"))
+        captures.append(bytes.fromhex("F1 F2 F3 09 F2 F3 F4"))
+        for data in captures:
+            capture_hash, protocol_hash = history.store_capture(data, protocol)
+            history.add_analysis("示例", data.hex(' '), 1, 1, 0, [],
+                                 capture_hash=capture_hash, protocol_hash=protocol_hash)
+        # 没有保存捕获数据的旧记录在预览中查找
+        history.add_analysis("旧", "68 01 03 05", 1, 1, 0, [])
+
+        assert history.count(hex_pattern="68 01 03") == 2
+        assert [r['protocol_name'] for r in history.query(hex_pattern="680103")] == ["旧", "示例"]
+        # 字节组都存在但不连续时不匹配
+        assert history.count(hex_pattern="F1 F2 F3 F4") == 0
+        assert history.count(hex_pattern="F2 F3 09 F2") == 1
+        # 少于3字节时直接查找数据
+        assert history.count(hex_pattern="16 05") == 1
+        assert history.count(hex_pattern="68 01 03", protocol_name="示例") == 1
+
+        # 未建索引的捕获仍能搜索到
+        unindexed = bytes(range(256)) * 4 + bytes.fromhex("DE AD BE EF")
+        capture_hash, protocol_hash = history.store_capture(unindexed, protocol)
+        history._pending_grams[capture_hash] = (None, None)
+        history.add_analysis("未索引", "", 1, 1, 0, [], capture_hash=capture_hash, protocol_hash=protocol_hash)
+        assert history.count(hex_pattern="DE AD BE EF") == 1
+
+        # 字节组过多的大捕获用位图索引
+        large = random.Random(5).randbytes(300000) + bytes.fromhex("CA FE BA BE 01")
+        capture_hash, protocol_hash = history.store_capture(large, protocol)
+        grams, bitmap = history._pending_grams[capture_hash]
+        history.add_analysis("大", "", 1, 1, 0, [], capture_hash=capture_hash, protocol_hash=protocol_hash)
+        if is_numpy_available():
+            assert grams is None and bitmap is not None
+            assert bitmap_contains(bitmap, capture_grams(large[:1000], limit=10000))
+            assert history.conn.execute("SELECT indexed FROM captures WHERE capture_hash = ?",
+                                        (capture_hash,)).fetchone()[0] == INDEX_BITMAP
+        assert [r['protocol_name'] for r in history.query(hex_pattern="CA FE BA BE 01")] == ["大"]
+        assert history.count(hex_pattern=large[123456:123470].hex()) == 1
+
+        # 粘贴的串口日志保存日志文本，按其中的数据字节搜索
+        log_text = ("[2026-10-01 12:00:01.100] TX: 68 02 01\n"
+                    "[2026-10-01 12:00:01.120] RX: 77 88 99 16\n").encode('utf-8')
+        capture_hash, protocol_hash = history.store_capture(log_text, protocol)
+        history.add_analysis("日志", "", 1, 1, 0, [], capture_hash=capture_hash, protocol_hash=protocol_hash)
+        assert [r['protocol_name'] for r in history.query(hex_pattern="01 77 88 99")] == ["日志"]
+        assert history.load_capture(history.get_record(0))[1] == log_text
+
+        try:
+            history.count(hex_pattern="XYZ")
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("未拒绝无效的十六进制片段")
+        history.conn.close()
+
+
+def main():
+    """运行所有测试"""
+    tests = [
+        ("分页与筛选", test_pagination_and_filter),
+        ("淘汰旧记录", test_eviction),
+        ("迁移JSON历史", test_migrate_json),
+        ("捕获数据重放", test_capture_replay),
+        ("十六进制搜索", test_hex_search),
+    ]
+
+    passed = 0
+    for name, test in tests:
+        try:
+            test()
+            print(f"✅ 通过 - {name}")
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ 失败 - {name}: {e}")
+
+    print(f"\n总计: {passed}/{len(tests)} 个测试通过")
+    return 0 if passed == len(tests) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
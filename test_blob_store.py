@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试内容寻址数据块存储
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+# 添加项目路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core.blob_store import BlobStore
+
+
+def test_dedup_roundtrip():
+    """测试相同内容只保存一份且读回一致"""
+    with tempfile.TemporaryDirectory() as tmp:
+        store = BlobStore(tmp)
+        data = bytes.fromhex("68 01 03 02 AA BB 6B 16") * 10000
+        digest = store.put(data)
+        size = store.total_size()
+        assert store.put(data) == digest
+        assert store.total_size() == size
+        # 压缩保存
+        assert size < len(data) // 10
+        assert store.get(digest) == data
+        assert store.get('0' * 64) is None
+
+        # 损坏的数据块不返回
+        path = store._path(digest)
+        with open(path, 'wb') as f:
+            f.write(b'broken')
+        assert store.get(digest) is None
+
+
+def test_lru_eviction():
+    """测试超出上限时淘汰最久未用的数据块"""
+    with tempfile.TemporaryDirectory() as tmp:
+        store = BlobStore(tmp, max_bytes=0)
+        digests = [store.put(os.urandom(1000)) for _ in range(3)]
+        # 设置使用时间：第一个最久未用，读取第二个后它变为最近使用
+        now = time.time()
+        for i, digest in enumerate(digests):
+            os.utime(store._path(digest), (now - 100 + i, now - 100 + i))
+        assert store.get(digests[1]) is not None
+
+        store.max_bytes = 2500
+        new_digest = store.put(os.urandom(1000))
+        assert [store.has(d) for d in digests] == [False, True, False]
+        assert store.has(new_digest)
+
+        # 同一条记录的数据块一起保留
+        store.max_bytes = 1500
+        first = store.put(os.urandom(1000))
+        second = store.put(os.urandom(1000), keep=(first,))
+        assert store.has(first) and store.has(second)
+
+        store.clear()
+        assert store.total_size() == 0
+
+
+def main():
+    """运行所有测试"""
+    tests = [
+        ("去重与读回", test_dedup_roundtrip),
+        ("LRU淘汰", test_lru_eviction),
+    ]
+
+    passed = 0
+    for name, test in tests:
+        try:
+            test()
+            print(f"✅ 通过 - {name}")
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ 失败 - {name}: {e}")
+
+    print(f"\n总计: {passed}/{len(tests)} 个测试通过")
+    return 0 if passed == len(tests) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
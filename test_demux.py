@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试多协议分流解析
+"""
+
+import os
+import random
+import sys
+
+# 添加项目路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from models import ProtocolConfig, FieldDefinition, FieldType, ChecksumConfig, ChecksumType
+from core import DataParser, ProtocolManager
+from core.demux import MultiProtocolParser
+from core.frame_filter import FrameFilter
+from test_protocol_library import make_frame
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def make_modbus_protocol() -> ProtocolConfig:
+    """帧头 AA 55、帧尾 0D 的定长协议"""
+    protocol = ProtocolConfig(protocol_name="Modbus风格", frame_header="AA55", frame_tail="0D",
+                              checksum_config=ChecksumConfig(checksum_type=ChecksumType.XOR,
+                                                             start_offset=-1, end_offset=-2))
+    protocol.add_field(FieldDefinition("从站地址", 1, FieldType.UINT8))
+    protocol.add_field(FieldDefinition("寄存器", 2, FieldType.UINT16))
+    return protocol
+
+
+def test_interleaved():
+    """测试交替出现的两种协议一次解析，结果与分别解析一致"""
+    example = ProtocolManager.load_protocol(os.path.join(BASE_DIR, 'protocol_example.json'))
+    modbus = make_modbus_protocol()
+    rng = random.Random(1)
+    chunks = []
+    for i in range(200):
+        if rng.random() < 0.5:
+            chunks.append(make_frame(example, bytes([1, 3, 2, i % 0x10, (250 - i % 0x10) % 256])))
+        else:
+            chunks.append(make_frame(modbus, bytes([i % 0x0D, i % 0x0C, 0])))
+        chunks.append(bytes([0xFF]) * rng.randint(0, 3))
+    data = b''.join(chunks)
+
+    result = MultiProtocolParser([example, modbus]).parse_bytes(data)
+    assert result.get_total_frames() == 200
+    assert result.get_error_frames() == 0
+    assert [f.frame_number for f in result.frames] == list(range(1, 201))
+    positions = [f.start_position for f in result.frames]
+    assert positions == sorted(positions)
+
+    # 每种协议的帧与单独用该协议解析得到的帧一致
+    for protocol in (example, modbus):
+        tagged = [f for f in result.frames if f.protocol_name == protocol.protocol_name]
+        single = [f for f in DataParser(protocol).parse_bytes(data).frames if not f.has_error]
+        assert [(f.start_position, f.fields) for f in tagged] == [(f.start_position, f.fields) for f in single]
+
+    # 按协议过滤
+    matched = FrameFilter("protocol == 'Modbus风格' and 寄存器 < 0x10").filter(result.frames)
+    assert matched and all(f.protocol_name == "Modbus风格" and f.get_field('寄存器') < 0x10 for f in matched)
+
+
+def test_shared_header():
+    """测试帧头相同的协议按校验和帧长分派"""
+    example = ProtocolManager.load_protocol(os.path.join(BASE_DIR, 'protocol_example.json'))
+    industrial = ProtocolManager.load_protocol(os.path.join(BASE_DIR, 'protocol_industrial_fixed.json'))
+    frames = []
+    for i in range(20):
+        frames.append(make_frame(example, bytes([1, 3, 2, i, (250 - i) % 256])))
+        frames.append(make_frame(industrial, bytes([1, i]) + b'A' * 79))
+    result = MultiProtocolParser([example, industrial]).parse_bytes(b''.join(frames))
+
+    names = [f.protocol_name for f in result.frames]
+    assert names == ['示例协议', '工业通信器物协议'] * 20, names
+    assert result.get_error_frames() == 0
+
+
+def test_reject_swallowing_frame():
+    """测试未通过校验且夹着其他协议帧头的候选帧不被接受"""
+    example = ProtocolManager.load_protocol(os.path.join(BASE_DIR, 'protocol_example.json'))
+    other = ProtocolConfig(protocol_name="EB90协议", frame_header="EB90", frame_tail="16",
+                           checksum_config=ChecksumConfig(checksum_type=ChecksumType.XOR,
+                                                          start_offset=-1, end_offset=-2))
+    other.add_field(FieldDefinition("数据", 4, FieldType.UINT32))
+    frames = [make_frame(example, bytes([1, 3, 2, i, (250 - i) % 256])) for i in range(10)]
+    result = MultiProtocolParser([example, other]).parse_bytes(bytes.fromhex("EB 90") + b''.join(frames))
+    assert [f.protocol_name for f in result.frames] == ['示例协议'] * 10
+    assert [f.raw_data for f in result.frames] == frames
+    assert result.get_error_frames() == 0
+
+    # 只有其他协议帧头、没有帧尾的噪声（帧尾在很远处）之后的帧仍能找到
+    noise = bytes.fromhex("EB 90 00") * 5000
+    result = MultiProtocolParser([example, other]).parse_bytes(noise + b''.join(frames))
+    assert [f.raw_data for f in result.frames] == frames
+
+    # 没有夹着其他帧头的错误帧仍然保留
+    result = MultiProtocolParser([example, other]).parse(
+        "EB 90 01 02 03 04 FF 16 " + frames[0].hex(' '))
+    assert [(f.protocol_name, f.has_error) for f in result.frames] == [('EB90协议', True), ('示例协议', False)]
+
+
+def test_single_protocol():
+    """测试只有一个协议时与 DataParser 结果一致"""
+    protocol = ProtocolManager.get_default_protocol()
+    hex_string = "68 01 03 02 AA BB 6B 16 FF 68 02 01 00 03 16 68 01"
+    expected = DataParser(protocol).parse(hex_string)
+    result = MultiProtocolParser([protocol]).parse(hex_string)
+    assert ([(f.start_position, f.end_position, f.fields, f.has_error) for f in result.frames]
+            == [(f.start_position, f.end_position, f.fields, f.has_error) for f in expected.frames])
+    assert MultiProtocolParser([protocol]).parse("XYZ").frames[0].has_error
+
+
+def main():
+    """运行所有测试"""
+    tests = [
+        ("交替协议分流", test_interleaved),
+        ("相同帧头分派", test_shared_header),
+        ("拒绝吞帧的错误帧", test_reject_swallowing_frame),
+        ("单协议一致", test_single_protocol),
+    ]
+
+    passed = 0
+    for name, test in tests:
+        try:
+            test()
+            print(f"✅ 通过 - {name}")
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ 失败 - {name}: {e}")
+
+    print(f"\n总计: {passed}/{len(tests)} 个测试通过")
+    return 0 if passed == len(tests) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
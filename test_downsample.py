@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试趋势图降采样
+"""
+
+import os
+import sys
+
+# 添加项目路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core.columns import is_numpy_available
+
+
+def test_pyramid_view():
+    """测试金字塔窗口降采样保留极值"""
+    if not is_numpy_available():
+        return
+    import numpy as np
+    from core.downsample import MinMaxPyramid
+    
+    count = 1_000_000
+    x = np.arange(count, dtype=np.float64)
+    y = np.sin(x / 1000.0)
+    y[123456] = 50.0
+    pyramid = MinMaxPyramid(x, y)
+    assert len(pyramid.levels) > 1
+    
+    # 全部范围：点数受限且尖峰保留
+    view_x, view_y = pyramid.get_view(None, None, 2000)
+    assert len(view_x) <= 2000 and view_y.max() == 50.0
+    assert np.all(np.diff(view_x) >= 0)
+    
+    # 放大后返回原始点
+    view_x, view_y = pyramid.get_view(123450, 123460, 2000)
+    assert view_x[0] <= 123450 and view_x[-1] >= 123460
+    assert 50.0 in view_y and len(view_x) == 12
+    
+    # LTTB
+    view_x, view_y = pyramid.get_view(100000, 200000, 1000, method='lttb')
+    assert len(view_x) == 1000 and view_y.max() == 50.0
+
+
+def test_lttb():
+    """测试LTTB保留首尾点和点数"""
+    if not is_numpy_available():
+        return
+    import numpy as np
+    from core.downsample import lttb
+    
+    x = np.arange(100, dtype=np.float64)
+    y = (x - 50) ** 2
+    out_x, out_y = lttb(x, y, 10)
+    assert len(out_x) == 10
+    assert out_x[0] == 0 and out_x[-1] == 99
+    assert np.all(np.diff(out_x) > 0)
+
+
+def main():
+    """运行所有测试"""
+    tests = [
+        ("金字塔降采样", test_pyramid_view),
+        ("LTTB降采样", test_lttb),
+    ]
+    
+    passed = 0
+    for name, test in tests:
+        try:
+            test()
+            print(f"✅ 通过 - {name}")
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ 失败 - {name}: {e}")
+    
+    print(f"\n总计: {passed}/{len(tests)} 个测试通过")
+    return 0 if passed == len(tests) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
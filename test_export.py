@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试流式导出
+"""
+
+import os
+import sys
+import tempfile
+
+# 添加项目路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from models import DataFrame
+from utils import stream_export, get_txt_header, ExportCancelled, iter_capture_file
+from utils.helpers import format_txt_chunk, format_csv_chunk, CSV_HEADER
+
+
+def make_frames(count=1000):
+    """构造测试帧"""
+    frames = []
+    for i in range(count):
+        frame = DataFrame(frame_number=i + 1, start_position=i * 4, end_position=i * 4 + 4,
+                          raw_data=bytes([0x68, i % 256, 0x00, 0x16]))
+        frame.add_field("值", i, "uint16")
+        if i % 7 == 0:
+            frame.set_checksum_result(False, 0x12, 0x34)
+        frames.append(frame)
+    return frames
+
+
+def read_text(path, encoding='utf-8'):
+    with open(path, encoding=encoding) as f:
+        return f.read()
+
+
+def test_stream_export():
+    """测试分批导出与整体格式化结果一致"""
+    frames = make_frames()
+    with tempfile.TemporaryDirectory() as tmp:
+        txt_path = os.path.join(tmp, 'out.txt')
+        progress = []
+        count = stream_export(iter(frames), txt_path, 'txt', get_txt_header(), total=len(frames),
+                              progress=lambda done, total: progress.append(done), chunk_size=64)
+        assert count == len(frames)
+        assert progress[-1] == len(frames) and progress == sorted(progress)
+        assert read_text(txt_path) == get_txt_header() + format_txt_chunk(frames)
+
+        csv_path = os.path.join(tmp, 'out.csv')
+        stream_export(iter(frames), csv_path, 'csv', chunk_size=64)
+        text = read_text(csv_path, 'utf-8-sig')
+        assert text.startswith(','.join(CSV_HEADER))
+        assert text.count('\n') == len(frames) + 1
+
+        # 多进程格式化结果相同
+        parallel_path = os.path.join(tmp, 'parallel.csv')
+        stream_export(iter(frames), parallel_path, 'csv', chunk_size=64, workers=2)
+        assert read_text(parallel_path, 'utf-8-sig') == text
+        with open(parallel_path, 'rb') as f:
+            assert f.read().endswith(format_csv_chunk(frames).encode('utf-8'))
+
+
+def test_cancel():
+    """测试取消导出时删除未完成的文件"""
+    frames = make_frames()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'out.txt')
+        written = []
+        try:
+            stream_export(frames, path, 'txt', progress=lambda done, total: written.append(done),
+                          is_cancelled=lambda: len(written) >= 2, chunk_size=100)
+        except ExportCancelled:
+            pass
+        else:
+            raise AssertionError("未取消")
+        assert not os.path.exists(path)
+
+
+def test_iter_capture_file():
+    """测试分块读取十六进制文本和二进制文件"""
+    data = bytes(range(256)) * 10
+    with tempfile.TemporaryDirectory() as tmp:
+        hex_path = os.path.join(tmp, 'data.txt')
+        with open(hex_path, 'w') as f:
+            f.write(' '.join(f"{b:02X}" for b in data))
+        # 块大小为奇数，字节会被拆到两个块中
+        assert b''.join(iter_capture_file(hex_path, block_size=7)) == data
+
+        bin_path = os.path.join(tmp, 'data.bin')
+        with open(bin_path, 'wb') as f:
+            f.write(data)
+        assert b''.join(iter_capture_file(bin_path, block_size=100)) == data
+
+
+def test_columnar_export():
+    """测试列式导出（每个字段一列，缺失或超出范围的值为空）"""
+    from utils import export_columnar, load_npz, is_pyarrow_available
+    from utils.columnar_export import np
+    from models import ProtocolConfig, FieldDefinition, FieldType
+    if np is None:
+        return
+    
+    frames = make_frames(300)
+    frames[5].fields["值"] = b"\x01"
+    protocol = ProtocolConfig(protocol_name="测试")
+    protocol.add_field(FieldDefinition("值", 1, FieldType.UINT8))
+    protocol.add_field(FieldDefinition("channel", 1, FieldType.STRING))
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'out.npz')
+        assert export_columnar(iter(frames), path, protocol, row_group_size=64) == 300
+        columns = load_npz(path)
+        assert columns['frame_number'].tolist() == list(range(1, 301))
+        assert columns['值'].dtype == np.uint8
+        # 解析出错的 bytes 值和超出 uint8 范围的值为空
+        assert columns['值'].mask[5] and columns['值'].mask[256] and not columns['值'].mask[4]
+        assert columns['值'][255] == 255
+        assert columns['raw_data'][1] == frames[1].raw_data
+        assert columns['field_channel'].mask.all()
+        assert int(columns['checksum_valid'].sum()) == 300 - 43
+        
+        if is_pyarrow_available():
+            import pyarrow.parquet as pq
+            path = os.path.join(tmp, 'out.parquet')
+            export_columnar(frames, path, protocol, row_group_size=64)
+            parquet = pq.ParquetFile(path)
+            assert parquet.num_row_groups == 5
+            table = parquet.read()
+            assert str(table.schema.field('值').type) == 'uint8'
+            assert table.column('值').null_count == 1 + 44
+            assert table.column('raw_data').to_pylist()[:2] == [f.raw_data for f in frames[:2]]
+
+
+def test_sqlite_export():
+    """测试导出到 SQLite 并重新打开"""
+    import sqlite3
+    from utils import export_sqlite, load_sqlite, list_sqlite_tables, SqliteTable
+    from models import ProtocolConfig, FieldDefinition, FieldType
+    
+    frames = make_frames(300)
+    protocol = ProtocolConfig(protocol_name="测试 协议")
+    protocol.add_field(FieldDefinition("值", 2, FieldType.UINT16))
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'frames.db')
+        assert export_sqlite(iter(frames), path, protocol, index_fields=["值"], chunk_size=64) == 300
+        assert list_sqlite_tables(path) == [("frames_测试_协议", "测试 协议", 300)]
+        
+        loaded_protocol, result = load_sqlite(path)
+        assert loaded_protocol.protocol_name == "测试 协议"
+        assert [f.frame_number for f in result.frames] == list(range(1, 301))
+        assert result.frames[7] == frames[7] and result.frames[8] == frames[8]
+        
+        _, result = load_sqlite(path, where='"值" >= ? AND checksum_valid = 0', params=(100,))
+        assert [f.fields["值"] for f in result.frames] == [i for i in range(100, 300) if i % 7 == 0]
+        
+        # 取消时删除不完整的表
+        try:
+            export_sqlite(frames, path, protocol, table_name="cancelled", chunk_size=64,
+                          is_cancelled=lambda: True)
+        except ExportCancelled:
+            pass
+        conn = sqlite3.connect(path)
+        tables = [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+        conn.close()
+        assert tables == ["protocols", "frames_测试_协议"] and len(list_sqlite_tables(path)) == 1
+        
+        # 重新导出同名表时取消，原有的表保持不变
+        try:
+            export_sqlite(frames[:10], path, protocol, chunk_size=5, is_cancelled=lambda: True)
+        except ExportCancelled:
+            pass
+        assert list_sqlite_tables(path) == [("frames_测试_协议", "测试 协议", 300)]
+        # 重新导出完成后替换原表
+        assert export_sqlite(frames[:10], path, protocol, index_fields=["值"]) == 10
+        assert list_sqlite_tables(path) == [("frames_测试_协议", "测试 协议", 10)]
+        assert export_sqlite(frames, path, protocol, index_fields=["值"]) == 300
+        
+        # 按页读取
+        _, result = load_sqlite(path, limit=50, offset=100)
+        assert [f.frame_number for f in result.frames] == list(range(101, 151))
+        _, result = load_sqlite(path, where='has_error = 0', offset=290)
+        assert result.frames == [f for f in frames if not f.has_error][290:]
+        table = SqliteTable(path)
+        try:
+            assert len(table) == 300 and table.protocol.protocol_name == "测试 协议"
+            assert table.error_count == sum(f.has_error for f in frames)
+            assert table.read_frames(299, 5) == frames[298:]
+            errors = [i + 1 for i, f in enumerate(frames) if f.has_error]
+            assert table.next_error() == errors[0]
+            assert table.next_error(errors[0]) == errors[1]
+            assert table.next_error(300) is None
+        finally:
+            table.close()
+
+
+def main():
+    """运行所有测试"""
+    tests = [
+        ("流式导出", test_stream_export),
+        ("取消导出", test_cancel),
+        ("分块读取捕获文件", test_iter_capture_file),
+        ("列式导出", test_columnar_export),
+        ("SQLite导出", test_sqlite_export),
+    ]
+
+    passed = 0
+    for name, test in tests:
+        try:
+            test()
+            print(f"✅ 通过 - {name}")
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ 失败 - {name}: {e}")
+
+    print(f"\n总计: {passed}/{len(tests)} 个测试通过")
+    return 0 if passed == len(tests) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试字段流式统计
+"""
+
+import math
+import os
+import random
+import statistics
+import sys
+
+# 添加项目路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from models import DataFrame
+from core.columns import FrameColumns, is_numpy_available
+from core.field_stats import FieldStatistics, Histogram
+
+
+def make_frames(count, seed=1):
+    """构造测试帧"""
+    rng = random.Random(seed)
+    frames = []
+    for i in range(count):
+        frame = DataFrame(frame_number=i + 1, start_position=i, end_position=i + 1, raw_data=b"\x68")
+        frame.add_field("电压", rng.randint(3000, 4200), "uint16")
+        frame.add_field("温度", rng.gauss(25.0, 3.0), "float")
+        frame.add_field("数据", b"\x01\x02", "bytes")
+        frames.append(frame)
+    return frames
+
+
+def check_stats(stats, frames):
+    """与标准库结果比较"""
+    voltages = [f.fields["电压"] for f in frames]
+    temperatures = [f.fields["温度"] for f in frames]
+    
+    voltage = stats.fields["电压"]
+    assert voltage.count == len(frames)
+    assert voltage.minimum == min(voltages) and voltage.maximum == max(voltages)
+    assert abs(voltage.mean - statistics.mean(voltages)) < 1e-6
+    assert abs(voltage.get_stddev() - statistics.pstdev(voltages)) < 1e-6
+    assert sum(count for _, _, count in voltage.histogram.get_buckets()) == len(frames)
+    
+    temperature = stats.fields["温度"]
+    assert abs(temperature.get_stddev() - statistics.pstdev(temperatures)) < 1e-6
+    assert stats.fields["数据"].count == 0 and stats.fields["数据"].skipped == len(frames)
+
+
+def test_streaming_stats():
+    """测试逐帧和分批合并的统计结果"""
+    frames = make_frames(5000)
+    
+    stats = FieldStatistics()
+    stats.add_frames(frames)
+    check_stats(stats, frames)
+    
+    merged = FieldStatistics()
+    merged.add_frames(frames[:100])
+    part = FieldStatistics()
+    part.add_frames(frames[100:])
+    merged.merge(part)
+    check_stats(merged, frames)
+
+
+def test_columns_stats():
+    """测试列式数据批量统计"""
+    if not is_numpy_available():
+        return
+    
+    frames = make_frames(5000, seed=2)
+    stats = FieldStatistics()
+    stats.add_columns(FrameColumns.from_frames(frames))
+    check_stats(stats, frames)
+
+
+def test_histogram_growth():
+    """测试直方图在范围外的值出现时加倍桶宽"""
+    histogram = Histogram(bins=10)
+    for value in [5] * 300 + [-1000, 10 ** 6]:
+        histogram.add(value)
+    
+    buckets = histogram.get_buckets()
+    assert len(histogram.counts) == 10
+    assert sum(count for _, _, count in buckets) == 302
+    assert buckets[0][0] <= -1000 and buckets[-1][1] > 10 ** 6
+
+
+def test_nonfinite_values():
+    """测试 NaN 和 ±inf 单独计数，不进入统计量和直方图"""
+    frames = make_frames(300, seed=3)
+    for frame, value in zip(frames, [float('inf'), float('-inf'), float('nan')]):
+        frame.fields["温度"] = value
+    finite = [f.fields["温度"] for f in frames[3:]]
+    
+    batches = [FieldStatistics()]
+    batches[0].add_frames(frames)
+    if is_numpy_available():
+        batches.append(FieldStatistics())
+        batches[1].add_columns(FrameColumns.from_frames(frames))
+    for stats in batches:
+        temperature = stats.fields["温度"]
+        assert temperature.nonfinite == 3 and temperature.skipped == 0
+        assert temperature.count == len(finite)
+        assert temperature.minimum == min(finite) and temperature.maximum == max(finite)
+        assert abs(temperature.mean - statistics.mean(finite)) < 1e-6
+        assert sum(count for _, _, count in temperature.histogram.get_buckets()) == len(finite)
+    
+    # 很大的有限值：批量统计与逐值统计一致，标准差不为 NaN
+    rng = random.Random(4)
+    huge = [rng.uniform(1e160, 1e160 + 1e150) for _ in range(1000)]
+    frames = make_frames(len(huge), seed=4)
+    for frame, value in zip(frames, huge):
+        frame.fields["温度"] = value
+    scalar = FieldStatistics()
+    scalar.add_frames(frames)
+    expected = scalar.fields["温度"].get_stddev()
+    assert math.isfinite(expected) and abs(expected / statistics.pstdev(huge) - 1) < 1e-6
+    if is_numpy_available():
+        batch = FieldStatistics()
+        batch.add_columns(FrameColumns.from_frames(frames))
+        assert abs(batch.fields["温度"].get_stddev() / expected - 1) < 1e-6
+        assert abs(batch.fields["温度"].mean / statistics.mean(huge) - 1) < 1e-9
+
+    histogram = Histogram(bins=10, integer=False)
+    for value in [1.0] * 300 + [float('inf'), float('-inf')]:
+        histogram.add(value)
+    assert sum(histogram.counts) == 300
+
+
+def main():
+    """运行所有测试"""
+    tests = [
+        ("流式统计", test_streaming_stats),
+        ("列式统计", test_columns_stats),
+        ("直方图扩展", test_histogram_growth),
+        ("非有限值", test_nonfinite_values),
+    ]
+    
+    passed = 0
+    for name, test in tests:
+        try:
+            test()
+            print(f"✅ 通过 - {name}")
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ 失败 - {name}: {e}")
+    
+    print(f"\n总计: {passed}/{len(tests)} 个测试通过")
+    return 0 if passed == len(tests) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
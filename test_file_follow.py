@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试文件跟踪（tail -f）模式
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+# 添加项目路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core import ProtocolManager
+from core.file_follow import (
+    FileFollower, PollingWatcher, detect_content_format, FORMAT_BINARY, FORMAT_HEX, FORMAT_LOG
+)
+
+RX_FRAME = bytes.fromhex("68 01 03 01 00 05 16")
+TX_FRAME = bytes.fromhex("68 02 01 00 03 16")
+
+
+def append(path: str, data: bytes):
+    with open(path, 'ab') as f:
+        f.write(data)
+
+
+def wait_frames(follower: FileFollower, count: int, timeout: float = 3.0):
+    """等待跟踪到指定数量的帧"""
+    frames = []
+    deadline = time.monotonic() + timeout
+    while len(frames) < count and time.monotonic() < deadline:
+        frames.extend(follower.get_frames(timeout=0.1))
+    return frames
+
+
+def test_follow_binary():
+    """测试只解析新追加的数据，跨追加的半帧拼接完整"""
+    protocol = ProtocolManager.get_default_protocol()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'capture.bin')
+        append(path, RX_FRAME * 3)
+        follower = FileFollower(path, protocol, wait_timeout=0.05)
+        follower.start()
+        try:
+            append(path, RX_FRAME[:3])
+            time.sleep(0.2)
+            append(path, RX_FRAME[3:] + TX_FRAME)
+            frames = wait_frames(follower, 2)
+            assert [f.raw_data for f in frames] == [RX_FRAME, TX_FRAME]
+            assert [f.frame_number for f in frames] == [1, 2]
+            assert frames[0].channel == 'capture.bin' and frames[0].timestamp is not None
+            assert follower.content_format == FORMAT_BINARY
+
+            # 文件被截断后从新文件开头分帧，帧序号继续
+            with open(path, 'wb') as f:
+                f.write(TX_FRAME)
+            frames = wait_frames(follower, 1)
+            assert [(f.frame_number, f.raw_data) for f in frames] == [(3, TX_FRAME)]
+            assert follower.reopen_count == 1
+        finally:
+            follower.stop()
+        assert not follower.is_running()
+        assert follower.get_stats().frames == 3
+
+
+def test_follow_text():
+    """测试从头读取十六进制文本和串口日志"""
+    protocol = ProtocolManager.get_default_protocol()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'capture.txt')
+        append(path, (RX_FRAME.hex(' ') + ' ').encode() * 2)
+        follower = FileFollower(path, protocol, from_start=True, wait_timeout=0.05)
+        follower.start()
+        try:
+            # 十六进制字符在两个字节中间断开
+            append(path, TX_FRAME.hex(' ')[:4].encode())
+            time.sleep(0.2)
+            append(path, TX_FRAME.hex(' ')[4:].encode() + b'\n')
+            frames = wait_frames(follower, 3)
+            assert [f.raw_data for f in frames] == [RX_FRAME, RX_FRAME, TX_FRAME]
+            assert follower.content_format == FORMAT_HEX
+        finally:
+            follower.stop()
+
+        path = os.path.join(tmp, 'serial.log')
+        append(path, f"[2026-10-01 12:00:01.100] RX: {RX_FRAME.hex(' ')}\n".encode())
+        follower = FileFollower(path, protocol, wait_timeout=0.05)
+        follower.start()
+        try:
+            # 半行先写入，换行后才解析
+            append(path, b"[2026-10-01 12:00:02.500] TX: ")
+            time.sleep(0.2)
+            append(path, TX_FRAME.hex(' ').encode() + b"\n")
+            frames = wait_frames(follower, 1)
+            assert [(f.channel, f.raw_data) for f in frames] == [("TX", TX_FRAME)]
+            assert frames[0].get_timestamp_text() == "2026-10-01 12:00:02.500"
+            assert follower.content_format == FORMAT_LOG
+        finally:
+            follower.stop()
+
+
+def test_backpressure():
+    """测试帧队列满时暂停读取，不丢弃文件中已有的帧"""
+    protocol = ProtocolManager.get_default_protocol()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'capture.bin')
+        append(path, RX_FRAME * 50)
+        follower = FileFollower(path, protocol, from_start=True, wait_timeout=0.05,
+                                block_size=64, max_queued_frames=4)
+        follower.start()
+        try:
+            frames = []
+            deadline = time.monotonic() + 5.0
+            while len(frames) < 50 and time.monotonic() < deadline:
+                time.sleep(0.01)
+                frames.extend(follower.get_frames(max_frames=3))
+            assert [f.frame_number for f in frames] == list(range(1, 51))
+            assert follower.frames_dropped == 0
+        finally:
+            follower.stop()
+
+
+def test_polling_watcher():
+    """测试轮询方式发现文件变化"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'capture.bin')
+        append(path, RX_FRAME)
+        watcher = PollingWatcher(path, interval=0.02)
+        assert not watcher.wait(0.1)
+        append(path, TX_FRAME)
+        assert watcher.wait(0.5)
+        watcher.close()
+
+    assert detect_content_format(RX_FRAME) == FORMAT_BINARY
+    assert detect_content_format(b"68 01 03\n") == FORMAT_HEX
+
+
+def main():
+    """运行所有测试"""
+    tests = [
+        ("跟踪二进制文件", test_follow_binary),
+        ("跟踪文本文件", test_follow_text),
+        ("队列满时暂停读取", test_backpressure),
+        ("轮询监视", test_polling_watcher),
+    ]
+
+    passed = 0
+    for name, test in tests:
+        try:
+            test()
+            print(f"✅ 通过 - {name}")
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ 失败 - {name}: {e}")
+
+    print(f"\n总计: {passed}/{len(tests)} 个测试通过")
+    return 0 if passed == len(tests) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试捕获数据对比功能
+"""
+
+import os
+import random
+import sys
+
+# 添加项目路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core.parser import DataParser
+from core.protocol_manager import ProtocolManager
+from core.frame_compare import FrameComparator, DiffKind, diff_sequences
+from core.live_compare import LiveComparator, SIDE_A, SIDE_B
+from models import DataFrame
+
+
+def check_opcodes(a, b, opcodes):
+    """检查操作码覆盖两个序列且相等段确实相等，返回相同元素数"""
+    i = j = equal = 0
+    for tag, i1, i2, j1, j2 in opcodes:
+        assert (i1, j1) == (i, j)
+        if tag == 'equal':
+            assert a[i1:i2] == b[j1:j2]
+            equal += i2 - i1
+        i, j = i2, j2
+    assert (i, j) == (len(a), len(b))
+    return equal
+
+
+def test_diff_sequences_random():
+    """测试随机编辑后的序列对齐"""
+    rng = random.Random(1)
+    for _ in range(500):
+        a = [rng.randint(0, 5) for _ in range(rng.randint(0, 40))]
+        b = list(a)
+        for _ in range(rng.randint(0, 5)):
+            if b and rng.random() < 0.5:
+                del b[rng.randrange(len(b))]
+            else:
+                b.insert(rng.randint(0, len(b)), rng.randint(0, 5))
+        check_opcodes(a, b, diff_sequences(a, b))
+
+
+def test_diff_sequences_large():
+    """测试大序列中少量编辑能被准确定位"""
+    a = list(range(200000))
+    b = list(a)
+    del b[1000]
+    b.insert(50000, -1)
+    b[150000] = -2
+    opcodes = diff_sequences(a, b)
+    assert check_opcodes(a, b, opcodes) == len(a) - 2
+    assert [op[0] for op in opcodes if op[0] != 'equal'] == ['delete', 'insert', 'replace']
+
+
+def test_frame_compare():
+    """测试帧级对比与字段级差异"""
+    parser = DataParser(ProtocolManager.get_default_protocol())
+    frames_a = parser.parse("68 01 03 02 AA BB 6B 16 68 01 03 01 00 05 16 68 02 03 01 07 0D 16").frames
+    frames_b = parser.parse("68 01 03 02 AA BC 6B 16 68 02 03 01 07 0D 16 68 09 03 00 0C 16").frames
+    
+    result = FrameComparator().compare(frames_a, frames_b)
+    assert result.equal == 1
+    assert [diff.kind for diff in result.diffs] == [DiffKind.CHANGED, DiffKind.MISSING, DiffKind.INSERTED]
+    
+    changed = result.diffs[0]
+    assert (changed.index_a, changed.index_b) == (0, 0)
+    assert [d.name for d in changed.field_diffs] == ["数据"]
+    assert result.diffs[1].frame_a.frame_number == 2
+    assert result.diffs[2].frame_b.frame_number == 3
+    
+    assert FrameComparator().compare(frames_a, frames_a).is_identical()
+
+
+def make_live_frame(number, data, timestamp):
+    """构造带到达时间的帧"""
+    frame = DataFrame(frame_number=number, raw_data=data, start_position=0, end_position=len(data))
+    frame.timestamp = timestamp
+    return frame
+
+
+def test_live_compare():
+    """测试双路实时对比的窗口匹配"""
+    comparator = LiveComparator(window_seconds=1.0, window_frames=100)
+    
+    # B 晚 0.1 秒到达同样的帧
+    results = comparator.add_frame(SIDE_A, make_live_frame(1, b"\x01", 10.0))
+    assert results == []
+    results = comparator.add_frame(SIDE_B, make_live_frame(1, b"\x01", 10.1))
+    assert len(results) == 1 and results[0].is_matched()
+    assert abs(results[0].latency - 0.1) < 1e-9
+    
+    # A 独有的帧超过时间窗口后判定为未匹配
+    comparator.add_frame(SIDE_A, make_live_frame(2, b"\x02", 11.0))
+    results = comparator.expire(12.5)
+    assert len(results) == 1 and results[0].frame_a.frame_number == 2
+    
+    stats = comparator.get_stats()
+    assert stats.matched == 1 and stats.unmatched_a == 1 and stats.unmatched_b == 0
+    assert abs(stats.rolling_match_rate - 0.5) < 1e-9
+    
+    # 长时间运行时待匹配帧数受窗口限制
+    for i in range(1000):
+        comparator.add_frame(SIDE_B, make_live_frame(i, bytes([i % 256, i // 256]), 20.0))
+    stats = comparator.get_stats()
+    assert stats.pending_b == 100 and stats.unmatched_b == 900
+    assert len(comparator.windows[SIDE_B].index) == 100
+
+
+def main():
+    """运行所有测试"""
+    tests = [
+        ("随机序列对齐", test_diff_sequences_random),
+        ("大序列对齐", test_diff_sequences_large),
+        ("帧级对比", test_frame_compare),
+        ("双路实时对比", test_live_compare),
+    ]
+    
+    passed = 0
+    for name, test in tests:
+        try:
+            test()
+            print(f"✅ 通过 - {name}")
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ 失败 - {name}: {e}")
+    
+    print(f"\n总计: {passed}/{len(tests)} 个测试通过")
+    return 0 if passed == len(tests) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
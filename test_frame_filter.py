@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试帧过滤表达式
+"""
+
+import os
+import random
+import sys
+
+# 添加项目路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from models import DataFrame
+from core.columns import FrameColumns, is_numpy_available
+from core.frame_filter import FrameFilter, FilterError
+
+
+def make_frames():
+    """构造测试帧"""
+    frames = []
+    for i in range(100):
+        frame = DataFrame(frame_number=i + 1, start_position=i * 6, end_position=i * 6 + 6,
+                          raw_data=bytes(6))
+        frame.add_field("命令", i % 4, "uint8")
+        frame.add_field("电压", 3500 + i * 2, "uint16")
+        frame.add_field("帧 类型", b"\x01" if i % 2 else b"\x02", "bytes")
+        if i % 10 == 0:
+            frame.set_checksum_result(False, 0x12, 0x34)
+        frames.append(frame)
+    # 缺少字段的帧
+    frames.append(DataFrame(frame_number=101, start_position=600, end_position=603, raw_data=bytes(3)))
+    return frames
+
+
+def test_scalar_filter():
+    """测试逐帧过滤"""
+    frames = make_frames()
+    
+    matched = FrameFilter("命令 == 0x03 and 电压 > 3600").filter(frames)
+    assert [f.frame_number for f in matched] == [52, 56, 60, 64, 68, 72, 76, 80, 84, 88, 92, 96, 100]
+    
+    matched = FrameFilter("not checksum_valid").filter(frames)
+    assert len(matched) == 10
+    
+    matched = FrameFilter("field('帧 类型') == b'\\x01' and 命令 in (1, 3)").filter(frames)
+    assert len(matched) == 50
+    
+    matched = FrameFilter("length < 6").filter(frames)
+    assert [f.frame_number for f in matched] == [101]
+    
+    # 缺少引用字段的帧不匹配（包括取反时）
+    assert len(FrameFilter("not (命令 == 1)").filter(frames)) == 75
+
+
+def test_vector_filter():
+    """测试向量化过滤与逐帧结果一致"""
+    if not is_numpy_available():
+        return
+    
+    frames = make_frames()
+    columns = FrameColumns.from_frames(frames)
+    expressions = [
+        "命令 == 0x03 and 电压 > 3600",
+        "not checksum_valid or 3600 <= 电压 < 3620",
+        "命令 not in (0, 1) and (电压 - 3500) // 2 % 3 == 0",
+        "field('帧 类型') == b'\\x01' and 命令 in (1, 3)",
+        "not (命令 == 1)",
+        "position >= 300",
+        # 短路求值：命令为3的帧不访问缺失的字段
+        "命令 == 3 or 缺失 == 1",
+        "命令 != 3 and 缺失 == 1",
+        # 除数为0的帧不匹配
+        "命令 / 0 > 1",
+        "电压 % 命令 == 0",
+        # int64 溢出时退回逐帧判断（Python 整数不溢出）
+        "电压 * 4000000000000000 < 0",
+        "(电压 << 60) > 0",
+        "-(电压 - 电压 - 9223372036854775807 - 1) > 0",
+    ]
+    for expression in expressions:
+        frame_filter = FrameFilter(expression)
+        assert frame_filter.filter_columns(columns) == frame_filter.filter(frames), expression
+
+
+def random_expression(rng: random.Random, depth: int = 0) -> str:
+    """随机生成过滤表达式"""
+    operands = ["命令", "电压", "偏移", "缺失", "frame_number", "length", "checksum_valid",
+                "0", "1", "3", "-2", "3600", "True", "4000000000000000"]
+    if depth >= 3 or rng.random() < 0.3:
+        return rng.choice(operands)
+    kind = rng.randrange(5)
+    left = random_expression(rng, depth + 1)
+    right = random_expression(rng, depth + 1)
+    if kind == 0:
+        return f"({left} {rng.choice(['+', '-', '*', '/', '//', '%', '&', '|', '^', '<<', '>>'])} {right})"
+    if kind == 1:
+        return f"({left} {rng.choice(['==', '!=', '<', '<=', '>', '>='])} {right})"
+    if kind == 2:
+        return f"({left} {rng.choice(['and', 'or'])} {right})"
+    if kind == 3:
+        return f"({rng.choice(['not ', '-', '~'])}{left})"
+    return f"({left} {rng.choice(['in', 'not in'])} (0, 2, 3600))"
+
+
+def test_vector_fuzz():
+    """测试随机表达式向量化过滤与逐帧结果一致"""
+    if not is_numpy_available():
+        return
+    
+    frames = make_frames()
+    # 只有一半帧有的字段，含负数
+    for i, frame in enumerate(frames[:100]):
+        if i % 2 == 0:
+            frame.add_field("偏移", i - 50, "int8")
+    columns = FrameColumns.from_frames(frames)
+    rng = random.Random(20261019)
+    for _ in range(500):
+        expression = random_expression(rng)
+        frame_filter = FrameFilter(expression)
+        expected = [frame_filter.matches(frame) for frame in frames]
+        assert frame_filter.mask(columns).tolist() == expected, expression
+
+
+def test_invalid_expressions():
+    """测试非法表达式被拒绝"""
+    for expression in ["", "命令 = 1", "__import__('os')", "frame.fields", "[x for x in y]",
+                       "open('a')", "命令 in 电压"]:
+        try:
+            FrameFilter(expression)
+        except FilterError:
+            continue
+        raise AssertionError(f"未拒绝: {expression}")
+
+
+def main():
+    """运行所有测试"""
+    tests = [
+        ("逐帧过滤", test_scalar_filter),
+        ("向量化过滤", test_vector_filter),
+        ("随机表达式", test_vector_fuzz),
+        ("非法表达式", test_invalid_expressions),
+    ]
+    
+    passed = 0
+    for name, test in tests:
+        try:
+            test()
+            print(f"✅ 通过 - {name}")
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ 失败 - {name}: {e}")
+    
+    print(f"\n总计: {passed}/{len(tests)} 个测试通过")
+    return 0 if passed == len(tests) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试未成帧间隙索引
+"""
+
+import os
+import sys
+
+# 添加项目路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from models import GapIndex
+from core import DataParser, ProtocolManager
+from core.demux import MultiProtocolParser
+
+
+def make_capture():
+    """生成帧之间夹有噪声的默认协议数据"""
+    frame = bytes([0x68, 0x01, 0x02, 0x03, 0x16])
+    noise = bytes([0x11, 0x22, 0x33])
+    data = noise + frame + frame + noise + noise + frame + bytes([0x68, 0x05])
+    return data, frame
+
+
+def test_gap_index():
+    """测试由帧位置生成间隙区间和按位置查询"""
+    gaps = GapIndex.from_positions([(3, 8), (8, 13), (19, 24)], 26)
+    assert list(gaps) == [(0, 3), (13, 6), (24, 2)]
+    assert gaps.gap_bytes == 11
+    assert abs(gaps.coverage - 15 / 26) < 1e-9
+    assert gaps.find(0) == 0 and gaps.find(2) == 0
+    assert gaps.find(3) == -1 and gaps.find(12) == -1
+    assert gaps.find(13) == 1 and gaps.find(18) == 1
+    assert gaps.find(25) == 2 and gaps.find(26) == -1
+    # 没有原始数据时不能读取内容
+    assert gaps.get_bytes(0) == b''
+
+    empty = GapIndex.from_positions([], 0)
+    assert len(empty) == 0 and empty.coverage == 1.0
+    assert list(GapIndex.from_positions([(0, 10)], 10)) == []
+
+
+def test_parse_gaps():
+    """测试解析结果记录间隙并在摘要中显示覆盖率"""
+    data, frame = make_capture()
+    result = DataParser(ProtocolManager.get_default_protocol()).parse_bytes(data)
+    assert result.get_total_frames() == 3
+    gaps = result.gaps
+    assert list(gaps) == [(0, 3), (13, 6), (24, 2)]
+    # 间隙内容从原始数据读取
+    assert gaps.data is data
+    assert gaps.get_bytes(1) == bytes([0x11, 0x22, 0x33]) * 2
+    assert gaps.get_bytes(1, 2) == bytes([0x11, 0x22])
+    assert gaps.get_preview_hex(1, 4) == "11 22 33 11 ..."
+    assert gaps.get_preview_hex(2) == "68 05"
+    assert "覆盖率: 57.7%" in result.get_summary()
+    assert "未成帧间隙: 3 处 / 11 字节" in gaps.get_summary()
+    assert "6 字节" in gaps.get_detailed_info(1)
+
+    # 帧的位置加间隙的长度正好覆盖全部数据
+    covered = sum(f.end_position - f.start_position for f in result.frames) + gaps.gap_bytes
+    assert covered == len(data)
+
+    # 多协议分流解析同样记录间隙
+    demuxed = MultiProtocolParser([ProtocolManager.get_default_protocol()]).parse_bytes(data)
+    assert list(demuxed.gaps) == list(gaps)
+
+
+def main():
+    """运行所有测试"""
+    tests = [
+        ("间隙索引", test_gap_index),
+        ("解析结果间隙", test_parse_gaps),
+    ]
+
+    passed = 0
+    for name, test in tests:
+        try:
+            test()
+            print(f"✅ 通过 - {name}")
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ 失败 - {name}: {e}")
+
+    print(f"\n总计: {passed}/{len(tests)} 个测试通过")
+    return 0 if passed == len(tests) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
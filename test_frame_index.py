@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试大捕获文件的 .sdcidx 帧索引
+"""
+
+import os
+import sys
+import tempfile
+
+# 添加项目路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core.frame_index import (
+    FrameIndex, FrameIndexWriter, build_frame_index, open_frame_index, get_index_path
+)
+from core.stream_parser import StreamParser
+from test_resync import make_industrial_frames
+
+ERROR_FRAMES = {0, 7, 8, 300, 301, 1999}
+
+
+def write_capture(path: str, count: int = 2000):
+    """写入带若干校验错误帧的二进制捕获文件，返回协议和完整分帧结果"""
+    protocol, frames = make_industrial_frames(count)
+    data = b''.join(
+        frame[:-2] + bytes([frame[-2] ^ 0xFF]) + frame[-1:] if i in ERROR_FRAMES else frame
+        for i, frame in enumerate(frames)
+    )
+    with open(path, 'wb') as f:
+        f.write(b'\x00\x68' + data)  # 开头有不成帧的字节
+    return protocol, StreamParser(protocol).feed(b'\x00\x68' + data)
+
+
+def frame_keys(frames):
+    return [(f.frame_number, f.start_position, f.raw_data, f.has_error) for f in frames]
+
+
+def test_random_access():
+    """测试从检查点开始分帧，结果与从头分帧一致"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'capture.bin')
+        protocol, expected = write_capture(path)
+        assert build_frame_index(path, protocol, stride=64) == get_index_path(path)
+
+        index = FrameIndex(path, protocol)
+        try:
+            assert len(index) == len(expected) == 2000
+            assert index.error_count == len(ERROR_FRAMES)
+            assert index.checkpoint(130) == (129, expected[128].start_position)
+            for number in (1, 64, 65, 1000, 1999):
+                assert frame_keys(index.read_frames(number, 3)) == frame_keys(expected[number - 1:number + 2])
+            assert index.get_frame(2000).raw_data == expected[-1].raw_data
+            try:
+                index.read_frames(2001)
+            except ValueError:
+                pass
+            else:
+                raise AssertionError("未拒绝超出范围的帧序号")
+        finally:
+            index.close()
+
+
+def test_overlong_frame():
+    """测试有过长帧时检查点之后的帧与完整分帧一致（建立索引和随机访问的读取块大小不同）"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'capture.bin')
+        protocol, frames = make_industrial_frames(25)
+        data = b''.join(frames[:5]) + b'\x68' + bytes(200 * 1024) + b'\x16' + b''.join(frames[5:])
+        with open(path, 'wb') as f:
+            f.write(data)
+        expected = StreamParser(protocol).feed(data)
+        assert [f.raw_data for f in expected] == frames
+
+        build_frame_index(path, protocol, stride=8)
+        index = FrameIndex(path, protocol)
+        try:
+            assert len(index) == len(expected)
+            for number in range(1, len(expected) + 1):
+                assert frame_keys([index.get_frame(number)]) == frame_keys(expected[number - 1:number]), number
+        finally:
+            index.close()
+
+
+def test_error_navigation():
+    """测试下一个/上一个错误帧与逐帧查找一致"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'capture.bin')
+        protocol, expected = write_capture(path)
+        build_frame_index(path, protocol, stride=64)
+        errors = [f.frame_number for f in expected if f.has_error]
+        assert errors == sorted(i + 1 for i in ERROR_FRAMES)
+
+        index = FrameIndex(path, protocol)
+        try:
+            for number in range(0, len(expected) + 2):
+                assert index.next_error(number) == next((e for e in errors if e > number), None), number
+                assert index.previous_error(number) == next((e for e in reversed(errors) if e < number), None), number
+            assert [n for n in range(1, 2001) if index.is_error(n)] == errors
+        finally:
+            index.close()
+
+
+def test_stale_index():
+    """测试分帧模式或捕获文件变化后索引失效，open_frame_index 自动重建"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'capture.bin')
+        protocol, expected = write_capture(path)
+
+        # 分帧（如导出）时顺带记录索引
+        writer = FrameIndexWriter(protocol, stride=128)
+        assert len(list(writer.record(expected))) == len(expected)
+        writer.write(path)
+        FrameIndex(path, protocol).close()
+
+        try:
+            FrameIndex(path, protocol, resync=True)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("分帧模式变化后索引仍然有效")
+
+        with open(path, 'ab') as f:
+            f.write(expected[0].raw_data)
+        try:
+            FrameIndex(path, protocol)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("捕获文件变化后索引仍然有效")
+
+        index = open_frame_index(path, protocol)
+        try:
+            assert len(index) == len(expected) + 1 and index.stride == 1024
+        finally:
+            index.close()
+
+        hex_path = os.path.join(tmp, 'capture.txt')
+        with open(hex_path, 'w') as f:
+            f.write(expected[0].get_raw_data_hex())
+        try:
+            build_frame_index(hex_path, protocol)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("未拒绝十六进制文本捕获文件")
+
+
+def main():
+    """运行所有测试"""
+    tests = [
+        ("随机访问", test_random_access),
+        ("过长帧", test_overlong_frame),
+        ("错误帧跳转", test_error_navigation),
+        ("索引失效", test_stale_index),
+    ]
+
+    passed = 0
+    for name, test in tests:
+        try:
+            test()
+            print(f"✅ 通过 - {name}")
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ 失败 - {name}: {e}")
+
+    print(f"\n总计: {passed}/{len(tests)} 个测试通过")
+    return 0 if passed == len(tests) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
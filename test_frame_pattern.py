@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试帧头/帧尾通配和掩码模式
+"""
+
+import os
+import random
+import re
+import sys
+
+# 添加项目路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from models import ProtocolConfig, FieldDefinition, FieldType, ChecksumConfig, ChecksumType
+from core import DataParser, ProtocolManager
+from core.decode_plan import DecodePlan
+from core.demux import MultiProtocolParser
+from core.frame_pattern import FramePattern
+from core.stream_parser import StreamParser
+
+DLT645_HEADER = "68 ?? ?? ?? ?? ?? ?? 68"
+
+
+def make_dlt645_protocol() -> ProtocolConfig:
+    """DL/T 645 风格协议：68 + 6字节地址 + 68，控制码、长度、数据域，累加和校验"""
+    protocol = ProtocolConfig(protocol_name="DL/T 645", frame_header=DLT645_HEADER, frame_tail="16",
+                              checksum_config=ChecksumConfig(checksum_type=ChecksumType.SUM,
+                                                             start_offset=-1, end_offset=-2))
+    protocol.add_field(FieldDefinition("控制码", 1, FieldType.UINT8))
+    protocol.add_field(FieldDefinition("数据长度", 1, FieldType.UINT8))
+    protocol.add_field(FieldDefinition("数据域", 0, FieldType.BYTES, length_field="数据长度"))
+    return protocol
+
+
+def make_dlt645_frame(address: bytes, control: int, data: bytes) -> bytes:
+    """生成DL/T 645帧"""
+    body = b'\x68' + address + b'\x68' + bytes([control, len(data)]) + data
+    return body + bytes([sum(body) & 0xFF]) + b'\x16'
+
+
+def test_parse():
+    """测试模式解析和规范化"""
+    pattern = FramePattern("68 ?? ?? ?? ?? ?? ?? 68")
+    assert len(pattern) == 8
+    assert pattern.literal is None
+    assert pattern.to_text() == "68 ?? ?? ?? ?? ?? ?? 68"
+    assert FramePattern("6816").literal == b'\x68\x16'
+    assert FramePattern("aa 5? ?1 68/f0 81/81").to_text() == "AA 5? ?1 6? 81/81"
+    assert FramePattern("68 ?? 68") == FramePattern("68??68")
+    assert FramePattern(FramePattern("AA 5? 68/F0").to_text()) == FramePattern("AA 5? 68/F0")
+
+    for text in ("", "??", "6", "GG", "6?/F0", "68/"):
+        try:
+            FramePattern(text)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(f"未拒绝无效模式: {text!r}")
+
+
+def test_find():
+    """测试查找结果与正则表达式逐位置匹配一致"""
+    rng = random.Random(3)
+    data = bytes(rng.choice(b'\x68\x16\x00\x61\xAA') for _ in range(5000))
+    for text in ("68 ?? 68", "?? 68 16", "6? 16", "68 00/0F ?? 16", "16"):
+        pattern = FramePattern(text)
+        regex = re.compile(pattern.regex(), re.DOTALL)
+        expected = [i for i in range(len(data)) if regex.match(data, i)]
+        found = []
+        pos = pattern.find(data)
+        while pos != -1:
+            assert pattern.match_at(data, pos)
+            found.append(pos)
+            pos = pattern.find(data, pos + 1)
+        assert found == expected, text
+        
+        # 限定结束位置的查找
+        for start in range(0, len(data), 97):
+            end = start + rng.randint(0, 64)
+            in_window = [i for i in expected if i >= start and i + len(pattern) <= end]
+            assert pattern.find(data, start, end) == (in_window[0] if in_window else -1), (text, start, end)
+
+
+def test_dlt645_framing():
+    """测试DL/T 645帧头模式排除地址域之外的假帧头"""
+    protocol = make_dlt645_protocol()
+    assert ProtocolManager.validate_protocol(protocol)[0]
+    frames = [make_dlt645_frame(bytes([0x11, 0x22, 0x33, 0x44, 0x55, i]), 0x91, bytes([0x33, 0x34 + i]))
+              for i in range(10)]
+    # 帧之间的噪声中有单独的 68 和 16
+    data = b'\x68\x00\x16'.join(frames)
+
+    result = DataParser(protocol).parse_bytes(data)
+    assert result.get_total_frames() == 10
+    assert result.get_error_frames() == 0
+    assert result.frames[3].fields['数据域'] == bytes([0x33, 0x37])
+
+    # 只用固定帧头 68 时噪声产生假帧
+    plain = ProtocolConfig.from_dict({**protocol.to_dict(), 'frame_header': '68'})
+    assert DataParser(plain).parse_bytes(data).get_error_frames() > 0
+
+    # 解码计划缓存后帧头模式不变
+    plan = DecodePlan.from_dict(DecodePlan.compile(protocol).to_dict())
+    assert plan.header == FramePattern(DLT645_HEADER)
+    assert DecodePlan.from_dict({**plan.to_dict(), 'header': '68'}).header.literal == b'\x68'
+
+    # 分块输入时帧头跨块
+    stream_parser = StreamParser(protocol)
+    streamed = []
+    for i in range(0, len(data), 7):
+        streamed.extend(stream_parser.feed(data[i:i + 7]))
+    assert [f.raw_data for f in streamed] == frames
+
+    # 与其他协议一起分流解析
+    mixed = b''.join(frame + make_other_frame(i) for i, frame in enumerate(frames))
+    demuxed = MultiProtocolParser([ProtocolManager.get_default_protocol(), protocol]).parse_bytes(mixed)
+    assert [f.protocol_name for f in demuxed.frames if not f.has_error].count("DL/T 645") == 10
+
+
+def make_other_frame(i: int) -> bytes:
+    """生成帧头为 AA 的其他协议帧"""
+    return bytes([0xAA, i, 0x0D])
+
+
+def test_invalid_protocol():
+    """测试协议中的无效帧头模式"""
+    try:
+        ProtocolConfig(frame_header="68 XX")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("未拒绝无效帧头")
+    protocol = ProtocolConfig(frame_header="?? ??")
+    protocol.add_field(FieldDefinition("数据", 1, FieldType.UINT8))
+    assert not ProtocolManager.validate_protocol(protocol)[0]
+
+
+def main():
+    """运行所有测试"""
+    tests = [
+        ("模式解析", test_parse),
+        ("模式查找", test_find),
+        ("DL/T 645分帧", test_dlt645_framing),
+        ("无效帧头", test_invalid_protocol),
+    ]
+
+    passed = 0
+    for name, test in tests:
+        try:
+            test()
+            print(f"✅ 通过 - {name}")
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ 失败 - {name}: {e}")
+
+    print(f"\n总计: {passed}/{len(tests)} 个测试通过")
+    return 0 if passed == len(tests) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试串口监视日志导入和时间索引
+"""
+
+import os
+import sys
+import tempfile
+from datetime import date, datetime
+
+# 添加项目路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core import ProtocolManager
+from core.log_ingest import (
+    LogReader, LogTimeIndex, LogFrameParser, detect_log_format, parse_log_text, parse_time_text
+)
+
+RX_FRAME = "68 01 03 01 00 05 16"
+TX_FRAME = "68 02 01 00 03 16"
+
+
+def timestamp(text: str) -> float:
+    return datetime.fromisoformat(text).timestamp()
+
+
+def test_formats():
+    """测试识别常见日志格式"""
+    samples = {
+        "方括号时间戳": f"[2026-10-01 12:00:01.123] RX: {RX_FRAME}",
+        "行首时间戳": f"2026-10-01T12:00:01.123 [TX] {TX_FRAME}",
+        "串口调试助手": f"[12:00:01.123]收←◆{RX_FRAME}",
+    }
+    for name, line in samples.items():
+        log_format = detect_log_format([line.encode('utf-8')])
+        assert log_format is not None and log_format.name == name, line
+    assert detect_log_format([RX_FRAME.encode(), b"hello"]) is None
+
+
+def test_parse_log_text():
+    """测试帧记录到达时间和方向，两个方向分别分帧"""
+    protocol = ProtocolManager.get_default_protocol()
+    text = "\n".join([
+        "[2026-10-01 12:00:01.100] TX: 68 02 01",
+        "[2026-10-01 12:00:01.120] RX: 68 01 03 01",
+        "[2026-10-01 12:00:01.150] TX: 00 03 16",
+        "[2026-10-01 12:00:01.180] RX: 00 05",
+        "16",  # 续行
+        "--- 端口已打开 ---",
+        f"[2026-10-01 12:00:02.500] RX: {RX_FRAME}",
+    ])
+    result = parse_log_text(text, protocol)
+    frames = [(f.frame_number, f.channel, f.timestamp, f.get_raw_data_hex()) for f in result.frames]
+    assert frames == [
+        (1, "TX", timestamp("2026-10-01 12:00:01.150"), TX_FRAME),
+        (2, "RX", timestamp("2026-10-01 12:00:01.180"), RX_FRAME),
+        (3, "RX", timestamp("2026-10-01 12:00:02.500"), RX_FRAME),
+    ], frames
+    assert result.frames[1].fields['命令'] == 0x03
+    assert result.frames[0].get_timestamp_text() == "2026-10-01 12:00:01.150"
+
+    # 只有时分秒的日志跨过午夜
+    text = f"[23:59:59.900]收←◆{RX_FRAME}\n[00:00:00.100]发→◇{TX_FRAME}"
+    result = parse_log_text(text, protocol, base_date=date(2026, 10, 1))
+    assert [f.channel for f in result.frames] == ["RX", "TX"]
+    assert result.frames[1].timestamp == timestamp("2026-10-02 00:00:00.100")
+
+    assert parse_log_text(RX_FRAME, protocol) is None
+
+
+def write_log(path: str, count: int) -> float:
+    """写入每10毫秒一帧的日志，返回第一帧的时间"""
+    start = timestamp("2026-10-01 12:00:00")
+    with open(path, 'w', encoding='utf-8') as f:
+        for i in range(count):
+            moment = datetime.fromtimestamp(start + i * 0.01).strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]
+            f.write(f"[{moment}] RX: 68 01 03 01 {i & 0xFF:02X} 05 16\n")
+    return start
+
+
+def test_time_index():
+    """测试稀疏时间索引定位到时间范围，结果与从头扫描一致"""
+    protocol = ProtocolManager.get_default_protocol()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'serial.log')
+        start = write_log(path, 20000)
+        reader = LogReader(path)
+        assert LogReader.is_log_file(path)
+        index = LogTimeIndex(reader, stride=16 * 1024)
+        assert index.update() == len(index)
+        assert len(index) == (reader.size + index.stride - 1) // index.stride
+        assert list(index.times) == sorted(index.times)
+
+        begin, end = start + 123.455, start + 130.0
+        offset, previous = index.find(begin)
+        assert 0 < offset and reader.size - offset > reader.size * 0.3
+        records = list(reader.iter_records(offset, previous, begin, end))
+        expected = [r for r in reader.iter_records() if begin <= r.timestamp <= end]
+        assert [r.offset for r in records] == [r.offset for r in expected]
+        assert len(records) == 655
+
+        frames = list(LogFrameParser(protocol).iter_frames(records))
+        assert len(frames) == len(records)
+        assert frames[0].timestamp >= begin and frames[-1].timestamp <= end
+
+        # 早于日志开头的时间从文件开头读取
+        assert index.find(start - 10) == (0, None)
+
+        # 文件增长后只为新增内容补充索引
+        count = len(index)
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(f"[2026-10-01 13:00:00.000] RX: {RX_FRAME}\n" * 5000)
+        assert index.update() > 0 and len(index) > count
+        assert index.times[-1] == timestamp("2026-10-01 13:00:00")
+
+    try:
+        parse_time_text("yesterday")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("未拒绝无效时间")
+
+
+def main():
+    """运行所有测试"""
+    tests = [
+        ("日志格式识别", test_formats),
+        ("日志解析", test_parse_log_text),
+        ("时间索引", test_time_index),
+    ]
+
+    passed = 0
+    for name, test in tests:
+        try:
+            test()
+            print(f"✅ 通过 - {name}")
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ 失败 - {name}: {e}")
+
+    print(f"\n总计: {passed}/{len(tests)} 个测试通过")
+    return 0 if passed == len(tests) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
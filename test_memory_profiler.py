@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试解析流水线的内存分析
+"""
+
+import os
+import sys
+import tracemalloc
+
+# 添加项目路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core import DataParser, ProtocolManager
+from core.memory_profiler import MemoryProfiler, MemoryReport, StageMemory, format_size
+
+FRAME = "68 01 03 01 00 05 16 "
+
+
+def test_profile_parse():
+    """测试统计各解析阶段和各类对象的内存"""
+    parser = DataParser(ProtocolManager.get_default_protocol())
+    hex_string = FRAME * 2000
+    profiler = MemoryProfiler(top_n=3)
+    profiler.start()
+    try:
+        assert profiler.is_running()
+        result = parser.parse(hex_string, profiler)
+    finally:
+        profiler.stop()
+    assert not tracemalloc.is_tracing()
+
+    report = profiler.get_report()
+    assert [stage.name for stage in report.stages] == ["十六进制解码", "帧定位", "字段解析"]
+    for stage in report.stages:
+        assert stage.peak_bytes >= stage.retained_bytes >= 0, stage
+        assert len(stage.top_allocations) <= 3
+    # 字段解析阶段生成2000个帧对象，驻留内存至少是每帧一个对象
+    assert report.stages[-1].retained_bytes > 2000 * 48
+
+    assert report.frame_count == result.get_total_frames() == 2000
+    assert report.total_bytes == 2000 * 7
+    sizes = report.object_sizes
+    assert sizes['输入文本(str)'] >= len(hex_string)
+    assert sizes['原始数据(bytes)'] >= 2000 * 7
+    assert sizes['帧原始数据(bytes)'] >= 2000 * (sys.getsizeof(b'') + 7)
+    assert sizes['帧对象(DataFrame)'] > 0 and sizes['字段字典(dict)'] > 0
+    assert report.get_bytes_per_frame() == report.get_retained_total() / 2000
+
+    text = report.to_text()
+    assert "字段解析" in text and "每帧字节数" in text
+
+
+def test_report():
+    """测试报告汇总和未跟踪时不统计"""
+    report = MemoryReport(stages=[StageMemory("a", 100, 300), StageMemory("b", 50, 200)],
+                          frame_count=10, total_bytes=30)
+    assert report.get_retained_total() == 150
+    assert report.get_peak_max() == 300
+    assert report.get_bytes_per_frame() == 15.0
+    assert report.get_bytes_per_input_byte() == 5.0
+    assert MemoryReport().get_bytes_per_frame() == 0.0
+
+    profiler = MemoryProfiler()
+    with profiler.stage("未启动"):
+        pass
+    assert profiler.get_report().stages == []
+
+    assert format_size(512) == "512 B"
+    assert format_size(1536) == "1.5 KB"
+    assert format_size(3 * 1024 ** 3) == "3.0 GB"
+
+
+def main():
+    """运行所有测试"""
+    tests = [
+        ("解析内存分析", test_profile_parse),
+        ("报告汇总", test_report),
+    ]
+
+    passed = 0
+    for name, test in tests:
+        try:
+            test()
+            print(f"✅ 通过 - {name}")
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ 失败 - {name}: {e}")
+
+    print(f"\n总计: {passed}/{len(tests)} 个测试通过")
+    return 0 if passed == len(tests) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试多路采集的时间线合并
+各通道使用内存中的模拟采集源代替真实串口
+"""
+
+import os
+import sys
+import time
+
+# 添加项目路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from models import DataFrame
+from core.multi_capture import MultiCaptureSession
+from core.serial_capture import CaptureStats
+
+
+class FakeSource:
+    """模拟采集源：按需放入带时间戳的帧"""
+
+    def __init__(self):
+        self.frames = []
+        self.running = False
+        self.error_message = ""
+
+    def push(self, *timestamps: float):
+        for timestamp in timestamps:
+            self.frames.append(DataFrame(frame_number=len(self.frames) + 1, start_position=0,
+                                         end_position=1, raw_data=b'\x68', timestamp=timestamp))
+
+    def start(self):
+        self.running = True
+
+    def stop(self):
+        self.running = False
+
+    def is_running(self) -> bool:
+        return self.running
+
+    def get_frames(self, max_frames: int = 10000):
+        frames, self.frames = self.frames[:max_frames], self.frames[max_frames:]
+        return frames
+
+    def get_stats(self) -> CaptureStats:
+        return CaptureStats(frames=3)
+
+
+def make_session(**options):
+    session = MultiCaptureSession(**options)
+    sources = [FakeSource(), FakeSource()]
+    session.add_channel("A", sources[0])
+    session.add_channel("B", sources[1])
+    session.start()
+    return session, sources
+
+
+def test_merge_order():
+    """测试各通道按时间戳合并，通道名写入帧"""
+    session, (a, b) = make_session(reorder_delay=0.0)
+    base = time.time() - 10
+    a.push(base + 1, base + 3, base + 5)
+    b.push(base + 2, base + 4)
+    frames = session.get_frames()
+    assert [(f.channel, f.timestamp - base) for f in frames] == [
+        ("A", 1), ("B", 2), ("A", 3), ("B", 4), ("A", 5)
+    ]
+    assert [f.timestamp for f in session.get_timeline(base + 2, base + 5)] == [base + 2, base + 3, base + 4]
+    try:
+        session.add_channel("A", FakeSource())
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("未拒绝重复的通道名称")
+
+
+def test_watermark():
+    """测试水位线之后的帧等待其他通道，停止后全部输出"""
+    session, (a, b) = make_session(reorder_delay=5.0)
+    now = time.time()
+    a.push(now - 10, now)
+    b.push(now - 8)
+    assert [f.timestamp for f in session.get_frames()] == [now - 10, now - 8]
+    assert session.get_frames() == []
+    session.stop()
+    assert [f.timestamp for f in session.get_frames()] == [now]
+
+
+def test_bounded_pending():
+    """测试待取帧超过上限时丢弃最旧的帧并计入统计"""
+    session, (a, b) = make_session(max_frames_per_channel=4, reorder_delay=5.0)
+    now = time.time()
+    a.push(*(now + i for i in range(10)))
+    assert session.get_frames() == []
+    assert len(session.channels[0].pending) == 4
+    stats = session.get_channel_stats()
+    assert stats["A"].frames_dropped == 6 and stats["B"].frames_dropped == 0
+    assert session.get_stats().frames_dropped == 6
+    session.stop()
+    assert [f.timestamp for f in session.get_frames()] == [now + i for i in range(6, 10)]
+
+
+def main():
+    """运行所有测试"""
+    tests = [
+        ("时间线合并", test_merge_order),
+        ("合并水位线", test_watermark),
+        ("待取帧上限", test_bounded_pending),
+    ]
+
+    passed = 0
+    for name, test in tests:
+        try:
+            test()
+            print(f"✅ 通过 - {name}")
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ 失败 - {name}: {e}")
+
+    print(f"\n总计: {passed}/{len(tests)} 个测试通过")
+    return 0 if passed == len(tests) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试协议库索引和自动识别协议
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+
+# 添加项目路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core import ProtocolManager, ChecksumValidator
+from core.frame_pattern import FramePattern
+from core.protocol_library import ProtocolLibrary, ProtocolScore, ProtocolSignature
+from core.protocol_registry import ProtocolRegistry
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+PROTOCOL_FILES = ['protocol_example.json', 'protocol_extended_example.json', 'protocol_industrial_fixed.json']
+
+
+def make_frame(protocol, payload: bytes) -> bytes:
+    """按协议的校验配置生成校验通过的帧（1字节校验码）"""
+    config = protocol.checksum_config
+    for value in range(256):
+        frame = protocol.get_header_bytes() + payload + bytes([value]) + protocol.get_tail_bytes()
+        if ChecksumValidator.validate_frame(frame, config.checksum_type, config.start_offset,
+                                            config.end_offset, config.checksum_length)[0]:
+            return frame
+    raise AssertionError("无法生成校验通过的帧")
+
+
+def make_library(tmp):
+    """把示例协议复制到临时目录并扫描"""
+    sub_dir = os.path.join(tmp, 'sub')
+    os.makedirs(sub_dir)
+    for name in PROTOCOL_FILES:
+        shutil.copy(os.path.join(BASE_DIR, name), os.path.join(sub_dir if 'industrial' in name else tmp, name))
+    with open(os.path.join(tmp, 'notes.json'), 'w', encoding='utf-8') as f:
+        f.write('[1, 2, 3]')
+    library = ProtocolLibrary(tmp, ProtocolRegistry(cache_file=''))
+    return library, library.scan()
+
+
+def test_index():
+    """测试扫描目录并按特征建立索引"""
+    with tempfile.TemporaryDirectory() as tmp:
+        library, count = make_library(tmp)
+        # 无效的JSON文件被跳过，子目录中的协议也被扫描
+        assert count == 3
+        signatures = {entry.protocol_name: entry.signature for entry in library.entries}
+        assert signatures['示例协议'].fixed_length is None
+        assert signatures['工业设备测试协议'].fixed_length == 59
+        assert signatures['工业通信器物协议'].fixed_length == 84
+        assert signatures['示例协议'].checksum_type == '累加和'
+        assert len(library.index) == 3
+
+        # 帧头不在样本中时没有候选
+        assert library.candidates(bytes(100)) == []
+        signature = ProtocolSignature(FramePattern('AA'), FramePattern('55'), 4, '无校验')
+        assert signature.matches_sample(bytes.fromhex("00 AA 01 02 55"))
+        assert not signature.matches_sample(bytes.fromhex("AA 01 55"))
+        assert signature.verifiable
+
+
+def test_detect():
+    """测试按校验通过率自动选出协议"""
+    with tempfile.TemporaryDirectory() as tmp:
+        library, _ = make_library(tmp)
+        example = ProtocolManager.load_protocol(os.path.join(BASE_DIR, 'protocol_example.json'))
+        industrial = ProtocolManager.load_protocol(os.path.join(BASE_DIR, 'protocol_industrial_fixed.json'))
+
+        # 示例协议的校验范围包括校验码本身，数据域之和为0时任意校验码都通过
+        data = b''.join(make_frame(example, bytes([1, 3, 2, i, (250 - i) % 256])) for i in range(40))
+        best = library.best_match(data)
+        assert best is not None and best.protocol_name == '示例协议', best
+        assert best.pass_rate > 0.9
+
+        data = b''.join(make_frame(industrial, bytes([1, i]) + b'A' * 79) for i in range(40))
+        scores = library.detect(data)
+        assert scores[0].protocol_name == '工业通信器物协议'
+        assert scores[0].path == os.path.realpath(os.path.join(tmp, 'sub', 'protocol_industrial_fixed.json'))
+        assert scores[0].passed_frames == 39  # 帧序号0x16的帧在数据中出现帧尾
+        assert all(score.score < 0.1 for score in scores[1:])
+
+        # 并行打分结果与顺序打分一致
+        parallel = library.detect(data, workers=2)
+        assert [(s.path, s.passed_frames) for s in parallel] == [(s.path, s.passed_frames) for s in scores]
+
+        assert library.best_match(bytes(range(0x20, 0x60)) * 10) is None
+
+
+def test_score_weighting():
+    """测试得分考虑帧数和覆盖率：偶然通过的1帧不高于大量通过的帧"""
+    single = ProtocolScore('a.json', 'A', total_frames=1, passed_frames=1, covered_bytes=7, sample_bytes=65536)
+    many = ProtocolScore('b.json', 'B', total_frames=1000, passed_frames=950, covered_bytes=62000,
+                         sample_bytes=65536)
+    assert single.pass_rate > many.pass_rate
+    assert single.pass_rate_lower_bound < 0.25 < 0.9 < many.pass_rate_lower_bound < many.pass_rate
+    assert ProtocolScore('c.json', 'C').pass_rate_lower_bound == 0.0
+
+
+def main():
+    """运行所有测试"""
+    tests = [
+        ("协议库索引", test_index),
+        ("自动识别协议", test_detect),
+        ("得分权重", test_score_weighting),
+    ]
+
+    passed = 0
+    for name, test in tests:
+        try:
+            test()
+            print(f"✅ 通过 - {name}")
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ 失败 - {name}: {e}")
+
+    print(f"\n总计: {passed}/{len(tests)} 个测试通过")
+    return 0 if passed == len(tests) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试协议注册表和解码计划
+"""
+
+import os
+import sys
+import tempfile
+
+# 添加项目路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core import DataParser, ProtocolManager
+from core.decode_plan import DecodePlan
+from core.protocol_registry import ProtocolRegistry
+from core.stream_parser import StreamParser
+
+
+def test_registry_cache():
+    """测试文件不变时复用解码计划，磁盘缓存可在新注册表中使用"""
+    protocol = ProtocolManager.get_default_protocol()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'protocol.json')
+        cache_file = os.path.join(tmp, 'cache.json')
+        ProtocolManager.save_protocol(protocol, path)
+
+        registry = ProtocolRegistry(cache_file)
+        loaded, plan = registry.load(path)
+        assert loaded.to_dict() == protocol.to_dict()
+        again, plan_again = registry.load(path)
+        assert plan_again is plan
+        # 每次返回新的协议对象
+        assert again is not loaded
+
+        # 新注册表从磁盘缓存恢复解码计划
+        other = ProtocolRegistry(cache_file)
+        cached, cached_plan = other.load(path)
+        assert cached.to_dict() == protocol.to_dict()
+        assert cached_plan.to_dict() == plan.to_dict()
+
+        try:
+            registry.load(os.path.join(tmp, 'missing.json'))
+        except OSError:
+            pass
+        else:
+            raise AssertionError("未报告文件不存在")
+
+
+def test_watch_and_hot_swap():
+    """测试协议文件变化后通知回调，流式解析器不丢失未完成的帧"""
+    protocol = ProtocolManager.get_default_protocol()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'protocol.json')
+        ProtocolManager.save_protocol(protocol, path)
+        registry = ProtocolRegistry('')
+
+        loaded, plan = registry.load(path)
+        stream = StreamParser(loaded, plan=plan)
+        changes = []
+
+        def on_changed(file_path, new_protocol, plan):
+            changes.append(file_path)
+            stream.set_protocol(new_protocol, plan)
+
+        registry.watch(path, on_changed)
+        assert registry.poll() == []
+
+        frames = stream.feed(bytes.fromhex("68 01 03 02 AA BB 6B 16 68 01 03"))
+        assert len(frames) == 1 and frames[0].fields['命令'] == 3
+
+        # 修改字段名后保存（修改时间可能不变，大小变化即可被检测到）
+        protocol.fields[1].name = "命令码"
+        ProtocolManager.save_protocol(protocol, path)
+        assert registry.poll() == [os.path.abspath(path)]
+        assert changes == [os.path.abspath(path)]
+
+        frames = stream.feed(bytes.fromhex("02 AA BB 6B 16"))
+        assert len(frames) == 1 and frames[0].fields['命令码'] == 3
+        assert frames[0].frame_number == 2
+
+        registry.unwatch(path, on_changed)
+        protocol.fields[1].name = "命令"
+        ProtocolManager.save_protocol(protocol, path)
+        assert registry.poll() == []
+
+
+def test_plan_matches_parser():
+    """测试解码计划与协议字段定义一致"""
+    protocol = ProtocolManager.get_default_protocol()
+    plan = DecodePlan.compile(protocol)
+    restored = DecodePlan.from_dict(plan.to_dict())
+    frame = bytes.fromhex("68 01 03 02 AA BB 6B 16")
+    assert restored.decode_fields(frame) == DataParser(protocol).parse_frame_fields(frame)
+    assert restored.decode_fields(frame) == {'地址': 1, '命令': 3, '长度': 2, '数据': b'\xaa\xbb'}
+
+
+def main():
+    """运行所有测试"""
+    tests = [
+        ("注册表缓存", test_registry_cache),
+        ("监视与热切换", test_watch_and_hot_swap),
+        ("解码计划", test_plan_matches_parser),
+    ]
+
+    passed = 0
+    for name, test in tests:
+        try:
+            test()
+            print(f"✅ 通过 - {name}")
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ 失败 - {name}: {e}")
+
+    print(f"\n总计: {passed}/{len(tests)} 个测试通过")
+    return 0 if passed == len(tests) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
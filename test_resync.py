@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试重同步分帧
+"""
+
+import os
+import sys
+
+# 添加项目路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core import DataParser, ProtocolManager
+from core.stream_parser import StreamParser
+from test_protocol_library import make_frame
+from test_frame_pattern import make_dlt645_protocol, make_dlt645_frame
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def make_industrial_frames(count: int):
+    """生成定长（84字节）的工业协议帧"""
+    protocol = ProtocolManager.load_protocol(os.path.join(BASE_DIR, 'protocol_industrial_fixed.json'))
+    return protocol, [make_frame(protocol, bytes([1, i % 0x10]) + b'A' * 79) for i in range(count)]
+
+
+def make_damaged_capture():
+    """生成有丢字节、假帧头、校验错误和末尾截断的捕获数据"""
+    protocol, frames = make_industrial_frames(30)
+    damaged = list(frames)
+    damaged[5] = frames[5][:40] + frames[5][41:]  # 丢一个字节
+    damaged[10] = b'\x68\x01' + frames[10]  # 假帧头
+    damaged[20] = frames[20][:-2] + bytes([frames[20][-2] ^ 0xFF]) + frames[20][-1:]  # 校验码错误
+    damaged[29] = frames[29][:50]  # 末尾截断
+    expected = [f for i, f in enumerate(frames) if i not in (5, 20, 29)]
+    return protocol, b''.join(damaged), expected
+
+
+def test_resync_fixed_length():
+    """测试定长协议在损坏数据后重新同步"""
+    protocol, data, expected = make_damaged_capture()
+
+    # 普通模式：假帧头吞掉后面的真实帧
+    plain = DataParser(protocol).parse_bytes(data)
+    assert frames_of(plain) != expected
+
+    result = DataParser(protocol, resync=True).parse_bytes(data)
+    assert frames_of(result) == expected
+    assert result.get_error_frames() == 0
+    stats = result.framing_stats
+    assert stats.framed_bytes == sum(len(f) for f in expected)
+    assert stats.skipped_bytes == len(data) - stats.framed_bytes
+    assert stats.resync_events == 4
+    assert stats.rejected_candidates >= 4
+    assert "跳过字节" in result.get_summary()
+    assert DataParser(protocol).parse_bytes(data).framing_stats is None
+
+
+def test_resync_length_field():
+    """测试按长度字段确定帧长，数据域中的帧尾字节不截断帧"""
+    protocol = make_dlt645_protocol()
+    frames = [make_dlt645_frame(bytes([1, 2, 3, 4, 5, i]), 0x91, bytes([0x16, i, 0x16])) for i in range(10)]
+    data = b'\xFE\xFE'.join(frames)
+
+    assert DataParser(protocol).parse_bytes(data).get_error_frames() > 0
+    result = DataParser(protocol, resync=True).parse_bytes(data)
+    assert frames_of(result) == frames
+    assert result.frames[3].fields['数据域'] == bytes([0x16, 3, 0x16])
+    assert result.framing_stats.skipped_bytes == 2 * 9
+    assert result.framing_stats.resync_events == 0
+
+
+def test_resync_stream():
+    """测试流式输入时跨数据块重同步，结果与一次解析一致"""
+    protocol, data, expected = make_damaged_capture()
+    # 中间插入一长段假帧头，失步状态跨越多个数据块
+    data = data[:84 * 3] + b'\x68\x01' * 200 + data[84 * 3:]
+    # 一次解析到末尾截断的帧之前，分帧统计应与流式输入一致
+    batch = DataParser(protocol, resync=True).parse_bytes(data[:-50]).framing_stats
+    for block_size in (1, 7, 100, len(data)):
+        stream_parser = StreamParser(protocol, resync=True)
+        frames = []
+        for i in range(0, len(data), block_size):
+            frames.extend(stream_parser.feed(data[i:i + block_size]))
+        assert [f.raw_data for f in frames] == expected, block_size
+        assert [f.frame_number for f in frames] == list(range(1, len(expected) + 1))
+        # 末尾截断的帧仍在缓冲区中等待
+        assert stream_parser.pending_bytes == 50
+        stats = stream_parser.framing_stats
+        assert stats.framed_bytes == sum(len(f) for f in expected)
+        # 失步状态跨数据块延续，不重复计入重同步次数
+        assert ((stats.scanned_bytes, stats.rejected_candidates, stats.resync_events)
+                == (batch.scanned_bytes, batch.rejected_candidates, batch.resync_events)), block_size
+    assert StreamParser(protocol).framing_stats is None
+
+
+def frames_of(result):
+    """解析结果中各帧的原始数据"""
+    return [frame.raw_data for frame in result.frames]
+
+
+def main():
+    """运行所有测试"""
+    tests = [
+        ("定长协议重同步", test_resync_fixed_length),
+        ("长度字段确定帧长", test_resync_length_field),
+        ("流式重同步", test_resync_stream),
+    ]
+
+    passed = 0
+    for name, test in tests:
+        try:
+            test()
+            print(f"✅ 通过 - {name}")
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ 失败 - {name}: {e}")
+
+    print(f"\n总计: {passed}/{len(tests)} 个测试通过")
+    return 0 if passed == len(tests) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
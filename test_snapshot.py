@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试解析结果快照
+"""
+
+import os
+import sys
+import tempfile
+
+# 添加项目路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core import DataParser, ProtocolManager
+from core.snapshot import Snapshot, save_snapshot, load_snapshot, protocol_fingerprint
+
+
+def make_result():
+    """解析一段带帧间杂散字节的数据"""
+    protocol = ProtocolManager.get_default_protocol()
+    data = bytes.fromhex("68 01 03 02 AA BB 6B 16 FF EE 68 01 03 01 00 05 16 68 02 01 00 03 16" * 50)
+    result = DataParser(protocol).parse_bytes(data)
+    result.frames[3].channel = "COM3"
+    result.frames[3].timestamp = 1700000000.25
+    return protocol, data, result
+
+
+def test_snapshot_roundtrip():
+    """测试保存后重新打开的帧与原结果一致"""
+    protocol, data, result = make_result()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'result.sdcsnap')
+        save_snapshot(path, result, protocol, data)
+
+        snapshot = Snapshot(path)
+        try:
+            assert snapshot.fingerprint == protocol_fingerprint(protocol)
+            # 保存了完整捕获数据（包括帧间的杂散字节）
+            assert snapshot.get_capture_data() == data
+
+            loaded = snapshot.get_result()
+            assert len(loaded.frames) == len(result.frames)
+            assert loaded.get_summary() == result.get_summary()
+            assert loaded.total_bytes == result.total_bytes
+            assert list(loaded.frames) == result.frames
+            assert loaded.frames[-1] == result.frames[-1]
+            assert loaded.frames[3].channel == "COM3" and loaded.frames[3].timestamp == 1700000000.25
+        finally:
+            snapshot.close()
+
+
+def test_snapshot_without_data():
+    """测试不提供捕获数据时只保存帧数据"""
+    protocol, data, result = make_result()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'result.sdcsnap')
+        save_snapshot(path, result, protocol)
+        loaded_protocol, loaded = load_snapshot(path)
+        assert loaded_protocol.to_dict() == protocol.to_dict()
+        assert loaded.frames[10:20] == result.frames[10:20]
+        assert len(loaded.snapshot.get_capture_data()) == sum(len(f.raw_data) for f in result.frames)
+        loaded.snapshot.close()
+
+        # 非快照文件
+        bad_path = os.path.join(tmp, 'bad.sdcsnap')
+        with open(bad_path, 'wb') as f:
+            f.write(b'not a snapshot file')
+        try:
+            Snapshot(bad_path)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("未拒绝无效文件")
+
+
+def test_snapshot_rejects_corrupt():
+    """测试截断的快照和协议配置被改动的快照被拒绝"""
+    protocol, data, result = make_result()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'result.sdcsnap')
+        save_snapshot(path, result, protocol, data)
+        with open(path, 'rb') as f:
+            content = f.read()
+
+        name = protocol.protocol_name.encode('utf-8')
+        corrupt = {
+            'truncated.sdcsnap': content[:len(content) - 100],
+            # 协议名改成等长的其他名字，段位置不变但指纹不一致
+            'tampered.sdcsnap': content.replace(name, b'x' * len(name), 1),
+        }
+        for file_name, payload in corrupt.items():
+            bad_path = os.path.join(tmp, file_name)
+            with open(bad_path, 'wb') as f:
+                f.write(payload)
+            try:
+                Snapshot(bad_path)
+            except ValueError:
+                pass
+            else:
+                raise AssertionError(f"未拒绝损坏的快照: {file_name}")
+
+
+def test_snapshot_pages():
+    """测试按页读取帧和查找错误帧"""
+    protocol, data, result = make_result()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'result.sdcsnap')
+        save_snapshot(path, result, protocol, data)
+        snapshot = Snapshot(path)
+        try:
+            assert len(snapshot) == len(result.frames)
+            assert snapshot.read_frames(5, 10) == result.frames[4:14]
+            assert snapshot.read_frames(len(result.frames), 10) == result.frames[-1:]
+            errors = [i + 1 for i, frame in enumerate(result.frames) if frame.has_error]
+            assert snapshot.error_count == len(errors) == result.get_error_frames()
+            assert snapshot.next_error() == errors[0]
+            assert snapshot.next_error(errors[0]) == errors[1]
+            assert snapshot.next_error(errors[-1]) is None
+        finally:
+            snapshot.close()
+
+
+def main():
+    """运行所有测试"""
+    tests = [
+        ("快照往返", test_snapshot_roundtrip),
+        ("只保存帧数据", test_snapshot_without_data),
+        ("拒绝损坏的快照", test_snapshot_rejects_corrupt),
+        ("按页读取", test_snapshot_pages),
+    ]
+
+    passed = 0
+    for name, test in tests:
+        try:
+            test()
+            print(f"✅ 通过 - {name}")
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ 失败 - {name}: {e}")
+
+    print(f"\n总计: {passed}/{len(tests)} 个测试通过")
+    return 0 if passed == len(tests) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -3,5 +3,12 @@ UI模块初始化
 """
 
 from .history_dialog import HistoryDialog
+from .report_dialog import ReportDialog
+from .multi_capture_dialog import MultiCaptureDialog
+from .compare_dialog import CompareDialog
+from .live_compare_dialog import LiveCompareDialog
+from .field_stats_panel import FieldStatsPanel
+from .trend_plot import TrendPlotDialog
 
-__all__ = ['HistoryDialog']
+__all__ = ['HistoryDialog', 'ReportDialog', 'MultiCaptureDialog', 'CompareDialog', 'LiveCompareDialog',
+           'FieldStatsPanel', 'TrendPlotDialog']
@@ -0,0 +1,231 @@
+"""
+数据对比对话框
+"""
+from typing import Optional
+
+from PySide6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QTableWidget, QTableWidgetItem,
+    QPushButton, QTextEdit, QSplitter, QLabel, QGroupBox, QFileDialog,
+    QMessageBox
+)
+from PySide6.QtCore import Qt, QThread, Signal
+from PySide6.QtGui import QColor
+
+from models import ProtocolConfig
+from core.parser import DataParser
+from core.frame_compare import FrameComparator, CompareResult, DiffKind
+from utils.helpers import read_capture_file
+
+
+# 差异类型对应的行颜色
+DIFF_COLORS = {
+    DiffKind.MISSING: QColor(255, 200, 200),
+    DiffKind.INSERTED: QColor(200, 255, 200),
+    DiffKind.CHANGED: QColor(255, 240, 180),
+}
+
+
+class CompareThread(QThread):
+    """对比线程"""
+    finished = Signal(object)
+    error = Signal(str)
+
+    def __init__(self, protocol: ProtocolConfig, data_a: bytes, data_b: bytes):
+        super().__init__()
+        self.protocol = protocol
+        self.data_a = data_a
+        self.data_b = data_b
+
+    def run(self):
+        try:
+            parser = DataParser(self.protocol)
+            result_a = parser.parse_bytes(self.data_a)
+            result_b = parser.parse_bytes(self.data_b)
+            self.finished.emit(FrameComparator().compare(result_a.frames, result_b.frames))
+        except Exception as e:
+            self.error.emit(str(e))
+
+
+class CompareDialog(QDialog):
+    """数据对比对话框"""
+
+    # 表格中最多显示的差异数
+    MAX_TABLE_ROWS = 10000
+
+    def __init__(self, protocol: ProtocolConfig, initial_text: str = "", parent=None):
+        """
+        初始化
+
+        Args:
+            protocol: 解析两段数据使用的协议配置
+            initial_text: 预填到基准数据的十六进制文本
+            parent: 父窗口
+        """
+        super().__init__(parent)
+        self.protocol = protocol
+        self.compare_result: Optional[CompareResult] = None
+        self.compare_thread: Optional[CompareThread] = None
+        # 从文件加载的数据（文本框中显示的是文件名）
+        self.file_data = {}
+        self.setWindowTitle("数据对比")
+        self.resize(1100, 750)
+        self.setup_ui()
+        self.text_a.setPlainText(initial_text)
+
+    def setup_ui(self):
+        """设置UI"""
+        layout = QVBoxLayout(self)
+        splitter = QSplitter(Qt.Orientation.Vertical)
+
+        # 输入区：基准 / 对比
+        input_widget = QSplitter(Qt.Orientation.Horizontal)
+        self.text_a = self._create_input_group(input_widget, "基准数据（期望/发送）", 'a')
+        self.text_b = self._create_input_group(input_widget, "对比数据（实测/接收）", 'b')
+        splitter.addWidget(input_widget)
+
+        # 差异表格
+        self.table = QTableWidget()
+        self.table.setColumnCount(6)
+        self.table.setHorizontalHeaderLabels([
+            "类型", "基准帧#", "对比帧#", "基准数据", "对比数据", "字段差异"
+        ])
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        self.table.itemSelectionChanged.connect(self.on_selection_changed)
+        splitter.addWidget(self.table)
+
+        # 差异详情
+        self.detail_text = QTextEdit()
+        self.detail_text.setReadOnly(True)
+        splitter.addWidget(self.detail_text)
+
+        splitter.setStretchFactor(0, 1)
+        splitter.setStretchFactor(1, 2)
+        splitter.setStretchFactor(2, 1)
+        layout.addWidget(splitter)
+
+        # 按钮与摘要
+        btn_layout = QHBoxLayout()
+
+        self.btn_compare = QPushButton("开始对比")
+        self.btn_compare.clicked.connect(self.on_compare_clicked)
+        btn_layout.addWidget(self.btn_compare)
+
+        self.label_summary = QLabel("")
+        btn_layout.addWidget(self.label_summary)
+        btn_layout.addStretch()
+
+        self.btn_close = QPushButton("关闭")
+        self.btn_close.clicked.connect(self.accept)
+        btn_layout.addWidget(self.btn_close)
+
+        layout.addLayout(btn_layout)
+
+    def _create_input_group(self, parent, title: str, key: str) -> QTextEdit:
+        """创建一个数据输入分组"""
+        group = QGroupBox(title)
+        group_layout = QVBoxLayout(group)
+
+        text_edit = QTextEdit()
+        text_edit.setPlaceholderText("粘贴十六进制数据，或从文件加载")
+        text_edit.textChanged.connect(lambda: self.file_data.pop(key, None))
+        group_layout.addWidget(text_edit)
+
+        btn_load = QPushButton("从文件加载...")
+        btn_load.clicked.connect(lambda: self.on_load_clicked(key, text_edit))
+        group_layout.addWidget(btn_load)
+
+        parent.addWidget(group)
+        return text_edit
+
+    def on_load_clicked(self, key: str, text_edit: QTextEdit):
+        """从文件加载捕获数据"""
+        file_path, _ = QFileDialog.getOpenFileName(
+            self, "加载捕获数据", "", "所有文件 (*);;文本文件 (*.txt);;二进制文件 (*.bin)"
+        )
+        if not file_path:
+            return
+
+        try:
+            data = read_capture_file(file_path)
+        except OSError as e:
+            QMessageBox.critical(self, "失败", f"文件读取失败：\n{e}")
+            return
+
+        # 大文件不显示在文本框中，只记录文件名
+        text_edit.setPlainText(f"[文件] {file_path} ({len(data)} 字节)")
+        self.file_data[key] = data
+
+    def get_input_data(self, key: str, text_edit: QTextEdit) -> bytes:
+        """获取输入数据"""
+        if key in self.file_data:
+            return self.file_data[key]
+        return DataParser.parse_hex_string(text_edit.toPlainText())
+
+    def on_compare_clicked(self):
+        """开始对比"""
+        try:
+            data_a = self.get_input_data('a', self.text_a)
+            data_b = self.get_input_data('b', self.text_b)
+        except ValueError as e:
+            QMessageBox.critical(self, "数据格式错误", str(e))
+            return
+
+        self.btn_compare.setEnabled(False)
+        self.btn_compare.setText("正在对比...")
+        self.table.setRowCount(0)
+        self.detail_text.clear()
+
+        self.compare_thread = CompareThread(self.protocol, data_a, data_b)
+        self.compare_thread.finished.connect(self.on_compare_finished)
+        self.compare_thread.error.connect(self.on_compare_error)
+        self.compare_thread.start()
+
+    def on_compare_finished(self, result: CompareResult):
+        """对比完成"""
+        self.compare_result = result
+        self.btn_compare.setEnabled(True)
+        self.btn_compare.setText("开始对比")
+
+        summary = result.get_summary()
+        if len(result.diffs) > self.MAX_TABLE_ROWS:
+            summary += f"（表格仅显示前 {self.MAX_TABLE_ROWS} 处差异）"
+        self.label_summary.setText(summary)
+        self.fill_table(result)
+
+    def on_compare_error(self, error_msg: str):
+        """对比出错"""
+        self.btn_compare.setEnabled(True)
+        self.btn_compare.setText("开始对比")
+        QMessageBox.critical(self, "对比失败", f"对比失败：\n{error_msg}")
+
+    def fill_table(self, result: CompareResult):
+        """填充差异表格"""
+        diffs = result.diffs[:self.MAX_TABLE_ROWS]
+        self.table.setRowCount(len(diffs))
+
+        for row, diff in enumerate(diffs):
+            items = [
+                diff.kind.value,
+                str(diff.frame_a.frame_number) if diff.frame_a else "",
+                str(diff.frame_b.frame_number) if diff.frame_b else "",
+                diff.frame_a.get_raw_data_hex() if diff.frame_a else "",
+                diff.frame_b.get_raw_data_hex() if diff.frame_b else "",
+                diff.get_field_diff_text(),
+            ]
+            for col, text in enumerate(items):
+                item = QTableWidgetItem(text)
+                item.setBackground(DIFF_COLORS[diff.kind])
+                self.table.setItem(row, col, item)
+
+        self.table.resizeColumnsToContents()
+
+    def on_selection_changed(self):
+        """选择改变"""
+        selected_items = self.table.selectedItems()
+        if not selected_items or not self.compare_result:
+            return
+
+        row = selected_items[0].row()
+        if row < len(self.compare_result.diffs):
+            self.detail_text.setPlainText(self.compare_result.diffs[row].get_detailed_info())
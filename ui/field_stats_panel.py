@@ -0,0 +1,178 @@
+"""
+字段统计面板
+"""
+from typing import Iterable, List, Optional, Tuple
+
+from PySide6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QTableWidget, QTableWidgetItem,
+    QPushButton, QLabel, QSplitter, QFileDialog, QMessageBox
+)
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QPainter, QColor
+
+from models import DataFrame
+from core.columns import FrameColumns
+from core.field_stats import FieldStatistics, FieldStats
+
+
+class HistogramWidget(QWidget):
+    """直方图绘制控件"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.buckets: List[Tuple[float, float, int]] = []
+        self.title = ""
+        self.setMinimumHeight(150)
+
+    def set_buckets(self, title: str, buckets: List[Tuple[float, float, int]]):
+        """设置要显示的区间"""
+        self.title = title
+        self.buckets = buckets
+        self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor(255, 255, 255))
+        margin = 30
+        width = self.width() - margin * 2
+        height = self.height() - margin * 2
+        painter.drawText(margin, 18, self.title)
+        if not self.buckets or width <= 0 or height <= 0:
+            return
+
+        max_count = max(count for _, _, count in self.buckets) or 1
+        bar_width = width / len(self.buckets)
+        for i, (_, _, count) in enumerate(self.buckets):
+            bar_height = height * count / max_count
+            painter.fillRect(
+                int(margin + i * bar_width), int(margin + height - bar_height),
+                max(int(bar_width) - 1, 1), int(bar_height), QColor(100, 150, 220)
+            )
+
+        painter.drawText(margin, self.height() - 8, f"{self.buckets[0][0]:g}")
+        end_text = f"{self.buckets[-1][1]:g}"
+        painter.drawText(self.width() - margin - painter.fontMetrics().horizontalAdvance(end_text),
+                         self.height() - 8, end_text)
+        painter.drawText(2, margin + 10, str(max_count))
+
+
+class FieldStatsPanel(QWidget):
+    """字段统计面板"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.statistics = FieldStatistics()
+        self.setup_ui()
+
+    def setup_ui(self):
+        """设置UI"""
+        layout = QVBoxLayout(self)
+
+        self.label_summary = QLabel("尚无统计数据")
+        layout.addWidget(self.label_summary)
+
+        splitter = QSplitter(Qt.Orientation.Vertical)
+        self.table = QTableWidget()
+        self.table.setColumnCount(7)
+        self.table.setHorizontalHeaderLabels(["字段", "类型", "计数", "最小值", "最大值", "均值", "标准差"])
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        self.table.itemSelectionChanged.connect(self.on_selection_changed)
+        splitter.addWidget(self.table)
+
+        self.histogram = HistogramWidget()
+        splitter.addWidget(self.histogram)
+        layout.addWidget(splitter)
+
+        btn_layout = QHBoxLayout()
+        btn_layout.addStretch()
+        self.btn_export = QPushButton("导出统计")
+        self.btn_export.clicked.connect(self.on_export_clicked)
+        btn_layout.addWidget(self.btn_export)
+        layout.addLayout(btn_layout)
+
+    def clear(self):
+        """清空统计"""
+        self.statistics.clear()
+        self.refresh()
+
+    def set_frames(self, frames: Iterable[DataFrame], columns: Optional[FrameColumns] = None):
+        """
+        重新统计
+
+        Args:
+            frames: 帧列表
+            columns: 同一帧列表的列式数据，提供时用 numpy 批量统计
+        """
+        self.statistics.clear()
+        if columns is not None:
+            self.statistics.add_columns(columns)
+        else:
+            self.statistics.add_frames(frames)
+        self.refresh()
+
+    def add_frames(self, frames: Iterable[DataFrame]):
+        """增量加入新帧（实时采集）"""
+        self.statistics.add_frames(frames)
+        self.refresh()
+
+    def refresh(self):
+        """刷新显示"""
+        fields = list(self.statistics.fields.values())
+        self.label_summary.setText(f"共 {self.statistics.frame_count} 帧，{len(fields)} 个字段")
+
+        selected = self.get_selected_stats()
+        self.table.setRowCount(len(fields))
+        for row, stats in enumerate(fields):
+            if stats.count:
+                values = [stats.name, stats.field_type, str(stats.count), f"{stats.minimum:g}",
+                          f"{stats.maximum:g}", f"{stats.mean:.4f}", f"{stats.get_stddev():.4f}"]
+            else:
+                values = [stats.name, stats.field_type, "0", "", "", "", ""]
+            for col, text in enumerate(values):
+                self.table.setItem(row, col, QTableWidgetItem(text))
+
+        if selected:
+            self.histogram.set_buckets(selected.name, selected.histogram.get_buckets())
+
+    def get_selected_stats(self) -> Optional[FieldStats]:
+        """获取选中行的字段统计"""
+        selected_items = self.table.selectedItems()
+        if not selected_items:
+            return None
+        name_item = self.table.item(selected_items[0].row(), 0)
+        return self.statistics.fields.get(name_item.text()) if name_item else None
+
+    def on_selection_changed(self):
+        """选择改变时显示该字段的直方图"""
+        stats = self.get_selected_stats()
+        if stats:
+            self.histogram.set_buckets(stats.name, stats.histogram.get_buckets())
+
+    def on_export_clicked(self):
+        """导出统计"""
+        if not self.statistics.fields:
+            QMessageBox.warning(self, "警告", "没有可导出的统计数据！")
+            return
+
+        file_path, _ = QFileDialog.getSaveFileName(
+            self, "导出统计", "", "CSV文件 (*.csv);;文本文件 (*.txt)"
+        )
+        if not file_path:
+            return
+
+        if file_path.endswith('.txt'):
+            try:
+                with open(file_path, 'w', encoding='utf-8') as f:
+                    f.write(self.statistics.to_text())
+                success = True
+            except OSError as e:
+                print(f"导出统计失败: {e}")
+                success = False
+        else:
+            success = self.statistics.export_csv(file_path)
+
+        if success:
+            QMessageBox.information(self, "成功", f"统计已导出到：\n{file_path}")
+        else:
+            QMessageBox.critical(self, "失败", "导出失败！")
@@ -1,18 +1,111 @@
 """
 历史记录查看对话框
+记录按需从历史数据库分批读取（表格滚动到底部时再读取下一批），
+支持按协议、时间范围和捕获数据中的十六进制片段搜索。
 """
+import os
+
 from PySide6.QtWidgets import (
-    QDialog, QVBoxLayout, QHBoxLayout, QTableWidget, 
-    QTableWidgetItem, QPushButton, QTextEdit, QSplitter,
-    QLabel, QMessageBox
+    QDialog, QVBoxLayout, QHBoxLayout, QTableView, QAbstractItemView,
+    QPushButton, QTextEdit, QSplitter, QLabel, QMessageBox, QComboBox,
+    QLineEdit, QCheckBox, QDateTimeEdit
 )
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, Signal, QAbstractTableModel, QModelIndex, QDateTime
 from core.analysis_history import AnalysisHistory
 
 
+class HistoryTableModel(QAbstractTableModel):
+    """历史记录表格模型（按需分批读取）"""
+
+    HEADERS = ["时间", "协议", "总帧数", "有效帧", "错误帧", "输入数据"]
+
+    # 每批读取的记录数
+    BATCH_SIZE = 100
+
+    def __init__(self, history_manager: AnalysisHistory, parent=None):
+        super().__init__(parent)
+        self.history_manager = history_manager
+        self.filters = {}
+        self.records = []
+        self.total = 0
+
+    def set_filters(self, **filters):
+        """
+        设置查询条件并重新加载
+
+        Args:
+            filters: AnalysisHistory.query 的筛选参数
+
+        Raises:
+            ValueError: 十六进制片段无效
+        """
+        total = self.history_manager.count(**filters)
+        self.beginResetModel()
+        self.filters = filters
+        self.records = []
+        self.total = total
+        self.endResetModel()
+        # 立即读取第一批，不等视图请求
+        if self.canFetchMore():
+            self.fetchMore()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.records)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and len(self.records) < self.total
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+        batch = self.history_manager.query(len(self.records), self.BATCH_SIZE, **self.filters)
+        if not batch:
+            # 记录在查询期间被删除
+            self.total = len(self.records)
+            return
+        self.beginInsertRows(QModelIndex(), len(self.records), len(self.records) + len(batch) - 1)
+        self.records.extend(batch)
+        self.endInsertRows()
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+        record = self.records[index.row()]
+        column = index.column()
+        if column == 0:
+            return self.history_manager.format_timestamp(record.get('timestamp', ''))
+        if column == 1:
+            return record.get('protocol_name', '')
+        if column == 2:
+            return str(record.get('total_frames', 0))
+        if column == 3:
+            return str(record.get('valid_frames', 0))
+        if column == 4:
+            return str(record.get('error_frames', 0))
+        # 输入数据（截断显示）
+        return record.get('input_data', '')
+
+    def get_record(self, row: int) -> dict:
+        """获取已读取的记录"""
+        return self.records[row] if 0 <= row < len(self.records) else {}
+
+
 class HistoryDialog(QDialog):
     """历史记录对话框"""
-    
+
+    # 请求打开快照（快照文件路径）
+    snapshot_requested = Signal(str)
+    # 请求用保存的捕获数据重新分析（历史记录）
+    replay_requested = Signal(dict)
+
     def __init__(self, history_manager: AnalysisHistory, parent=None):
         super().__init__(parent)
         self.history_manager = history_manager
@@ -20,89 +113,145 @@ class HistoryDialog(QDialog):
         self.resize(900, 600)
         self.setup_ui()
         self.load_history()
-    
+
     def setup_ui(self):
         """设置UI"""
         layout = QVBoxLayout(self)
-        
+
+        # 搜索条件
+        filter_layout = QHBoxLayout()
+        filter_layout.addWidget(QLabel("协议:"))
+        self.combo_protocol = QComboBox()
+        self.combo_protocol.addItem("全部", "")
+        for name in self.history_manager.get_protocol_names():
+            self.combo_protocol.addItem(name, name)
+        self.combo_protocol.currentIndexChanged.connect(self.load_history)
+        filter_layout.addWidget(self.combo_protocol)
+
+        self.check_time_range = QCheckBox("时间:")
+        self.check_time_range.toggled.connect(self.on_time_range_toggled)
+        filter_layout.addWidget(self.check_time_range)
+        now = QDateTime.currentDateTime()
+        self.edit_start_time = QDateTimeEdit(now.addDays(-7))
+        self.edit_end_time = QDateTimeEdit(now)
+        for edit in (self.edit_start_time, self.edit_end_time):
+            edit.setDisplayFormat("yyyy-MM-dd HH:mm")
+            edit.setCalendarPopup(True)
+            edit.setEnabled(False)
+        filter_layout.addWidget(self.edit_start_time)
+        filter_layout.addWidget(QLabel("至"))
+        filter_layout.addWidget(self.edit_end_time)
+
+        filter_layout.addWidget(QLabel("数据包含:"))
+        self.edit_hex = QLineEdit()
+        self.edit_hex.setPlaceholderText("十六进制片段，如 68 01 03")
+        self.edit_hex.returnPressed.connect(self.load_history)
+        filter_layout.addWidget(self.edit_hex)
+
+        self.btn_search = QPushButton("搜索")
+        self.btn_search.clicked.connect(self.load_history)
+        filter_layout.addWidget(self.btn_search)
+        layout.addLayout(filter_layout)
+
         # 创建分割器
         splitter = QSplitter(Qt.Orientation.Vertical)
-        
+
         # 历史记录表格
-        self.table = QTableWidget()
-        self.table.setColumnCount(6)
-        self.table.setHorizontalHeaderLabels([
-            "时间", "协议", "总帧数", "有效帧", "错误帧", "输入数据"
-        ])
-        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
-        self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        self.model = HistoryTableModel(self.history_manager, self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
         self.table.setAlternatingRowColors(True)
-        self.table.itemSelectionChanged.connect(self.on_selection_changed)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        self.table.selectionModel().selectionChanged.connect(self.on_selection_changed)
         splitter.addWidget(self.table)
-        
+
         # 详细信息
         detail_widget = QTextEdit()
         detail_widget.setReadOnly(True)
         self.detail_text = detail_widget
         splitter.addWidget(detail_widget)
-        
+
         splitter.setStretchFactor(0, 2)
         splitter.setStretchFactor(1, 1)
-        
+
         layout.addWidget(splitter)
-        
+
         # 按钮
         btn_layout = QHBoxLayout()
-        
+
         self.btn_clear = QPushButton("清空历史")
         self.btn_clear.clicked.connect(self.on_clear_clicked)
         btn_layout.addWidget(self.btn_clear)
-        
+
+        self.label_count = QLabel()
+        btn_layout.addWidget(self.label_count)
+
         btn_layout.addStretch()
-        
+
+        self.btn_replay = QPushButton("重新分析")
+        self.btn_replay.setEnabled(False)
+        self.btn_replay.clicked.connect(self.on_replay_clicked)
+        btn_layout.addWidget(self.btn_replay)
+
+        self.btn_open_snapshot = QPushButton("打开快照")
+        self.btn_open_snapshot.setEnabled(False)
+        self.btn_open_snapshot.clicked.connect(self.on_open_snapshot_clicked)
+        btn_layout.addWidget(self.btn_open_snapshot)
+
         self.btn_close = QPushButton("关闭")
         self.btn_close.clicked.connect(self.accept)
         btn_layout.addWidget(self.btn_close)
-        
+
         layout.addLayout(btn_layout)
-    
+
+    def get_filters(self) -> dict:
+        """获取当前搜索条件"""
+        filters = {
+            'protocol_name': self.combo_protocol.currentData(),
+            'hex_pattern': self.edit_hex.text().strip(),
+        }
+        if self.check_time_range.isChecked():
+            filters['start'] = self.edit_start_time.dateTime().toString(Qt.DateFormat.ISODate)
+            # 时间只显示到分钟，结束时间包含该分钟
+            filters['end'] = self.edit_end_time.dateTime().addSecs(60).toString(Qt.DateFormat.ISODate)
+        return filters
+
     def load_history(self):
-        """加载历史记录"""
-        history = self.history_manager.get_history()
-        self.table.setRowCount(len(history))
-        
-        for row, record in enumerate(history):
-            # 时间
-            timestamp = self.history_manager.format_timestamp(record.get('timestamp', ''))
-            self.table.setItem(row, 0, QTableWidgetItem(timestamp))
-            
-            # 协议
-            self.table.setItem(row, 1, QTableWidgetItem(record.get('protocol_name', '')))
-            
-            # 总帧数
-            self.table.setItem(row, 2, QTableWidgetItem(str(record.get('total_frames', 0))))
-            
-            # 有效帧
-            self.table.setItem(row, 3, QTableWidgetItem(str(record.get('valid_frames', 0))))
-            
-            # 错误帧
-            self.table.setItem(row, 4, QTableWidgetItem(str(record.get('error_frames', 0))))
-            
-            # 输入数据（截断显示）
-            input_data = record.get('input_data', '')
-            self.table.setItem(row, 5, QTableWidgetItem(input_data))
-        
+        """按当前搜索条件重新加载历史记录"""
+        try:
+            self.model.set_filters(**self.get_filters())
+        except ValueError as e:
+            QMessageBox.warning(self, "警告", f"搜索条件无效：\n{e}")
+            return
+
+        self.label_count.setText(f"共 {self.model.total} 条")
+        self.detail_text.clear()
+        self.btn_open_snapshot.setEnabled(False)
+        self.btn_replay.setEnabled(False)
         self.table.resizeColumnsToContents()
-    
+
+    def on_time_range_toggled(self, checked: bool):
+        """启用或取消时间范围"""
+        self.edit_start_time.setEnabled(checked)
+        self.edit_end_time.setEnabled(checked)
+        self.load_history()
+
+    def get_selected_record(self):
+        """获取选中的记录"""
+        rows = self.table.selectionModel().selectedRows()
+        if not rows:
+            return {}
+        return self.model.get_record(rows[0].row())
+
     def on_selection_changed(self):
         """选择改变"""
-        selected_items = self.table.selectedItems()
-        if not selected_items:
-            return
-        
-        row = selected_items[0].row()
-        record = self.history_manager.get_record(row)
-        
+        record = self.get_selected_record()
+        self.btn_open_snapshot.setEnabled(self.get_snapshot_path(record) != '')
+        self.btn_replay.setEnabled(self.can_replay(record))
+
         if record:
             # 显示详细信息
             details = []
@@ -111,33 +260,68 @@ class HistoryDialog(QDialog):
             details.append(f"总帧数: {record.get('total_frames', 0)}")
             details.append(f"有效帧: {record.get('valid_frames', 0)}")
             details.append(f"错误帧: {record.get('error_frames', 0)}")
+            if self.get_snapshot_path(record):
+                details.append(f"快照: {record['snapshot_path']}")
+            if self.can_replay(record):
+                details.append(f"捕获数据: {record['capture_hash'][:16]}")
             details.append("")
             details.append("输入数据:")
             details.append(record.get('input_data', ''))
             details.append("")
             details.append("帧摘要:")
-            
+
             for frame_summary in record.get('frame_summary', []):
                 frame_num = frame_summary.get('frame_number', 0)
                 has_error = frame_summary.get('has_error', False)
                 checksum_valid = frame_summary.get('checksum_valid', True)
                 raw_data = frame_summary.get('raw_data_hex', '')
-                
+
                 status = "❌ 错误" if has_error else ("✓ 正常" if checksum_valid else "⚠ 校验失败")
                 details.append(f"  帧#{frame_num}: {status}")
                 details.append(f"    数据: {raw_data}")
-            
+
             self.detail_text.setText('\n'.join(details))
-    
+
+    @staticmethod
+    def get_snapshot_path(record) -> str:
+        """获取记录中仍存在的快照路径"""
+        path = record.get('snapshot_path', '') if record else ''
+        return path if path and os.path.exists(path) else ''
+
+    def can_replay(self, record) -> bool:
+        """记录的捕获数据和协议配置是否仍保存着"""
+        if not record:
+            return False
+        store = self.history_manager.blob_store
+        return store.has(record.get('capture_hash', '')) and store.has(record.get('protocol_hash', ''))
+
+    def on_replay_clicked(self):
+        """重新分析选中的记录"""
+        record = self.get_selected_record()
+        if self.can_replay(record):
+            self.replay_requested.emit(record)
+            self.accept()
+
+    def on_open_snapshot_clicked(self):
+        """打开选中记录的快照"""
+        path = self.get_snapshot_path(self.get_selected_record())
+        if path:
+            self.snapshot_requested.emit(path)
+            self.accept()
+
     def on_clear_clicked(self):
         """清空历史"""
         reply = QMessageBox.question(
             self, "确认", "确定要清空所有历史记录吗？",
             QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
         )
-        
+
         if reply == QMessageBox.StandardButton.Yes:
             self.history_manager.clear_history()
+            self.combo_protocol.blockSignals(True)
+            while self.combo_protocol.count() > 1:
+                self.combo_protocol.removeItem(1)
+            self.combo_protocol.setCurrentIndex(0)
+            self.combo_protocol.blockSignals(False)
             self.load_history()
-            self.detail_text.clear()
             QMessageBox.information(self, "成功", "历史记录已清空！")
@@ -0,0 +1,191 @@
+"""
+双路实时对比对话框
+"""
+from typing import Optional
+
+from PySide6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QTableWidget, QTableWidgetItem,
+    QPushButton, QLabel, QLineEdit, QSpinBox, QDoubleSpinBox, QFormLayout,
+    QMessageBox
+)
+from PySide6.QtCore import QTimer
+from PySide6.QtGui import QColor
+
+from models import ProtocolConfig
+from core.serial_capture import SerialCapture
+from core.network_source import NetworkSource, parse_endpoint
+from core.live_compare import LiveComparator, LiveCompareSession, LiveMatch
+
+
+class LiveCompareDialog(QDialog):
+    """双路实时对比对话框"""
+
+    # 表格中最多显示的分歧数
+    MAX_TABLE_ROWS = 5000
+
+    def __init__(self, protocol: ProtocolConfig, parent=None):
+        """
+        初始化
+
+        Args:
+            protocol: 两个通道使用的协议配置
+            parent: 父窗口
+        """
+        super().__init__(parent)
+        self.protocol = protocol
+        self.session: Optional[LiveCompareSession] = None
+        self.timer = QTimer(self)
+        self.timer.setInterval(100)
+        self.timer.timeout.connect(self.on_timer)
+        self.setWindowTitle("双路实时对比")
+        self.resize(900, 600)
+        self.setup_ui()
+
+    def setup_ui(self):
+        """设置UI"""
+        layout = QVBoxLayout(self)
+
+        form_layout = QFormLayout()
+        self.edit_source_a = QLineEdit()
+        self.edit_source_a.setPlaceholderText("串口名（如 /dev/ttyUSB0）或 tcp://主机:端口、udp://地址:端口")
+        form_layout.addRow("A 通道（被测设备）:", self.edit_source_a)
+
+        self.edit_source_b = QLineEdit()
+        self.edit_source_b.setPlaceholderText("串口名或网络端点")
+        form_layout.addRow("B 通道（参考模拟器）:", self.edit_source_b)
+
+        self.spin_baudrate = QSpinBox()
+        self.spin_baudrate.setRange(50, 12000000)
+        self.spin_baudrate.setValue(115200)
+        form_layout.addRow("串口波特率:", self.spin_baudrate)
+
+        self.spin_window = QDoubleSpinBox()
+        self.spin_window.setRange(0.01, 600.0)
+        self.spin_window.setValue(2.0)
+        self.spin_window.setSuffix(" 秒")
+        form_layout.addRow("匹配时间窗口:", self.spin_window)
+
+        self.spin_window_frames = QSpinBox()
+        self.spin_window_frames.setRange(1, 10000000)
+        self.spin_window_frames.setValue(10000)
+        form_layout.addRow("每路最多待匹配帧数:", self.spin_window_frames)
+        layout.addLayout(form_layout)
+
+        # 分歧表格
+        self.table = QTableWidget()
+        self.table.setColumnCount(3)
+        self.table.setHorizontalHeaderLabels(["类型", "帧#", "数据"])
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        layout.addWidget(self.table)
+
+        self.label_stats = QLabel("")
+        layout.addWidget(self.label_stats)
+
+        btn_layout = QHBoxLayout()
+        self.btn_start = QPushButton("开始对比")
+        self.btn_start.clicked.connect(self.on_start_clicked)
+        btn_layout.addWidget(self.btn_start)
+
+        self.btn_stop = QPushButton("停止")
+        self.btn_stop.setEnabled(False)
+        self.btn_stop.clicked.connect(self.stop_session)
+        btn_layout.addWidget(self.btn_stop)
+        btn_layout.addStretch()
+
+        self.btn_close = QPushButton("关闭")
+        self.btn_close.clicked.connect(self.accept)
+        btn_layout.addWidget(self.btn_close)
+        layout.addLayout(btn_layout)
+
+    def create_source(self, spec: str):
+        """
+        根据输入创建采集源
+
+        Args:
+            spec: 串口名或网络端点URL
+
+        Returns:
+            采集源
+        """
+        if '://' in spec:
+            return NetworkSource([parse_endpoint(spec)], self.protocol)
+        return SerialCapture(spec, self.spin_baudrate.value(), self.protocol)
+
+    def on_start_clicked(self):
+        """开始对比"""
+        spec_a = self.edit_source_a.text().strip()
+        spec_b = self.edit_source_b.text().strip()
+        if not spec_a or not spec_b:
+            QMessageBox.warning(self, "警告", "请填写两个通道的数据源！")
+            return
+
+        comparator = LiveComparator(
+            window_seconds=self.spin_window.value(),
+            window_frames=self.spin_window_frames.value()
+        )
+        try:
+            session = LiveCompareSession(self.create_source(spec_a), self.create_source(spec_b), comparator)
+            session.start()
+        except Exception as e:
+            QMessageBox.critical(self, "启动失败", f"无法启动对比：\n{e}")
+            return
+
+        self.session = session
+        self.table.setRowCount(0)
+        self.btn_start.setEnabled(False)
+        self.btn_stop.setEnabled(True)
+        self.timer.start()
+
+    def stop_session(self):
+        """停止对比"""
+        if not self.session:
+            return
+
+        self.timer.stop()
+        self.session.stop()
+        self.on_timer()
+        self.session = None
+        self.btn_start.setEnabled(True)
+        self.btn_stop.setEnabled(False)
+
+    def on_timer(self):
+        """定时取帧对比并刷新统计"""
+        session = self.session
+        if not session:
+            return
+
+        _, results = session.poll()
+        for match in results:
+            if not match.is_matched():
+                self.append_divergence_row(match)
+        self.label_stats.setText(session.comparator.get_stats().get_summary())
+
+        if not session.is_running() and self.timer.isActive():
+            error_msg = session.error_message
+            self.stop_session()
+            if error_msg:
+                QMessageBox.critical(self, "采集错误", error_msg)
+
+    def append_divergence_row(self, match: LiveMatch):
+        """追加一行分歧（表格满时删除最早的行）"""
+        if self.table.rowCount() >= self.MAX_TABLE_ROWS:
+            self.table.removeRow(0)
+
+        if match.frame_a is not None:
+            kind, frame, color = "仅A", match.frame_a, QColor(255, 200, 200)
+        else:
+            kind, frame, color = "仅B", match.frame_b, QColor(200, 255, 200)
+
+        row = self.table.rowCount()
+        self.table.insertRow(row)
+        for col, text in enumerate([kind, str(frame.frame_number), frame.get_raw_data_hex()]):
+            item = QTableWidgetItem(text)
+            item.setBackground(color)
+            self.table.setItem(row, col, item)
+        self.table.scrollToBottom()
+
+    def done(self, result: int):
+        """关闭对话框时停止对比"""
+        self.stop_session()
+        super().done(result)
@@ -0,0 +1,164 @@
+"""
+多路采集配置对话框
+"""
+from typing import Any, Dict, List
+
+from PySide6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QTableWidget, QTableWidgetItem,
+    QPushButton, QLabel, QFileDialog, QMessageBox, QDoubleSpinBox, QFormLayout
+)
+
+
+class MultiCaptureDialog(QDialog):
+    """多路采集配置对话框"""
+    
+    def __init__(self, ports: List[str], parent=None):
+        """
+        初始化
+        
+        Args:
+            ports: 可用串口列表，用于预填通道
+            parent: 父窗口
+        """
+        super().__init__(parent)
+        self.ports = ports
+        self.setWindowTitle("多路串口采集")
+        self.resize(700, 400)
+        self.setup_ui()
+        
+        # 默认为每个可用串口添加一个通道
+        for port in ports or [""]:
+            self.add_channel_row(port)
+    
+    def setup_ui(self):
+        """设置UI"""
+        layout = QVBoxLayout(self)
+        
+        layout.addWidget(QLabel("每个通道独立分帧，协议文件留空时使用当前协议配置："))
+        
+        self.table = QTableWidget()
+        self.table.setColumnCount(4)
+        self.table.setHorizontalHeaderLabels(["通道名称", "串口", "波特率", "协议文件"])
+        self.table.horizontalHeader().setStretchLastSection(True)
+        layout.addWidget(self.table)
+        
+        # 通道管理按钮
+        btn_layout = QHBoxLayout()
+        
+        self.btn_add = QPushButton("添加通道")
+        self.btn_add.clicked.connect(lambda: self.add_channel_row(""))
+        btn_layout.addWidget(self.btn_add)
+        
+        self.btn_remove = QPushButton("删除通道")
+        self.btn_remove.clicked.connect(self.on_remove_clicked)
+        btn_layout.addWidget(self.btn_remove)
+        
+        self.btn_browse = QPushButton("选择协议文件...")
+        self.btn_browse.clicked.connect(self.on_browse_clicked)
+        btn_layout.addWidget(self.btn_browse)
+        
+        btn_layout.addStretch()
+        layout.addLayout(btn_layout)
+        
+        # 合并参数
+        form_layout = QFormLayout()
+        self.spin_reorder_delay = QDoubleSpinBox()
+        self.spin_reorder_delay.setRange(0.0, 10.0)
+        self.spin_reorder_delay.setSingleStep(0.1)
+        self.spin_reorder_delay.setValue(0.2)
+        self.spin_reorder_delay.setSuffix(" 秒")
+        form_layout.addRow("合并等待时间:", self.spin_reorder_delay)
+        layout.addLayout(form_layout)
+        
+        # 确定/取消
+        ok_layout = QHBoxLayout()
+        ok_layout.addStretch()
+        
+        self.btn_ok = QPushButton("开始采集")
+        self.btn_ok.clicked.connect(self.on_ok_clicked)
+        ok_layout.addWidget(self.btn_ok)
+        
+        self.btn_cancel = QPushButton("取消")
+        self.btn_cancel.clicked.connect(self.reject)
+        ok_layout.addWidget(self.btn_cancel)
+        
+        layout.addLayout(ok_layout)
+    
+    def add_channel_row(self, port: str):
+        """添加一个通道行"""
+        row = self.table.rowCount()
+        self.table.insertRow(row)
+        self.table.setItem(row, 0, QTableWidgetItem(f"CH{row + 1}"))
+        self.table.setItem(row, 1, QTableWidgetItem(port))
+        self.table.setItem(row, 2, QTableWidgetItem("115200"))
+        self.table.setItem(row, 3, QTableWidgetItem(""))
+    
+    def on_remove_clicked(self):
+        """删除选中的通道"""
+        row = self.table.currentRow()
+        if row >= 0:
+            self.table.removeRow(row)
+    
+    def on_browse_clicked(self):
+        """为选中的通道选择协议文件"""
+        row = self.table.currentRow()
+        if row < 0:
+            QMessageBox.warning(self, "警告", "请先选择通道！")
+            return
+        
+        file_path, _ = QFileDialog.getOpenFileName(self, "选择协议文件", "", "JSON文件 (*.json)")
+        if file_path:
+            self.table.setItem(row, 3, QTableWidgetItem(file_path))
+    
+    def on_ok_clicked(self):
+        """确认配置"""
+        try:
+            channels = self.get_channels()
+        except ValueError as e:
+            QMessageBox.critical(self, "配置错误", str(e))
+            return
+        
+        if not channels:
+            QMessageBox.warning(self, "警告", "请至少添加一个通道！")
+            return
+        self.accept()
+    
+    def get_channels(self) -> List[Dict[str, Any]]:
+        """
+        获取通道配置
+        
+        Returns:
+            [{'name', 'port', 'baudrate', 'protocol_file'}, ...]
+            
+        Raises:
+            ValueError: 配置无效
+        """
+        def text(row: int, col: int) -> str:
+            item = self.table.item(row, col)
+            return item.text().strip() if item else ""
+        
+        channels = []
+        for row in range(self.table.rowCount()):
+            name = text(row, 0) or f"CH{row + 1}"
+            port = text(row, 1)
+            if not port:
+                raise ValueError(f"通道 {name} 未指定串口")
+            try:
+                baudrate = int(text(row, 2))
+            except ValueError:
+                raise ValueError(f"通道 {name} 的波特率无效")
+            channels.append({
+                'name': name,
+                'port': port,
+                'baudrate': baudrate,
+                'protocol_file': text(row, 3)
+            })
+        
+        names = [c['name'] for c in channels]
+        if len(names) != len(set(names)):
+            raise ValueError("通道名称必须唯一")
+        return channels
+    
+    def get_reorder_delay(self) -> float:
+        """获取合并等待时间（秒）"""
+        return self.spin_reorder_delay.value()
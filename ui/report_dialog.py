@@ -0,0 +1,56 @@
+"""
+文本报告对话框
+"""
+from PySide6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QTextEdit, QPushButton,
+    QFileDialog, QMessageBox
+)
+from PySide6.QtGui import QFont
+
+
+class ReportDialog(QDialog):
+    """文本报告对话框（等宽字体显示，可保存）"""
+    
+    def __init__(self, title: str, text: str, parent=None):
+        super().__init__(parent)
+        self.text = text
+        self.setWindowTitle(title)
+        self.resize(800, 600)
+        self.setup_ui()
+    
+    def setup_ui(self):
+        """设置UI"""
+        layout = QVBoxLayout(self)
+        
+        self.text_edit = QTextEdit()
+        self.text_edit.setReadOnly(True)
+        self.text_edit.setFont(QFont("Courier New", 10))
+        self.text_edit.setPlainText(self.text)
+        layout.addWidget(self.text_edit)
+        
+        btn_layout = QHBoxLayout()
+        
+        self.btn_save = QPushButton("保存报告")
+        self.btn_save.clicked.connect(self.on_save_clicked)
+        btn_layout.addWidget(self.btn_save)
+        
+        btn_layout.addStretch()
+        
+        self.btn_close = QPushButton("关闭")
+        self.btn_close.clicked.connect(self.accept)
+        btn_layout.addWidget(self.btn_close)
+        
+        layout.addLayout(btn_layout)
+    
+    def on_save_clicked(self):
+        """保存报告"""
+        file_path, _ = QFileDialog.getSaveFileName(self, "保存报告", "", "文本文件 (*.txt)")
+        if not file_path:
+            return
+        
+        try:
+            with open(file_path, 'w', encoding='utf-8') as f:
+                f.write(self.text)
+            QMessageBox.information(self, "成功", "报告保存成功！")
+        except Exception as e:
+            QMessageBox.critical(self, "失败", f"报告保存失败：\n{e}")
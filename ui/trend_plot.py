@@ -0,0 +1,238 @@
+"""
+字段趋势图
+"""
+from datetime import datetime
+from typing import Dict, Optional
+
+from PySide6.QtWidgets import (
+    QWidget, QDialog, QVBoxLayout, QHBoxLayout, QComboBox, QLabel, QPushButton,
+    QMessageBox
+)
+from PySide6.QtCore import Qt, QPointF
+from PySide6.QtGui import QPainter, QColor, QPen, QPolygonF
+
+from core.columns import FrameColumns
+from core.downsample import MinMaxPyramid, build_field_pyramid
+
+
+class TrendPlotWidget(QWidget):
+    """
+    趋势图绘制控件
+
+    滚轮以光标为中心缩放，左键拖动平移，双击恢复全部范围；
+    每次重绘只从金字塔取出可见窗口并降采样到绘图区宽度的数量级
+    """
+
+    MARGIN_LEFT = 70
+    MARGIN_RIGHT = 20
+    MARGIN_TOP = 20
+    MARGIN_BOTTOM = 30
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pyramid: Optional[MinMaxPyramid] = None
+        self.method = 'minmax'
+        self.time_axis = False
+        self.x_start = 0.0
+        self.x_end = 1.0
+        self._drag_x: Optional[float] = None
+        self.setMinimumSize(600, 300)
+        self.setMouseTracking(True)
+
+    def set_pyramid(self, pyramid: Optional[MinMaxPyramid], time_axis: bool = False):
+        """设置要显示的序列并恢复全部范围"""
+        self.pyramid = pyramid
+        self.time_axis = time_axis
+        self.reset_view()
+
+    def set_method(self, method: str):
+        """设置降采样方法（'minmax' 或 'lttb'）"""
+        self.method = method
+        self.update()
+
+    def reset_view(self):
+        """显示全部范围"""
+        if self.pyramid is not None:
+            self.x_start, self.x_end = self.pyramid.get_x_range()
+            if self.x_end <= self.x_start:
+                self.x_end = self.x_start + 1
+        self.update()
+
+    def plot_width(self) -> int:
+        return max(self.width() - self.MARGIN_LEFT - self.MARGIN_RIGHT, 1)
+
+    def plot_height(self) -> int:
+        return max(self.height() - self.MARGIN_TOP - self.MARGIN_BOTTOM, 1)
+
+    def x_to_value(self, pixel: float) -> float:
+        """像素横坐标转换为数据横坐标"""
+        ratio = (pixel - self.MARGIN_LEFT) / self.plot_width()
+        return self.x_start + ratio * (self.x_end - self.x_start)
+
+    def format_x(self, value: float) -> str:
+        """横坐标文本"""
+        if self.time_axis:
+            return datetime.fromtimestamp(value).strftime('%H:%M:%S.%f')[:-3]
+        return f"{value:.0f}"
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor(255, 255, 255))
+        left, top = self.MARGIN_LEFT, self.MARGIN_TOP
+        width, height = self.plot_width(), self.plot_height()
+        painter.setPen(QColor(160, 160, 160))
+        painter.drawRect(left, top, width, height)
+
+        if self.pyramid is None or len(self.pyramid) == 0:
+            painter.drawText(left + 10, top + 20, "无数据")
+            return
+
+        xs, ys = self.pyramid.get_view(self.x_start, self.x_end, width * 2, self.method)
+        if len(xs) == 0:
+            return
+        y_min, y_max = float(ys.min()), float(ys.max())
+        if y_max <= y_min:
+            y_min, y_max = y_min - 1, y_max + 1
+
+        x_scale = width / (self.x_end - self.x_start)
+        y_scale = height / (y_max - y_min)
+        polygon = QPolygonF([
+            QPointF(left + (x - self.x_start) * x_scale, top + height - (y - y_min) * y_scale)
+            for x, y in zip(xs.tolist(), ys.tolist())
+        ])
+
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing, len(polygon) < 2000)
+        painter.setClipRect(left, top, width + 1, height + 1)
+        painter.setPen(QPen(QColor(40, 100, 200), 1))
+        painter.drawPolyline(polygon)
+        painter.setClipping(False)
+
+        # 坐标轴标注
+        painter.setPen(QColor(0, 0, 0))
+        painter.drawText(4, top + 10, f"{y_max:g}")
+        painter.drawText(4, top + height, f"{y_min:g}")
+        painter.drawText(left, self.height() - 8, self.format_x(self.x_start))
+        end_text = self.format_x(self.x_end)
+        painter.drawText(left + width - painter.fontMetrics().horizontalAdvance(end_text),
+                         self.height() - 8, end_text)
+        painter.drawText(left + width // 2 - 40, self.height() - 8, f"{len(xs)} 点")
+
+    def wheelEvent(self, event):
+        """以光标为中心缩放"""
+        if self.pyramid is None:
+            return
+        center = self.x_to_value(event.position().x())
+        factor = 0.8 if event.angleDelta().y() > 0 else 1.25
+        full_start, full_end = self.pyramid.get_x_range()
+
+        new_start = center - (center - self.x_start) * factor
+        new_end = center + (self.x_end - center) * factor
+        # 缩小时不超出数据范围
+        if new_end - new_start < 1e-9:
+            return
+        self.x_start = max(new_start, full_start)
+        self.x_end = min(new_end, full_end) if full_end > full_start else new_end
+        self.update()
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.MouseButton.LeftButton:
+            self._drag_x = event.position().x()
+
+    def mouseMoveEvent(self, event):
+        if self._drag_x is None or self.pyramid is None:
+            return
+        delta = (self._drag_x - event.position().x()) / self.plot_width() * (self.x_end - self.x_start)
+        self._drag_x = event.position().x()
+        full_start, full_end = self.pyramid.get_x_range()
+        # 平移时保持窗口宽度，不超出数据范围
+        delta = max(min(delta, full_end - self.x_end), full_start - self.x_start)
+        self.x_start += delta
+        self.x_end += delta
+        self.update()
+
+    def mouseReleaseEvent(self, event):
+        self._drag_x = None
+
+    def mouseDoubleClickEvent(self, event):
+        self.reset_view()
+
+
+class TrendPlotDialog(QDialog):
+    """字段趋势图对话框"""
+
+    def __init__(self, columns: FrameColumns, parent=None):
+        """
+        初始化
+
+        Args:
+            columns: 解析结果的列式数据
+            parent: 父窗口
+        """
+        super().__init__(parent)
+        self.columns = columns
+        # (字段名, 是否时间轴) -> 金字塔，每个字段只构建一次
+        self.pyramids: Dict[tuple, MinMaxPyramid] = {}
+        self.setWindowTitle("字段趋势图")
+        self.resize(1000, 550)
+        self.setup_ui()
+        self.on_series_changed()
+
+    def setup_ui(self):
+        """设置UI"""
+        layout = QVBoxLayout(self)
+
+        control_layout = QHBoxLayout()
+        control_layout.addWidget(QLabel("字段:"))
+        self.combo_field = QComboBox()
+        self.combo_field.addItems([
+            name for name in self.columns.get_field_names() if self.columns.is_numeric(name)
+        ])
+        self.combo_field.currentIndexChanged.connect(self.on_series_changed)
+        control_layout.addWidget(self.combo_field)
+
+        control_layout.addWidget(QLabel("横轴:"))
+        self.combo_axis = QComboBox()
+        self.combo_axis.addItems(["帧序号", "到达时间"])
+        self.combo_axis.currentIndexChanged.connect(self.on_series_changed)
+        control_layout.addWidget(self.combo_axis)
+
+        control_layout.addWidget(QLabel("降采样:"))
+        self.combo_method = QComboBox()
+        self.combo_method.addItem("最小/最大值", 'minmax')
+        self.combo_method.addItem("LTTB", 'lttb')
+        self.combo_method.currentIndexChanged.connect(
+            lambda: self.plot.set_method(self.combo_method.currentData())
+        )
+        control_layout.addWidget(self.combo_method)
+
+        control_layout.addStretch()
+        self.btn_reset = QPushButton("全部范围")
+        control_layout.addWidget(self.btn_reset)
+        layout.addLayout(control_layout)
+
+        self.plot = TrendPlotWidget()
+        self.btn_reset.clicked.connect(self.plot.reset_view)
+        layout.addWidget(self.plot)
+
+        layout.addWidget(QLabel("滚轮缩放，左键拖动平移，双击恢复全部范围"))
+
+    def on_series_changed(self):
+        """切换字段或横轴"""
+        name = self.combo_field.currentText()
+        if not name:
+            self.plot.set_pyramid(None)
+            return
+
+        time_axis = self.combo_axis.currentIndex() == 1
+        key = (name, time_axis)
+        if key not in self.pyramids:
+            try:
+                self.pyramids[key] = build_field_pyramid(self.columns, name, time_axis)
+            except ValueError as e:
+                QMessageBox.warning(self, "警告", str(e))
+                return
+
+        pyramid = self.pyramids[key]
+        if time_axis and len(pyramid) == 0:
+            QMessageBox.information(self, "提示", "当前数据没有到达时间（仅实时采集的帧有到达时间）")
+        self.plot.set_pyramid(pyramid, time_axis)
@@ -6,15 +6,47 @@
 from .helpers import (
     export_to_txt,
     export_to_csv,
+    stream_export,
+    get_txt_header,
+    ExportCancelled,
+    read_capture_file,
+    iter_capture_file,
     format_hex,
     bytes_to_int,
     int_to_bytes
 )
+from .columnar_export import (
+    export_columnar,
+    load_npz,
+    get_columnar_format,
+    is_pyarrow_available
+)
+from .sqlite_export import (
+    export_sqlite,
+    load_sqlite,
+    list_sqlite_tables,
+    is_sqlite_path,
+    SqliteTable
+)
 
 __all__ = [
     'export_to_txt',
     'export_to_csv',
+    'stream_export',
+    'get_txt_header',
+    'ExportCancelled',
+    'read_capture_file',
+    'iter_capture_file',
     'format_hex',
     'bytes_to_int',
-    'int_to_bytes'
+    'int_to_bytes',
+    'export_columnar',
+    'load_npz',
+    'get_columnar_format',
+    'is_pyarrow_available',
+    'export_sqlite',
+    'load_sqlite',
+    'list_sqlite_tables',
+    'is_sqlite_path',
+    'SqliteTable'
 ]
@@ -0,0 +1,366 @@
+# -*- coding: utf-8 -*-
+"""
+列式导出模块
+每个协议字段导出为一个带类型的列（uint8→uint8、float→float32、bytes→binary 等），
+另有帧元数据列，供 pandas/duckdb/polars 等工具直接加载：
+
+- .parquet：Parquet 文件，每批帧写为一个行组（需要 pyarrow）
+- .arrow / .feather：Arrow IPC 文件，每批帧写为一个记录批（需要 pyarrow）
+- .npz：NumPy 归档（没有 pyarrow 时的替代格式，需要 numpy），
+  可用 load_npz() 或 numpy.load() 读取，不需要 pickle
+"""
+
+import json
+import os
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # numpy 为可选依赖，.npz 导出需要
+    np = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow 为可选依赖，Parquet/Arrow 导出需要
+    pa = None
+    pq = None
+
+from models import DataFrame, ProtocolConfig
+from .helpers import ExportCancelled, _iter_chunks
+
+
+# 每个行组（记录批）的帧数
+COLUMNAR_ROW_GROUP_SIZE = 65536
+
+# 支持的列式格式（扩展名 -> 格式）
+COLUMNAR_FORMATS = {
+    '.parquet': 'parquet',
+    '.arrow': 'arrow',
+    '.feather': 'arrow',
+    '.npz': 'npz',
+}
+
+# 列类型：(Arrow类型名, numpy类型)；binary/string 在 .npz 中另行编码
+COLUMN_TYPES = {
+    'uint8': ('uint8', 'uint8'),
+    'uint16': ('uint16', 'uint16'),
+    'uint32': ('uint32', 'uint32'),
+    'int8': ('int8', 'int8'),
+    'int16': ('int16', 'int16'),
+    'int32': ('int32', 'int32'),
+    'int64': ('int64', 'int64'),
+    'float': ('float32', 'float32'),
+    'double': ('float64', 'float64'),
+    'bool': ('bool_', 'bool'),
+    'bytes': ('binary', None),
+    'string': ('string', None),
+}
+
+# 各列类型接受的 Python 值类型，其他值（如解析出错时的 bytes）写为空值
+_ACCEPTED_VALUES = {
+    'float': (int, float),
+    'double': (int, float),
+    'bool': (bool,),
+    'bytes': (bytes, bytearray),
+    'string': (str,),
+}
+
+# 整数列的取值范围，超出范围的值写为空值
+_INT_RANGES = {
+    'uint8': (0, 0xFF),
+    'uint16': (0, 0xFFFF),
+    'uint32': (0, 0xFFFFFFFF),
+    'int8': (-0x80, 0x7F),
+    'int16': (-0x8000, 0x7FFF),
+    'int32': (-0x80000000, 0x7FFFFFFF),
+}
+
+# 帧元数据列：(列名, 列类型, 取值函数)
+METADATA_COLUMNS: List[Tuple[str, str, Callable[[DataFrame], Any]]] = [
+    ('frame_number', 'int64', lambda f: f.frame_number),
+    ('start_position', 'int64', lambda f: f.start_position),
+    ('end_position', 'int64', lambda f: f.end_position),
+    ('raw_data', 'bytes', lambda f: f.raw_data),
+    ('checksum_valid', 'bool', lambda f: f.checksum_valid),
+    ('has_error', 'bool', lambda f: f.has_error),
+    ('error_message', 'string', lambda f: f.error_message),
+    ('channel', 'string', lambda f: f.channel),
+    ('timestamp', 'double', lambda f: f.timestamp),
+]
+
+
+def is_pyarrow_available() -> bool:
+    """pyarrow是否可用"""
+    return pa is not None
+
+
+def get_columnar_format(file_path: str) -> Optional[str]:
+    """
+    根据扩展名获取列式格式
+
+    Returns:
+        'parquet'、'arrow'、'npz'，不是列式格式时返回None
+    """
+    return COLUMNAR_FORMATS.get(os.path.splitext(file_path)[1].lower())
+
+
+def get_field_columns(protocol: Optional[ProtocolConfig] = None,
+                      frames: Sequence[DataFrame] = ()) -> List[Tuple[str, str, str]]:
+    """
+    确定字段列
+
+    有协议时每个字段定义一列（按字段顺序），否则按帧中出现的字段和类型推断。
+    字段名与元数据列同名时列名加 field_ 前缀。
+
+    Args:
+        protocol: 协议配置
+        frames: 用于推断字段的帧（没有协议时使用）
+
+    Returns:
+        [(列名, 字段名, 列类型), ...]
+    """
+    if protocol is not None:
+        fields = [(fd.name, fd.field_type.value)
+                  for fd in sorted(protocol.fields, key=lambda fd: fd.order)]
+    else:
+        field_types: Dict[str, str] = {}
+        for frame in frames:
+            for name in frame.fields:
+                if name not in field_types:
+                    field_types[name] = frame.field_types.get(name, 'bytes')
+        fields = list(field_types.items())
+
+    metadata_names = {name for name, _, _ in METADATA_COLUMNS}
+    columns = []
+    seen = set()
+    for name, field_type in fields:
+        if name in seen:
+            continue
+        seen.add(name)
+        column = f"field_{name}" if name in metadata_names else name
+        columns.append((column, name, field_type if field_type in COLUMN_TYPES else 'bytes'))
+    return columns
+
+
+def _column_values(frames: List[DataFrame], field_name: str, column_type: str) -> list:
+    """取出一批帧中某字段的值，缺失或类型不符的值为None"""
+    values = [frame.fields.get(field_name) for frame in frames]
+    if column_type in _INT_RANGES:
+        low, high = _INT_RANGES[column_type]
+        return [value if type(value) is int and low <= value <= high else None for value in values]
+    accepted = _ACCEPTED_VALUES.get(column_type, (int,))
+    return [value if type(value) in accepted else None for value in values]
+
+
+def _chunk_columns(frames: List[DataFrame],
+                   field_columns: List[Tuple[str, str, str]]) -> List[Tuple[str, str, list]]:
+    """把一批帧转换为 [(列名, 列类型, 值列表), ...]"""
+    columns = [(name, column_type, [getter(frame) for frame in frames])
+               for name, column_type, getter in METADATA_COLUMNS]
+    for column, field_name, column_type in field_columns:
+        columns.append((column, column_type, _column_values(frames, field_name, column_type)))
+    return columns
+
+
+def _arrow_schema(field_columns: List[Tuple[str, str, str]],
+                  protocol: Optional[ProtocolConfig]) -> "pa.Schema":
+    types = [(name, column_type) for name, column_type, _ in METADATA_COLUMNS]
+    types += [(column, column_type) for column, _, column_type in field_columns]
+    metadata = {'protocol': protocol.protocol_name} if protocol is not None else None
+    return pa.schema([(name, getattr(pa, COLUMN_TYPES[column_type][0])()) for name, column_type in types],
+                     metadata=metadata)
+
+
+def _arrow_batch(columns: List[Tuple[str, str, list]], schema: "pa.Schema") -> "pa.RecordBatch":
+    arrays = [pa.array(values, type=schema.field(name).type) for name, _, values in columns]
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+class _NpzColumn:
+    """.npz 导出时逐批累积的一列"""
+
+    def __init__(self, column_type: str):
+        self.column_type = column_type
+        self.parts: List["np.ndarray"] = []
+        self.present: List["np.ndarray"] = []
+        self.lengths: List["np.ndarray"] = []
+
+    def add(self, values: list):
+        if self.column_type == 'bytes':
+            # 二进制列拼接为 uint8 数组，另存每个值的长度（转换为偏移量）
+            data = [b'' if value is None else bytes(value) for value in values]
+            self.parts.append(np.frombuffer(b''.join(data), dtype=np.uint8))
+            self.lengths.append(np.fromiter((len(value) for value in data), np.int64, len(data)))
+            self.present.append(np.fromiter((value is not None for value in values), np.bool_, len(values)))
+        elif self.column_type == 'string':
+            self.parts.append(np.array(['' if value is None else value for value in values], dtype=np.str_))
+            self.present.append(np.fromiter((value is not None for value in values), np.bool_, len(values)))
+        else:
+            dtype = np.dtype(COLUMN_TYPES[self.column_type][1])
+            present = np.fromiter((value is not None for value in values), np.bool_, len(values))
+            fill = np.nan if dtype.kind == 'f' else 0
+            self.parts.append(np.array([fill if value is None else value for value in values], dtype=dtype))
+            self.present.append(present)
+
+    def arrays(self, name: str) -> Dict[str, "np.ndarray"]:
+        empty_dtype = {'bytes': np.uint8, 'string': np.str_}.get(self.column_type)
+        values = np.concatenate(self.parts) if self.parts else np.array(
+            [], dtype=empty_dtype or COLUMN_TYPES[self.column_type][1])
+        arrays = {name: values}
+        if self.column_type == 'bytes':
+            lengths = np.concatenate(self.lengths) if self.lengths else np.array([], dtype=np.int64)
+            arrays[f"{name}__offsets"] = np.concatenate(([0], np.cumsum(lengths))).astype(np.int64)
+        present = np.concatenate(self.present) if self.present else np.array([], dtype=np.bool_)
+        if not present.all():
+            arrays[f"{name}__present"] = present
+        return arrays
+
+
+def export_columnar(frames: Iterable[DataFrame], file_path: str,
+                    protocol: Optional[ProtocolConfig] = None, file_format: Optional[str] = None,
+                    total: int = 0, progress: Optional[Callable[[int, int], None]] = None,
+                    is_cancelled: Optional[Callable[[], bool]] = None,
+                    row_group_size: int = COLUMNAR_ROW_GROUP_SIZE) -> int:
+    """
+    列式导出帧
+
+    帧按批转换为列，Parquet/Arrow 每批写为一个行组，内存占用与批大小有关；
+    .npz 需要在最后一次性写入，内存占用与帧数成正比。
+
+    Args:
+        frames: 帧迭代器
+        file_path: 文件路径
+        protocol: 协议配置（决定字段列），为None时按第一批帧推断
+        file_format: 'parquet'、'arrow' 或 'npz'，为None时按扩展名判断
+        total: 总帧数（仅用于进度显示，未知时为0）
+        progress: 进度回调 progress(已写帧数, 总帧数)
+        is_cancelled: 返回True时取消导出并删除未完成的文件
+        row_group_size: 每个行组的帧数
+
+    Returns:
+        写入的帧数
+
+    Raises:
+        ExportCancelled: 导出被取消
+        RuntimeError: 缺少所需的库
+        ValueError: 不支持的格式
+        OSError: 文件写入失败
+    """
+    file_format = file_format or get_columnar_format(file_path)
+    if file_format not in ('parquet', 'arrow', 'npz'):
+        raise ValueError(f"不支持的列式格式: {file_path}")
+    if file_format == 'npz' and np is None:
+        raise RuntimeError("导出 .npz 需要安装 numpy：pip install numpy")
+    if file_format != 'npz' and pa is None:
+        raise RuntimeError("导出 Parquet/Arrow 需要安装 pyarrow：pip install pyarrow（或导出为 .npz）")
+
+    chunks = _iter_chunks(frames, row_group_size)
+    first = next(chunks, [])
+    field_columns = get_field_columns(protocol, first)
+
+    def all_chunks():
+        if first:
+            yield first
+        yield from chunks
+
+    written = 0
+    writer = None
+    try:
+        if file_format == 'npz':
+            npz_columns: Dict[str, _NpzColumn] = {}
+        else:
+            schema = _arrow_schema(field_columns, protocol)
+            if file_format == 'parquet':
+                writer = pq.ParquetWriter(file_path, schema)
+            else:
+                writer = pa.ipc.new_file(file_path, schema)
+
+        for chunk in all_chunks():
+            if is_cancelled and is_cancelled():
+                raise ExportCancelled()
+            columns = _chunk_columns(chunk, field_columns)
+            if file_format == 'npz':
+                for name, column_type, values in columns:
+                    npz_columns.setdefault(name, _NpzColumn(column_type)).add(values)
+            elif file_format == 'parquet':
+                writer.write_batch(_arrow_batch(columns, schema), row_group_size=row_group_size)
+            else:
+                writer.write_batch(_arrow_batch(columns, schema))
+            written += len(chunk)
+            if progress:
+                progress(written, total)
+
+        if file_format == 'npz':
+            _write_npz(file_path, field_columns, npz_columns, protocol)
+        else:
+            writer.close()
+            writer = None
+    except BaseException:
+        # 取消或失败时删除不完整的文件
+        if writer is not None:
+            try:
+                writer.close()
+            except Exception:
+                pass
+        try:
+            os.remove(file_path)
+        except OSError:
+            pass
+        raise
+
+    return written
+
+
+def _write_npz(file_path: str, field_columns: List[Tuple[str, str, str]],
+               npz_columns: Dict[str, "_NpzColumn"], protocol: Optional[ProtocolConfig]):
+    """写入 .npz 文件（列说明以 JSON 字符串保存在 __schema__ 中）"""
+    types = [(name, column_type) for name, column_type, _ in METADATA_COLUMNS]
+    types += [(column, column_type) for column, _, column_type in field_columns]
+    for name, column_type in types:
+        npz_columns.setdefault(name, _NpzColumn(column_type))
+
+    arrays = {}
+    for name, column_type in types:
+        arrays.update(npz_columns[name].arrays(name))
+    arrays['__schema__'] = np.array(json.dumps({
+        'protocol': protocol.protocol_name if protocol is not None else '',
+        'columns': [[name, column_type] for name, column_type in types],
+    }, ensure_ascii=False))
+
+    # 用文件对象写入，避免 numpy 在路径后追加 .npz
+    with open(file_path, 'wb') as f:
+        np.savez(f, **arrays)
+
+
+def load_npz(file_path: str) -> Dict[str, Any]:
+    """
+    读取 export_columnar 导出的 .npz 文件
+
+    Args:
+        file_path: 文件路径
+
+    Returns:
+        列名 -> 值：数值列为 numpy 数组（有空值时为掩码数组），
+        字符串列为字符串数组，二进制列为 bytes 列表（空值为None）
+    """
+    if np is None:
+        raise RuntimeError("读取 .npz 需要安装 numpy：pip install numpy")
+
+    with np.load(file_path, allow_pickle=False) as data:
+        schema = json.loads(str(data['__schema__']))
+        columns = {}
+        for name, column_type in schema['columns']:
+            values = data[name]
+            present = data[f"{name}__present"] if f"{name}__present" in data else None
+            if column_type == 'bytes':
+                offsets = data[f"{name}__offsets"]
+                raw = values.tobytes()
+                values = [raw[offsets[i]:offsets[i + 1]] for i in range(len(offsets) - 1)]
+                if present is not None:
+                    values = [value if ok else None for value, ok in zip(values, present.tolist())]
+            elif present is not None:
+                values = np.ma.masked_array(values, mask=~present)
+            columns[name] = values
+    return columns
@@ -4,10 +4,173 @@
 """
 
 import csv
-from typing import List
+import io
+import itertools
+import os
+import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
 from models import ParseResult, DataFrame
 
 
+# 流式导出每批格式化的帧数
+EXPORT_CHUNK_FRAMES = 5000
+# 导出文件的写缓冲大小
+EXPORT_BUFFER_SIZE = 1 << 20
+
+
+class ExportCancelled(Exception):
+    """导出被取消"""
+
+
+def get_checksum_status(frame: DataFrame) -> str:
+    """获取帧的校验状态文本"""
+    if frame.expected_checksum is not None:
+        return '✓ 通过' if frame.checksum_valid else '✗ 失败'
+    return '无校验'
+
+
+def format_txt_chunk(frames: List[DataFrame]) -> str:
+    """把一批帧格式化为TXT导出文本"""
+    separator = "\n" + "-" * 80 + "\n\n"
+    return ''.join(frame.get_detailed_info() + separator for frame in frames)
+
+
+def format_csv_chunk(frames: List[DataFrame]) -> str:
+    """把一批帧格式化为CSV行"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows(
+        [
+            frame.frame_number,
+            frame.start_position,
+            frame.end_position,
+            frame.get_raw_data_hex(),
+            frame.get_field_summary(),
+            get_checksum_status(frame),
+            frame.error_message if frame.has_error else ''
+        ]
+        for frame in frames
+    )
+    return buffer.getvalue()
+
+
+def get_txt_header(result: Optional[ParseResult] = None) -> str:
+    """
+    获取TXT导出的文件头
+
+    Args:
+        result: 解析结果，提供时写入统计信息（流式导出时帧数未知，可不提供）
+    """
+    lines = ["=" * 80, "串口数据分析结果", "=" * 80, ""]
+    if result is not None:
+        lines += [
+            "统计信息:",
+            f"  总帧数: {result.get_total_frames()}",
+            f"  有效帧: {result.get_valid_frames()}",
+            f"  错误帧: {result.get_error_frames()}",
+            f"  总字节数: {result.total_bytes}",
+            "",
+        ]
+    lines += ["=" * 80, "帧详细信息", "=" * 80, "", ""]
+    return '\n'.join(lines)
+
+
+CSV_HEADER = ['帧序号', '起始位置', '结束位置', '原始数据', '解析结果', '校验状态', '错误信息']
+
+
+def _iter_chunks(frames: Iterable[DataFrame], chunk_size: int) -> Iterator[List[DataFrame]]:
+    iterator = iter(frames)
+    while True:
+        chunk = list(itertools.islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _format_chunks(chunks: Iterator[List[DataFrame]], formatter: Callable,
+                   workers: int) -> Iterator[Tuple[int, str]]:
+    """格式化各批帧，workers>1时用进程池并行，最多同时处理 workers*2 批以限制内存"""
+    if workers <= 1:
+        for chunk in chunks:
+            yield len(chunk), formatter(chunk)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append((len(chunk), executor.submit(formatter, chunk)))
+            if len(pending) >= workers * 2:
+                count, future = pending.popleft()
+                yield count, future.result()
+        while pending:
+            count, future = pending.popleft()
+            yield count, future.result()
+
+
+def stream_export(frames: Iterable[DataFrame], file_path: str, file_format: str = 'txt',
+                  header: str = '', total: int = 0,
+                  progress: Optional[Callable[[int, int], None]] = None,
+                  is_cancelled: Optional[Callable[[], bool]] = None,
+                  chunk_size: int = EXPORT_CHUNK_FRAMES, workers: int = 0) -> int:
+    """
+    流式导出帧
+
+    帧按批从迭代器取出、格式化后整批写入带大缓冲区的文件，
+    内存占用只与批大小有关，与总帧数无关。
+
+    Args:
+        frames: 帧迭代器
+        file_path: 文件路径
+        file_format: 'txt' 或 'csv'
+        header: TXT导出的文件头（CSV固定写表头）
+        total: 总帧数（仅用于进度显示，未知时为0）
+        progress: 进度回调 progress(已写帧数, 总帧数)
+        is_cancelled: 返回True时取消导出并删除未完成的文件
+        chunk_size: 每批帧数
+        workers: 并行格式化的进程数，0或1表示在当前线程格式化
+
+    Returns:
+        写入的帧数
+
+    Raises:
+        ExportCancelled: 导出被取消
+        OSError: 文件写入失败
+    """
+    if file_format == 'csv':
+        formatter = format_csv_chunk
+        f = open(file_path, 'w', encoding='utf-8-sig', newline='', buffering=EXPORT_BUFFER_SIZE)
+    else:
+        formatter = format_txt_chunk
+        f = open(file_path, 'w', encoding='utf-8', buffering=EXPORT_BUFFER_SIZE)
+
+    written = 0
+    try:
+        with f:
+            if file_format == 'csv':
+                csv.writer(f).writerow(CSV_HEADER)
+            else:
+                f.write(header)
+
+            for count, text in _format_chunks(_iter_chunks(frames, chunk_size), formatter, workers):
+                if is_cancelled and is_cancelled():
+                    raise ExportCancelled()
+                f.write(text)
+                written += count
+                if progress:
+                    progress(written, total)
+    except BaseException:
+        # 取消或失败时删除不完整的文件
+        try:
+            os.remove(file_path)
+        except OSError:
+            pass
+        raise
+
+    return written
+
+
 def export_to_txt(result: ParseResult, file_path: str) -> bool:
     """
     导出解析结果到文本文件
@@ -20,25 +183,7 @@ def export_to_txt(result: ParseResult, file_path: str) -> bool:
         是否成功
     """
     try:
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write("=" * 80 + "\n")
-            f.write("串口数据分析结果\n")
-            f.write("=" * 80 + "\n\n")
-            
-            f.write(f"统计信息:\n")
-            f.write(f"  总帧数: {result.get_total_frames()}\n")
-            f.write(f"  有效帧: {result.get_valid_frames()}\n")
-            f.write(f"  错误帧: {result.get_error_frames()}\n")
-            f.write(f"  总字节数: {result.total_bytes}\n\n")
-            
-            f.write("=" * 80 + "\n")
-            f.write("帧详细信息\n")
-            f.write("=" * 80 + "\n\n")
-            
-            for frame in result.frames:
-                f.write(frame.get_detailed_info())
-                f.write("\n" + "-" * 80 + "\n\n")
-        
+        stream_export(result.frames, file_path, 'txt', get_txt_header(result))
         return True
     except Exception as e:
         print(f"导出TXT失败: {e}")
@@ -57,39 +202,70 @@ def export_to_csv(result: ParseResult, file_path: str) -> bool:
         是否成功
     """
     try:
-        with open(file_path, 'w', encoding='utf-8-sig', newline='') as f:
-            writer = csv.writer(f)
-            
-            # 写入表头
-            writer.writerow([
-                '帧序号', '起始位置', '结束位置', '原始数据',
-                '解析结果', '校验状态', '错误信息'
-            ])
-            
-            # 写入数据
-            for frame in result.frames:
-                checksum_status = ''
-                if frame.expected_checksum is not None:
-                    checksum_status = '✓ 通过' if frame.checksum_valid else '✗ 失败'
-                else:
-                    checksum_status = '无校验'
-                
-                writer.writerow([
-                    frame.frame_number,
-                    frame.start_position,
-                    frame.end_position,
-                    frame.get_raw_data_hex(),
-                    frame.get_field_summary(),
-                    checksum_status,
-                    frame.error_message if frame.has_error else ''
-                ])
-        
+        stream_export(result.frames, file_path, 'csv')
         return True
     except Exception as e:
         print(f"导出CSV失败: {e}")
         return False
 
 
+def read_capture_file(file_path: str) -> bytes:
+    """
+    读取捕获文件
+    
+    文件内容只包含十六进制字符和分隔符时按十六进制文本解析，否则按二进制读取
+    
+    Args:
+        file_path: 文件路径
+        
+    Returns:
+        字节数据
+    """
+    with open(file_path, 'rb') as f:
+        data = f.read()
+    
+    if re.fullmatch(rb'[0-9A-Fa-f\s,;:\-]*', data):
+        cleaned = re.sub(rb'[\s,;:\-]+', b'', data)
+        if len(cleaned) % 2 == 0:
+            return bytes.fromhex(cleaned.decode('ascii'))
+    return data
+
+
+def iter_capture_file(file_path: str, block_size: int = 1 << 20) -> Iterator[bytes]:
+    """
+    分块读取捕获文件（用于流式解析大文件）
+
+    按文件开头判断格式：只包含十六进制字符和分隔符时按十六进制文本逐块解码，
+    否则按二进制逐块读取。
+
+    Args:
+        file_path: 文件路径
+        block_size: 每次读取的字节数
+
+    Yields:
+        字节数据块
+    """
+    with open(file_path, 'rb') as f:
+        block = f.read(block_size)
+        if not re.fullmatch(rb'[0-9A-Fa-f\s,;:\-]*', block):
+            while block:
+                yield block
+                block = f.read(block_size)
+            return
+
+        # 十六进制文本：奇数个字符时把最后半个字节留到下一块
+        carry = b''
+        while block:
+            digits = carry + re.sub(rb'[\s,;:\-]+', b'', block)
+            even = len(digits) & ~1
+            carry = digits[even:]
+            if even:
+                yield bytes.fromhex(digits[:even].decode('ascii'))
+            block = f.read(block_size)
+        if carry:
+            raise ValueError("十六进制数据长度必须是偶数")
+
+
 def format_hex(data: bytes, separator: str = ' ', bytes_per_line: int = 16) -> str:
     """
     格式化字节数据为十六进制字符串
@@ -0,0 +1,365 @@
+# -*- coding: utf-8 -*-
+"""
+SQLite 导出模块
+每个协议一张表，由 ProtocolConfig.fields 生成带类型的列（整数→INTEGER、
+浮点→REAL、bytes→BLOB、string→TEXT），另有帧元数据列；
+协议配置保存在 protocols 表中，数据库可以重新打开为解析结果，不需要重新解析；
+大表可以用 SqliteTable 按页读取。
+"""
+
+import json
+import re
+import sqlite3
+import time
+from typing import Callable, Iterable, List, Optional, Sequence, Tuple
+
+from models import DataFrame, ParseResult, ProtocolConfig
+from .helpers import ExportCancelled, _iter_chunks
+from .columnar_export import METADATA_COLUMNS, get_field_columns, _chunk_columns
+
+
+# 数据库文件扩展名
+SQLITE_EXTENSIONS = ('.db', '.sqlite', '.sqlite3')
+
+# 每个事务插入的帧数
+SQLITE_CHUNK_FRAMES = 50000
+
+# 导出过程中临时表名的后缀
+PARTIAL_TABLE_SUFFIX = '__partial'
+
+# 列类型 -> SQLite 列类型
+SQLITE_TYPES = {
+    'uint8': 'INTEGER',
+    'uint16': 'INTEGER',
+    'uint32': 'INTEGER',
+    'int8': 'INTEGER',
+    'int16': 'INTEGER',
+    'int32': 'INTEGER',
+    'int64': 'INTEGER',
+    'bool': 'INTEGER',
+    'float': 'REAL',
+    'double': 'REAL',
+    'bytes': 'BLOB',
+    'string': 'TEXT',
+}
+
+# 除列式导出的元数据列外，SQLite 表还保存校验码，以便重新打开时还原帧详情
+CHECKSUM_COLUMNS = [
+    ('expected_checksum', 'int64', lambda f: f.expected_checksum),
+    ('actual_checksum', 'int64', lambda f: f.actual_checksum),
+]
+
+_PROTOCOLS_TABLE = """
+CREATE TABLE IF NOT EXISTS protocols (
+    table_name TEXT PRIMARY KEY,
+    protocol_name TEXT NOT NULL,
+    protocol_json TEXT NOT NULL,
+    field_columns TEXT NOT NULL,
+    created_at REAL NOT NULL
+)
+"""
+
+
+def quote_identifier(name: str) -> str:
+    """SQL 标识符加引号（字段名可以包含中文、空格等）"""
+    return '"' + name.replace('"', '""') + '"'
+
+
+def is_sqlite_path(file_path: str) -> bool:
+    """是否数据库文件扩展名"""
+    return file_path.lower().endswith(SQLITE_EXTENSIONS)
+
+
+def get_table_name(protocol: Optional[ProtocolConfig]) -> str:
+    """根据协议名生成表名"""
+    name = protocol.protocol_name if protocol is not None else ''
+    return 'frames_' + (re.sub(r'\s+', '_', name.strip()) or 'default')
+
+
+def export_sqlite(frames: Iterable[DataFrame], db_path: str,
+                  protocol: Optional[ProtocolConfig] = None,
+                  index_fields: Sequence[str] = (), table_name: str = '',
+                  total: int = 0, progress: Optional[Callable[[int, int], None]] = None,
+                  is_cancelled: Optional[Callable[[], bool]] = None,
+                  chunk_size: int = SQLITE_CHUNK_FRAMES) -> int:
+    """
+    导出帧到 SQLite 数据库
+
+    帧先写入临时表，全部写完后在一个事务中替换同名表并创建索引，
+    因此取消或失败时原有的同名表保持不变；每批帧在一个事务中用 executemany 插入，
+    数据库使用 WAL 日志。
+
+    Args:
+        frames: 帧迭代器
+        db_path: 数据库文件路径（不存在时创建）
+        protocol: 协议配置（决定字段列），为None时按第一批帧推断
+        index_fields: 需要建索引的字段名或元数据列名
+        table_name: 表名，为空时按协议名生成
+        total: 总帧数（仅用于进度显示，未知时为0）
+        progress: 进度回调 progress(已写帧数, 总帧数)
+        is_cancelled: 返回True时取消导出（删除临时表）
+        chunk_size: 每个事务插入的帧数
+
+    Returns:
+        写入的帧数
+
+    Raises:
+        ExportCancelled: 导出被取消
+        ValueError: 索引字段不存在
+        sqlite3.Error: 数据库写入失败
+    """
+    table_name = table_name or get_table_name(protocol)
+    table = quote_identifier(table_name)
+    chunks = _iter_chunks(frames, chunk_size)
+    first = next(chunks, [])
+    field_columns = get_field_columns(protocol, first)
+
+    columns = [(name, column_type) for name, column_type, _ in METADATA_COLUMNS + CHECKSUM_COLUMNS]
+    columns += [(column, column_type) for column, _, column_type in field_columns]
+    column_names = {name for name, _ in columns}
+    field_to_column = {field_name: column for column, field_name, _ in field_columns}
+    index_columns = []
+    for name in index_fields:
+        column = field_to_column.get(name, name)
+        if column not in column_names:
+            raise ValueError(f"索引字段不存在: {name}")
+        index_columns.append(column)
+
+    # 写入中的临时表，完成后改名为目标表
+    partial_table = quote_identifier(table_name + PARTIAL_TABLE_SUFFIX)
+    conn = sqlite3.connect(db_path)
+    written = 0
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        with conn:
+            conn.execute(_PROTOCOLS_TABLE)
+            # 上次中断的导出可能留下临时表
+            conn.execute(f"DROP TABLE IF EXISTS {partial_table}")
+            conn.execute(f"CREATE TABLE {partial_table} (" + ", ".join(
+                f"{quote_identifier(name)} {SQLITE_TYPES[column_type]}" for name, column_type in columns
+            ) + ")")
+
+        insert = f"INSERT INTO {partial_table} VALUES ({', '.join('?' * len(columns))})"
+
+        def all_chunks():
+            if first:
+                yield first
+            yield from chunks
+
+        for chunk in all_chunks():
+            if is_cancelled and is_cancelled():
+                raise ExportCancelled()
+            values = [values for _, _, values in _chunk_columns(chunk, field_columns)]
+            checksums = [[getter(frame) for frame in chunk] for _, _, getter in CHECKSUM_COLUMNS]
+            # 列顺序：元数据列、校验码列、字段列
+            metadata_count = len(METADATA_COLUMNS)
+            rows = zip(*(values[:metadata_count] + checksums + values[metadata_count:]))
+            with conn:
+                conn.executemany(insert, rows)
+            written += len(chunk)
+            if progress:
+                progress(written, total)
+
+        # 替换原表、建索引和登记协议在同一个事务中完成（DDL 语句不会隐式开始事务）
+        with conn:
+            conn.execute("BEGIN")
+            conn.execute(f"DROP TABLE IF EXISTS {table}")
+            conn.execute(f"ALTER TABLE {partial_table} RENAME TO {table}")
+            for column in index_columns:
+                index = quote_identifier(f"idx_{table_name}_{column}")
+                conn.execute(f"CREATE INDEX {index} ON {table} ({quote_identifier(column)})")
+            conn.execute(
+                "INSERT OR REPLACE INTO protocols VALUES (?, ?, ?, ?, ?)",
+                (table_name, protocol.protocol_name if protocol is not None else '',
+                 json.dumps(protocol.to_dict() if protocol is not None else {}, ensure_ascii=False),
+                 json.dumps(field_columns, ensure_ascii=False), time.time())
+            )
+    except BaseException:
+        # 取消或失败时只删除临时表，原有的同名表保持不变
+        try:
+            with conn:
+                conn.execute(f"DROP TABLE IF EXISTS {partial_table}")
+        except sqlite3.Error:
+            pass
+        raise
+    finally:
+        conn.close()
+
+    return written
+
+
+def list_sqlite_tables(db_path: str) -> List[Tuple[str, str, int]]:
+    """
+    列出数据库中导出的表
+
+    Args:
+        db_path: 数据库文件路径
+
+    Returns:
+        [(表名, 协议名, 帧数), ...]
+
+    Raises:
+        sqlite3.Error: 不是导出的数据库
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        tables = conn.execute("SELECT table_name, protocol_name FROM protocols ORDER BY created_at").fetchall()
+        return [
+            (name, protocol_name,
+             conn.execute(f"SELECT COUNT(*) FROM {quote_identifier(name)}").fetchone()[0])
+            for name, protocol_name in tables
+        ]
+    finally:
+        conn.close()
+
+
+def _read_table_info(conn: sqlite3.Connection, table_name: str,
+                     db_path: str) -> Tuple[str, Optional[ProtocolConfig], list]:
+    """读取导出表的表名、协议配置和字段列（表名为空时使用最早导出的表）"""
+    if table_name:
+        row = conn.execute("SELECT table_name, protocol_json, field_columns FROM protocols "
+                           "WHERE table_name = ?", (table_name,)).fetchone()
+    else:
+        row = conn.execute("SELECT table_name, protocol_json, field_columns FROM protocols "
+                           "ORDER BY created_at LIMIT 1").fetchone()
+    if row is None:
+        raise ValueError(f"数据库中没有导出的帧表: {table_name or db_path}")
+    table_name, protocol_json, field_columns_json = row
+    protocol_data = json.loads(protocol_json)
+    protocol = ProtocolConfig.from_dict(protocol_data) if protocol_data else None
+    return table_name, protocol, json.loads(field_columns_json)
+
+
+def _row_to_frame(row: Sequence, field_columns: list) -> DataFrame:
+    """把表中的一行还原为数据帧"""
+    metadata_count = len(METADATA_COLUMNS) + len(CHECKSUM_COLUMNS)
+    (frame_number, start_position, end_position, raw_data, checksum_valid, has_error,
+     error_message, channel, timestamp, expected_checksum, actual_checksum) = row[:metadata_count]
+    frame = DataFrame(
+        frame_number=frame_number, start_position=start_position, end_position=end_position,
+        raw_data=bytes(raw_data), channel=channel, timestamp=timestamp,
+        checksum_valid=bool(checksum_valid), expected_checksum=expected_checksum,
+        actual_checksum=actual_checksum, has_error=bool(has_error), error_message=error_message
+    )
+    for (_, field_name, field_type), value in zip(field_columns, row[metadata_count:]):
+        if value is not None:
+            frame.add_field(field_name, value, field_type)
+    return frame
+
+
+def load_sqlite(db_path: str, table_name: str = '', where: str = '',
+                params: Sequence = (), limit: int = 0,
+                offset: int = 0) -> Tuple[Optional[ProtocolConfig], ParseResult]:
+    """
+    从数据库重新打开解析结果
+
+    Args:
+        db_path: 数据库文件路径
+        table_name: 表名，为空时使用最早导出的表
+        where: SQL 过滤条件（不含 WHERE 关键字），例如 '"命令码" = 3 AND has_error = 0'
+        params: 过滤条件中 ? 占位符的参数
+        limit: 最多读取的帧数，0表示全部
+        offset: 跳过的帧数（与 limit 一起按页读取）
+
+    Returns:
+        (协议配置, 解析结果)，导出时没有协议配置则协议为None
+
+    Raises:
+        sqlite3.Error: 数据库读取失败或过滤条件无效
+        ValueError: 表不存在
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        table_name, protocol, field_columns = _read_table_info(conn, table_name, db_path)
+
+        sql = f"SELECT * FROM {quote_identifier(table_name)}"
+        if where:
+            sql += f" WHERE {where}"
+        sql += " ORDER BY rowid"
+        if limit > 0 or offset > 0:
+            sql += f" LIMIT {int(limit) if limit > 0 else -1} OFFSET {max(int(offset), 0)}"
+
+        result = ParseResult()
+        for row in conn.execute(sql, params):
+            result.add_frame(_row_to_frame(row, field_columns))
+        if result.frames:
+            result.total_bytes = max(frame.end_position for frame in result.frames)
+        return protocol, result
+    finally:
+        conn.close()
+
+
+class SqliteTable:
+    """
+    数据库中导出的帧表（保持连接，按页读取帧）
+
+    export_sqlite 写入的表行号（rowid）从1开始连续，等于帧在表中的位置，
+    因此按页读取和查找错误帧都是 rowid 范围查询，不扫描之前的行。
+    接口与 FrameIndex 的分页部分一致，界面可以用同样的方式翻页。
+    """
+
+    def __init__(self, db_path: str, table_name: str = ''):
+        """
+        打开导出表
+
+        Args:
+            db_path: 数据库文件路径
+            table_name: 表名，为空时使用最早导出的表
+
+        Raises:
+            sqlite3.Error: 数据库读取失败
+            ValueError: 表不存在
+        """
+        self.capture_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        try:
+            self.table_name, self.protocol, self.field_columns = _read_table_info(
+                self.conn, table_name, db_path)
+            self._table = quote_identifier(self.table_name)
+            self.frame_count = self.conn.execute(f"SELECT COUNT(*) FROM {self._table}").fetchone()[0]
+            self.error_count = self.conn.execute(
+                f"SELECT COUNT(*) FROM {self._table} WHERE has_error != 0").fetchone()[0]
+        except BaseException:
+            self.conn.close()
+            raise
+
+    def __len__(self) -> int:
+        return self.frame_count
+
+    def read_frames(self, frame_number: int, count: int = 1) -> List[DataFrame]:
+        """
+        读取表中从第 frame_number 行开始的若干帧
+
+        Args:
+            frame_number: 第一帧在表中的位置（从1开始）
+            count: 帧数（超出总帧数的部分忽略）
+
+        Returns:
+            帧列表
+        """
+        rows = self.conn.execute(
+            f"SELECT * FROM {self._table} WHERE rowid >= ? ORDER BY rowid LIMIT ?",
+            (frame_number, count)
+        )
+        return [_row_to_frame(row, self.field_columns) for row in rows]
+
+    def next_error(self, frame_number: int = 0) -> Optional[int]:
+        """
+        下一个错误帧
+
+        Args:
+            frame_number: 从该位置之后开始查找（0表示从第一帧开始）
+
+        Returns:
+            错误帧在表中的位置，之后没有错误帧时返回None
+        """
+        row = self.conn.execute(
+            f"SELECT rowid FROM {self._table} WHERE rowid > ? AND has_error != 0 ORDER BY rowid LIMIT 1",
+            (frame_number,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def close(self):
+        """关闭数据库连接"""
+        self.conn.close()